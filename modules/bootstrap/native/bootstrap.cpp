@@ -1,5 +1,7 @@
 #include <vector>
 #include <algorithm>
+#include <boost/random/uniform_int.hpp>
+#include <boost/random/variate_generator.hpp>
 
 #include "bootstrap.h"
 
@@ -75,4 +77,100 @@ void sample(int *vec, int dim, int samples, bool withReplacement)
     }
 }
 
+// Draws uniformly from [low, high] using the generator passed in
+static int uniformInt(int low, int high, boost::mt19937& gen)
+{
+    boost::uniform_int<> uniform(low, high);
+    boost::variate_generator<boost::mt19937&,boost::uniform_int<> > var_uniform(gen, uniform);
+    return var_uniform();
+}
+
+void shuffleFirst(int* vec, int numberOfSamples, int totalNumber, boost::mt19937& gen)
+{
+    for(int i=0; i<numberOfSamples && i<totalNumber-1; i++)
+    {
+        std::swap(vec[i], vec[uniformInt(i, totalNumber-1, gen)]);
+    }
+}
+
+void sampleIndicesWithOutReplacement(int* vec, int numberOfSamples, int totalNumber, boost::mt19937& gen)
+{
+    std::vector<int> sampleIndices(totalNumber);
+    for(int i=0; i<totalNumber; i++)
+    {
+        sampleIndices[i] = i;
+    }
+    if(totalNumber > 0)
+    {
+        shuffleFirst(&sampleIndices[0], numberOfSamples, totalNumber, gen);
+    }
+
+    for(int i=0; i<numberOfSamples; i++)
+    {
+        vec[i] = sampleIndices[i];
+    }
+}
+
+void sampleWithOutReplacement(int *vec, int dim, int samples, boost::mt19937& gen)
+{
+    for(int i=0;i<dim;i++)
+    {
+        vec[i] = 0;
+    }
+
+    samples = samples > dim ? dim : samples;
+    std::vector<int> sampleIndices(dim);
+    for(int i=0; i<dim; i++)
+    {
+        sampleIndices[i] = i;
+    }
+    if(dim > 0)
+    {
+        shuffleFirst(&sampleIndices[0], samples, dim, gen);
+    }
+
+    for(int i=0; i<samples; i++)
+    {
+        vec[ sampleIndices[i] ] = 1;
+    }
+}
+
+void sampleWithReplacement(int *vec, int dim, int samples, boost::mt19937& gen)
+{
+    for(int i=0;i<dim;i++)
+    {
+        vec[i] = 0;
+    }
 
+    if(dim <= 0)
+    {
+        return;
+    }
+
+    boost::uniform_int<> uniform(0, dim-1);
+    boost::variate_generator<boost::mt19937&,boost::uniform_int<> > var_uniform(gen, uniform);
+    for(int i=0;i<samples;i++)
+    {
+        vec[var_uniform()]++;
+    }
+}
+
+void sample(int *vec, int dim, int samples, bool withReplacement, boost::mt19937& gen)
+{
+    if(withReplacement)
+    {
+        return sampleWithReplacement(vec, dim, samples, gen);
+    }
+    else
+    {
+        return sampleWithOutReplacement(vec, dim, samples, gen);
+    }
+}
+
+void shuffle(std::vector<int>& vec, boost::mt19937& gen)
+{
+    if(!vec.empty())
+    {
+        shuffleFirst(&vec[0], vec.size(), vec.size(), gen);
+    }
+}
@@ -1,7 +1,26 @@
 #pragma once
 
+#ifndef SWIG
+#include <vector>
+#include <boost/random/mersenne_twister.hpp>
+#endif
+
+// Legacy versions that use the global c rng (only safe from a single thread)
 void setSeed(int seed);
 void sampleIndicesWithOutReplacement(int* vec, int numberOfSamples, int totalNumber);
 void sampleWithOutReplacement(int *vec, int dim, int samples);
 void sampleWithReplacement(int *vec, int dim, int samples);
 void sample(int *vec, int dim, int samples, bool withReplacement);
+
+// Versions that draw from the generator passed in (ie the per tree generator
+// passed to ProcessStep) so they can be called from multiple threads
+#ifndef SWIG
+void sampleIndicesWithOutReplacement(int* vec, int numberOfSamples, int totalNumber, boost::mt19937& gen);
+void sampleWithOutReplacement(int *vec, int dim, int samples, boost::mt19937& gen);
+void sampleWithReplacement(int *vec, int dim, int samples, boost::mt19937& gen);
+void sample(int *vec, int dim, int samples, bool withReplacement, boost::mt19937& gen);
+void shuffle(std::vector<int>& vec, boost::mt19937& gen);
+// Only shuffles the first numberOfSamples positions (partial Fisher-Yates) so
+// they are a sample without replacement of vec, without allocating
+void shuffleFirst(int* vec, int numberOfSamples, int totalNumber, boost::mt19937& gen);
+#endif
@@ -12,7 +12,7 @@ BufferCollection::BufferCollection()
 BufferCollection::BufferCollection(const BufferCollection& bc)
 : mBuffers()
 {
-    for(std::map<BufferCollectionKey_t, boost::any>::const_iterator it=bc.mBuffers.begin(); 
+    for(BufferMapType::const_iterator it=bc.mBuffers.begin(); 
         it!=bc.mBuffers.end(); 
         ++it )
     {
@@ -23,11 +23,11 @@ BufferCollection::BufferCollection(const BufferCollection& bc)
 BufferCollection::~BufferCollection()
 {
     // printf("~BufferCollection() %p\n", this);
-    // for(std::map<BufferCollectionKey_t, boost::any>::const_iterator it=mBuffers.begin(); 
+    // for(BufferMapType::const_iterator it=mBuffers.begin(); 
     //     it!=mBuffers.end(); 
     //     ++it )
     // {
-    //     printf(" %s\n", it->first.c_str());
+    //     printf(" %s\n", GetBufferKeyName(it->first).c_str());
     // }
     mBuffers.clear();
 }
@@ -37,7 +37,7 @@ BufferCollection& BufferCollection::operator=(const BufferCollection& bc)
     if(this != &bc) // protect against invalid self-assignment
     {
         mBuffers.clear();
-        for(std::map<BufferCollectionKey_t, boost::any>::const_iterator it=bc.mBuffers.begin(); 
+        for(BufferMapType::const_iterator it=bc.mBuffers.begin(); 
             it!=bc.mBuffers.end(); 
             ++it )
         {
@@ -90,25 +90,32 @@ DEFINE_BUFFER_SWIG_INTERFACE_FOR_TYPE(Int64Tensor3Buffer)
 
 bool BufferCollection::HasBuffer(std::string name) const
 {
-    return (mBuffers.find(name) != mBuffers.end());
+    return HasBuffer(InternBufferKey(name));
+}
+
+bool BufferCollection::HasBuffer(BufferKey_t key) const
+{
+    return (mBuffers.find(key) != mBuffers.end());
 }
 
 void BufferCollection::Print() const
 {
-    for(BufferMapType::const_iterator iter = mBuffers.begin(); iter != mBuffers.end(); ++iter)
+    std::list<std::string> keys = GetKeys();
+    for(std::list<std::string>::const_iterator iter = keys.begin(); iter != keys.end(); ++iter)
     {
-        printf("%s\n", iter->first.c_str());
+        printf("%s\n", iter->c_str());
     }
 }
 
 std::list<std::string> BufferCollection::GetKeys() const
 {
     std::list<std::string> keys;
-    for(std::map<BufferCollectionKey_t, boost::any>::const_iterator it=mBuffers.begin(); 
+    for(BufferMapType::const_iterator it=mBuffers.begin(); 
         it!=mBuffers.end(); 
         ++it )
     {
-        keys.push_back(it->first);
+        keys.push_back(GetBufferKeyName(it->first));
     }
+    keys.sort();
     return keys;
 }
@@ -10,6 +10,7 @@
 #include "MatrixBuffer.h"
 #include "SparseMatrixBuffer.h"
 #include "Tensor3Buffer.h"
+#include "BufferKeys.h"
 
 #define BufferCollectionKey_t std::string
 
@@ -49,23 +50,36 @@ BUFFER_TYPE& Get ## BUFFER_TYPE(const BufferCollectionKey_t& name);
 #undef DECLARE_BUFFER_SWIG_INTERFACE_FOR_TYPE
 
     bool HasBuffer(BufferCollectionKey_t name) const;
+    bool HasBuffer(BufferKey_t key) const;
     void Print() const;
     std::list<std::string> GetKeys() const;
 
     template<typename BufferType>
     void AddBuffer(BufferCollectionKey_t name, BufferType const& data);
     template<typename BufferType>
+    void AddBuffer(BufferKey_t key, BufferType const& data);
+    template<typename BufferType>
     BufferType& GetOrAddBuffer(BufferCollectionKey_t name);
     template<typename BufferType>
+    BufferType& GetOrAddBuffer(BufferKey_t key);
+    template<typename BufferType>
     void AppendBuffer(BufferCollectionKey_t name, BufferType const& buffer);
     template<typename BufferType>
     BufferType const& GetBuffer(BufferCollectionKey_t name) const;
     template<typename BufferType>
     BufferType& GetBuffer(BufferCollectionKey_t name);
     template<typename BufferType>
+    BufferType const& GetBuffer(BufferKey_t key) const;
+    template<typename BufferType>
+    BufferType& GetBuffer(BufferKey_t key);
+    template<typename BufferType>
     BufferType const* GetBufferPtr(BufferCollectionKey_t name) const;
     template<typename BufferType>
     BufferType* GetBufferPtr(BufferCollectionKey_t name);
+    template<typename BufferType>
+    BufferType const* GetBufferPtr(BufferKey_t key) const;
+    template<typename BufferType>
+    BufferType* GetBufferPtr(BufferKey_t key);
 
 // private:
     // Checks for a buffer of a specific type.
@@ -75,15 +89,18 @@ BUFFER_TYPE& Get ## BUFFER_TYPE(const BufferCollectionKey_t& name);
     // transition.
     template<typename BufferType>
     bool HasBuffer(BufferCollectionKey_t name) const {
-        if (HasBuffer(name)) {
-            BufferMapType::const_iterator bufferIter = mBuffers.find(name);
-            return bufferIter->second.type() == typeid(BufferType);
-        }
-        return false;
+        return HasBuffer<BufferType>(InternBufferKey(name));
+    }
+
+    template<typename BufferType>
+    bool HasBuffer(BufferKey_t key) const {
+        BufferMapType::const_iterator bufferIter = mBuffers.find(key);
+        return bufferIter != mBuffers.end() && bufferIter->second.type() == typeid(BufferType);
     }
 
 private:
-    typedef std::map<BufferCollectionKey_t, boost::any> BufferMapType;
+    // Keyed by interned names, see BufferKeys.h
+    typedef std::map<BufferKey_t, boost::any> BufferMapType;
 
     BufferMapType mBuffers;
 };
@@ -92,58 +109,95 @@ private:
 template<typename BufferType>
 void BufferCollection::AddBuffer(BufferCollectionKey_t name, BufferType const& buffer)
 {
-    mBuffers[name] = boost::any(buffer);
+    AddBuffer(InternBufferKey(name), buffer);
+}
+
+template<typename BufferType>
+void BufferCollection::AddBuffer(BufferKey_t key, BufferType const& buffer)
+{
+    mBuffers[key] = boost::any(buffer);
 }
 
 template<typename BufferType>
 BufferType& BufferCollection::GetOrAddBuffer(BufferCollectionKey_t name)
 {
-    if( !HasBuffer<BufferType>(name) )
+    return GetOrAddBuffer<BufferType>(InternBufferKey(name));
+}
+
+template<typename BufferType>
+BufferType& BufferCollection::GetOrAddBuffer(BufferKey_t key)
+{
+    if( !HasBuffer<BufferType>(key) )
     {
-        mBuffers[name] = boost::any(BufferType());
+        mBuffers[key] = boost::any(BufferType());
     }
-    return GetBuffer<BufferType>(name);
+    return GetBuffer<BufferType>(key);
 }
 
 template<typename BufferType>
 void BufferCollection::AppendBuffer(BufferCollectionKey_t name, BufferType const& buffer)
 {
-    if (!HasBuffer(name)) {
-        AddBuffer(name, buffer);
+    const BufferKey_t key = InternBufferKey(name);
+    if (!HasBuffer(key)) {
+        AddBuffer(key, buffer);
     }
     else {
-        GetBuffer<BufferType>(name).Append(buffer);
+        GetBuffer<BufferType>(key).Append(buffer);
     }
 }
 
 template<typename BufferType>
 BufferType const& BufferCollection::GetBuffer(BufferCollectionKey_t name) const
 {
-    BufferType const* ptr = GetBufferPtr<BufferType>(name);
-    return *ptr;
+    return GetBuffer<BufferType>(InternBufferKey(name));
 }
 
 template<typename BufferType>
 BufferType& BufferCollection::GetBuffer(BufferCollectionKey_t name)
 {
-    BufferType* ptr = GetBufferPtr<BufferType>(name);
+    return GetBuffer<BufferType>(InternBufferKey(name));
+}
+
+template<typename BufferType>
+BufferType const& BufferCollection::GetBuffer(BufferKey_t key) const
+{
+    BufferType const* ptr = GetBufferPtr<BufferType>(key);
+    return *ptr;
+}
+
+template<typename BufferType>
+BufferType& BufferCollection::GetBuffer(BufferKey_t key)
+{
+    BufferType* ptr = GetBufferPtr<BufferType>(key);
     return *ptr;
 }
 
 template<typename BufferType>
 BufferType const* BufferCollection::GetBufferPtr(BufferCollectionKey_t name) const
 {
-    ASSERT(HasBuffer(name));
-    BufferMapType::const_iterator bufferIter = mBuffers.find(name);
+    return GetBufferPtr<BufferType>(InternBufferKey(name));
+}
+
+template<typename BufferType>
+BufferType* BufferCollection::GetBufferPtr(BufferCollectionKey_t name)
+{
+    return GetBufferPtr<BufferType>(InternBufferKey(name));
+}
+
+template<typename BufferType>
+BufferType const* BufferCollection::GetBufferPtr(BufferKey_t key) const
+{
+    ASSERT(HasBuffer(key));
+    BufferMapType::const_iterator bufferIter = mBuffers.find(key);
     // use pointers so any_cast doesn't copy the buffer
     return boost::any_cast<BufferType>(&bufferIter->second);
 }
 
 template<typename BufferType>
-BufferType* BufferCollection::GetBufferPtr(BufferCollectionKey_t name)
+BufferType* BufferCollection::GetBufferPtr(BufferKey_t key)
 {
-    ASSERT(HasBuffer(name));
-    BufferMapType::iterator bufferIter = mBuffers.find(name);
+    ASSERT(HasBuffer(key));
+    BufferMapType::iterator bufferIter = mBuffers.find(key);
     // use pointers so any_cast doesn't copy the buffer
     return boost::any_cast<BufferType>(&bufferIter->second);
 }
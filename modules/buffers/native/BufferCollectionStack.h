@@ -33,12 +33,18 @@ public:
 
     template<typename BufferType>
     bool HasBuffer(BufferCollectionKey_t bufferKey) const;
+    template<typename BufferType>
+    bool HasBuffer(BufferKey_t bufferKey) const;
 
     template<typename BufferType>
     BufferType const& GetBuffer(BufferCollectionKey_t bufferKey) const;
+    template<typename BufferType>
+    BufferType const& GetBuffer(BufferKey_t bufferKey) const;
 
     template<typename BufferType>
     BufferType const* GetBufferPtr(BufferCollectionKey_t bufferKey) const;
+    template<typename BufferType>
+    BufferType const* GetBufferPtr(BufferKey_t bufferKey) const;
 
 
 private:
@@ -47,8 +53,15 @@ private:
 
 
 
+// The name is interned once and each level compares integers
 template<typename BufferType>
 bool BufferCollectionStack::HasBuffer(BufferCollectionKey_t bufferKey) const
+{
+    return HasBuffer<BufferType>(InternBufferKey(bufferKey));
+}
+
+template<typename BufferType>
+bool BufferCollectionStack::HasBuffer(BufferKey_t bufferKey) const
 {
     for (std::list<const BufferCollection*>::const_iterator it = mStack.begin() ; it != mStack.end(); ++it)
     {
@@ -62,6 +75,12 @@ bool BufferCollectionStack::HasBuffer(BufferCollectionKey_t bufferKey) const
 
 template<typename BufferType>
 BufferType const& BufferCollectionStack::GetBuffer(BufferCollectionKey_t bufferKey) const
+{
+    return GetBuffer<BufferType>(InternBufferKey(bufferKey));
+}
+
+template<typename BufferType>
+BufferType const& BufferCollectionStack::GetBuffer(BufferKey_t bufferKey) const
 {
     BufferType const* bufferPtr = GetBufferPtr<BufferType>(bufferKey);
     ASSERT(bufferPtr != NULL);
@@ -70,6 +89,12 @@ BufferType const& BufferCollectionStack::GetBuffer(BufferCollectionKey_t bufferK
 
 template<typename BufferType>
 BufferType const* BufferCollectionStack::GetBufferPtr(BufferCollectionKey_t bufferKey) const
+{
+    return GetBufferPtr<BufferType>(InternBufferKey(bufferKey));
+}
+
+template<typename BufferType>
+BufferType const* BufferCollectionStack::GetBufferPtr(BufferKey_t bufferKey) const
 {
     for (std::list<const BufferCollection*>::const_iterator it = mStack.begin(); it != mStack.end(); ++it)
     {
@@ -79,10 +104,10 @@ BufferType const* BufferCollectionStack::GetBufferPtr(BufferCollectionKey_t buff
         }
         else if((*it)->HasBuffer(bufferKey))
         {
-            printf("Warning there is another bufferkey %s of a different type\n", bufferKey.c_str() );
+            printf("Warning there is another bufferkey %s of a different type\n", GetBufferKeyName(bufferKey).c_str() );
         }
     }
-    printf("Error bufferkey %s does not exist\n", bufferKey.c_str() );
+    printf("Error bufferkey %s does not exist\n", GetBufferKeyName(bufferKey).c_str() );
     Print();
     return NULL;
-}
\ No newline at end of file
+}
@@ -1,5 +1,26 @@
 #include "BufferCollectionUtils.h"
 
+void IncrementBuffers(BufferCollection& bc, const BufferCollection& other)
+{
+	const std::list<std::string> keys = other.GetKeys();
+	for(std::list<std::string>::const_iterator it = keys.begin(); it != keys.end(); ++it)
+	{
+		const BufferCollectionKey_t& key = *it;
+		IncrementVectorBuffer<float>(bc, other, key)
+			|| IncrementVectorBuffer<double>(bc, other, key)
+			|| IncrementVectorBuffer<int>(bc, other, key)
+			|| IncrementVectorBuffer<long long>(bc, other, key)
+			|| AddBufferIfMissing<Float32MatrixBuffer>(bc, other, key)
+			|| AddBufferIfMissing<Float64MatrixBuffer>(bc, other, key)
+			|| AddBufferIfMissing<Int32MatrixBuffer>(bc, other, key)
+			|| AddBufferIfMissing<Int64MatrixBuffer>(bc, other, key)
+			|| AddBufferIfMissing<Float32Tensor3Buffer>(bc, other, key)
+			|| AddBufferIfMissing<Float64Tensor3Buffer>(bc, other, key)
+			|| AddBufferIfMissing<Int32Tensor3Buffer>(bc, other, key)
+			|| AddBufferIfMissing<Int64Tensor3Buffer>(bc, other, key);
+	}
+}
+
 TimeLogger::TimeLogger(BufferCollection& bc, const std::string& name)
 : mBufferCollection(bc)
 , mTimeName("Time-"+name)
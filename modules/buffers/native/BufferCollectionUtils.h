@@ -37,6 +37,41 @@ void IncrementValue(BufferCollection& bc, const BufferCollectionKey_t& key, int
 	buffer.Incr(index, value);
 }
 
+template<typename BufferType>
+bool AddBufferIfMissing(BufferCollection& bc, const BufferCollection& other, const BufferCollectionKey_t& key)
+{
+	if(!other.HasBuffer<BufferType>(key))
+	{
+		return false;
+	}
+	if(!bc.HasBuffer(key))
+	{
+		bc.AddBuffer<BufferType>(key, other.GetBuffer<BufferType>(key));
+	}
+	return true;
+}
+
+template<typename T>
+bool IncrementVectorBuffer(BufferCollection& bc, const BufferCollection& other, const BufferCollectionKey_t& key)
+{
+	if(!other.HasBuffer< VectorBufferTemplate<T> >(key))
+	{
+		return false;
+	}
+	const VectorBufferTemplate<T>& otherBuffer = other.GetBuffer< VectorBufferTemplate<T> >(key);
+	for(int i=0; i<otherBuffer.GetN(); i++)
+	{
+		IncrementValue<T>(bc, key, i, otherBuffer.Get(i));
+	}
+	return true;
+}
+
+// Adds the vector buffers of other to bc element by element (how the
+// counters and timers in extra info are written) and copies matrix and
+// tensor buffers that bc does not have yet.  Used to combine the extra info
+// gathered by tasks that ran concurrently.
+void IncrementBuffers(BufferCollection& bc, const BufferCollection& other);
+
 class TimeLogger
 {
 public:
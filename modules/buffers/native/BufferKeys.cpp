@@ -0,0 +1,84 @@
+#include <vector>
+#include <boost/unordered_map.hpp>
+
+#if USE_BOOST_THREAD
+#include <boost/thread.hpp>
+#include <boost/thread/tss.hpp>
+#endif
+
+#include <asserts.h>
+#include "BufferKeys.h"
+
+namespace
+{
+    typedef boost::unordered_map<std::string, BufferKey_t> BufferKeyMap;
+
+    BufferKeyMap globalKeys;
+    std::vector<std::string> globalNames;
+#if USE_BOOST_THREAD
+    // Only taken the first time a thread sees a name, after that the name is
+    // found in the thread's own copy of the keys without locking
+    boost::mutex globalKeysMutex;
+    boost::thread_specific_ptr<BufferKeyMap> threadKeys;
+#endif
+
+    BufferKey_t InternBufferKeyLocked(const std::string& name)
+    {
+        BufferKeyMap::const_iterator it = globalKeys.find(name);
+        if( it != globalKeys.end() )
+        {
+            return it->second;
+        }
+        const BufferKey_t key = static_cast<BufferKey_t>(globalNames.size());
+        globalKeys[name] = key;
+        globalNames.push_back(name);
+        return key;
+    }
+}
+
+BufferKey_t InternBufferKey(const std::string& name)
+{
+#if USE_BOOST_THREAD
+    BufferKeyMap* keys = threadKeys.get();
+    if( keys == NULL )
+    {
+        keys = new BufferKeyMap();
+        threadKeys.reset(keys);
+    }
+    BufferKeyMap::const_iterator it = keys->find(name);
+    if( it != keys->end() )
+    {
+        return it->second;
+    }
+    BufferKey_t key = 0;
+    {
+        boost::mutex::scoped_lock lock(globalKeysMutex);
+        key = InternBufferKeyLocked(name);
+    }
+    (*keys)[name] = key;
+    return key;
+#else
+    return InternBufferKeyLocked(name);
+#endif
+}
+
+std::string GetBufferKeyName(BufferKey_t key)
+{
+#if USE_BOOST_THREAD
+    boost::mutex::scoped_lock lock(globalKeysMutex);
+#endif
+    ASSERT_VALID_RANGE(key, 0, static_cast<BufferKey_t>(globalNames.size()))
+    return globalNames[key];
+}
+
+BufferKey::BufferKey()
+: mName()
+, mKey(-1)
+{
+}
+
+BufferKey::BufferKey(const std::string& name)
+: mName(name)
+, mKey(InternBufferKey(name))
+{
+}
@@ -0,0 +1,41 @@
+#pragma once
+
+#include <string>
+
+// ----------------------------------------------------------------------------
+//
+// Buffer names are interned to small integers so BufferCollection and
+// BufferCollectionStack compare integers instead of strings.  A name always
+// interns to the same key and the names are kept for printing and pickling.
+//
+// Interning is thread safe.  Each thread keeps its own copy of the keys it
+// has seen so only the first lookup of a name by a thread takes a lock.
+//
+// ----------------------------------------------------------------------------
+typedef int BufferKey_t;
+
+BufferKey_t InternBufferKey(const std::string& name);
+std::string GetBufferKeyName(BufferKey_t key);
+
+// ----------------------------------------------------------------------------
+//
+// A buffer name that is interned once when it is constructed.  Steps,
+// walkers and features keep the buffers they look up as BufferKeys so
+// ProcessStep and Bind go straight to the BufferKey_t overloads of
+// BufferCollection and BufferCollectionStack.
+//
+// ----------------------------------------------------------------------------
+class BufferKey
+{
+public:
+    BufferKey();
+    BufferKey(const std::string& name);
+
+    const std::string& GetName() const { return mName; }
+    BufferKey_t GetKey() const { return mKey; }
+    operator BufferKey_t() const { return mKey; }
+
+private:
+    std::string mName;
+    BufferKey_t mKey;
+};
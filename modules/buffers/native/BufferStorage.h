@@ -0,0 +1,174 @@
+#pragma once
+
+#include <vector>
+#include <algorithm>
+#include <cstddef>
+#include <boost/shared_ptr.hpp>
+
+#include <asserts.h>
+
+// ----------------------------------------------------------------------------
+//
+// BufferStorage is the contiguous storage behind the vector, matrix and
+// tensor3 buffers.  It behaves like the subset of std::vector the buffers
+// use but it can also wrap memory owned by someone else (ie a numpy array)
+// without copying it.
+//
+// A wrapped BufferStorage keeps the memory alive through mOwner, which is
+// shared by every copy.  Copies of a wrapped storage share the memory and
+// the first non-const access (Set, Resize, etc) copies the data into memory
+// owned by that storage, so writes never leak into the wrapped memory or
+// into other copies (copy on write).
+//
+// A view can also wrap part of another view, it shares the same owner.
+//
+// ----------------------------------------------------------------------------
+template <class T>
+class BufferStorage
+{
+public:
+    BufferStorage();
+    explicit BufferStorage(size_t n);
+    BufferStorage(size_t n, const T& value);
+    BufferStorage(T* data, size_t n, const boost::shared_ptr<void>& owner);
+    BufferStorage(const BufferStorage& view, size_t offset, size_t n);
+    BufferStorage(const BufferStorage& other);
+    BufferStorage& operator=(const BufferStorage& other);
+    ~BufferStorage();
+
+    size_t size() const { return mSize; }
+    void resize(size_t n);
+    void resize(size_t n, const T& value);
+
+    T& operator[](size_t i) { Detach(); return mData[i]; }
+    const T& operator[](size_t i) const { return mData[i]; }
+
+    T* begin() { Detach(); return mData; }
+    T* end() { Detach(); return mData + mSize; }
+    const T* begin() const { return mData; }
+    const T* end() const { return mData + mSize; }
+
+    bool IsView() const { return mOwner.get() != NULL; }
+
+private:
+    void Detach();
+    void UpdateDataPtr();
+
+    std::vector<T> mOwned;
+    boost::shared_ptr<void> mOwner;
+    T* mData;
+    size_t mSize;
+};
+
+template <class T>
+BufferStorage<T>::BufferStorage()
+: mOwned()
+, mOwner()
+, mData(NULL)
+, mSize(0)
+{
+}
+
+template <class T>
+BufferStorage<T>::BufferStorage(size_t n)
+: mOwned(n)
+, mOwner()
+, mData(NULL)
+, mSize(n)
+{
+    UpdateDataPtr();
+}
+
+template <class T>
+BufferStorage<T>::BufferStorage(size_t n, const T& value)
+: mOwned(n, value)
+, mOwner()
+, mData(NULL)
+, mSize(n)
+{
+    UpdateDataPtr();
+}
+
+template <class T>
+BufferStorage<T>::BufferStorage(T* data, size_t n, const boost::shared_ptr<void>& owner)
+: mOwned()
+, mOwner(owner)
+, mData(data)
+, mSize(n)
+{
+}
+
+template <class T>
+BufferStorage<T>::BufferStorage(const BufferStorage& view, size_t offset, size_t n)
+: mOwned()
+, mOwner(view.mOwner)
+, mData(view.mData + offset)
+, mSize(n)
+{
+    ASSERT(view.IsView())
+    ASSERT(offset + n <= view.mSize)
+}
+
+template <class T>
+BufferStorage<T>::BufferStorage(const BufferStorage& other)
+: mOwned(other.mOwned)
+, mOwner(other.mOwner)
+, mData(other.mData)
+, mSize(other.mSize)
+{
+    UpdateDataPtr();
+}
+
+template <class T>
+BufferStorage<T>& BufferStorage<T>::operator=(const BufferStorage& other)
+{
+    if(this != &other)
+    {
+        mOwned = other.mOwned;
+        mOwner = other.mOwner;
+        mData = other.mData;
+        mSize = other.mSize;
+        UpdateDataPtr();
+    }
+    return *this;
+}
+
+template <class T>
+BufferStorage<T>::~BufferStorage()
+{
+}
+
+template <class T>
+void BufferStorage<T>::resize(size_t n)
+{
+    resize(n, T());
+}
+
+template <class T>
+void BufferStorage<T>::resize(size_t n, const T& value)
+{
+    Detach();
+    mOwned.resize(n, value);
+    mSize = n;
+    UpdateDataPtr();
+}
+
+template <class T>
+void BufferStorage<T>::Detach()
+{
+    if(IsView())
+    {
+        mOwned.assign(mData, mData + mSize);
+        mOwner.reset();
+        UpdateDataPtr();
+    }
+}
+
+template <class T>
+void BufferStorage<T>::UpdateDataPtr()
+{
+    if(!IsView())
+    {
+        mData = mOwned.empty() ? NULL : &mOwned[0];
+    }
+}
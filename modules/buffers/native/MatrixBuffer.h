@@ -7,6 +7,7 @@
 
 #include <asserts.h>
 #include "VectorBuffer.h"
+#include "BufferStorage.h"
 
 template <class T>
 class MatrixBufferTemplate {
@@ -18,6 +19,7 @@ public:
     MatrixBufferTemplate(double* data, int m, int n);
     MatrixBufferTemplate(int* data, int m, int n);
     MatrixBufferTemplate(long long* data, int m, int n);
+    MatrixBufferTemplate(const BufferStorage<T>& storage, int m, int n);
     ~MatrixBufferTemplate();
 
     void Resize(int m, int n);
@@ -38,6 +40,9 @@ public:
     void Incr(int m, int n, T value);
 
     const T* GetRowPtrUnsafe(int m) const;
+    T* GetMutableRowPtrUnsafe(int m);
+    const T* GetDataPtrUnsafe() const;
+    bool IsView() const;
     void SetRow(int m, const VectorBufferTemplate<T>& row);
 
     T GetMax() const;
@@ -67,7 +72,7 @@ public:
     void Print() const;
 
 private:
-    std::vector< T > mData;
+    BufferStorage< T > mData;
     int mM;
     int mN;
 };
@@ -144,6 +149,16 @@ MatrixBufferTemplate<T>::MatrixBufferTemplate(long long* data, int m, int n)
     }
 }
 
+// Wraps storage without copying, see BufferStorage
+template <class T>
+MatrixBufferTemplate<T>::MatrixBufferTemplate(const BufferStorage<T>& storage, int m, int n)
+: mData( storage )
+, mM(m)
+, mN(n)
+{
+    ASSERT(static_cast<size_t>(m*n) <= mData.size())
+}
+
 template <class T>
 MatrixBufferTemplate<T>::~MatrixBufferTemplate()
 {
@@ -275,6 +290,26 @@ const T* MatrixBufferTemplate<T>::GetRowPtrUnsafe(int m) const
     return &mData[m*mN];
 }
 
+// Copies a view first (see BufferStorage) so writes never reach the wrapped memory
+template <class T>
+T* MatrixBufferTemplate<T>::GetMutableRowPtrUnsafe(int m)
+{
+    ASSERT_VALID_RANGE(m, 0, mM)
+    return mData.begin() + m*mN;
+}
+
+template <class T>
+const T* MatrixBufferTemplate<T>::GetDataPtrUnsafe() const
+{
+    return mData.begin();
+}
+
+template <class T>
+bool MatrixBufferTemplate<T>::IsView() const
+{
+    return mData.IsView();
+}
+
 template <class T>
 void MatrixBufferTemplate<T>::SetRow(int m, const VectorBufferTemplate<T>& row)
 {
@@ -61,6 +61,18 @@ public:
     void NormalizeRow(int m);
 
     void Append(const SparseMatrixBufferTemplate<T>& buffer);
+
+    /**
+     * The column index is a CSC copy of the matrix so the non-zeros of a
+     * column can be walked without searching every row.  It is optional
+     * because it doubles the memory of the matrix.  The rows of each column
+     * are sorted.  Anything that changes the matrix drops the index.
+     */
+    void BuildColumnIndex();
+    bool HasColumnIndex() const { return !mColPtr.empty(); }
+    int GetColumnNumberOfNonZeros(int n) const;
+    int const* GetColumnRowsPtrUnsafe(int n) const;
+    T const* GetColumnValuesPtrUnsafe(int n) const;
     SparseMatrixBufferTemplate<T> Slice(const VectorBufferTemplate<int>& indices) const;
     SparseMatrixBufferTemplate<T> SliceRow(int row) const;
 
@@ -88,6 +100,8 @@ private:
 
     T const* priv_valueAtConst(int m, int n) const;
 
+    void priv_clearColumnIndex();
+
 private:
     std::vector<T> mValues;
     std::vector<int> mCol;
@@ -98,6 +112,12 @@ private:
     std::vector<int> mRowPtr;
     int mM;
     int mN;
+
+    // Optional column index (see BuildColumnIndex).  mColPtr is empty when
+    // there is no index, otherwise it has mN + 1 entries like mRowPtr.
+    std::vector<int> mColPtr;
+    std::vector<int> mColRow;
+    std::vector<T> mColValues;
 };
 
 
@@ -165,6 +185,7 @@ void SparseMatrixBufferTemplate<T>::priv_initFromDensePointer(T const* values, i
     mValues.clear();
     mCol.clear();
     mRowPtr.clear();
+    priv_clearColumnIndex();
 
     T zero(0);
     int elementCounter = 0;
@@ -191,6 +212,67 @@ void SparseMatrixBufferTemplate<T>::Zero()
     std::vector<T>().swap(mValues);
     std::vector<int>().swap(mCol);
     std::vector<int>(mM+1, T(0)).swap(mRowPtr);
+    priv_clearColumnIndex();
+}
+
+template<typename T>
+void SparseMatrixBufferTemplate<T>::BuildColumnIndex()
+{
+    // Count the non-zeros of each column, then place each row's entries
+    // at the next free slot of its column.  Rows are visited in order so
+    // the rows of each column come out sorted.
+    std::vector<int> colPtr(mN+1, 0);
+    for (std::size_t i=0; i<mCol.size(); ++i) {
+        colPtr[mCol[i]+1] += 1;
+    }
+    std::partial_sum(colPtr.begin(), colPtr.end(), colPtr.begin());
+
+    std::vector<int> next(colPtr.begin(), colPtr.end() - 1);
+    std::vector<int> colRow(mValues.size());
+    std::vector<T> colValues(mValues.size());
+    for (int i=0; i<mM; ++i) {
+        for (int valIndex=mRowPtr[i]; valIndex<mRowPtr[i+1]; ++valIndex) {
+            int const dest = next[mCol[valIndex]]++;
+            colRow[dest] = i;
+            colValues[dest] = mValues[valIndex];
+        }
+    }
+
+    mColPtr.swap(colPtr);
+    mColRow.swap(colRow);
+    mColValues.swap(colValues);
+}
+
+template<typename T>
+int SparseMatrixBufferTemplate<T>::GetColumnNumberOfNonZeros(int n) const
+{
+    ASSERT(HasColumnIndex());
+    ASSERT_VALID_RANGE(n, 0, mN);
+    return mColPtr[n+1] - mColPtr[n];
+}
+
+template<typename T>
+int const* SparseMatrixBufferTemplate<T>::GetColumnRowsPtrUnsafe(int n) const
+{
+    ASSERT(HasColumnIndex());
+    ASSERT_VALID_RANGE(n, 0, mN);
+    return mColRow.empty() ? static_cast<int const*>(0) : &mColRow[0] + mColPtr[n];
+}
+
+template<typename T>
+T const* SparseMatrixBufferTemplate<T>::GetColumnValuesPtrUnsafe(int n) const
+{
+    ASSERT(HasColumnIndex());
+    ASSERT_VALID_RANGE(n, 0, mN);
+    return mColValues.empty() ? static_cast<T const*>(0) : &mColValues[0] + mColPtr[n];
+}
+
+template<typename T>
+void SparseMatrixBufferTemplate<T>::priv_clearColumnIndex()
+{
+    std::vector<int>().swap(mColPtr);
+    std::vector<int>().swap(mColRow);
+    std::vector<T>().swap(mColValues);
 }
 
 
@@ -280,6 +362,7 @@ void SparseMatrixBufferTemplate<T>::NormalizeRow(int m)
 
     // don't do anything if the row is all zeros
     if (Z != 0) {
+        priv_clearColumnIndex();
         using namespace boost::lambda;
         std::transform(&mValues[valIndexBegin], &mValues[valIndexEnd],
                        &mValues[valIndexBegin], ret<T>(_1 / Z));
@@ -291,6 +374,8 @@ void SparseMatrixBufferTemplate<T>::Append(const SparseMatrixBufferTemplate<T>&
 {
     ASSERT(mN == other.GetN() || mN == 0);
 
+    priv_clearColumnIndex();
+
     if (mN == 0) {
         // if this matrix has no shape then appropriate the horizontal
         // shape from the thing that's being appended to us
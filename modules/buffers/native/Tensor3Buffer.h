@@ -5,6 +5,7 @@
 
 #include <asserts.h>
 #include "VectorBuffer.h"
+#include "BufferStorage.h"
 
 template <class T>
 class Tensor3BufferTemplate {
@@ -15,6 +16,7 @@ public:
     Tensor3BufferTemplate(double* data, int l, int m, int n);
     Tensor3BufferTemplate(int* data, int l, int m, int n);
     Tensor3BufferTemplate(long long* data, int l, int m, int n);
+    Tensor3BufferTemplate(const BufferStorage<T>& storage, int l, int m, int n);
     ~Tensor3BufferTemplate();
 
     void Resize(int l, int m, int n);
@@ -30,6 +32,8 @@ public:
     void Incr(int l, int m, int n, T value);
 
     const T* GetRowPtrUnsafe(int l, int m) const;
+    const T* GetDataPtrUnsafe() const;
+    bool IsView() const;
     void Append(const Tensor3BufferTemplate<T>& buffer);
 
     void SetRow(int l, int m, const VectorBufferTemplate<T>& row);
@@ -48,7 +52,7 @@ public:
     void Print() const;
 
 private:
-    std::vector< T > mData;
+    BufferStorage< T > mData;
     int mL;
     int mM;
     int mN;
@@ -124,6 +128,17 @@ Tensor3BufferTemplate<T>::Tensor3BufferTemplate(long long* data, int l, int m, i
     }
 }
 
+// Wraps storage without copying, see BufferStorage
+template <class T>
+Tensor3BufferTemplate<T>::Tensor3BufferTemplate(const BufferStorage<T>& storage, int l, int m, int n)
+: mData(storage)
+, mL(l)
+, mM(m)
+, mN(n)
+{
+    ASSERT(static_cast<size_t>(l*m*n) <= mData.size())
+}
+
 template <class T>
 Tensor3BufferTemplate<T>::~Tensor3BufferTemplate()
 {
@@ -212,6 +227,18 @@ const T* Tensor3BufferTemplate<T>::GetRowPtrUnsafe(int l, int m) const
     return &mData[l*mM*mN + m*mN];
 }
 
+template <class T>
+const T* Tensor3BufferTemplate<T>::GetDataPtrUnsafe() const
+{
+    return mData.begin();
+}
+
+template <class T>
+bool Tensor3BufferTemplate<T>::IsView() const
+{
+    return mData.IsView();
+}
+
 template <class T>
 void Tensor3BufferTemplate<T>::Append(const Tensor3BufferTemplate<T>& buffer)
 {
@@ -6,6 +6,7 @@
 #include <iostream>
 
 #include <asserts.h>
+#include "BufferStorage.h"
 
 template <class T>
 class VectorBufferTemplate {
@@ -16,6 +17,7 @@ public:
     VectorBufferTemplate(double* data, int n);
     VectorBufferTemplate(int* data, int n);
     VectorBufferTemplate(long long* data, int n);
+    VectorBufferTemplate(const BufferStorage<T>& storage, int n);
     ~VectorBufferTemplate();
 
     void Resize(int n);
@@ -31,6 +33,8 @@ public:
     T Get(int n) const;
     void SetUnsafe(int n, T value);
     T GetUnsafe(int n) const;
+    const T* GetDataPtrUnsafe() const;
+    bool IsView() const;
 
     void Incr(int n, T value);
 
@@ -46,6 +50,7 @@ public:
 
     void Append(const VectorBufferTemplate<T>& buffer);
     VectorBufferTemplate<T> Slice(const VectorBufferTemplate<int>& indices) const;
+    VectorBufferTemplate<T> View(int offset, int n) const;
 
     void AsNumpy1dFloat32(float* outfloat1d, int n) const;
     void AsNumpy1dFloat64(double* outdouble1d, int n) const;
@@ -57,7 +62,7 @@ public:
     void Print() const;
 
 private:
-    std::vector< T > mData;
+    BufferStorage< T > mData;
     int mN;
 };
 
@@ -77,7 +82,7 @@ VectorBufferTemplate<T>::VectorBufferTemplate(int n)
 
 template <class T>
 VectorBufferTemplate<T>::VectorBufferTemplate(float* data, int n)
-: mData( data, data + n )
+: mData( n )
 , mN(n)
 {
     for(int i=0; i<n; i++)
@@ -119,6 +124,15 @@ VectorBufferTemplate<T>::VectorBufferTemplate(long long* data, int n)
     }
 }
 
+// Wraps storage without copying, see BufferStorage
+template <class T>
+VectorBufferTemplate<T>::VectorBufferTemplate(const BufferStorage<T>& storage, int n)
+: mData( storage )
+, mN(n)
+{
+    ASSERT(static_cast<size_t>(n) <= mData.size())
+}
+
 template <class T>
 VectorBufferTemplate<T>::~VectorBufferTemplate()
 {
@@ -197,6 +211,18 @@ T VectorBufferTemplate<T>::GetUnsafe(int n) const
     return mData[n];
 }
 
+template <class T>
+const T* VectorBufferTemplate<T>::GetDataPtrUnsafe() const
+{
+    return mData.begin();
+}
+
+template <class T>
+bool VectorBufferTemplate<T>::IsView() const
+{
+    return mData.IsView();
+}
+
 template <class T>
 void VectorBufferTemplate<T>::Incr(int n, T value)
 {
@@ -295,6 +321,16 @@ VectorBufferTemplate<T> VectorBufferTemplate<T>::Slice(const VectorBufferTemplat
     return sliced;
 }
 
+// Wraps part of a view without copying, see BufferStorage
+template <class T>
+VectorBufferTemplate<T> VectorBufferTemplate<T>::View(int offset, int n) const
+{
+    ASSERT(IsView())
+    ASSERT_VALID_RANGE(offset, 0, mN+1)
+    ASSERT_VALID_RANGE(offset+n, 0, mN+1)
+    return VectorBufferTemplate<T>(BufferStorage<T>(mData, offset, n), n);
+}
+
 template <class T>
 void VectorBufferTemplate<T>::AsNumpy1dFloat32(float* outfloat1d, int n) const
 {
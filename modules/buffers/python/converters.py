@@ -2,33 +2,42 @@ import numpy as np
 import scipy.sparse
 import buffers as buffers
 
-def as_buffer( np_array ):
+def as_buffer( np_array, copy=True ):
     if scipy.sparse.issparse(np_array):
         return as_sparse_matrix(np_array)
     elif np_array.ndim == 1:
-        return as_vector_buffer(np_array)
+        return as_vector_buffer(np_array, copy=copy)
     elif np_array.ndim == 2:
-        return as_matrix_buffer(np_array)
+        return as_matrix_buffer(np_array, copy=copy)
     elif np_array.ndim == 3:
-        return as_tensor_buffer(np_array)
+        return as_tensor_buffer(np_array, copy=copy)
     else:
         raise Exception('as_buffer unknown type and ndim', np_array.dtype, np_array.ndim())
 
-def as_vector_buffer( np_array ):
+# With copy=False the buffer wraps the memory of np_array (made contiguous
+# first if needed) and keeps a reference to it.  The buffer copies the data
+# the first time it is written to so np_array is never modified.
+def _as_view_args( np_array, copy ):
+    if copy:
+        return (np_array,)
+    np_array = np.ascontiguousarray(np_array)
+    return (np_array, np_array)
+
+def as_vector_buffer( np_array, copy=True ):
     type_string = np_array.dtype.name.title()
-    function_name = '%s%s' % (type_string, 'Vector')
+    function_name = '%s%s' % (type_string, 'Vector' if copy else 'VectorView')
     if hasattr(buffers, function_name):
         function = getattr(buffers, function_name)
-        return function(np_array)
+        return function(*_as_view_args(np_array, copy))
     else:
         raise Exception('as_vector_buffer failed because %s does not exist' % function_name)
 
-def as_matrix_buffer( np_array ):
+def as_matrix_buffer( np_array, copy=True ):
     type_string = np_array.dtype.name.title()
-    function_name = '%s%s%d' % (type_string, 'Matrix', np_array.ndim)
+    function_name = '%s%s%d' % (type_string, 'Matrix' if copy else 'MatrixView', np_array.ndim)
     if hasattr(buffers, function_name):
         function = getattr(buffers, function_name)
-        return function(np_array)
+        return function(*_as_view_args(np_array, copy))
     else:
         raise Exception('as_matrix_buffer failed because %s does not exist' % function_name)
 
@@ -42,16 +51,28 @@ def as_sparse_matrix( sparse_matrix ):
         raise Exception('as_sparse_matrix failed because %s does not exist' % function_name)
 
 
-def as_tensor_buffer( np_array ):
+def as_tensor_buffer( np_array, copy=True ):
     type_string = np_array.dtype.name.title()
-    function_name = '%s%s%d' % (type_string, 'Tensor', np_array.ndim)
+    function_name = '%s%s%d' % (type_string, 'Tensor' if copy else 'TensorView', np_array.ndim)
     if hasattr(buffers, function_name):
         function = getattr(buffers, function_name)
-        return function(np_array)
+        return function(*_as_view_args(np_array, copy))
     else:
         raise Exception('as_tensor_buffer failed because %s does not exist' % function_name)
 
-def as_numpy_array( buffer, flatten=False ):
+class _BufferArrayInterface(object):
+    """ Exposes the storage of a buffer through the numpy array interface
+    and keeps the buffer alive for as long as the numpy view exists """
+    def __init__(self, buffer, shape, dtype):
+        self.buffer = buffer
+        self.__array_interface__ = {'shape': shape,
+                                    'typestr': np.dtype(dtype).str,
+                                    'data': (buffer.DataAddress(), True),
+                                    'version': 3}
+
+# With copy=False the result is a read only numpy view of the buffer storage.
+# The view is only valid until the buffer is modified or resized.
+def as_numpy_array( buffer, flatten=False, copy=True ):
     isFloat32Tensor3Buffer = isinstance(buffer, buffers.Float32Tensor3Buffer)
     isFloat64Tensor3Buffer = isinstance(buffer, buffers.Float64Tensor3Buffer)
     isInt32Tensor3Buffer = isinstance(buffer, buffers.Int32Tensor3Buffer)
@@ -79,28 +100,26 @@ def as_numpy_array( buffer, flatten=False ):
         buffer_type = np.int64
 
     if isFloat32Tensor3Buffer or isFloat64Tensor3Buffer or isInt32Tensor3Buffer or isInt64Tensor3Buffer:
-        result = np.zeros((buffer.GetL(), buffer.GetM(), buffer.GetN()), dtype=buffer_type)
-        function_name = 'AsNumpy3d%s' % result.dtype.name.title()
-        function = getattr(buffer, function_name)
-        function(result)
-
-        if buffer.GetL() == 1 and flatten:
-            result = result.reshape(buffer.GetM(), buffer.GetN)
-
+        shape = (buffer.GetL(), buffer.GetM(), buffer.GetN())
+        function_name = 'AsNumpy3d%s'
     elif isFloat32MatrixBuffer or isFloat64MatrixBuffer or isInt32MatrixBuffer or isInt64MatrixBuffer:
-        result = np.zeros((buffer.GetM(), buffer.GetN()), dtype=buffer_type)
-        function_name = 'AsNumpy2d%s' % result.dtype.name.title()
-        function = getattr(buffer, function_name)
-        function(result)
-
-        if buffer.GetN() == 1 and flatten:
-            result = result.flatten()
-
+        shape = (buffer.GetM(), buffer.GetN())
+        function_name = 'AsNumpy2d%s'
     elif isFloat32VectorBuffer or isFloat64VectorBuffer or isInt32VectorBuffer or isInt64VectorBuffer:
-        result = np.zeros(buffer.GetN(), dtype=buffer_type)
-        function_name = 'AsNumpy1d%s' % result.dtype.name.title()
-        function = getattr(buffer, function_name)
+        shape = (buffer.GetN(),)
+        function_name = 'AsNumpy1d%s'
+
+    if copy or np.prod(shape) == 0:
+        result = np.zeros(shape, dtype=buffer_type)
+        function = getattr(buffer, function_name % result.dtype.name.title())
         function(result)
+    else:
+        result = np.asarray(_BufferArrayInterface(buffer, shape, buffer_type))
+
+    if len(shape) == 3 and buffer.GetL() == 1 and flatten:
+        result = result.reshape(buffer.GetM(), buffer.GetN())
+    elif len(shape) == 2 and buffer.GetN() == 1 and flatten:
+        result = result.flatten() if copy else result.ravel()
 
     return result
 
@@ -110,6 +129,8 @@ def is_buffer( buffer ):
     isIntTensor3Buffer = isinstance(buffer, buffers.Int32Tensor3Buffer) or isinstance(buffer, buffers.Int64Tensor3Buffer)
     isFloatMatrixBuffer = isinstance(buffer, buffers.Float32MatrixBuffer) or isinstance(buffer, buffers.Float64MatrixBuffer)
     isIntMatrixBuffer = isinstance(buffer, buffers.Int32MatrixBuffer) or isinstance(buffer, buffers.Int64MatrixBuffer)
+    isFloatSparseMatrixBuffer = isinstance(buffer, buffers.Float32SparseMatrixBuffer) or isinstance(buffer, buffers.Float64SparseMatrixBuffer)
+    isIntSparseMatrixBuffer = isinstance(buffer, buffers.Int32SparseMatrixBuffer) or isinstance(buffer, buffers.Int64SparseMatrixBuffer)
     isFloatVectorBuffer = isinstance(buffer, buffers.Float32VectorBuffer) or isinstance(buffer, buffers.Float64VectorBuffer)
     isIntVectorBuffer = isinstance(buffer, buffers.Int32VectorBuffer) or isinstance(buffer, buffers.Int64VectorBuffer)
-    return isFloatTensor3Buffer or isIntTensor3Buffer or isFloatMatrixBuffer or isIntMatrixBuffer or isFloatVectorBuffer or isIntVectorBuffer
\ No newline at end of file
+    return isFloatTensor3Buffer or isIntTensor3Buffer or isFloatMatrixBuffer or isIntMatrixBuffer or isFloatSparseMatrixBuffer or isIntSparseMatrixBuffer or isFloatVectorBuffer or isIntVectorBuffer
\ No newline at end of file
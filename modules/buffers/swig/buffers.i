@@ -5,6 +5,8 @@
     #include "MatrixBuffer.h"
     #include "SparseMatrixBuffer.h"
     #include "Tensor3Buffer.h"
+    #include "BufferStorage.h"
+    #include "BufferKeys.h"
     #include "BufferCollection.h"
     #include "BufferTypes.h"
 %}
@@ -53,6 +55,19 @@ namespace std {
 %apply (double* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3) {(double* outdouble3d, int l, int m, int n)}
 %apply (long long* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3) {(long long* outlong3d, int l, int m, int n)}
 
+%apply (float* INPLACE_ARRAY1, int DIM1) {(float* viewfloat1d, int n)}
+%apply (double* INPLACE_ARRAY1, int DIM1) {(double* viewdouble1d, int n)}
+%apply (int* INPLACE_ARRAY1, int DIM1) {(int* viewint1d, int n)}
+%apply (long long* INPLACE_ARRAY1, int DIM1) {(long long* viewlong1d, int n)}
+%apply (float* INPLACE_ARRAY2, int DIM1, int DIM2) {(float* viewfloat2d, int m, int n)}
+%apply (double* INPLACE_ARRAY2, int DIM1, int DIM2) {(double* viewdouble2d, int m, int n)}
+%apply (int* INPLACE_ARRAY2, int DIM1, int DIM2) {(int* viewint2d, int m, int n)}
+%apply (long long* INPLACE_ARRAY2, int DIM1, int DIM2) {(long long* viewlong2d, int m, int n)}
+%apply (float* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3) {(float* viewfloat3d, int l, int m, int n)}
+%apply (double* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3) {(double* viewdouble3d, int l, int m, int n)}
+%apply (int* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3) {(int* viewint3d, int l, int m, int n)}
+%apply (long long* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3) {(long long* viewlong3d, int l, int m, int n)}
+
 %include "VectorBuffer.h"
 %include "Tensor3Buffer.h"
 %include "MatrixBuffer.h"
@@ -72,6 +87,86 @@ namespace std {
 %template(Int32Tensor3Buffer) Tensor3BufferTemplate<int>;
 %template(Int64Tensor3Buffer) Tensor3BufferTemplate<long long>;
 
+/* Zero copy buffers that wrap the memory of a numpy array */
+%{
+    // Drops the reference to the numpy array once the last buffer sharing
+    // its memory is gone
+    struct PyObjectBufferOwnerDeleter
+    {
+        void operator()(void* object)
+        {
+            PyGILState_STATE state = PyGILState_Ensure();
+            Py_XDECREF(static_cast<PyObject*>(object));
+            PyGILState_Release(state);
+        }
+    };
+
+    boost::shared_ptr<void> AsBufferOwner(PyObject* owner)
+    {
+        Py_XINCREF(owner);
+        return boost::shared_ptr<void>(owner, PyObjectBufferOwnerDeleter());
+    }
+%}
+
+%define DECLARE_VIEW_FUNCTIONS(TYPE_PREFIX, TYPE, TYPE_VAR)
+%inline %{
+TYPE_PREFIX ## VectorBuffer TYPE_PREFIX ## VectorView(TYPE* view ## TYPE_VAR ## 1d, int n, PyObject* owner)
+{
+    return TYPE_PREFIX ## VectorBuffer(BufferStorage< TYPE >(view ## TYPE_VAR ## 1d, n, AsBufferOwner(owner)), n);
+}
+
+TYPE_PREFIX ## MatrixBuffer TYPE_PREFIX ## MatrixView1(TYPE* view ## TYPE_VAR ## 1d, int n, PyObject* owner)
+{
+    return TYPE_PREFIX ## MatrixBuffer(BufferStorage< TYPE >(view ## TYPE_VAR ## 1d, n, AsBufferOwner(owner)), n, 1);
+}
+
+TYPE_PREFIX ## MatrixBuffer TYPE_PREFIX ## MatrixView2(TYPE* view ## TYPE_VAR ## 2d, int m, int n, PyObject* owner)
+{
+    return TYPE_PREFIX ## MatrixBuffer(BufferStorage< TYPE >(view ## TYPE_VAR ## 2d, m*n, AsBufferOwner(owner)), m, n);
+}
+
+TYPE_PREFIX ## Tensor3Buffer TYPE_PREFIX ## TensorView2(TYPE* view ## TYPE_VAR ## 2d, int m, int n, PyObject* owner)
+{
+    return TYPE_PREFIX ## Tensor3Buffer(BufferStorage< TYPE >(view ## TYPE_VAR ## 2d, m*n, AsBufferOwner(owner)), 1, m, n);
+}
+
+TYPE_PREFIX ## Tensor3Buffer TYPE_PREFIX ## TensorView3(TYPE* view ## TYPE_VAR ## 3d, int l, int m, int n, PyObject* owner)
+{
+    return TYPE_PREFIX ## Tensor3Buffer(BufferStorage< TYPE >(view ## TYPE_VAR ## 3d, l*m*n, AsBufferOwner(owner)), l, m, n);
+}
+%}
+%enddef
+
+DECLARE_VIEW_FUNCTIONS(Float32, float, float)
+DECLARE_VIEW_FUNCTIONS(Float64, double, double)
+DECLARE_VIEW_FUNCTIONS(Int32, int, int)
+DECLARE_VIEW_FUNCTIONS(Int64, long long, long)
+
+/* Expose the address of the storage so numpy can view it without a copy */
+%define DECLARE_DATA_ADDRESS_FOR_BUFFER(class_name)
+%extend class_name {
+    long long DataAddress() const
+    {
+        return reinterpret_cast<long long>($self->GetDataPtrUnsafe());
+    }
+}
+%enddef
+
+DECLARE_DATA_ADDRESS_FOR_BUFFER(VectorBufferTemplate<float>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(VectorBufferTemplate<double>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(VectorBufferTemplate<int>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(VectorBufferTemplate<long long>)
+
+DECLARE_DATA_ADDRESS_FOR_BUFFER(MatrixBufferTemplate<float>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(MatrixBufferTemplate<double>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(MatrixBufferTemplate<int>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(MatrixBufferTemplate<long long>)
+
+DECLARE_DATA_ADDRESS_FOR_BUFFER(Tensor3BufferTemplate<float>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(Tensor3BufferTemplate<double>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(Tensor3BufferTemplate<int>)
+DECLARE_DATA_ADDRESS_FOR_BUFFER(Tensor3BufferTemplate<long long>)
+
 /* Sparse matrix buffers */
 %pythoncode %{
 import scipy.sparse
@@ -111,6 +206,8 @@ DECLARE_WRAPPER_FOR_SPARSE_TYPE(long long, Int64SparseMatrix)
 %template(Int32SparseMatrixBuffer) SparseMatrixBufferTemplate<int>;
 %template(Int64SparseMatrixBuffer) SparseMatrixBufferTemplate<long long>;
 
+%ignore BufferKey::operator BufferKey_t;
+%include "BufferKeys.h"
 %include "BufferCollection.h"
 %include "buffer_collection.i"
 
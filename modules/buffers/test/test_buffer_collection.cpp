@@ -63,4 +63,47 @@ BOOST_AUTO_TEST_CASE(test_AppendBuffer)
     BOOST_CHECK(mb_result == mb3);
 }
 
+BOOST_AUTO_TEST_CASE(test_interned_keys)
+{
+    BufferCollection collection;
+    MatrixBufferTemplate<double> mb = CreateExampleMatrix<double>();
+    const BufferKey_t key = InternBufferKey("double");
+    BOOST_CHECK_EQUAL(key, InternBufferKey(std::string("double")));
+    BOOST_CHECK(key != InternBufferKey("float"));
+    BOOST_CHECK_EQUAL(GetBufferKeyName(key), "double");
+
+    collection.AddBuffer(key, mb);
+    BOOST_CHECK(collection.HasBuffer("double"));
+    BOOST_CHECK(collection.HasBuffer< MatrixBufferTemplate<double> >(key));
+    BOOST_CHECK(&collection.GetBuffer< MatrixBufferTemplate<double> >("double") ==
+                &collection.GetBuffer< MatrixBufferTemplate<double> >(key));
+}
+
+BOOST_AUTO_TEST_CASE(test_BufferKey)
+{
+    BufferCollection collection;
+    MatrixBufferTemplate<double> mb = CreateExampleMatrix<double>();
+    const BufferKey bufferKey("double");
+    BOOST_CHECK_EQUAL(bufferKey.GetKey(), InternBufferKey("double"));
+    BOOST_CHECK_EQUAL(bufferKey.GetName(), "double");
+
+    collection.AddBuffer("double", mb);
+    BOOST_CHECK(collection.HasBuffer< MatrixBufferTemplate<double> >(bufferKey));
+    BOOST_CHECK(&collection.GetBuffer< MatrixBufferTemplate<double> >("double") ==
+                &collection.GetBuffer< MatrixBufferTemplate<double> >(bufferKey));
+}
+
+BOOST_AUTO_TEST_CASE(test_GetKeys)
+{
+    BufferCollection collection;
+    MatrixBufferTemplate<double> mb = CreateExampleMatrix<double>();
+    collection.AddBuffer("b", mb);
+    collection.AddBuffer("a", mb);
+
+    std::list<std::string> keys = collection.GetKeys();
+    BOOST_CHECK_EQUAL(keys.size(), 2);
+    BOOST_CHECK_EQUAL(keys.front(), "a");
+    BOOST_CHECK_EQUAL(keys.back(), "b");
+}
+
 BOOST_AUTO_TEST_SUITE_END()
@@ -0,0 +1,98 @@
+#include <boost/test/unit_test.hpp>
+#include <boost/shared_ptr.hpp>
+
+#include "BufferStorage.h"
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "Tensor3Buffer.h"
+#include "BufferCollection.h"
+
+struct CountingDeleter
+{
+    CountingDeleter(int* numberOfDeletes)
+    : mNumberOfDeletes(numberOfDeletes)
+    {}
+
+    void operator()(void*)
+    {
+        (*mNumberOfDeletes)++;
+    }
+
+    int* mNumberOfDeletes;
+};
+
+BOOST_AUTO_TEST_SUITE( BufferStorageTests )
+
+BOOST_AUTO_TEST_CASE(test_view_does_not_copy)
+{
+    float data[] = {0, 1, 2, 3, 4, 5};
+    int numberOfDeletes = 0;
+    {
+        boost::shared_ptr<void> owner(&data[0], CountingDeleter(&numberOfDeletes));
+        MatrixBufferTemplate<float> view(BufferStorage<float>(&data[0], 6, owner), 2, 3);
+        owner.reset();
+
+        BOOST_CHECK(view.IsView());
+        BOOST_CHECK_EQUAL(view.GetDataPtrUnsafe(), &data[0]);
+        BOOST_CHECK_EQUAL(view.Get(1, 2), 5);
+
+        MatrixBufferTemplate<float> copy = view;
+        BOOST_CHECK(copy.IsView());
+        BOOST_CHECK_EQUAL(copy.GetDataPtrUnsafe(), &data[0]);
+        BOOST_CHECK_EQUAL(numberOfDeletes, 0);
+    }
+    BOOST_CHECK_EQUAL(numberOfDeletes, 1);
+}
+
+BOOST_AUTO_TEST_CASE(test_view_copy_on_write)
+{
+    int data[] = {3, 4, 5};
+    boost::shared_ptr<void> owner(&data[0], CountingDeleter(new int(0)));
+    VectorBufferTemplate<int> view(BufferStorage<int>(&data[0], 3, owner), 3);
+    VectorBufferTemplate<int> copy = view;
+
+    copy.Set(0, 10);
+    BOOST_CHECK(!copy.IsView());
+    BOOST_CHECK(view.IsView());
+    BOOST_CHECK_EQUAL(copy.Get(0), 10);
+    BOOST_CHECK_EQUAL(copy.Get(2), 5);
+    BOOST_CHECK_EQUAL(view.Get(0), 3);
+    BOOST_CHECK_EQUAL(data[0], 3);
+
+    view.Resize(5);
+    BOOST_CHECK(!view.IsView());
+    BOOST_CHECK_EQUAL(view.Get(2), 5);
+    BOOST_CHECK_EQUAL(view.GetN(), 5);
+}
+
+BOOST_AUTO_TEST_CASE(test_tensor_view_in_buffer_collection)
+{
+    double data[] = {0, 1, 2, 3, 4, 5, 6, 7};
+    boost::shared_ptr<void> owner(&data[0], CountingDeleter(new int(0)));
+    Tensor3BufferTemplate<double> view(BufferStorage<double>(&data[0], 8, owner), 2, 2, 2);
+
+    BufferCollection collection;
+    collection.AddBuffer(std::string("view"), view);
+    const Tensor3BufferTemplate<double>& stored = collection.GetBuffer< Tensor3BufferTemplate<double> >("view");
+    BOOST_CHECK(stored.IsView());
+    BOOST_CHECK_EQUAL(stored.GetDataPtrUnsafe(), &data[0]);
+    BOOST_CHECK_EQUAL(stored.Get(1, 1, 0), 6);
+}
+
+BOOST_AUTO_TEST_CASE(test_vector_view_of_view)
+{
+    int data[] = {3, 4, 5, 6};
+    boost::shared_ptr<void> owner(&data[0], CountingDeleter(new int(0)));
+    VectorBufferTemplate<int> view(BufferStorage<int>(&data[0], 4, owner), 4);
+
+    VectorBufferTemplate<int> part = view.View(1, 2);
+    BOOST_CHECK(part.IsView());
+    BOOST_CHECK_EQUAL(part.GetN(), 2);
+    BOOST_CHECK_EQUAL(part.GetDataPtrUnsafe(), &data[1]);
+    BOOST_CHECK_EQUAL(part.Get(1), 5);
+
+    data[2] = 7;
+    BOOST_CHECK_EQUAL(part.Get(1), 7);
+}
+
+BOOST_AUTO_TEST_SUITE_END()
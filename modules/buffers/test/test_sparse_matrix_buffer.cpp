@@ -318,4 +318,42 @@ BOOST_AUTO_TEST_CASE(test_Slice)
     BOOST_CHECK(sliced == expectedSliced);
 }
 
+
+BOOST_AUTO_TEST_CASE(test_BuildColumnIndex)
+{
+    SparseMatrixBufferTemplate<double> smb = CreateExampleSparseMatrix<double>();
+    BOOST_CHECK(!smb.HasColumnIndex());
+    smb.BuildColumnIndex();
+    BOOST_CHECK(smb.HasColumnIndex());
+
+    bool correct = true;
+    for (int j=0; j<smb.GetN(); ++j) {
+        int const* rows = smb.GetColumnRowsPtrUnsafe(j);
+        double const* values = smb.GetColumnValuesPtrUnsafe(j);
+        int nonZeros = 0;
+        for (int i=0; i<smb.GetM(); ++i) {
+            if (smb.Get(i, j) != 0.0) {
+                correct &= nonZeros < smb.GetColumnNumberOfNonZeros(j);
+                correct &= rows[nonZeros] == i;
+                correct &= values[nonZeros] == smb.Get(i, j);
+                nonZeros += 1;
+            }
+        }
+        correct &= nonZeros == smb.GetColumnNumberOfNonZeros(j);
+    }
+    BOOST_CHECK(correct);
+}
+
+BOOST_AUTO_TEST_CASE(test_BuildColumnIndex_dropped_on_change)
+{
+    SparseMatrixBufferTemplate<double> smb = CreateExampleSparseMatrix<double>();
+    smb.BuildColumnIndex();
+    smb.NormalizeRow(1);
+    BOOST_CHECK(!smb.HasColumnIndex());
+
+    smb.BuildColumnIndex();
+    smb.Append(CreateExampleSparseMatrix<double>());
+    BOOST_CHECK(!smb.HasColumnIndex());
+}
+
 BOOST_AUTO_TEST_SUITE_END()
@@ -91,8 +91,8 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mClassesBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mClassesBufferId;
     const int mNumberOfClasses;
 };
 
@@ -0,0 +1,259 @@
+#pragma once
+
+#include <vector>
+#include <cmath>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "FeatureExtractorStep.h"
+#include "PipelineStepI.h"
+#include "UniqueBufferId.h"
+
+// ----------------------------------------------------------------------------
+//
+// Compute the class information gain when walking sorted feature values like
+// ClassInfoGainWalker but in constant time per sample.  The entropy of a
+// histogram with total weight W is log2(W) - sum_c(n_c*log2(n_c))/W so the
+// walker keeps sum_c(n_c*log2(n_c)) of each side and only updates the term
+// of the class that moved.
+//
+// When every sample weight of the node is an integer (ie no weights or
+// bootstrap/poisson weights) n*log2(n) is read from a table that is built
+// once in Bind, otherwise it is computed with log2.
+//
+// ----------------------------------------------------------------------------
+template <class BT>
+class ClassInfoGainIncrementalWalker
+{
+public:
+    ClassInfoGainIncrementalWalker (const BufferId& sampleWeights,
+                                    const BufferId& classes,
+                                    const int numberOfClasses );
+    virtual ~ClassInfoGainIncrementalWalker();
+
+    void Bind(const BufferCollectionStack& readCollection);
+    void Bind(const BufferCollectionStack& readCollection, const VectorBufferTemplate<typename BT::Index>& includedSamples );
+    void Reset();
+
+    void MoveLeftToRight(typename BT::Index sampleIndex);
+
+    typename BT::ImpurityValue Impurity();
+
+    typename BT::Index GetYDim() const;
+
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> GetLeftYs() const;
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> GetRightYs() const;
+    typename BT::SufficientStatsContinuous GetLeftChildCounts() const;
+    typename BT::SufficientStatsContinuous GetRightChildCounts() const;
+
+    typedef BT BufferTypes;
+
+private:
+    void BindNLogN(bool integerWeights);
+    double NLogN(typename BT::SufficientStatsContinuous n) const;
+
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mClassesBufferId;
+    const int mNumberOfClasses;
+
+    VectorBufferTemplate<typename BT::ParamsContinuous> const* mSampleWeights;
+    VectorBufferTemplate<typename BT::SourceInteger> const* mClasses;
+
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> mAllClassHistogram;
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> mLeftClassHistogram;
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> mRightClassHistogram;
+
+    // Accumulated in double so the running sums do not drift over a walk
+    double mAllWeight;
+    double mLeftWeight;
+    double mRightWeight;
+    double mAllNLogN;
+    double mLeftNLogN;
+    double mRightNLogN;
+    double mStartEntropy;
+
+    // n*log2(n) for n = 0..total weight of the node, empty for fractional weights
+    std::vector<double> mNLogNTable;
+};
+
+
+template <class BT>
+ClassInfoGainIncrementalWalker<BT>::ClassInfoGainIncrementalWalker(const BufferId& sampleWeights,
+                                                                   const BufferId& classes,
+                                                                   const int numberOfClasses )
+: mSampleWeightsBufferId(sampleWeights)
+, mClassesBufferId(classes)
+, mNumberOfClasses(numberOfClasses)
+, mSampleWeights(NULL)
+, mClasses(NULL)
+, mAllClassHistogram(numberOfClasses)
+, mLeftClassHistogram(numberOfClasses)
+, mRightClassHistogram(numberOfClasses)
+, mAllWeight(0.0)
+, mLeftWeight(0.0)
+, mRightWeight(0.0)
+, mAllNLogN(0.0)
+, mLeftNLogN(0.0)
+, mRightNLogN(0.0)
+, mStartEntropy(0.0)
+, mNLogNTable()
+{}
+
+template <class BT>
+ClassInfoGainIncrementalWalker<BT>::~ClassInfoGainIncrementalWalker()
+{}
+
+template <class BT>
+void ClassInfoGainIncrementalWalker<BT>::Bind(const BufferCollectionStack& readCollection)
+{
+    ASSERT(readCollection.HasBuffer< VectorBufferTemplate<typename BT::ParamsContinuous> >(mSampleWeightsBufferId))
+    ASSERT(readCollection.HasBuffer< VectorBufferTemplate<typename BT::SourceInteger> >(mClassesBufferId))
+    mSampleWeights = readCollection.GetBufferPtr< VectorBufferTemplate<typename BT::ParamsContinuous> >(mSampleWeightsBufferId);
+    mClasses = readCollection.GetBufferPtr< VectorBufferTemplate<typename BT::SourceInteger> >(mClassesBufferId);
+    ASSERT_ARG_DIM_1D(mSampleWeights->GetN(), mClasses->GetN())
+
+    bool integerWeights = true;
+    for(typename BT::Index i=0; i<mSampleWeights->GetN(); i++)
+    {
+        const typename BT::ParamsContinuous weight = mSampleWeights->Get(i);
+        mAllClassHistogram.Incr(mClasses->Get(i), weight);
+        integerWeights = integerWeights && (weight == std::floor(weight));
+    }
+
+    BindNLogN(integerWeights);
+}
+
+template <class BT>
+void ClassInfoGainIncrementalWalker<BT>::Bind(const BufferCollectionStack& readCollection, const VectorBufferTemplate<typename BT::Index>& includedSamples )
+{
+    ASSERT(readCollection.HasBuffer< VectorBufferTemplate<typename BT::ParamsContinuous> >(mSampleWeightsBufferId))
+    ASSERT(readCollection.HasBuffer< VectorBufferTemplate<typename BT::SourceInteger> >(mClassesBufferId))
+    mSampleWeights = readCollection.GetBufferPtr< VectorBufferTemplate<typename BT::ParamsContinuous> >(mSampleWeightsBufferId);
+    mClasses = readCollection.GetBufferPtr< VectorBufferTemplate<typename BT::SourceInteger> >(mClassesBufferId);
+    ASSERT_ARG_DIM_1D(mSampleWeights->GetN(), mClasses->GetN())
+
+    bool integerWeights = true;
+    for(typename BT::Index s=0; s<includedSamples.GetN(); s++)
+    {
+        typename BT::Index i = includedSamples.Get(s);
+        const typename BT::ParamsContinuous weight = mSampleWeights->Get(i);
+        mAllClassHistogram.Incr(mClasses->Get(i), weight);
+        integerWeights = integerWeights && (weight == std::floor(weight));
+    }
+
+    BindNLogN(integerWeights);
+}
+
+template <class BT>
+void ClassInfoGainIncrementalWalker<BT>::BindNLogN(bool integerWeights)
+{
+    mAllWeight = 0.0;
+    for(typename BT::Index c=0; c<mNumberOfClasses; c++)
+    {
+        mAllWeight += mAllClassHistogram.Get(c);
+    }
+
+    mNLogNTable.clear();
+    if(integerWeights)
+    {
+        const int tableSize = static_cast<int>(mAllWeight + 0.5) + 1;
+        mNLogNTable.resize(tableSize);
+        mNLogNTable[0] = 0.0;
+        for(int n=1; n<tableSize; n++)
+        {
+            mNLogNTable[n] = n * log2(static_cast<double>(n));
+        }
+    }
+
+    mAllNLogN = 0.0;
+    for(typename BT::Index c=0; c<mNumberOfClasses; c++)
+    {
+        mAllNLogN += NLogN(mAllClassHistogram.Get(c));
+    }
+    mStartEntropy = mAllWeight > 0.0 ? (NLogN(mAllWeight) - mAllNLogN) / mAllWeight : 0.0;
+
+    Reset();
+}
+
+template <class BT>
+double ClassInfoGainIncrementalWalker<BT>::NLogN(typename BT::SufficientStatsContinuous n) const
+{
+    if(n <= typename BT::SufficientStatsContinuous(0))
+    {
+        return 0.0;
+    }
+    if(!mNLogNTable.empty())
+    {
+        return mNLogNTable[static_cast<int>(n + 0.5)];
+    }
+    return n * log2(static_cast<double>(n));
+}
+
+template <class BT>
+void ClassInfoGainIncrementalWalker<BT>::Reset()
+{
+    mLeftClassHistogram = mAllClassHistogram;
+    mRightClassHistogram.Zero();
+
+    mLeftWeight = mAllWeight;
+    mRightWeight = 0.0;
+    mLeftNLogN = mAllNLogN;
+    mRightNLogN = 0.0;
+}
+
+template <class BT>
+void ClassInfoGainIncrementalWalker<BT>::MoveLeftToRight(typename BT::Index sampleIndex)
+{
+    const typename BT::ParamsContinuous weight = mSampleWeights->Get(sampleIndex);
+    const typename BT::Index classIndex = mClasses->Get(sampleIndex);
+
+    mLeftNLogN -= NLogN(mLeftClassHistogram.Get(classIndex));
+    mRightNLogN -= NLogN(mRightClassHistogram.Get(classIndex));
+    mLeftClassHistogram.Incr(classIndex, -weight);
+    mRightClassHistogram.Incr(classIndex, weight);
+    mLeftNLogN += NLogN(mLeftClassHistogram.Get(classIndex));
+    mRightNLogN += NLogN(mRightClassHistogram.Get(classIndex));
+
+    mLeftWeight -= weight;
+    mRightWeight += weight;
+}
+
+template <class BT>
+typename BT::ImpurityValue ClassInfoGainIncrementalWalker<BT>::Impurity()
+{
+    // (leftWeight*leftEntropy + rightWeight*rightEntropy) / totalWeight
+    const double totalWeight = mLeftWeight + mRightWeight;
+    const double childrenEntropy = (NLogN(mLeftWeight) - mLeftNLogN + NLogN(mRightWeight) - mRightNLogN) / totalWeight;
+    return static_cast<typename BT::ImpurityValue>(mStartEntropy - childrenEntropy);
+}
+
+template <class BT>
+typename BT::Index ClassInfoGainIncrementalWalker<BT>::GetYDim() const
+{
+    return mNumberOfClasses;
+}
+
+template <class BT>
+VectorBufferTemplate<typename BT::SufficientStatsContinuous> ClassInfoGainIncrementalWalker<BT>::GetLeftYs() const
+{
+    return mLeftClassHistogram.Normalized();
+}
+
+template <class BT>
+VectorBufferTemplate<typename BT::SufficientStatsContinuous> ClassInfoGainIncrementalWalker<BT>::GetRightYs() const
+{
+    return mRightClassHistogram.Normalized();
+}
+
+template <class BT>
+typename BT::SufficientStatsContinuous ClassInfoGainIncrementalWalker<BT>::GetLeftChildCounts() const
+{
+    return mLeftClassHistogram.Sum();
+}
+
+template <class BT>
+typename BT::SufficientStatsContinuous ClassInfoGainIncrementalWalker<BT>::GetRightChildCounts() const
+{
+    return mRightClassHistogram.Sum();
+}
@@ -50,9 +50,9 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mStreamTypeBufferId;
-    const BufferId mClassesBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mStreamTypeBufferId;
+    const BufferKey mClassesBufferId;
     const int mNumberOfClasses;
 
     VectorBufferTemplate<typename BT::ParamsContinuous> const* mSampleWeights;
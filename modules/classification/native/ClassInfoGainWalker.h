@@ -45,8 +45,8 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mClassesBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mClassesBufferId;
     const int mNumberOfClasses;
 
     VectorBufferTemplate<typename BT::ParamsContinuous> const* mSampleWeights;
@@ -152,7 +152,7 @@ void ClassInfoGainWalker<BT>::Reset()
     mRightClassHistogram.Zero();
     mLeftLogClassHistogram.Zero();
     mRightLogClassHistogram.Zero();
-    mRecomputeClassLog.clear();
+    mRecomputeClassLog.assign(mNumberOfClasses, false);
 
     mLeftClassHistogram = mAllClassHistogram;
     mLeftLogClassHistogram = mAllLogClassHistogram;
@@ -181,6 +181,7 @@ typename BT::ImpurityValue ClassInfoGainWalker<BT>::Impurity()
             mLeftLogClassHistogram.Set(c, leftLogClass);
             const typename BT::SufficientStatsContinuous rightLogClass = mRightClassHistogram.Get(c) > zero ? log2(mRightClassHistogram.Get(c)) : zero;
             mRightLogClassHistogram.Set(c, rightLogClass);
+            mRecomputeClassLog[c] = false;
         }
     }
 
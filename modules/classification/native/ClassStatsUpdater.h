@@ -21,6 +21,12 @@ public:
     void UpdateStats(typename BT::DatapointCounts& counts, Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& stats,
                 int feature, int threshold, int sampleIndex) const;
 
+    // Add the stats of otherFeature, otherThreshold in otherStats to feature, threshold in stats
+    void MergeStats(typename BT::DatapointCounts& counts, Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& stats,
+                int feature, int threshold,
+                typename BT::DatapointCounts otherCounts, const Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& otherStats,
+                int otherFeature, int otherThreshold) const;
+
 private:
     VectorBufferTemplate<typename BT::DatapointCounts> const* mSampleWeights;
     VectorBufferTemplate<typename BT::SourceInteger> const* mClasses;
@@ -44,6 +50,19 @@ void BindedClassStatsUpdater<BT>::UpdateStats(typename BT::DatapointCounts& coun
     stats.Incr(feature, threshold, classId, weight);
 }
 
+template <class BT>
+void BindedClassStatsUpdater<BT>::MergeStats(typename BT::DatapointCounts& counts, Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& stats,
+                                                          int feature, int threshold,
+                                                          typename BT::DatapointCounts otherCounts, const Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& otherStats,
+                                                          int otherFeature, int otherThreshold) const
+{
+    counts += otherCounts;
+    for(int c=0; c<stats.GetN(); c++)
+    {
+        stats.Incr(feature, threshold, c, otherStats.Get(otherFeature, otherThreshold, c));
+    }
+}
+
 
 // ----------------------------------------------------------------------------
 //
@@ -65,8 +84,8 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mClassesBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mClassesBufferId;
     const int mNumberOfClasses;
 };
 
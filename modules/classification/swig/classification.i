@@ -4,6 +4,7 @@
     #include "BufferTypes.h"
     #include "SplitpointsImpurity.h"
     #include "SplitpointStatsStep.h"
+    #include "HistogramSplitpointStatsStep.h"
     #include "TwoStreamSplitpointStatsStep.h"
 %}
 
@@ -16,11 +17,15 @@
 
 %include "SplitpointsImpurity.h"
 %include "SplitpointStatsStep.h"
+%include "HistogramSplitpointStatsStep.h"
 %include "TwoStreamSplitpointStatsStep.h"
 
 %template(ClassInfoGainWalker_f32i32) ClassInfoGainWalker< DefaultBufferTypes >;
 %template(ClassInfoGainBestSplitpointsWalkingSortedStep_f32i32) BestSplitpointsWalkingSortedStep< ClassInfoGainWalker<DefaultBufferTypes> >;
 %template(ClassInfoGainDownSampleBestSplitpointsWalkingSortedStep_f32i32) DownSampleBestSplitpointsWalkingSortedStep< ClassInfoGainWalker<DefaultBufferTypes> >;
+%template(ClassInfoGainIncrementalWalker_f32i32) ClassInfoGainIncrementalWalker< DefaultBufferTypes >;
+%template(ClassInfoGainIncrementalBestSplitpointsWalkingSortedStep_f32i32) BestSplitpointsWalkingSortedStep< ClassInfoGainIncrementalWalker<DefaultBufferTypes> >;
+%template(ClassInfoGainIncrementalDownSampleBestSplitpointsWalkingSortedStep_f32i32) DownSampleBestSplitpointsWalkingSortedStep< ClassInfoGainIncrementalWalker<DefaultBufferTypes> >;
 %template(ClassInfoGainTwoStreamWalker_f32i32) ClassInfoGainTwoStreamWalker<DefaultBufferTypes>;
 %template(ClassInfoGainTwoStreamBestSplitpointsWalkingSortedStep_f32i32) TwoStreamBestSplitpointsWalkingSortedStep< ClassInfoGainTwoStreamWalker<DefaultBufferTypes> >;
 %template(ClassInfoGainRandomGapSplitpointsStep_f32i32) RandomGapSplitpointsStep< ClassInfoGainWalker<DefaultBufferTypes> >;
@@ -32,4 +37,5 @@
 %template(ClassStatsUpdater_f32i32) ClassStatsUpdater<DefaultBufferTypes>;
 %template(ClassStatsUpdaterOneStreamStep_f32i32) SplitpointStatsStep< ClassStatsUpdater<DefaultBufferTypes> >;
 %template(ClassStatsUpdaterTwoStreamStep_f32i32) TwoStreamSplitpointStatsStep< ClassStatsUpdater<DefaultBufferTypes> >;
+%template(ClassStatsUpdaterHistogramStep_f32i32) HistogramSplitpointStatsStep< ClassStatsUpdater<DefaultBufferTypes> >;
 %template(ClassInfoGainSplitpointsImpurity_f32i32) SplitpointsImpurity< ClassInfoGainImpurity<DefaultBufferTypes> >;
\ No newline at end of file
@@ -2,6 +2,7 @@
 %{
     #define SWIG_FILE_WITH_INIT
     #include "ClassInfoGainWalker.h"
+    #include "ClassInfoGainIncrementalWalker.h"
     #include "ClassInfoGainTwoStreamWalker.h"
     #include "ClassInfoGainImpurity.h"
     #include "BestSplitpointsWalkingSortedStep.h"
@@ -22,6 +23,7 @@
 %import(module="rftk.splitpoints") "splitpoints_external.i"
 
 %include "ClassInfoGainWalker.h"
+%include "ClassInfoGainIncrementalWalker.h"
 %include "ClassInfoGainTwoStreamWalker.h"
 %include "ClassInfoGainImpurity.h"
 %include "BestSplitpointsWalkingSortedStep.h"
@@ -0,0 +1,119 @@
+#include <boost/test/unit_test.hpp>
+
+#include "BufferTypes.h"
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "BufferCollectionStack.h"
+#include "ClassInfoGainWalker.h"
+#include "ClassInfoGainIncrementalWalker.h"
+
+
+struct ClassInfoGainIncrementalWalkerFixture {
+    ClassInfoGainIncrementalWalkerFixture()
+    : classes_key("classes")
+    , weights_key("weights")
+    , fractional_weights_key("fractional_weights")
+    , number_of_classes(3)
+    , collection()
+    , stack()
+    {
+        int classes_data[] = {0,1,2,1,1,2,0,2};
+        const VectorBufferTemplate<int> classes = VectorBufferTemplate<int>(&classes_data[0], 8);
+        collection.AddBuffer(classes_key, classes);
+
+        float weights_data[] = {1,1,1,1,1,1,1,1};
+        const VectorBufferTemplate<float> weights = VectorBufferTemplate<float>(&weights_data[0], 8);
+        collection.AddBuffer(weights_key, weights);
+
+        float fractional_weights_data[] = {0.5,1,2.25,1,0.1,3,1,0.75};
+        const VectorBufferTemplate<float> fractional_weights = VectorBufferTemplate<float>(&fractional_weights_data[0], 8);
+        collection.AddBuffer(fractional_weights_key, fractional_weights);
+
+        stack.Push(&collection);
+    }
+
+    ~ClassInfoGainIncrementalWalkerFixture()
+    {
+    }
+
+    const BufferCollectionKey_t classes_key;
+    const BufferCollectionKey_t weights_key;
+    const BufferCollectionKey_t fractional_weights_key;
+    const int number_of_classes;
+    BufferCollection collection;
+    BufferCollectionStack stack;
+
+typedef SinglePrecisionBufferTypes BufferTypes_t;
+};
+
+BOOST_FIXTURE_TEST_SUITE( ClassInfoGainIncrementalWalkerTests,  ClassInfoGainIncrementalWalkerFixture )
+
+BOOST_AUTO_TEST_CASE(test_ClassInfoGainIncrementalWalker_Impurity)
+{
+    ClassInfoGainIncrementalWalker< BufferTypes_t > walker(weights_key, classes_key, number_of_classes);
+    walker.Bind(stack);
+    BOOST_CHECK_SMALL(walker.Impurity(), 0.0001f);
+
+    walker.MoveLeftToRight(2);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.199, 1);
+
+    walker.MoveLeftToRight(5);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.467, 1);
+
+    walker.MoveLeftToRight(7);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.949, 1);
+
+    walker.MoveLeftToRight(3);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.656, 1);
+
+    walker.MoveLeftToRight(6);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.360, 1);
+
+    walker.MoveLeftToRight(0);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.4669, 1);
+
+    walker.MoveLeftToRight(1);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.199, 1);
+
+    walker.MoveLeftToRight(4);
+    BOOST_CHECK_SMALL(walker.Impurity(), 0.0001f);
+}
+
+BOOST_AUTO_TEST_CASE(test_ClassInfoGainIncrementalWalker_Reset)
+{
+    ClassInfoGainIncrementalWalker< BufferTypes_t > walker(weights_key, classes_key, number_of_classes);
+    walker.Bind(stack);
+    walker.MoveLeftToRight(2);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.199, 1);
+    BOOST_CHECK_CLOSE(walker.GetLeftChildCounts(), 7.0, 0.001);
+    BOOST_CHECK_CLOSE(walker.GetRightChildCounts(), 1.0, 0.001);
+
+    walker.Reset();
+    BOOST_CHECK_SMALL(walker.Impurity(), 0.0001f);
+    BOOST_CHECK_CLOSE(walker.GetLeftChildCounts(), 8.0, 0.001);
+
+    walker.MoveLeftToRight(2);
+    BOOST_CHECK_CLOSE(walker.Impurity(), 0.199, 1);
+}
+
+BOOST_AUTO_TEST_CASE(test_ClassInfoGainIncrementalWalker_matches_ClassInfoGainWalker)
+{
+    // Fractional weights do not use the n*log(n) table
+    ClassInfoGainWalker< BufferTypes_t > expectedWalker(fractional_weights_key, classes_key, number_of_classes);
+    expectedWalker.Bind(stack);
+    ClassInfoGainIncrementalWalker< BufferTypes_t > walker(fractional_weights_key, classes_key, number_of_classes);
+    walker.Bind(stack);
+
+    int order[] = {2,5,7,3,6,0,1};
+    for(int i=0; i<7; i++)
+    {
+        expectedWalker.MoveLeftToRight(order[i]);
+        walker.MoveLeftToRight(order[i]);
+        BOOST_CHECK_CLOSE(walker.Impurity(), expectedWalker.Impurity(), 0.01);
+        BOOST_CHECK(walker.GetLeftYs() == expectedWalker.GetLeftYs());
+        BOOST_CHECK(walker.GetRightYs() == expectedWalker.GetRightYs());
+    }
+}
+
+BOOST_AUTO_TEST_SUITE_END()
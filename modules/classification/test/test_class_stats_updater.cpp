@@ -28,7 +28,7 @@ BOOST_AUTO_TEST_CASE(test_UpdateStats)
     ClassStatsUpdater<SinglePrecisionBufferTypes> classStatsUpdater(weights_key, classes_key, numberOfClasses);
     BindedClassStatsUpdater<SinglePrecisionBufferTypes> bindedClassStatsUpdater = classStatsUpdater.Bind(stack);
 
-    float counts;
+    float counts = 0.0f;
     Tensor3BufferTemplate<float> stats(4,5,numberOfClasses);
 
     bindedClassStatsUpdater.UpdateStats(counts, stats, 0,0,0);
@@ -0,0 +1,191 @@
+#include <string.h>
+#include <boost/static_assert.hpp>
+
+#include <asserts.h>
+#include "Constants.h"
+#include "CompiledForest.h"
+
+BOOST_STATIC_ASSERT(sizeof(CompiledNode) == CompiledNode::NODE_INTS * sizeof(int));
+
+static const std::string COMPILED_TREE_NODES = "CompiledTree-Nodes";
+static const std::string COMPILED_TREE_INT_PARAMS = "CompiledTree-IntFeatureParams";
+static const std::string COMPILED_TREE_FLOAT_PARAMS = "CompiledTree-FloatFeatureParams";
+
+CompiledTree::CompiledTree()
+: mNodes()
+, mIntFeatureParams()
+, mFloatFeatureParams()
+{
+}
+
+CompiledTree::CompiledTree( const Tree& tree )
+: mNodes()
+, mIntFeatureParams()
+, mFloatFeatureParams()
+{
+    if( WrapExtraInfo(tree) )
+    {
+        return;
+    }
+
+    const MatrixBufferTemplate<int>& path = tree.GetPath();
+    const MatrixBufferTemplate<int>& intParams = tree.GetIntFeatureParams();
+    const MatrixBufferTemplate<float>& floatParams = tree.GetFloatFeatureParams();
+    if( path.GetM() == 0 )
+    {
+        return;
+    }
+
+    // Breadth first walk from the root.  nodeIds doubles as the queue because
+    // a node's compiled id is the order in which it is visited.
+    std::vector<int> nodeIds;
+    std::vector<CompiledNode> nodes;
+    nodeIds.push_back(0);
+    for(unsigned int compiledId=0; compiledId<nodeIds.size(); compiledId++)
+    {
+        const int nodeId = nodeIds[compiledId];
+        const int leftNodeId = path.Get(nodeId, LEFT_CHILD);
+        const int rightNodeId = path.Get(nodeId, RIGHT_CHILD);
+
+        CompiledNode node;
+        node.mNodeId = nodeId;
+        node.mSplitpoint = floatParams.Get(nodeId, SPLIT_POINT_INDEX);
+        if( leftNodeId == NULL_CHILD || rightNodeId == NULL_CHILD )
+        {
+            node.mLeftChild = NULL_CHILD;
+            node.mRightChild = NULL_CHILD;
+        }
+        else
+        {
+            node.mLeftChild = nodeIds.size();
+            nodeIds.push_back(leftNodeId);
+            node.mRightChild = nodeIds.size();
+            nodeIds.push_back(rightNodeId);
+        }
+        nodes.push_back(node);
+    }
+
+    const int numberOfNodes = nodes.size();
+    mNodes = MatrixBufferTemplate<int>(numberOfNodes, CompiledNode::NODE_INTS);
+    memcpy(mNodes.GetMutableRowPtrUnsafe(0), &nodes[0], numberOfNodes * sizeof(CompiledNode));
+    mIntFeatureParams = MatrixBufferTemplate<int>(numberOfNodes, intParams.GetN());
+    mFloatFeatureParams = MatrixBufferTemplate<float>(numberOfNodes, floatParams.GetN());
+    for(int compiledId=0; compiledId<numberOfNodes; compiledId++)
+    {
+        const int nodeId = nodes[compiledId].mNodeId;
+        for(int c=0; c<intParams.GetN(); c++)
+        {
+            mIntFeatureParams.Set(compiledId, c, intParams.Get(nodeId, c));
+        }
+        for(int c=0; c<floatParams.GetN(); c++)
+        {
+            mFloatFeatureParams.Set(compiledId, c, floatParams.Get(nodeId, c));
+        }
+    }
+}
+
+// The stored layout is only used while the tree buffers it was compiled
+// from still wrap the file, any write to them makes a private copy
+bool CompiledTree::WrapExtraInfo( const Tree& tree )
+{
+    const BufferCollection& extraInfo = tree.GetExtraInfo();
+    if( !tree.GetPath().IsView()
+        || !tree.GetIntFeatureParams().IsView()
+        || !tree.GetFloatFeatureParams().IsView()
+        || !extraInfo.HasBuffer< MatrixBufferTemplate<int> >(COMPILED_TREE_NODES)
+        || !extraInfo.HasBuffer< MatrixBufferTemplate<int> >(COMPILED_TREE_INT_PARAMS)
+        || !extraInfo.HasBuffer< MatrixBufferTemplate<float> >(COMPILED_TREE_FLOAT_PARAMS) )
+    {
+        return false;
+    }
+
+    const MatrixBufferTemplate<int>& nodes = extraInfo.GetBuffer< MatrixBufferTemplate<int> >(COMPILED_TREE_NODES);
+    const MatrixBufferTemplate<int>& intParams = extraInfo.GetBuffer< MatrixBufferTemplate<int> >(COMPILED_TREE_INT_PARAMS);
+    const MatrixBufferTemplate<float>& floatParams = extraInfo.GetBuffer< MatrixBufferTemplate<float> >(COMPILED_TREE_FLOAT_PARAMS);
+    if( nodes.GetN() != CompiledNode::NODE_INTS
+        || intParams.GetM() != nodes.GetM()
+        || floatParams.GetM() != nodes.GetM()
+        || intParams.GetN() != tree.GetIntFeatureParams().GetN()
+        || floatParams.GetN() != tree.GetFloatFeatureParams().GetN() )
+    {
+        return false;
+    }
+
+    mNodes = nodes;
+    mIntFeatureParams = intParams;
+    mFloatFeatureParams = floatParams;
+    return true;
+}
+
+void CompiledTree::WriteExtraInfo( BufferCollection& extraInfo ) const
+{
+    extraInfo.AddBuffer< MatrixBufferTemplate<int> >(COMPILED_TREE_NODES, mNodes);
+    extraInfo.AddBuffer< MatrixBufferTemplate<int> >(COMPILED_TREE_INT_PARAMS, mIntFeatureParams);
+    extraInfo.AddBuffer< MatrixBufferTemplate<float> >(COMPILED_TREE_FLOAT_PARAMS, mFloatFeatureParams);
+}
+
+int CompiledTree::GetNumberOfNodes() const
+{
+    return mNodes.GetM();
+}
+
+const CompiledNode* CompiledTree::GetNodes() const
+{
+    return mNodes.GetM() == 0 ? NULL : reinterpret_cast<const CompiledNode*>(mNodes.GetDataPtrUnsafe());
+}
+
+const MatrixBufferTemplate<int>& CompiledTree::GetIntFeatureParams() const
+{
+    return mIntFeatureParams;
+}
+
+const MatrixBufferTemplate<float>& CompiledTree::GetFloatFeatureParams() const
+{
+    return mFloatFeatureParams;
+}
+
+bool CompiledTree::IsView() const
+{
+    return mNodes.IsView() && mIntFeatureParams.IsView() && mFloatFeatureParams.IsView();
+}
+
+CompiledForest::CompiledForest()
+: mTrees()
+{
+}
+
+CompiledForest::CompiledForest( const Forest& forest )
+: mTrees()
+{
+    AddForest(forest);
+}
+
+void CompiledForest::AddForest(const Forest& forest)
+{
+    for(unsigned int i=0; i<forest.mTrees.size(); i++)
+    {
+        AddTree( forest.mTrees[i] );
+    }
+}
+
+void CompiledForest::AddTree(const Tree& tree)
+{
+    mTrees.push_back( CompiledTree(tree) );
+}
+
+void CompiledForest::RemoveTree(const int index)
+{
+    ASSERT_VALID_RANGE(index, 0, static_cast<int>(mTrees.size()))
+    mTrees.erase(mTrees.begin()+index);
+}
+
+int CompiledForest::GetNumberOfTrees() const
+{
+    return mTrees.size();
+}
+
+const CompiledTree& CompiledForest::GetTree(const int index) const
+{
+    ASSERT_VALID_RANGE(index, 0, static_cast<int>(mTrees.size()))
+    return mTrees[index];
+}
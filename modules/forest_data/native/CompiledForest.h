@@ -0,0 +1,82 @@
+#pragma once
+
+#include <vector>
+
+#include <VectorBuffer.h>
+#include <MatrixBuffer.h>
+#include "Tree.h"
+#include "Forest.h"
+
+// ----------------------------------------------------------------------------
+//
+// CompiledNode packs everything needed to route a datapoint through a node
+// into one struct.  Children are indices into the compiled node array and
+// mNodeId is the index of the node in the original tree (used to look up
+// counts and ys).
+//
+// ----------------------------------------------------------------------------
+struct CompiledNode
+{
+    int mLeftChild;
+    int mRightChild;
+    float mSplitpoint;
+    int mNodeId;
+
+    enum { NODE_INTS = 4 };
+};
+
+// ----------------------------------------------------------------------------
+//
+// CompiledTree is a read only copy of a tree laid out for prediction.  Nodes
+// are stored breadth first so the top levels, which every datapoint visits,
+// share cache lines and siblings are always adjacent.  The feature params
+// are reordered to match so row i of the params belongs to compiled node i.
+//
+// WriteExtraInfo stores the compiled layout in the extra info of a tree
+// (WriteForestFile does this for every tree it writes).  When a tree still
+// wraps the memory of a forest file (ie it was loaded with ReadForestFile
+// and not written to) the compiled tree wraps the stored layout instead of
+// building a copy, so the pages stay shared between processes.
+//
+// ----------------------------------------------------------------------------
+class CompiledTree
+{
+public:
+    CompiledTree();     //default for stl vector
+    CompiledTree( const Tree& tree );
+
+    int GetNumberOfNodes() const;
+    const CompiledNode* GetNodes() const;
+    const MatrixBufferTemplate<int>& GetIntFeatureParams() const;
+    const MatrixBufferTemplate<float>& GetFloatFeatureParams() const;
+
+    // True when the compiled layout wraps memory owned by someone else
+    bool IsView() const;
+    void WriteExtraInfo( BufferCollection& extraInfo ) const;
+
+private:
+    bool WrapExtraInfo( const Tree& tree );
+
+    // One row of NODE_INTS ints per CompiledNode so the nodes can be stored
+    // and wrapped like any other buffer
+    MatrixBufferTemplate<int> mNodes;
+    MatrixBufferTemplate<int> mIntFeatureParams;
+    MatrixBufferTemplate<float> mFloatFeatureParams;
+};
+
+class CompiledForest
+{
+public:
+    CompiledForest();
+    CompiledForest( const Forest& forest );
+
+    void AddForest(const Forest& forest);
+    void AddTree(const Tree& tree);
+    void RemoveTree(const int index);
+
+    int GetNumberOfTrees() const;
+    const CompiledTree& GetTree(const int index) const;
+
+private:
+    std::vector<CompiledTree> mTrees;
+};
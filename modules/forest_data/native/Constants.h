@@ -4,4 +4,8 @@ const int FEATURE_TYPE_INDEX = 0;
 const int SPLIT_POINT_INDEX = FEATURE_TYPE_INDEX; 
 const int FEATURE_SPECIFIC_PARAMS_START = FEATURE_TYPE_INDEX + 1;
 const int LEFT_CHILD = 0;
-const int RIGHT_CHILD = 1;
\ No newline at end of file
+const int RIGHT_CHILD = 1;
+
+// Histogram bins are coded in one byte (see HistogramBinsStep)
+typedef unsigned char HistogramBinCode;
+const int HISTOGRAM_MAX_NUMBER_OF_BINS = 256;
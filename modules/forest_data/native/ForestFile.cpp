@@ -0,0 +1,417 @@
+#include <stdint.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+#include <fstream>
+#include <list>
+#include <stdexcept>
+#include <boost/shared_ptr.hpp>
+
+#include <BufferStorage.h>
+#include <VectorBuffer.h>
+#include <MatrixBuffer.h>
+#include <Tensor3Buffer.h>
+#include <BufferCollection.h>
+
+#include "CompiledForest.h"
+#include "ForestFile.h"
+
+static const char FOREST_FILE_MAGIC[8] = {'R','F','T','K','F','R','S','T'};
+static const size_t FOREST_FILE_ALIGNMENT = 8;
+
+// Buffer record types are (kind << 2) | scalar
+enum ForestFileBufferKind
+{
+    FOREST_FILE_VECTOR = 0,
+    FOREST_FILE_MATRIX = 1,
+    FOREST_FILE_TENSOR3 = 2
+};
+
+template <class T> uint32_t ForestFileScalarType();
+template <> uint32_t ForestFileScalarType<float>() { return 0; }
+template <> uint32_t ForestFileScalarType<double>() { return 1; }
+template <> uint32_t ForestFileScalarType<int>() { return 2; }
+template <> uint32_t ForestFileScalarType<long long>() { return 3; }
+
+struct ForestFileHeader
+{
+    char mMagic[8];
+    uint32_t mVersion;
+    uint32_t mNumberOfTrees;
+};
+
+struct ForestFileBufferHeader
+{
+    uint32_t mType;
+    int32_t mL;
+    int32_t mM;
+    int32_t mN;
+};
+
+static size_t AlignForestFileOffset(size_t offset)
+{
+    return (offset + FOREST_FILE_ALIGNMENT - 1) & ~(FOREST_FILE_ALIGNMENT - 1);
+}
+
+// ----------------------------------------------------------------------------
+// Writing
+// ----------------------------------------------------------------------------
+
+static void WritePadding(std::ofstream& out)
+{
+    const char zeros[FOREST_FILE_ALIGNMENT] = {0};
+    const size_t offset = static_cast<size_t>(out.tellp());
+    out.write(zeros, AlignForestFileOffset(offset) - offset);
+}
+
+template <class T>
+static void WriteBufferRecord(std::ofstream& out, ForestFileBufferKind kind, int l, int m, int n, const T* data)
+{
+    ForestFileBufferHeader header;
+    header.mType = (static_cast<uint32_t>(kind) << 2) | ForestFileScalarType<T>();
+    header.mL = l;
+    header.mM = m;
+    header.mN = n;
+    out.write(reinterpret_cast<const char*>(&header), sizeof(header));
+    const size_t numberOfElements = static_cast<size_t>(l) * m * n;
+    if(numberOfElements > 0)
+    {
+        out.write(reinterpret_cast<const char*>(data), numberOfElements * sizeof(T));
+    }
+    WritePadding(out);
+}
+
+template <class T>
+static void WriteBuffer(std::ofstream& out, const VectorBufferTemplate<T>& buffer)
+{
+    WriteBufferRecord(out, FOREST_FILE_VECTOR, 1, 1, buffer.GetN(), buffer.GetDataPtrUnsafe());
+}
+
+template <class T>
+static void WriteBuffer(std::ofstream& out, const MatrixBufferTemplate<T>& buffer)
+{
+    WriteBufferRecord(out, FOREST_FILE_MATRIX, 1, buffer.GetM(), buffer.GetN(), buffer.GetDataPtrUnsafe());
+}
+
+template <class T>
+static void WriteBuffer(std::ofstream& out, const Tensor3BufferTemplate<T>& buffer)
+{
+    WriteBufferRecord(out, FOREST_FILE_TENSOR3, buffer.GetL(), buffer.GetM(), buffer.GetN(), buffer.GetDataPtrUnsafe());
+}
+
+template <class BufferType>
+static bool WriteExtraInfoBufferIfType(std::ofstream& out, const BufferCollection& extraInfo, const std::string& key)
+{
+    if(!extraInfo.HasBuffer<BufferType>(key))
+    {
+        return false;
+    }
+    const uint32_t keyLength = key.size();
+    out.write(reinterpret_cast<const char*>(&keyLength), sizeof(keyLength));
+    WritePadding(out);
+    out.write(key.data(), keyLength);
+    WritePadding(out);
+    WriteBuffer(out, extraInfo.GetBuffer<BufferType>(key));
+    return true;
+}
+
+static bool WriteExtraInfoBuffer(std::ofstream& out, const BufferCollection& extraInfo, const std::string& key)
+{
+    return WriteExtraInfoBufferIfType<Float32VectorBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Float64VectorBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Int32VectorBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Int64VectorBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Float32MatrixBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Float64MatrixBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Int32MatrixBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Int64MatrixBuffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Float32Tensor3Buffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Float64Tensor3Buffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Int32Tensor3Buffer>(out, extraInfo, key)
+        || WriteExtraInfoBufferIfType<Int64Tensor3Buffer>(out, extraInfo, key);
+}
+
+static void WriteTree(std::ofstream& out, const Tree& tree)
+{
+    WriteBuffer(out, tree.GetPath());
+    WriteBuffer(out, tree.GetIntFeatureParams());
+    WriteBuffer(out, tree.GetFloatFeatureParams());
+    WriteBuffer(out, tree.GetDepths());
+    WriteBuffer(out, tree.GetCounts());
+    WriteBuffer(out, tree.GetYs());
+
+    // Buffers of types WriteExtraInfoBuffer does not store (ie sparse) are
+    // skipped, so the count is filled in once the records are written
+    const BufferCollection& extraInfo = tree.GetExtraInfo();
+    const std::list<std::string> keys = extraInfo.GetKeys();
+    const std::streampos countPosition = out.tellp();
+    uint32_t numberOfExtraInfoBuffers = 0;
+    out.write(reinterpret_cast<const char*>(&numberOfExtraInfoBuffers), sizeof(numberOfExtraInfoBuffers));
+    WritePadding(out);
+    for(std::list<std::string>::const_iterator it = keys.begin(); it != keys.end(); ++it)
+    {
+        numberOfExtraInfoBuffers += WriteExtraInfoBuffer(out, extraInfo, *it) ? 1 : 0;
+    }
+    const std::streampos endPosition = out.tellp();
+    out.seekp(countPosition);
+    out.write(reinterpret_cast<const char*>(&numberOfExtraInfoBuffers), sizeof(numberOfExtraInfoBuffers));
+    out.seekp(endPosition);
+}
+
+void WriteForestFile(const Forest& forest, const std::string& filename)
+{
+    std::ofstream out(filename.c_str(), std::ios::out | std::ios::binary | std::ios::trunc);
+    if(!out)
+    {
+        throw std::runtime_error("WriteForestFile could not open " + filename);
+    }
+
+    const int numberOfTrees = forest.GetNumberOfTrees();
+    ForestFileHeader header;
+    memcpy(header.mMagic, FOREST_FILE_MAGIC, sizeof(header.mMagic));
+    header.mVersion = FOREST_FILE_VERSION;
+    header.mNumberOfTrees = numberOfTrees;
+    out.write(reinterpret_cast<const char*>(&header), sizeof(header));
+
+    // Reserve the offset table and fill it in once the trees are written
+    const std::streampos offsetsPosition = out.tellp();
+    std::vector<uint64_t> treeOffsets(numberOfTrees, 0);
+    if(numberOfTrees > 0)
+    {
+        out.write(reinterpret_cast<const char*>(&treeOffsets[0]), numberOfTrees * sizeof(uint64_t));
+    }
+
+    for(int i=0; i<numberOfTrees; i++)
+    {
+        // Only write the nodes that are used (same as pickling)
+        Tree tree = forest.GetTree(i);
+        tree.Compact();
+        // Stored so predictors can wrap the compiled layout instead of copying it
+        CompiledTree(tree).WriteExtraInfo(tree.GetExtraInfo());
+        treeOffsets[i] = static_cast<uint64_t>(out.tellp());
+        WriteTree(out, tree);
+    }
+
+    if(numberOfTrees > 0)
+    {
+        out.seekp(offsetsPosition);
+        out.write(reinterpret_cast<const char*>(&treeOffsets[0]), numberOfTrees * sizeof(uint64_t));
+    }
+    if(!out)
+    {
+        throw std::runtime_error("WriteForestFile failed writing " + filename);
+    }
+}
+
+// ----------------------------------------------------------------------------
+// Reading
+// ----------------------------------------------------------------------------
+
+// Unmaps the file once the last buffer wrapping it is gone
+class MappedForestFile
+{
+public:
+    MappedForestFile(void* address, size_t length)
+    : mAddress(address)
+    , mLength(length)
+    {}
+
+    ~MappedForestFile()
+    {
+        munmap(mAddress, mLength);
+    }
+
+    const char* GetData() const { return static_cast<const char*>(mAddress); }
+    size_t GetLength() const { return mLength; }
+
+private:
+    MappedForestFile(const MappedForestFile&);
+    MappedForestFile& operator=(const MappedForestFile&);
+
+    void* mAddress;
+    size_t mLength;
+};
+
+class ForestFileReader
+{
+public:
+    ForestFileReader(const boost::shared_ptr<MappedForestFile>& file, size_t offset)
+    : mFile(file)
+    , mOffset(offset)
+    {}
+
+    const char* Read(size_t numberOfBytes)
+    {
+        if(mOffset > mFile->GetLength() || numberOfBytes > mFile->GetLength() - mOffset)
+        {
+            throw std::runtime_error("ReadForestFile file is truncated");
+        }
+        const char* data = mFile->GetData() + mOffset;
+        mOffset = AlignForestFileOffset(mOffset + numberOfBytes);
+        return data;
+    }
+
+    template <class T>
+    BufferStorage<T> ReadBufferRecord(ForestFileBufferKind kind, int& l, int& m, int& n)
+    {
+        ForestFileBufferHeader header;
+        memcpy(&header, Read(sizeof(header)), sizeof(header));
+        if(header.mType != ((static_cast<uint32_t>(kind) << 2) | ForestFileScalarType<T>())
+            || header.mL < 0 || header.mM < 0 || header.mN < 0)
+        {
+            throw std::runtime_error("ReadForestFile unexpected buffer record");
+        }
+        l = header.mL;
+        m = header.mM;
+        n = header.mN;
+        const size_t numberOfElements = static_cast<size_t>(l) * m * n;
+        T* data = reinterpret_cast<T*>(const_cast<char*>(Read(numberOfElements * sizeof(T))));
+        return BufferStorage<T>(data, numberOfElements, mFile);
+    }
+
+    template <class T>
+    void ReadBuffer(VectorBufferTemplate<T>& buffer)
+    {
+        int l, m, n;
+        BufferStorage<T> storage = ReadBufferRecord<T>(FOREST_FILE_VECTOR, l, m, n);
+        buffer = VectorBufferTemplate<T>(storage, n);
+    }
+
+    template <class T>
+    void ReadBuffer(MatrixBufferTemplate<T>& buffer)
+    {
+        int l, m, n;
+        BufferStorage<T> storage = ReadBufferRecord<T>(FOREST_FILE_MATRIX, l, m, n);
+        buffer = MatrixBufferTemplate<T>(storage, m, n);
+    }
+
+    template <class T>
+    void ReadBuffer(Tensor3BufferTemplate<T>& buffer)
+    {
+        int l, m, n;
+        BufferStorage<T> storage = ReadBufferRecord<T>(FOREST_FILE_TENSOR3, l, m, n);
+        buffer = Tensor3BufferTemplate<T>(storage, l, m, n);
+    }
+
+    template <class BufferType>
+    void ReadExtraInfoBuffer(BufferCollection& extraInfo, const std::string& key)
+    {
+        BufferType buffer;
+        ReadBuffer(buffer);
+        extraInfo.AddBuffer(key, buffer);
+    }
+
+    uint32_t PeekType()
+    {
+        ForestFileBufferHeader header;
+        const size_t offset = mOffset;
+        memcpy(&header, Read(sizeof(header)), sizeof(header));
+        mOffset = offset;
+        return header.mType;
+    }
+
+private:
+    boost::shared_ptr<MappedForestFile> mFile;
+    size_t mOffset;
+};
+
+static void ReadExtraInfo(ForestFileReader& reader, BufferCollection& extraInfo)
+{
+    uint32_t numberOfExtraInfoBuffers = 0;
+    memcpy(&numberOfExtraInfoBuffers, reader.Read(sizeof(numberOfExtraInfoBuffers)), sizeof(numberOfExtraInfoBuffers));
+    for(uint32_t i=0; i<numberOfExtraInfoBuffers; i++)
+    {
+        uint32_t keyLength = 0;
+        memcpy(&keyLength, reader.Read(sizeof(keyLength)), sizeof(keyLength));
+        const std::string key(reader.Read(keyLength), keyLength);
+
+        switch(reader.PeekType())
+        {
+            case (FOREST_FILE_VECTOR << 2) | 0: reader.ReadExtraInfoBuffer<Float32VectorBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_VECTOR << 2) | 1: reader.ReadExtraInfoBuffer<Float64VectorBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_VECTOR << 2) | 2: reader.ReadExtraInfoBuffer<Int32VectorBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_VECTOR << 2) | 3: reader.ReadExtraInfoBuffer<Int64VectorBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_MATRIX << 2) | 0: reader.ReadExtraInfoBuffer<Float32MatrixBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_MATRIX << 2) | 1: reader.ReadExtraInfoBuffer<Float64MatrixBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_MATRIX << 2) | 2: reader.ReadExtraInfoBuffer<Int32MatrixBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_MATRIX << 2) | 3: reader.ReadExtraInfoBuffer<Int64MatrixBuffer>(extraInfo, key); break;
+            case (FOREST_FILE_TENSOR3 << 2) | 0: reader.ReadExtraInfoBuffer<Float32Tensor3Buffer>(extraInfo, key); break;
+            case (FOREST_FILE_TENSOR3 << 2) | 1: reader.ReadExtraInfoBuffer<Float64Tensor3Buffer>(extraInfo, key); break;
+            case (FOREST_FILE_TENSOR3 << 2) | 2: reader.ReadExtraInfoBuffer<Int32Tensor3Buffer>(extraInfo, key); break;
+            case (FOREST_FILE_TENSOR3 << 2) | 3: reader.ReadExtraInfoBuffer<Int64Tensor3Buffer>(extraInfo, key); break;
+            default: throw std::runtime_error("ReadForestFile unknown extra info buffer type");
+        }
+    }
+}
+
+static Tree ReadTree(ForestFileReader& reader)
+{
+    MatrixBufferTemplate<int> path;
+    MatrixBufferTemplate<int> intFeatureParams;
+    MatrixBufferTemplate<float> floatFeatureParams;
+    VectorBufferTemplate<int> depths;
+    VectorBufferTemplate<float> counts;
+    MatrixBufferTemplate<float> ys;
+    reader.ReadBuffer(path);
+    reader.ReadBuffer(intFeatureParams);
+    reader.ReadBuffer(floatFeatureParams);
+    reader.ReadBuffer(depths);
+    reader.ReadBuffer(counts);
+    reader.ReadBuffer(ys);
+
+    Tree tree(path, intFeatureParams, floatFeatureParams, depths, counts, ys);
+    ReadExtraInfo(reader, tree.GetExtraInfo());
+    return tree;
+}
+
+Forest ReadForestFile(const std::string& filename)
+{
+    const int fd = open(filename.c_str(), O_RDONLY);
+    if(fd < 0)
+    {
+        throw std::runtime_error("ReadForestFile could not open " + filename);
+    }
+    struct stat fileStat;
+    if(fstat(fd, &fileStat) != 0 || static_cast<size_t>(fileStat.st_size) < sizeof(ForestFileHeader))
+    {
+        close(fd);
+        throw std::runtime_error("ReadForestFile " + filename + " is not a forest file");
+    }
+    const size_t length = fileStat.st_size;
+    void* address = mmap(NULL, length, PROT_READ, MAP_SHARED, fd, 0);
+    close(fd);
+    if(address == MAP_FAILED)
+    {
+        throw std::runtime_error("ReadForestFile could not map " + filename);
+    }
+    boost::shared_ptr<MappedForestFile> file(new MappedForestFile(address, length));
+
+    ForestFileHeader header;
+    memcpy(&header, file->GetData(), sizeof(header));
+    if(memcmp(header.mMagic, FOREST_FILE_MAGIC, sizeof(header.mMagic)) != 0)
+    {
+        throw std::runtime_error("ReadForestFile " + filename + " is not a forest file");
+    }
+    if(header.mVersion != FOREST_FILE_VERSION)
+    {
+        throw std::runtime_error("ReadForestFile " + filename + " has an unsupported version");
+    }
+
+    ForestFileReader offsetsReader(file, sizeof(header));
+    std::vector<uint64_t> treeOffsets(header.mNumberOfTrees, 0);
+    if(header.mNumberOfTrees > 0)
+    {
+        memcpy(&treeOffsets[0], offsetsReader.Read(header.mNumberOfTrees * sizeof(uint64_t)), header.mNumberOfTrees * sizeof(uint64_t));
+    }
+
+    std::vector<Tree> trees(header.mNumberOfTrees);
+    for(uint32_t i=0; i<header.mNumberOfTrees; i++)
+    {
+        ForestFileReader treeReader(file, treeOffsets[i]);
+        trees[i] = ReadTree(treeReader);
+    }
+    return Forest(trees);
+}
@@ -0,0 +1,32 @@
+#pragma once
+
+#include <string>
+
+#include "Forest.h"
+
+// ----------------------------------------------------------------------------
+//
+// Versioned binary forest file.
+//
+// The file starts with the magic "RFTKFRST", the format version and the
+// number of trees followed by the byte offset of every tree.  Each tree is
+// a sequence of buffer records (path, int params, float params, depths,
+// counts, ys and then the dense extra info buffers).  A buffer record is a
+// small header (type, l, m, n) followed by the raw data, padded so every
+// record starts on an 8 byte boundary.
+//
+// ReadForestFile maps the file read only and the tree buffers wrap the
+// mapped memory (see BufferStorage) instead of copying it.  Pages are only
+// read from disk the first time a tree touches them and are shared by every
+// process that maps the same file.  Writing to a buffer of a loaded tree
+// copies that buffer, the file is never modified.
+//
+// The compiled (breadth first) layout of every tree is stored in its extra
+// info so a predictor built from a loaded forest wraps the mapped layout as
+// well (see CompiledTree).
+//
+// ----------------------------------------------------------------------------
+const unsigned int FOREST_FILE_VERSION = 1;
+
+void WriteForestFile(const Forest& forest, const std::string& filename);
+Forest ReadForestFile(const std::string& filename);
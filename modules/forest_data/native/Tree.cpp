@@ -81,6 +81,9 @@ TreeData::~TreeData()
 
 int TreeData::NextNodeIndex()
 {
+#if USE_BOOST_THREAD
+    boost::recursive_mutex::scoped_lock lock(mMutex);
+#endif
     int nextNodeIndex = mLastNodeIndex;
     mLastNodeIndex++;
     const int numberOfNodesAllocated = mPath.GetM();
@@ -193,6 +196,13 @@ BufferCollection& Tree::GetExtraInfo()
    return mTreeData->mExtraInfo;
 }
 
+#if USE_BOOST_THREAD
+boost::recursive_mutex& Tree::GetMutex()
+{
+    return mTreeData->mMutex;
+}
+#endif
+
 const MatrixBufferTemplate<int>& Tree::GetPath() const
 {
     return mTreeData->mPath;
@@ -1,6 +1,9 @@
 #pragma once
 
 #include <boost/shared_ptr.hpp>
+#if USE_BOOST_THREAD && !defined(SWIG)
+#include <boost/thread/recursive_mutex.hpp>
+#endif
 
 #include <VectorBuffer.h>
 #include <MatrixBuffer.h>
@@ -40,6 +43,11 @@ public:
 
     int mLastNodeIndex;
     bool mValid;
+
+#if USE_BOOST_THREAD && !defined(SWIG)
+    // Guards growing the tree when nodes are learned concurrently
+    boost::recursive_mutex mMutex;
+#endif
 };
 
 class Tree
@@ -59,6 +67,9 @@ public:
     ~Tree();
 
     void GatherStats(ForestStats& stats) const;
+
+    // Safe to call from multiple threads.  Writes to the node buffers that
+    // may race with NextNodeIndex growing them must hold GetMutex()
     int NextNodeIndex();
     void Compact();
 
@@ -78,6 +89,10 @@ public:
     const MatrixBufferTemplate<float>& GetYs() const;
     const BufferCollection& GetExtraInfo() const; 
 
+#if USE_BOOST_THREAD && !defined(SWIG)
+    boost::recursive_mutex& GetMutex();
+#endif
+
 private:
     boost::shared_ptr<TreeData> mTreeData;
 };
@@ -4,6 +4,8 @@
     #include "Tree.h"
     #include "ForestStats.h"
     #include "Forest.h"
+    #include "CompiledForest.h"
+    #include "ForestFile.h"
 
     #if PY_VERSION_HEX >= 0x03020000
     # define SWIGPY_SLICE_ARG(obj) ((PyObject*) (obj))
@@ -30,6 +32,8 @@ namespace std {
 %include "Tree.h"
 %include "ForestStats.h"
 %include "Forest.h"
+%include "CompiledForest.h"
+%include "ForestFile.h"
 
 %extend Tree {
 %insert("python") %{
@@ -0,0 +1,97 @@
+#include <boost/test/unit_test.hpp>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "Tree.h"
+#include "Forest.h"
+#include "CompiledForest.h"
+
+struct CompiledForestFixture {
+    CompiledForestFixture()
+    {
+        // node 0 splits into 3 and 1, node 1 splits into 4 and 2
+        int path_data[] = {3, 1,
+                           4, 2,
+                          -1, -1,
+                          -1, -1,
+                          -1, -1};
+        path = MatrixBufferTemplate<int>(&path_data[0], 5, 2);
+        int int_params_data[] = {10, 1, 0,
+                                 10, 1, 1,
+                                 10, 1, 2,
+                                 10, 1, 3,
+                                 10, 1, 4};
+        int_params = MatrixBufferTemplate<int>(&int_params_data[0], 5, 3);
+        float float_params_data[] = {0.5, 0, 1.0,
+                                     1.5, 0, 1.0,
+                                     2.5, 0, 1.0,
+                                     3.5, 0, 1.0,
+                                     4.5, 0, 1.0};
+        float_params = MatrixBufferTemplate<float>(&float_params_data[0], 5, 3);
+        int depth_data[] = {0, 1, 2, 1, 2};
+        depth = VectorBufferTemplate<int>(&depth_data[0], 5);
+        float counts_data[] = {5, 5, 5, 5, 5};
+        counts = VectorBufferTemplate<float>(&counts_data[0], 5);
+        ys = MatrixBufferTemplate<float>(5, 2);
+    }
+
+    MatrixBufferTemplate<int> path;
+    MatrixBufferTemplate<int> int_params;
+    MatrixBufferTemplate<float> float_params;
+    VectorBufferTemplate<int> depth;
+    VectorBufferTemplate<float> counts;
+    MatrixBufferTemplate<float> ys;
+};
+
+BOOST_FIXTURE_TEST_SUITE( CompiledForestTests, CompiledForestFixture )
+
+BOOST_AUTO_TEST_CASE(test_CompiledTree_breadth_first_layout)
+{
+    Tree tree(path, int_params, float_params, depth, counts, ys);
+    CompiledTree compiledTree(tree);
+
+    BOOST_CHECK_EQUAL(compiledTree.GetNumberOfNodes(), 5);
+    const CompiledNode* nodes = compiledTree.GetNodes();
+
+    int expectedNodeIds[] = {0, 3, 1, 4, 2};
+    for(int i=0; i<5; i++)
+    {
+        BOOST_CHECK_EQUAL(nodes[i].mNodeId, expectedNodeIds[i]);
+        BOOST_CHECK_EQUAL(nodes[i].mSplitpoint, float_params.Get(expectedNodeIds[i], 0));
+        BOOST_CHECK_EQUAL(compiledTree.GetIntFeatureParams().Get(i, 2), expectedNodeIds[i]);
+        BOOST_CHECK_EQUAL(compiledTree.GetFloatFeatureParams().Get(i, 0), float_params.Get(expectedNodeIds[i], 0));
+    }
+
+    BOOST_CHECK_EQUAL(nodes[0].mLeftChild, 1);
+    BOOST_CHECK_EQUAL(nodes[0].mRightChild, 2);
+    BOOST_CHECK_EQUAL(nodes[1].mLeftChild, NULL_CHILD);
+    BOOST_CHECK_EQUAL(nodes[2].mLeftChild, 3);
+    BOOST_CHECK_EQUAL(nodes[2].mRightChild, 4);
+    BOOST_CHECK_EQUAL(nodes[3].mRightChild, NULL_CHILD);
+}
+
+BOOST_AUTO_TEST_CASE(test_CompiledForest_AddTree)
+{
+    Forest forest;
+    forest.AddTree(Tree(path, int_params, float_params, depth, counts, ys));
+    CompiledForest compiledForest(forest);
+    BOOST_CHECK_EQUAL(compiledForest.GetNumberOfTrees(), 1);
+
+    compiledForest.AddForest(forest);
+    BOOST_CHECK_EQUAL(compiledForest.GetNumberOfTrees(), 2);
+    BOOST_CHECK_EQUAL(compiledForest.GetTree(1).GetNumberOfNodes(), 5);
+}
+
+BOOST_AUTO_TEST_CASE(test_CompiledForest_RemoveTree)
+{
+    Forest forest;
+    forest.AddTree(Tree(path, int_params, float_params, depth, counts, ys));
+    CompiledForest compiledForest(forest);
+    compiledForest.AddForest(forest);
+
+    compiledForest.RemoveTree(0);
+    BOOST_CHECK_EQUAL(compiledForest.GetNumberOfTrees(), 1);
+    BOOST_CHECK_EQUAL(compiledForest.GetTree(0).GetNumberOfNodes(), 5);
+}
+
+BOOST_AUTO_TEST_SUITE_END()
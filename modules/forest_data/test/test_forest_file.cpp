@@ -0,0 +1,167 @@
+#include <boost/test/unit_test.hpp>
+#include <stdio.h>
+#include <stdexcept>
+#include <fstream>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "Tensor3Buffer.h"
+#include "SparseMatrixBuffer.h"
+#include "Tree.h"
+#include "Forest.h"
+#include "CompiledForest.h"
+#include "ForestFile.h"
+
+struct ForestFileFixture {
+    ForestFileFixture()
+    : filename("test_forest_file.rftk")
+    {
+        int path_data[] = {1, 2,
+                          -1, -1,
+                          -1, -1};
+        path = MatrixBufferTemplate<int>(&path_data[0], 3, 2);
+        int int_params_data[] = {10, 1, 0,
+                                 10, 1, 1,
+                                 10, 1, 2};
+        int_params = MatrixBufferTemplate<int>(&int_params_data[0], 3, 3);
+        float float_params_data[] = {0.5, 0, 1.0,
+                                     1.5, 0, 1.0,
+                                     2.5, 0, 1.0};
+        float_params = MatrixBufferTemplate<float>(&float_params_data[0], 3, 3);
+        int depth_data[] = {0, 1, 1};
+        depth = VectorBufferTemplate<int>(&depth_data[0], 3);
+        float counts_data[] = {5, 3, 2};
+        counts = VectorBufferTemplate<float>(&counts_data[0], 3);
+        float ys_data[] = {0.5, 0.5,
+                           1.0, 0.0,
+                           0.0, 1.0};
+        ys = MatrixBufferTemplate<float>(&ys_data[0], 3, 2);
+    }
+
+    ~ForestFileFixture()
+    {
+        remove(filename.c_str());
+    }
+
+    std::string filename;
+    MatrixBufferTemplate<int> path;
+    MatrixBufferTemplate<int> int_params;
+    MatrixBufferTemplate<float> float_params;
+    VectorBufferTemplate<int> depth;
+    VectorBufferTemplate<float> counts;
+    MatrixBufferTemplate<float> ys;
+};
+
+BOOST_FIXTURE_TEST_SUITE( ForestFileTests, ForestFileFixture )
+
+BOOST_AUTO_TEST_CASE(test_WriteForestFile_ReadForestFile)
+{
+    Forest forest;
+    Tree tree(path, int_params, float_params, depth, counts, ys);
+    double timing_data[] = {0.25, 0.5, 0.125};
+    VectorBufferTemplate<double> timing(&timing_data[0], 3);
+    tree.GetExtraInfo().AddBuffer("Timing", timing);
+    tree.GetExtraInfo().AddBuffer("Tensor", Tensor3BufferTemplate<long long>(2, 1, 3));
+    forest.AddTree(tree);
+    forest.AddTree(Tree(path, int_params, float_params, depth, counts, ys));
+
+    WriteForestFile(forest, filename);
+    Forest loaded = ReadForestFile(filename);
+
+    BOOST_CHECK_EQUAL(loaded.GetNumberOfTrees(), 2);
+    for(int i=0; i<loaded.GetNumberOfTrees(); i++)
+    {
+        const Tree& loadedTree = loaded.mTrees[i];
+        BOOST_CHECK(loadedTree.GetPath() == path);
+        BOOST_CHECK(loadedTree.GetIntFeatureParams() == int_params);
+        BOOST_CHECK(loadedTree.GetFloatFeatureParams() == float_params);
+        BOOST_CHECK(loadedTree.GetDepths() == depth);
+        BOOST_CHECK(loadedTree.GetCounts() == counts);
+        BOOST_CHECK(loadedTree.GetYs() == ys);
+        BOOST_CHECK(loadedTree.GetYs().IsView());
+    }
+
+    const BufferCollection& extraInfo = loaded.mTrees[0].GetExtraInfo();
+    BOOST_CHECK(extraInfo.GetBuffer< VectorBufferTemplate<double> >("Timing") == timing);
+    BOOST_CHECK_EQUAL(extraInfo.GetBuffer< Tensor3BufferTemplate<long long> >("Tensor").GetL(), 2);
+    BOOST_CHECK(!loaded.mTrees[1].GetExtraInfo().HasBuffer("Timing"));
+}
+
+BOOST_AUTO_TEST_CASE(test_WriteForestFile_skips_unstored_extra_info)
+{
+    Forest forest;
+    Tree tree(path, int_params, float_params, depth, counts, ys);
+    tree.GetExtraInfo().AddBuffer("Sparse", SparseMatrixBufferTemplate<float>(2, 2));
+    tree.GetExtraInfo().AddBuffer("Unstored", VectorBufferTemplate<unsigned char>(4));
+    tree.GetExtraInfo().AddBuffer("Timing", VectorBufferTemplate<double>(3));
+    forest.AddTree(tree);
+    forest.AddTree(Tree(path, int_params, float_params, depth, counts, ys));
+
+    // Only the records that were written are counted, so the next tree is
+    // not read as extra info
+    WriteForestFile(forest, filename);
+    Forest loaded = ReadForestFile(filename);
+
+    BOOST_CHECK_EQUAL(loaded.GetNumberOfTrees(), 2);
+    const BufferCollection& extraInfo = loaded.mTrees[0].GetExtraInfo();
+    BOOST_CHECK(extraInfo.HasBuffer< VectorBufferTemplate<double> >("Timing"));
+    BOOST_CHECK(!extraInfo.HasBuffer("Sparse"));
+    BOOST_CHECK(!extraInfo.HasBuffer("Unstored"));
+    BOOST_CHECK(loaded.mTrees[1].GetPath() == path);
+    BOOST_CHECK(loaded.mTrees[1].GetYs() == ys);
+}
+
+BOOST_AUTO_TEST_CASE(test_ReadForestFile_tree_outlives_forest)
+{
+    Forest forest;
+    forest.AddTree(Tree(path, int_params, float_params, depth, counts, ys));
+    WriteForestFile(forest, filename);
+
+    Tree tree;
+    {
+        Forest loaded = ReadForestFile(filename);
+        tree = loaded.GetTree(0);
+    }
+    BOOST_CHECK(tree.GetFloatFeatureParams() == float_params);
+
+    tree.GetCounts().Set(0, 7);
+    BOOST_CHECK(!tree.GetCounts().IsView());
+    BOOST_CHECK_EQUAL(ReadForestFile(filename).GetTree(0).GetCounts().Get(0), 5);
+}
+
+BOOST_AUTO_TEST_CASE(test_ReadForestFile_compiled_tree_wraps_file)
+{
+    Forest forest;
+    forest.AddTree(Tree(path, int_params, float_params, depth, counts, ys));
+    WriteForestFile(forest, filename);
+
+    Tree tree = ReadForestFile(filename).GetTree(0);
+    CompiledTree compiledTree(tree);
+    CompiledTree expectedCompiledTree(Tree(path, int_params, float_params, depth, counts, ys));
+    BOOST_CHECK(compiledTree.IsView());
+    BOOST_CHECK(!expectedCompiledTree.IsView());
+    BOOST_CHECK_EQUAL(compiledTree.GetNumberOfNodes(), expectedCompiledTree.GetNumberOfNodes());
+    for(int i=0; i<compiledTree.GetNumberOfNodes(); i++)
+    {
+        BOOST_CHECK_EQUAL(compiledTree.GetNodes()[i].mNodeId, expectedCompiledTree.GetNodes()[i].mNodeId);
+        BOOST_CHECK_EQUAL(compiledTree.GetNodes()[i].mLeftChild, expectedCompiledTree.GetNodes()[i].mLeftChild);
+        BOOST_CHECK_EQUAL(compiledTree.GetNodes()[i].mSplitpoint, expectedCompiledTree.GetNodes()[i].mSplitpoint);
+    }
+    BOOST_CHECK(compiledTree.GetFloatFeatureParams() == expectedCompiledTree.GetFloatFeatureParams());
+
+    // The stored layout is stale once the tree is written to
+    tree.GetFloatFeatureParams().Set(0, 0, 9.0f);
+    CompiledTree recompiledTree(tree);
+    BOOST_CHECK(!recompiledTree.IsView());
+    BOOST_CHECK_EQUAL(recompiledTree.GetNodes()[0].mSplitpoint, 9.0f);
+}
+
+BOOST_AUTO_TEST_CASE(test_ReadForestFile_bad_magic)
+{
+    std::ofstream out(filename.c_str(), std::ios::out | std::ios::binary);
+    out << "not a forest file at all";
+    out.close();
+    BOOST_CHECK_THROW(ReadForestFile(filename), std::runtime_error);
+}
+
+BOOST_AUTO_TEST_SUITE_END()
@@ -46,7 +46,7 @@ private:
                       MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams,
                       boost::mt19937& gen ) const;
 
-    const BufferId mNumberOfFeaturesBufferId;
+    const BufferKey mNumberOfFeaturesBufferId;
     const typename BufferTypes::ParamsContinuous mUx;
     const typename BufferTypes::ParamsContinuous mUy;
     const typename BufferTypes::ParamsContinuous mVx;
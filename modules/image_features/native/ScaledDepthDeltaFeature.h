@@ -54,12 +54,12 @@ public:
     typedef typename BufferTypes::Index Int;
     typedef ScaledDepthDeltaFeatureBinding<BufferTypes> FeatureBinding;
 
-    const BufferId mFloatParamsBufferId;
-    const BufferId mIntParamsBufferId;
-    const BufferId mIndicesBufferId;
-    const BufferId mPixelIndicesBufferId;
-    const BufferId mScalesBufferId;
-    const BufferId mDepthsImgsBufferId;
+    const BufferKey mFloatParamsBufferId;
+    const BufferKey mIntParamsBufferId;
+    const BufferKey mIndicesBufferId;
+    const BufferKey mPixelIndicesBufferId;
+    const BufferKey mScalesBufferId;
+    const BufferKey mDepthsImgsBufferId;
 };
 
 template <class BufferTypes>
@@ -123,7 +123,7 @@ ScaledDepthDeltaFeatureBinding<BufferTypes> ScaledDepthDeltaFeature<BufferTypes>
         readCollection.GetBufferPtr< Tensor3BufferTemplate<typename BufferTypes::SourceContinuous> >(mDepthsImgsBufferId);
     
     MatrixBufferTemplate<typename BufferTypes::SourceContinuous> const* scales = NULL;
-    if( mScalesBufferId != NullKey )
+    if( mScalesBufferId.GetName() != NullKey )
     {
         scales = readCollection.GetBufferPtr< MatrixBufferTemplate<typename BufferTypes::SourceContinuous> >(mScalesBufferId);
     }
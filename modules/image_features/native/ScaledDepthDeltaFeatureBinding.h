@@ -30,6 +30,7 @@ public:
     ScaledDepthDeltaFeatureBinding & operator=(const ScaledDepthDeltaFeatureBinding & other);
 
     typename BufferTypes::FeatureValue FeatureValue( const int featureIndex, const int relativeSampleIndex) const;
+    void FeatureValues( const int featureIndex, typename BufferTypes::FeatureValue* featureValues) const;
 
     typename BufferTypes::Index GetNumberOfFeatures() const;
     typename BufferTypes::Index GetNumberOfDatapoints() const;
@@ -118,6 +119,31 @@ typename BufferTypes::FeatureValue ScaledDepthDeltaFeatureBinding<BufferTypes>::
     return featureValue;
 }
 
+// Writes the feature for every datapoint with the offsets read once
+template <class BufferTypes>
+void ScaledDepthDeltaFeatureBinding<BufferTypes>::FeatureValues( const int featureIndex, typename BufferTypes::FeatureValue* featureValues) const
+{
+    const typename BufferTypes::ParamsContinuous um = mFloatParams->Get(featureIndex,FEATURE_SPECIFIC_PARAMS_START);
+    const typename BufferTypes::ParamsContinuous un = mFloatParams->Get(featureIndex,FEATURE_SPECIFIC_PARAMS_START+1);
+    const typename BufferTypes::ParamsContinuous vm = mFloatParams->Get(featureIndex,FEATURE_SPECIFIC_PARAMS_START+2);
+    const typename BufferTypes::ParamsContinuous vn = mFloatParams->Get(featureIndex,FEATURE_SPECIFIC_PARAMS_START+3);
+
+    const typename BufferTypes::Index numberOfDatapoints = mIndices->GetN();
+    const typename BufferTypes::Index* indices = mIndices->GetDataPtrUnsafe();
+    for(int s=0; s<numberOfDatapoints; s++)
+    {
+        const typename BufferTypes::Index index = indices[s];
+        const typename BufferTypes::Index* pixel = mPixelIndices->GetRowPtrUnsafe(index);
+
+        const typename BufferTypes::SourceContinuous scaleM = 
+            (mScales != NULL) ? mScales->Get(index, 0) : typename BufferTypes::SourceContinuous(1.0);
+        const typename BufferTypes::SourceContinuous scaleN = 
+            (mScales != NULL) ? mScales->Get(index, 1) : typename BufferTypes::SourceContinuous(1.0);
+
+        featureValues[s] = PixelDepthDelta<BufferTypes>(*mDepthImgs, pixel[0], pixel[1], pixel[2], um*scaleM, un*scaleN, vm*scaleM, vn*scaleN);
+    }
+}
+
 template <class BufferTypes>
 typename BufferTypes::Index ScaledDepthDeltaFeatureBinding<BufferTypes>::GetNumberOfFeatures() const
 {
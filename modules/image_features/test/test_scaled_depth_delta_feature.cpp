@@ -132,5 +132,31 @@ BOOST_AUTO_TEST_CASE(test_FeatureValue_scales)
     BOOST_CHECK_CLOSE(featureBinding.FeatureValue(1, 3), 3.0, 0.1);
 }
 
+BOOST_AUTO_TEST_CASE(test_FeatureValues)
+{
+    float scales_data[] = {0.5, 2.0,
+                          0.5, 2.0,
+                          0.5, 2.0,
+                          0.5, 2.0};
+    collection.AddBuffer(scales_key, MatrixBufferTemplate<float>(&scales_data[0], 4, 2));
+    float float_params_data[] = {0.0, -0.5, 0.0, 2.0, 0.0,
+                                 0.0, 2.0, 1.0, -2.0, -1.0};
+    collection.AddBuffer(float_params_key, MatrixBufferTemplate<float>(&float_params_data[0], 2, 5));    
+
+    ScaledDepthDeltaFeature_t feature(  float_params_key, int_params_key,
+                                        indices_key, pixel_indices_key,
+                                        depth_imgs_key, scales_key);
+    ScaledDepthDeltaFeatureBinding_t featureBinding = feature.Bind(stack);
+
+    float featureValues[4];
+    for(int f=0; f<2; f++)
+    {
+        featureBinding.FeatureValues(f, &featureValues[0]);
+        for(int s=0; s<4; s++)
+        {
+            BOOST_CHECK_EQUAL(featureValues[s], featureBinding.FeatureValue(f, s));
+        }
+    }
+}
 
 BOOST_AUTO_TEST_SUITE_END()
@@ -6,7 +6,13 @@
 
 #include <limits>
 #include <list>
-#include <queue>
+#include <vector>
+
+#if USE_BOOST_THREAD
+#include <boost/thread.hpp>
+#include <boost/shared_ptr.hpp>
+#include <boost/make_shared.hpp>
+#endif
 
 #include "VectorBuffer.h"
 #include "MatrixBuffer.h"
@@ -18,6 +24,41 @@
 #include "SplitSelectorI.h"
 #include "TreeLearnerI.h"
 #include "ActiveLeaf.h"
+#include "BufferCollectionUtils.h"
+
+// ----------------------------------------------------------------------------
+//
+// Hands out the leafs of a level to the threads that process them
+//
+// ----------------------------------------------------------------------------
+class BreadthFirstLevelQueue
+{
+public:
+    BreadthFirstLevelQueue(int numberOfLeafs)
+    : mNextLeafIndex(0)
+    , mNumberOfLeafs(numberOfLeafs)
+    {}
+
+    bool Pop(int& leafIndex)
+    {
+#if USE_BOOST_THREAD
+        boost::mutex::scoped_lock lock(mMutex);
+#endif
+        if( mNextLeafIndex >= mNumberOfLeafs )
+        {
+            return false;
+        }
+        leafIndex = mNextLeafIndex++;
+        return true;
+    }
+
+private:
+    int mNextLeafIndex;
+    const int mNumberOfLeafs;
+#if USE_BOOST_THREAD
+    boost::mutex mMutex;
+#endif
+};
 
 template <class BufferTypes>
 class BreadthFirstTreeLearner: public TreeLearnerI
@@ -39,17 +80,51 @@ public:
     virtual TreeLearnerI* Clone() const;
     virtual void Learn( BufferCollectionStack stack, Tree& tree, unsigned int seed ) const;
 
+    // With learn levels the tree is grown a level at a time.  The node steps
+    // and split selection of every leaf of a level run concurrently on up to
+    // numberOfJobs threads, each leaf with its own generator and extra info,
+    // and then the leafs are split in breadth first order so the tree is the
+    // same for any number of jobs.  Without USE_BOOST_THREAD the leafs of a
+    // level are processed one after the other.  The number of jobs is only
+    // used when learning levels.
+    void SetLearnLevels( bool learnLevels );
+    bool GetLearnLevels() const;
+    void SetNumberOfJobs( int numberOfJobs );
+    int GetNumberOfJobs() const;
+
 private:
+    // A leaf of the level being learned
+    struct LevelLeaf
+    {
+        ActiveLeaf* mActiveLeaf;
+        BufferCollectionStack mStack;
+        BufferCollection mNodeData;
+        BufferCollection mExtraInfo;
+        boost::mt19937 mGen;
+        boost::shared_ptr< SplitSelectorInfo<BufferTypes> > mSelectorInfo;
+    };
+
     bool ProcessActiveLeaf( boost::mt19937& gen,
                               Tree& tree,
                               BufferCollectionStack& stack,
-                              std::queue< ActiveLeaf >& activeLeaves ) const;
+                              std::list< ActiveLeaf >& activeLeaves ) const;
+    void LearnLevels( boost::mt19937& gen,
+                      Tree& tree,
+                      BufferCollectionStack& stack ) const;
+    void ProcessLevelLeafs( std::vector<LevelLeaf>* levelLeafs,
+                            BreadthFirstLevelQueue* levelQueue ) const;
+    void SplitActiveLeaf( Tree& tree,
+                          const ActiveLeaf& activeLeaf,
+                          const SplitSelectorInfo<BufferTypes>& selectorInfo,
+                          std::list< ActiveLeaf >& activeLeaves ) const;
 
     const TrySplitCriteriaI* mTrySplitCriteria;
     const PipelineStepI* mTreeSteps;
     const PipelineStepI* mNodeSteps;
     const SplitSelectorI<BufferTypes>* mSplitSelector;
     const typename BufferTypes::Index mMaxNumberOfSplits;
+    bool mLearnLevels;
+    int mNumberOfJobs;
 };
 
 template <class BufferTypes>
@@ -62,6 +137,8 @@ BreadthFirstTreeLearner<BufferTypes>::BreadthFirstTreeLearner( const TrySplitCri
 , mNodeSteps( nodeSteps->Clone() )
 , mSplitSelector( splitSelector->Clone() )
 , mMaxNumberOfSplits( std::numeric_limits<typename BufferTypes::Index>::max() )
+, mLearnLevels(false)
+, mNumberOfJobs(1)
 {}
 
 template <class BufferTypes>
@@ -75,6 +152,8 @@ BreadthFirstTreeLearner<BufferTypes>::BreadthFirstTreeLearner( const TrySplitCri
 , mNodeSteps( nodeSteps->Clone() )
 , mSplitSelector( splitSelector->Clone() )
 , mMaxNumberOfSplits( maxNumberOfLeaves )
+, mLearnLevels(false)
+, mNumberOfJobs(1)
 {}
 
 template <class BufferTypes>
@@ -84,6 +163,8 @@ BreadthFirstTreeLearner<BufferTypes>::BreadthFirstTreeLearner(const BreadthFirst
 , mNodeSteps( other.mNodeSteps->Clone() )
 , mSplitSelector( other.mSplitSelector->Clone() )
 , mMaxNumberOfSplits( other.mMaxNumberOfSplits )
+, mLearnLevels( other.mLearnLevels )
+, mNumberOfJobs( other.mNumberOfJobs )
 {
 }
 
@@ -103,6 +184,30 @@ TreeLearnerI* BreadthFirstTreeLearner<BufferTypes>::Clone() const
     return clone;
 }
 
+template <class BufferTypes>
+void BreadthFirstTreeLearner<BufferTypes>::SetLearnLevels( bool learnLevels )
+{
+    mLearnLevels = learnLevels;
+}
+
+template <class BufferTypes>
+bool BreadthFirstTreeLearner<BufferTypes>::GetLearnLevels() const
+{
+    return mLearnLevels;
+}
+
+template <class BufferTypes>
+void BreadthFirstTreeLearner<BufferTypes>::SetNumberOfJobs( int numberOfJobs )
+{
+    ASSERT(numberOfJobs > 0)
+    mNumberOfJobs = numberOfJobs;
+}
+
+template <class BufferTypes>
+int BreadthFirstTreeLearner<BufferTypes>::GetNumberOfJobs() const
+{
+    return mNumberOfJobs;
+}
 
 template <class BufferTypes>
 void BreadthFirstTreeLearner<BufferTypes>::Learn( BufferCollectionStack stack, Tree& tree, unsigned int seed ) const
@@ -114,8 +219,14 @@ void BreadthFirstTreeLearner<BufferTypes>::Learn( BufferCollectionStack stack, T
     stack.Push(&treeData);
     mTreeSteps->ProcessStep(stack, treeData, gen, tree.GetExtraInfo(), 0);
 
-    std::queue< ActiveLeaf > activeLeaves;
-    activeLeaves.push(ActiveLeaf(0, 0));
+    if( mLearnLevels )
+    {
+        LearnLevels(gen, tree, stack);
+        return;
+    }
+
+    std::list< ActiveLeaf > activeLeaves;
+    activeLeaves.push_back(ActiveLeaf(0, 0));
 
     // FIFO breath first
     int numberOfSplits = 0;
@@ -133,7 +244,7 @@ template <class BufferTypes>
 bool BreadthFirstTreeLearner<BufferTypes>::ProcessActiveLeaf( boost::mt19937& gen,
                                                               Tree& tree,
                                                               BufferCollectionStack& stack,
-                                                              std::queue< ActiveLeaf >& activeLeaves) const
+                                                              std::list< ActiveLeaf >& activeLeaves) const
 
 {
     ActiveLeaf& activeLeaf = activeLeaves.front();
@@ -147,36 +258,120 @@ bool BreadthFirstTreeLearner<BufferTypes>::ProcessActiveLeaf( boost::mt19937& ge
     const bool ValidSplit = selectorInfo.ValidSplit(); 
     if(ValidSplit) 
     {
-        const typename BufferTypes::Index leftNodeIndex = tree.NextNodeIndex();
-        const typename BufferTypes::Index rightNodeIndex = tree.NextNodeIndex();
+        SplitActiveLeaf(tree, activeLeaf, selectorInfo, activeLeaves);
+    }
+
+    // Remove the node
+    activeLeaves.pop_front();
 
-        selectorInfo.WriteToTree( activeLeaf.mNodeIndex, leftNodeIndex, rightNodeIndex,
-                                  tree.GetCounts(), tree.GetDepths(), tree.GetFloatFeatureParams(), tree.GetIntFeatureParams(), tree.GetYs());
+    stack.Pop(); //stack.Push(activeLeaf.mSplitBufferCollection)
+    stack.Pop(); //stack.Push(&nodeData);
 
-        tree.GetPath().Set(activeLeaf.mNodeIndex, 0, leftNodeIndex);
-        tree.GetPath().Set(activeLeaf.mNodeIndex, 1, rightNodeIndex);
+    return ValidSplit;
+}
 
-        ActiveLeaf leftActiveLeaf(leftNodeIndex, activeLeaf.mDepth+1);
-        ActiveLeaf rightActiveLeaf(rightNodeIndex, activeLeaf.mDepth+1);
-        typename BufferTypes::DatapointCounts leftSize = std::numeric_limits<typename BufferTypes::DatapointCounts>::min();
-        typename BufferTypes::DatapointCounts rightSize = std::numeric_limits<typename BufferTypes::DatapointCounts>::min();
-        selectorInfo.SplitBuffers(leftActiveLeaf.mSplitBufferCollection, rightActiveLeaf.mSplitBufferCollection, leftSize, rightSize);
+template <class BufferTypes>
+void BreadthFirstTreeLearner<BufferTypes>::LearnLevels( boost::mt19937& gen,
+                                                        Tree& tree,
+                                                        BufferCollectionStack& stack ) const
+{
+    std::list< ActiveLeaf > level;
+    level.push_back(ActiveLeaf(0, 0));
+
+    int numberOfSplits = 0;
+    while(numberOfSplits < mMaxNumberOfSplits && level.size() > 0)
+    {
+        std::vector<LevelLeaf> levelLeafs(level.size());
+        typename std::vector<LevelLeaf>::iterator levelLeaf = levelLeafs.begin();
+        for(std::list< ActiveLeaf >::iterator activeLeaf = level.begin(); activeLeaf != level.end(); ++activeLeaf, ++levelLeaf)
+        {
+            levelLeaf->mActiveLeaf = &(*activeLeaf);
+            levelLeaf->mGen.seed(static_cast<unsigned int>(gen()));
+            levelLeaf->mStack = stack;
+            levelLeaf->mStack.Push(&activeLeaf->mSplitBufferCollection);
+            levelLeaf->mStack.Push(&levelLeaf->mNodeData);
+        }
 
-        if(mTrySplitCriteria->TrySplit(leftActiveLeaf.mDepth, leftSize, tree.GetExtraInfo(), leftNodeIndex, true))
+        BreadthFirstLevelQueue levelQueue(levelLeafs.size());
+#if USE_BOOST_THREAD
+        const int numberOfJobs = std::min(mNumberOfJobs, static_cast<int>(levelLeafs.size()));
+        std::vector< boost::shared_ptr< boost::thread > > threadVec;
+        for(int job=0; job<numberOfJobs; job++)
         {
-            activeLeaves.push(leftActiveLeaf);
+            threadVec.push_back( boost::make_shared<boost::thread>(&BreadthFirstTreeLearner<BufferTypes>::ProcessLevelLeafs,
+                                                                   this, &levelLeafs, &levelQueue) );
         }
-        if(mTrySplitCriteria->TrySplit(rightActiveLeaf.mDepth, rightSize, tree.GetExtraInfo(), rightNodeIndex, true))
+        for(int job=0; job<numberOfJobs; job++)
         {
-            activeLeaves.push(rightActiveLeaf);
+            threadVec[job]->join();
         }
+#else
+        ProcessLevelLeafs(&levelLeafs, &levelQueue);
+#endif
+
+        // Split in breadth first order so the node indices do not depend on
+        // the order the threads ran in
+        std::list< ActiveLeaf > nextLevel;
+        for(levelLeaf = levelLeafs.begin(); levelLeaf != levelLeafs.end(); ++levelLeaf)
+        {
+            IncrementBuffers(tree.GetExtraInfo(), levelLeaf->mExtraInfo);
+            if(numberOfSplits < mMaxNumberOfSplits && levelLeaf->mSelectorInfo->ValidSplit())
+            {
+                SplitActiveLeaf(tree, *levelLeaf->mActiveLeaf, *levelLeaf->mSelectorInfo, nextLevel);
+                numberOfSplits++;
+            }
+        }
+        levelLeafs.clear();
+        level.swap(nextLevel);
     }
+}
 
-    // Remove the node
-    activeLeaves.pop();
+template <class BufferTypes>
+void BreadthFirstTreeLearner<BufferTypes>::ProcessLevelLeafs( std::vector<LevelLeaf>* levelLeafs,
+                                                              BreadthFirstLevelQueue* levelQueue ) const
+{
+    int i = 0;
+    while( levelQueue->Pop(i) )
+    {
+        LevelLeaf& levelLeaf = (*levelLeafs)[i];
+        const ActiveLeaf& activeLeaf = *levelLeaf.mActiveLeaf;
+        mNodeSteps->ProcessStep(levelLeaf.mStack, levelLeaf.mNodeData, levelLeaf.mGen, levelLeaf.mExtraInfo, activeLeaf.mNodeIndex);
+        levelLeaf.mSelectorInfo.reset( new SplitSelectorInfo<BufferTypes>(
+                mSplitSelector->ProcessSplits(levelLeaf.mStack, activeLeaf.mDepth, levelLeaf.mExtraInfo, activeLeaf.mNodeIndex)) );
+    }
+}
 
-    stack.Pop(); //stack.Push(activeLeaf.mSplitBufferCollection)
-    stack.Pop(); //stack.Push(&nodeData);
+template <class BufferTypes>
+void BreadthFirstTreeLearner<BufferTypes>::SplitActiveLeaf( Tree& tree,
+                                                            const ActiveLeaf& activeLeaf,
+                                                            const SplitSelectorInfo<BufferTypes>& selectorInfo,
+                                                            std::list< ActiveLeaf >& activeLeaves ) const
+{
+    const typename BufferTypes::Index leftNodeIndex = tree.NextNodeIndex();
+    const typename BufferTypes::Index rightNodeIndex = tree.NextNodeIndex();
 
-    return ValidSplit;
-}
\ No newline at end of file
+    selectorInfo.WriteToTree( activeLeaf.mNodeIndex, leftNodeIndex, rightNodeIndex,
+                              tree.GetCounts(), tree.GetDepths(), tree.GetFloatFeatureParams(), tree.GetIntFeatureParams(), tree.GetYs());
+
+    tree.GetPath().Set(activeLeaf.mNodeIndex, 0, leftNodeIndex);
+    tree.GetPath().Set(activeLeaf.mNodeIndex, 1, rightNodeIndex);
+
+    // The children are split into their place in the list to avoid copying
+    // their buffers
+    const std::list< ActiveLeaf >::iterator leftActiveLeaf =
+            activeLeaves.insert(activeLeaves.end(), ActiveLeaf(leftNodeIndex, activeLeaf.mDepth+1));
+    const std::list< ActiveLeaf >::iterator rightActiveLeaf =
+            activeLeaves.insert(activeLeaves.end(), ActiveLeaf(rightNodeIndex, activeLeaf.mDepth+1));
+    typename BufferTypes::DatapointCounts leftSize = std::numeric_limits<typename BufferTypes::DatapointCounts>::min();
+    typename BufferTypes::DatapointCounts rightSize = std::numeric_limits<typename BufferTypes::DatapointCounts>::min();
+    selectorInfo.SplitBuffers(leftActiveLeaf->mSplitBufferCollection, rightActiveLeaf->mSplitBufferCollection, leftSize, rightSize);
+
+    if(!mTrySplitCriteria->TrySplit(leftActiveLeaf->mDepth, leftSize, tree.GetExtraInfo(), leftNodeIndex, true))
+    {
+        activeLeaves.erase(leftActiveLeaf);
+    }
+    if(!mTrySplitCriteria->TrySplit(rightActiveLeaf->mDepth, rightSize, tree.GetExtraInfo(), rightNodeIndex, true))
+    {
+        activeLeaves.erase(rightActiveLeaf);
+    }
+}
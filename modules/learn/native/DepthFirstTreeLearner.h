@@ -5,6 +5,10 @@
 
 #include <limits>
 
+#if USE_BOOST_THREAD
+#include <boost/thread.hpp>
+#endif
+
 #include "VectorBuffer.h"
 #include "MatrixBuffer.h"
 #include "Tensor3Buffer.h"
@@ -14,6 +18,51 @@
 #include "PipelineStepI.h"
 #include "SplitSelectorI.h"
 #include "TreeLearnerI.h"
+#include "BufferCollectionUtils.h"
+
+// ----------------------------------------------------------------------------
+//
+// Counts how many more threads a single Learn call may start.  Shared by all
+// the subtree tasks of one tree.
+//
+// ----------------------------------------------------------------------------
+class DepthFirstJobs
+{
+public:
+    DepthFirstJobs(int numberOfJobs)
+    : mNumberOfIdleJobs(numberOfJobs-1)
+    {}
+
+    bool TryAcquire()
+    {
+#if USE_BOOST_THREAD
+        boost::mutex::scoped_lock lock(mMutex);
+#endif
+        if( mNumberOfIdleJobs <= 0 )
+        {
+            return false;
+        }
+        mNumberOfIdleJobs--;
+        return true;
+    }
+
+    void Release()
+    {
+#if USE_BOOST_THREAD
+        boost::mutex::scoped_lock lock(mMutex);
+#endif
+        mNumberOfIdleJobs++;
+    }
+
+private:
+    int mNumberOfIdleJobs;
+#if USE_BOOST_THREAD
+    boost::mutex mMutex;
+#endif
+};
+
+template <class BufferTypes>
+class DepthFirstSubtreeTask;
 
 
 template <class BufferTypes>
@@ -31,18 +80,79 @@ public:
     virtual TreeLearnerI* Clone() const;
     virtual void Learn( BufferCollectionStack stack, Tree& tree, unsigned int seed ) const;
 
+    // With more than one job, sibling subtrees are learned concurrently on up
+    // to numberOfJobs threads per tree.  Each subtree task has its own
+    // generator and extra info (merged into the tree when the task ends) so
+    // the node ids depend on thread timing.  Ignored without USE_BOOST_THREAD.
+    void SetNumberOfJobs( int numberOfJobs );
+    int GetNumberOfJobs() const;
+
 private:
+    friend class DepthFirstSubtreeTask<BufferTypes>;
+
     void ProcessNode( boost::mt19937& gen,
                       Tree& tree,
                       BufferCollectionStack& stack,
                       typename BufferTypes::Index nodeIndex,
                       typename BufferTypes::Index depth,
-                      typename BufferTypes::DatapointCounts nodeSize ) const;
+                      typename BufferTypes::DatapointCounts nodeSize,
+                      BufferCollection& extraInfo,
+                      DepthFirstJobs& jobs ) const;
 
     const TrySplitCriteriaI* mTrySplitCriteria;
     const PipelineStepI* mTreeSteps;
     const PipelineStepI* mNodeSteps;
     const SplitSelectorI<BufferTypes>* mSplitSelector;
+    int mNumberOfJobs;
+};
+
+// ----------------------------------------------------------------------------
+//
+// Learns the subtree below one node on its own thread.
+//
+// ----------------------------------------------------------------------------
+template <class BufferTypes>
+class DepthFirstSubtreeTask
+{
+public:
+    DepthFirstSubtreeTask( const DepthFirstTreeLearner<BufferTypes>* learner,
+                           unsigned int seed,
+                           Tree* tree,
+                           const BufferCollectionStack& stack,
+                           typename BufferTypes::Index nodeIndex,
+                           typename BufferTypes::Index depth,
+                           typename BufferTypes::DatapointCounts nodeSize,
+                           BufferCollection* extraInfo,
+                           DepthFirstJobs* jobs )
+    : mLearner(learner)
+    , mSeed(seed)
+    , mTree(tree)
+    , mStack(stack)
+    , mNodeIndex(nodeIndex)
+    , mDepth(depth)
+    , mNodeSize(nodeSize)
+    , mExtraInfo(extraInfo)
+    , mJobs(jobs)
+    {}
+
+    void operator()()
+    {
+        boost::mt19937 gen;
+        gen.seed(mSeed);
+        mLearner->ProcessNode(gen, *mTree, mStack, mNodeIndex, mDepth, mNodeSize, *mExtraInfo, *mJobs);
+        mJobs->Release();
+    }
+
+private:
+    const DepthFirstTreeLearner<BufferTypes>* mLearner;
+    unsigned int mSeed;
+    Tree* mTree;
+    BufferCollectionStack mStack;
+    typename BufferTypes::Index mNodeIndex;
+    typename BufferTypes::Index mDepth;
+    typename BufferTypes::DatapointCounts mNodeSize;
+    BufferCollection* mExtraInfo;
+    DepthFirstJobs* mJobs;
 };
 
 template <class BufferTypes>
@@ -54,6 +164,7 @@ DepthFirstTreeLearner<BufferTypes>::DepthFirstTreeLearner( const TrySplitCriteri
 , mTreeSteps( treeSteps->Clone() )
 , mNodeSteps( nodeSteps->Clone() )
 , mSplitSelector( splitSelector->Clone() )
+, mNumberOfJobs(1)
 {}
 
 template <class BufferTypes>
@@ -62,6 +173,7 @@ DepthFirstTreeLearner<BufferTypes>::DepthFirstTreeLearner(const DepthFirstTreeLe
 , mTreeSteps( other.mTreeSteps->Clone() )
 , mNodeSteps( other.mNodeSteps->Clone() )
 , mSplitSelector( other.mSplitSelector->Clone() )
+, mNumberOfJobs( other.mNumberOfJobs )
 {
 }
 
@@ -81,6 +193,17 @@ TreeLearnerI* DepthFirstTreeLearner<BufferTypes>::Clone() const
     return clone;
 }
 
+template <class BufferTypes>
+void DepthFirstTreeLearner<BufferTypes>::SetNumberOfJobs( int numberOfJobs )
+{
+    mNumberOfJobs = numberOfJobs;
+}
+
+template <class BufferTypes>
+int DepthFirstTreeLearner<BufferTypes>::GetNumberOfJobs() const
+{
+    return mNumberOfJobs;
+}
 
 template <class BufferTypes>
 void DepthFirstTreeLearner<BufferTypes>::Learn( BufferCollectionStack stack, Tree& tree, unsigned int seed ) const
@@ -96,7 +219,8 @@ void DepthFirstTreeLearner<BufferTypes>::Learn( BufferCollectionStack stack, Tre
     //can be popped before adding the next layer down
     BufferCollection emptyIndicesCollection;
     stack.Push(&emptyIndicesCollection);
-    ProcessNode(gen, tree, stack, 0, 0, std::numeric_limits<typename BufferTypes::DatapointCounts>::max());
+    DepthFirstJobs jobs(mNumberOfJobs);
+    ProcessNode(gen, tree, stack, 0, 0, std::numeric_limits<typename BufferTypes::DatapointCounts>::max(), tree.GetExtraInfo(), jobs);
 }
 
 template <class BufferTypes>
@@ -104,9 +228,11 @@ void DepthFirstTreeLearner<BufferTypes>::ProcessNode( boost::mt19937& gen,
                                                               Tree& tree, BufferCollectionStack& stack,
                                                               typename BufferTypes::Index nodeIndex,
                                                               typename BufferTypes::Index depth,
-                                                              typename BufferTypes::DatapointCounts nodeSize ) const
+                                                              typename BufferTypes::DatapointCounts nodeSize,
+                                                              BufferCollection& extraInfo,
+                                                              DepthFirstJobs& jobs ) const
 {
-    if(mTrySplitCriteria->TrySplit(depth, nodeSize, tree.GetExtraInfo(), nodeIndex, true))
+    if(mTrySplitCriteria->TrySplit(depth, nodeSize, extraInfo, nodeIndex, true))
     {
 
         bool doSplit = false;
@@ -121,19 +247,25 @@ void DepthFirstTreeLearner<BufferTypes>::ProcessNode( boost::mt19937& gen,
         {
             BufferCollection nodeData;
             stack.Push(&nodeData);
-            mNodeSteps->ProcessStep(stack, nodeData, gen, tree.GetExtraInfo(), nodeIndex);
-            SplitSelectorInfo<BufferTypes> selectorInfo = mSplitSelector->ProcessSplits(stack, depth, tree.GetExtraInfo(), nodeIndex);
+            mNodeSteps->ProcessStep(stack, nodeData, gen, extraInfo, nodeIndex);
+            SplitSelectorInfo<BufferTypes> selectorInfo = mSplitSelector->ProcessSplits(stack, depth, extraInfo, nodeIndex);
             doSplit = selectorInfo.ValidSplit();
             if(doSplit)
             {
-                leftNodeIndex = tree.NextNodeIndex();
-                rightNodeIndex = tree.NextNodeIndex();
+                {
+#if USE_BOOST_THREAD
+                    // Other subtree tasks may be growing the tree
+                    boost::recursive_mutex::scoped_lock lock(tree.GetMutex());
+#endif
+                    leftNodeIndex = tree.NextNodeIndex();
+                    rightNodeIndex = tree.NextNodeIndex();
 
-                selectorInfo.WriteToTree( nodeIndex, leftNodeIndex, rightNodeIndex,
-                                          tree.GetCounts(), tree.GetDepths(), tree.GetFloatFeatureParams(), tree.GetIntFeatureParams(), tree.GetYs());
+                    selectorInfo.WriteToTree( nodeIndex, leftNodeIndex, rightNodeIndex,
+                                              tree.GetCounts(), tree.GetDepths(), tree.GetFloatFeatureParams(), tree.GetIntFeatureParams(), tree.GetYs());
 
-                tree.GetPath().Set(nodeIndex, 0, leftNodeIndex);
-                tree.GetPath().Set(nodeIndex, 1, rightNodeIndex);
+                    tree.GetPath().Set(nodeIndex, 0, leftNodeIndex);
+                    tree.GetPath().Set(nodeIndex, 1, rightNodeIndex);
+                }
 
                 selectorInfo.SplitBuffers(leftIndicesBufCol, rightIndicesBufCol, leftSize, rightSize);
             }
@@ -144,13 +276,34 @@ void DepthFirstTreeLearner<BufferTypes>::ProcessNode( boost::mt19937& gen,
         {
             stack.Pop(); //stack.Push(&emptyIndicesCollection); or stack.Push(&leftIndicesBufCol); or stack.Push(&rightIndicesBufCol);
 
+#if USE_BOOST_THREAD
+            if( jobs.TryAcquire() )
+            {
+                // Learn the left subtree on another thread while this one
+                // learns the right subtree
+                BufferCollectionStack leftStack = stack;
+                leftStack.Push(&leftIndicesBufCol);
+                BufferCollection leftExtraInfo;
+                const unsigned int leftSeed = gen();
+                DepthFirstSubtreeTask<BufferTypes> leftTask(this, leftSeed, &tree, leftStack,
+                                                            leftNodeIndex, depth+1, leftSize, &leftExtraInfo, &jobs);
+                boost::thread leftThread(leftTask);
+
+                stack.Push(&rightIndicesBufCol);
+                ProcessNode(gen, tree, stack, rightNodeIndex, depth+1, rightSize, extraInfo, jobs);
+
+                leftThread.join();
+                IncrementBuffers(extraInfo, leftExtraInfo);
+                return;
+            }
+#endif
             stack.Push(&leftIndicesBufCol);
-            ProcessNode(gen, tree, stack, leftNodeIndex, depth+1, leftSize);
+            ProcessNode(gen, tree, stack, leftNodeIndex, depth+1, leftSize, extraInfo, jobs);
 
             stack.Pop(); //stack.Push(&emptyIndicesCollection); or stack.Push(&leftIndicesBufCol); or stack.Push(&rightIndicesBufCol);
 
             stack.Push(&rightIndicesBufCol);
-            ProcessNode(gen, tree, stack, rightNodeIndex, depth+1, rightSize);
+            ProcessNode(gen, tree, stack, rightNodeIndex, depth+1, rightSize, extraInfo, jobs);
         }
     }
 }
\ No newline at end of file
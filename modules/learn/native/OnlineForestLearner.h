@@ -1,11 +1,13 @@
 #pragma once
 
 #include <set>
+#include <algorithm>
 #include <utility>
 #include <vector>
 #include <limits>
 #include <ctime>
 
+#include <asserts.h>
 #include <VectorBuffer.h>
 #include <MatrixBuffer.h>
 #include <Tensor3Buffer.h>
@@ -20,6 +22,12 @@
 #include "ActiveLeaf.h"
 #include "ProbabilityOfErrorFrontierQueue.h"
 
+#if USE_BOOST_THREAD
+#include <boost/thread.hpp>
+#include <boost/shared_ptr.hpp>
+#include <boost/make_shared.hpp>
+#endif
+
 
 // ----------------------------------------------------------------------------
 //
@@ -52,11 +60,43 @@ public:
     Forest Learn(const BufferCollection& data);
     Forest GetForest() const;
 
+    // Number of samples routed through a tree before the stats of its
+    // active leafs are updated
+    void SetBatchSize(int batchSize);
+
+    // Number of threads that route a batch through the trees, each thread
+    // updates its own trees.  Use with a batch size larger than one since the
+    // threads are joined after every batch.
+    void SetNumberOfJobs(int numberOfJobs);
+
 private:
     OnlineForestLearner(const OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError,BufferTypes>& rhs);
     OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError,BufferTypes> & operator= 
                       (const OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError,BufferTypes> & other);
 
+    // Everything a tree reads and writes while a batch is routed through it
+    struct TreeLearnState
+    {
+        BufferCollectionStack mStack;
+        BufferCollection mBc;
+        VectorBufferTemplate<typename BufferTypes::Index>* mIndices;
+        VectorBufferTemplate<typename BufferTypes::SourceContinuous> const* mWeights;
+        typename Feature::FeatureBinding mFeatureBinding;
+        typename EstimatorUpdater::BindedEstimatorUpdater mEstimatorUpdaterBinding;
+        boost::mt19937 mGen;
+        // Nodes split during the batch, they are still in mActiveFrontierLeaves
+        std::vector<int> mSplitNodeIndices;
+        // (node, sample) of the samples that reached an active leaf, kept
+        // between batches so it does not allocate
+        std::vector< std::pair<int, typename BufferTypes::Index> > mLeafSamples;
+    };
+
+    void LearnTrees( std::vector<TreeLearnState>* treeStates,
+                     int firstTreeIndex, int treeIndexStep,
+                     int batchStart, int batchEnd );
+    void LearnTree( int treeIndex, TreeLearnState& state, int batchStart, int batchEnd );
+    void ProcessTreeSplits( int treeIndex, TreeLearnState& state );
+    ActiveOnlineLeaf* FindActiveLeaf( int treeIndex, int nodeIndex );
     void UpdateActiveFrontier();
 
     const TrySplitCriteriaI* mTrySplitCriteria;
@@ -68,13 +108,22 @@ private:
     const SplitSelectorI<BufferTypes>* mSplitSelector;
 
     const int mMaxFrontierSize;
+    int mBatchSize;
+    int mNumberOfJobs;
+
+    // Seeded once so calls to Learn with consecutive chunks of a stream draw
+    // different samples
+    boost::mt19937 mGen;
 
     Forest mForest;
     ProbabilityOfErrorFrontierQueue<ProbabilityOfError> mFrontierQueue;
-    std::map< std::pair<int, int>, ActiveOnlineLeaf > mActiveFrontierLeaves;
+    // Leafs of each tree indexed by node, a leaf is active when it has node
+    // data.  A tree only touches its own leafs while it learns a batch.
+    std::vector< std::vector<ActiveOnlineLeaf> > mActiveFrontierLeaves;
+    int mNumberOfActiveFrontierLeaves;
 
-    const BufferId mIndicesBufferId;
-    const BufferId mWeightsBufferId;
+    const BufferKey mIndicesBufferId;
+    const BufferKey mWeightsBufferId;
 
     const Feature mPredictFeature;
     const EstimatorUpdater mEstimatorUpdater;
@@ -106,9 +155,13 @@ OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
 , mImpurityUpdatePeriod(impurityUpdatePeriod)
 , mSplitSelector( splitSelector->Clone() )
 , mMaxFrontierSize(maxFrontierSize)
+, mBatchSize(1)
+, mNumberOfJobs(1)
+, mGen( static_cast<unsigned int>(std::time(NULL)) )
 , mForest( numberOfTrees, 1, maxIntParamsDim, maxFloatParamsDim, maxEstimatorDim )
 , mFrontierQueue(numberOfTrees)
-, mActiveFrontierLeaves()
+, mActiveFrontierLeaves(numberOfTrees)
+, mNumberOfActiveFrontierLeaves(0)
 , mIndicesBufferId(indicesBufferId)
 , mWeightsBufferId(weightsBufferId)
 , mPredictFeature(predictFeature)
@@ -121,11 +174,13 @@ template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class
 OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
 ::~OnlineForestLearner()
 {
-    typedef std::map< std::pair<int, int>, ActiveOnlineLeaf >::iterator it_type;
-    for(it_type iterator = mActiveFrontierLeaves.begin(); iterator != mActiveFrontierLeaves.end(); ++iterator)
+    for(size_t treeIndex=0; treeIndex<mActiveFrontierLeaves.size(); treeIndex++)
     {
-        delete iterator->second.mNodeData;
-        iterator->second.mNodeData = NULL;
+        for(size_t nodeIndex=0; nodeIndex<mActiveFrontierLeaves[treeIndex].size(); nodeIndex++)
+        {
+            delete mActiveFrontierLeaves[treeIndex][nodeIndex].mNodeData;
+            mActiveFrontierLeaves[treeIndex][nodeIndex].mNodeData = NULL;
+        }
     }
 }
 
@@ -133,123 +188,214 @@ template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class
 Forest OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
 ::Learn( const BufferCollection& data )
 {
-    boost::mt19937 gen;
-    gen.seed( static_cast<unsigned int>(std::time(NULL)) );
-
     const int numberOfTrees = mForest.mTrees.size();
 
-    std::vector<BufferCollectionStack> forestStacks(numberOfTrees);
-    std::vector<BufferCollection> forestBcs(numberOfTrees);
-    std::vector< VectorBufferTemplate<typename BufferTypes::Index>* > forestIndices(numberOfTrees);
-    std::vector< VectorBufferTemplate<typename BufferTypes::SourceContinuous> const* > forestWeights(numberOfTrees);
-    std::vector<typename Feature::FeatureBinding> featureBindings(numberOfTrees);
-    std::vector<typename EstimatorUpdater::BindedEstimatorUpdater> estimatorUpdaterBindings(numberOfTrees);
+    // Each tree has its own generator so the trees do not depend on the
+    // order the threads run in
+    std::vector<TreeLearnState> treeStates(numberOfTrees);
     for(int treeIndex=0; treeIndex<numberOfTrees; treeIndex++)
     {
         Tree& tree = mForest.mTrees[treeIndex];
-        BufferCollectionStack& treeStack = forestStacks[treeIndex];
+        TreeLearnState& state = treeStates[treeIndex];
+        state.mGen.seed(static_cast<unsigned int>(mGen()));
+        BufferCollectionStack& treeStack = state.mStack;
         treeStack.Push(&data);
-        BufferCollection& treeBc = forestBcs[treeIndex];
+        BufferCollection& treeBc = state.mBc;
         treeStack.Push(&treeBc);
-        mTreeSteps->ProcessStep(treeStack, treeBc, gen, tree.GetExtraInfo(), 0);
-        forestIndices[treeIndex] = treeBc.GetBufferPtr< VectorBufferTemplate<typename BufferTypes::Index> >(mIndicesBufferId);
-        forestWeights[treeIndex] = treeStack.GetBufferPtr< VectorBufferTemplate<typename BufferTypes::SourceContinuous> >(mWeightsBufferId);
+        mTreeSteps->ProcessStep(treeStack, treeBc, state.mGen, tree.GetExtraInfo(), 0);
+        state.mIndices = treeBc.GetBufferPtr< VectorBufferTemplate<typename BufferTypes::Index> >(mIndicesBufferId);
+        state.mWeights = treeStack.GetBufferPtr< VectorBufferTemplate<typename BufferTypes::SourceContinuous> >(mWeightsBufferId);
         treeBc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mPredictFeature.mFloatParamsBufferId, tree.GetFloatFeatureParams());
         treeBc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mPredictFeature.mIntParamsBufferId, tree.GetIntFeatureParams());
-        featureBindings[treeIndex] = mPredictFeature.Bind(treeStack);
-        estimatorUpdaterBindings[treeIndex] = mEstimatorUpdater.Bind(treeStack);
+        state.mFeatureBinding = mPredictFeature.Bind(treeStack);
+        state.mEstimatorUpdaterBinding = mEstimatorUpdater.Bind(treeStack);
     }
 
-    const int numberOfSamples = forestWeights[0]->GetN();
-
-    for(int sampleIndex=0; sampleIndex<numberOfSamples; sampleIndex++)
+    const int numberOfSamples = treeStates[0].mWeights->GetN();
+
+    // Each batch is routed through a tree before the stats of the active
+    // leafs are updated, once per leaf with all the samples that reached it.
+    // A batch of one is the same as learning one sample at a time.
+    //
+    // The trees only share the frontier.  While a batch is learned a tree
+    // only updates its own leafs and datapoint count, the nodes it splits are
+    // removed from the frontier and their children queued once every tree
+    // is done with the batch.  This is the same for any number of jobs.
+    for(int batchStart=0; batchStart<numberOfSamples; batchStart+=mBatchSize)
     {
+        const int batchEnd = std::min(batchStart + mBatchSize, numberOfSamples);
+
+#if USE_BOOST_THREAD
+        const int numberOfJobs = std::min(mNumberOfJobs, numberOfTrees);
+        std::vector< boost::shared_ptr< boost::thread > > threadVec;
+        for(int job=0; job<numberOfJobs; job++)
+        {
+            threadVec.push_back( boost::make_shared<boost::thread>(&OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>::LearnTrees,
+                                                                   this, &treeStates, job, numberOfJobs, batchStart, batchEnd) );
+        }
+        for(int job=0; job<numberOfJobs; job++)
+        {
+            threadVec[job]->join();
+        }
+#else
+        LearnTrees(&treeStates, 0, 1, batchStart, batchEnd);
+#endif
+
         for(int treeIndex=0; treeIndex<numberOfTrees; treeIndex++)
         {
-            Tree& tree = mForest.mTrees[treeIndex];
-            BufferCollectionStack& stack = forestStacks[treeIndex];
+            ProcessTreeSplits(treeIndex, treeStates[treeIndex]);
+        }
+
+        // Update the frontier priority queue
+        UpdateActiveFrontier();
+    }
+    return mForest;
+}
+
+template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
+void OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
+::LearnTrees( std::vector<TreeLearnState>* treeStates,
+              int firstTreeIndex, int treeIndexStep,
+              int batchStart, int batchEnd )
+{
+    for(int treeIndex=firstTreeIndex; treeIndex<static_cast<int>(treeStates->size()); treeIndex+=treeIndexStep)
+    {
+        LearnTree(treeIndex, (*treeStates)[treeIndex], batchStart, batchEnd);
+    }
+}
+
+template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
+void OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
+::LearnTree( int treeIndex, TreeLearnState& state, int batchStart, int batchEnd )
+{
+    Tree& tree = mForest.mTrees[treeIndex];
+    BufferCollectionStack& stack = state.mStack;
+    VectorBufferTemplate<typename BufferTypes::Index>* indices = state.mIndices;
+    const VectorBufferTemplate<typename BufferTypes::SourceContinuous>* weights = state.mWeights;
+
+    indices->Resize(batchEnd - batchStart);
+    for(int sampleIndex=batchStart; sampleIndex<batchEnd; sampleIndex++)
+    {
+        indices->Set(sampleIndex - batchStart, sampleIndex);
+    }
+
+    std::vector< std::pair<int, typename BufferTypes::Index> >& leafSamples = state.mLeafSamples;
+    leafSamples.clear();
+    for(int sampleIndex=batchStart; sampleIndex<batchEnd; sampleIndex++)
+    {
+        const typename BufferTypes::SourceContinuous sampleWeight = weights->Get(sampleIndex);
+
+        if(sampleWeight <= typename BufferTypes::SourceContinuous(0)) continue;
+
+        mFrontierQueue.IncrDatapoints(treeIndex, static_cast<long long>(sampleWeight));
+
+        const int nodeIndex = walkTree<typename Feature::FeatureBinding, BufferTypes>(
+                                         state.mFeatureBinding, tree, 0, sampleIndex - batchStart );
+
+        state.mEstimatorUpdaterBinding.UpdateEstimator(tree, nodeIndex, sampleIndex);
+        tree.GetCounts().Incr(nodeIndex, sampleWeight);
+        mFrontierQueue.NodeChanged(treeIndex, nodeIndex);
+
+        if( FindActiveLeaf(treeIndex, nodeIndex) != NULL )
+        {
+            leafSamples.push_back(std::make_pair(nodeIndex, static_cast<typename BufferTypes::Index>(sampleIndex)));
+        }
+    }
 
-            VectorBufferTemplate<typename BufferTypes::Index>* indices = forestIndices[treeIndex];
-            indices->Resize(1);
-            indices->Set(0, sampleIndex);
+    // Group the samples by leaf, the samples of a leaf stay in order
+    std::sort(leafSamples.begin(), leafSamples.end());
 
-            const VectorBufferTemplate<typename BufferTypes::SourceContinuous>* weights = forestWeights[treeIndex];
-            const typename BufferTypes::SourceContinuous sampleWeight = weights->Get(sampleIndex);
+    // Update active node stats
+    for(size_t groupStart=0; groupStart<leafSamples.size(); )
+    {
+        const int nodeIndex = leafSamples[groupStart].first;
+        size_t groupEnd = groupStart;
+        while( groupEnd < leafSamples.size() && leafSamples[groupEnd].first == nodeIndex )
+        {
+            groupEnd++;
+        }
+        const int numberOfLeafSamples = static_cast<int>(groupEnd - groupStart);
+        const int depth = tree.GetDepths().Get(nodeIndex);
 
-            if(sampleWeight <= typename BufferTypes::SourceContinuous(0)) continue;
+        indices->Resize(numberOfLeafSamples);
+        for(int i=0; i<numberOfLeafSamples; i++)
+        {
+            indices->Set(i, leafSamples[groupStart + i].second);
+        }
+        groupStart = groupEnd;
 
-            mFrontierQueue.IncrDatapoints(treeIndex, static_cast<long long>(sampleWeight));
+        ActiveOnlineLeaf& leaf = *FindActiveLeaf(treeIndex, nodeIndex);
+        stack.Push(leaf.mNodeData);
+        if( !leaf.mIsInitialized )
+        {
+            mInitNodeSteps->ProcessStep(stack, *leaf.mNodeData, state.mGen, tree.GetExtraInfo(), nodeIndex);
+            leaf.mIsInitialized = true;
+        }
 
-            const int nodeIndex = walkTree<typename Feature::FeatureBinding, BufferTypes>(
-                                             featureBindings[treeIndex], tree, 0, 0 );
-            const int depth = tree.GetDepths().Get(nodeIndex);
+        mStatsUpdateNodeSteps->ProcessStep(stack, *leaf.mNodeData, state.mGen, tree.GetExtraInfo(), nodeIndex);
+        leaf.mDatapointsSinceLastImpurityUpdate += numberOfLeafSamples;
 
-            estimatorUpdaterBindings[treeIndex].UpdateEstimator(tree, nodeIndex, sampleIndex);
-            tree.GetCounts().Incr(nodeIndex, sampleWeight);
+        if( leaf.mDatapointsSinceLastImpurityUpdate >= mImpurityUpdatePeriod )
+        {
+            mImpurityUpdateNodeSteps->ProcessStep(stack, *leaf.mNodeData, state.mGen, tree.GetExtraInfo(), nodeIndex);
+            leaf.mDatapointsSinceLastImpurityUpdate = 0;
 
-            // Update active node stats
-            std::pair<int,int> treeNodeKey = std::make_pair(treeIndex, nodeIndex);
-            if( mActiveFrontierLeaves.find(treeNodeKey) != mActiveFrontierLeaves.end() )
+            // Split the node
+            SplitSelectorInfo<BufferTypes> selectorInfo = mSplitSelector->ProcessSplits(stack, depth, tree.GetExtraInfo(), nodeIndex);
+            if( selectorInfo.ValidSplit() )
             {
-                ActiveOnlineLeaf& leaf = mActiveFrontierLeaves[treeNodeKey];
-                stack.Push(leaf.mNodeData);
-                if( !leaf.mIsInitialized )
-                {
-                    mInitNodeSteps->ProcessStep(stack, *leaf.mNodeData, gen, tree.GetExtraInfo(), nodeIndex);
-                    leaf.mIsInitialized = true;
-                }
-
-                mStatsUpdateNodeSteps->ProcessStep(stack, *leaf.mNodeData, gen, tree.GetExtraInfo(), nodeIndex);
-                leaf.mDatapointsSinceLastImpurityUpdate++;
-
-                if( leaf.mDatapointsSinceLastImpurityUpdate >= mImpurityUpdatePeriod )
-                {
-                    mImpurityUpdateNodeSteps->ProcessStep(stack, *leaf.mNodeData, gen, tree.GetExtraInfo(), nodeIndex);
-                    leaf.mDatapointsSinceLastImpurityUpdate = 0;
-
-                    // Split the node
-                    SplitSelectorInfo<BufferTypes> selectorInfo = mSplitSelector->ProcessSplits(stack, depth, tree.GetExtraInfo(), nodeIndex);
-                    if( selectorInfo.ValidSplit() )
-                    {
-                        const int leftNodeIndex = tree.NextNodeIndex();
-                        const int rightNodeIndex = tree.NextNodeIndex();
-
-                        selectorInfo.WriteToTree( nodeIndex, leftNodeIndex, rightNodeIndex,
-                                                  tree.GetCounts(), tree.GetDepths(), tree.GetFloatFeatureParams(), tree.GetIntFeatureParams(), tree.GetYs());
-
-                        tree.GetPath().Set(nodeIndex, LEFT_CHILD, leftNodeIndex);
-                        tree.GetPath().Set(nodeIndex, RIGHT_CHILD, rightNodeIndex);
-
-                        // Remove split node
-                        mActiveFrontierLeaves.erase(treeNodeKey);
-                        delete leaf.mNodeData;
-
-                        // Add children to the queue
-                        if( mTrySplitCriteria->TrySplit(depth, std::numeric_limits<int>::max(), tree.GetExtraInfo(), nodeIndex, true) )
-                        {
-                            mFrontierQueue.ProcessSplit(mForest, treeIndex, nodeIndex, leftNodeIndex, rightNodeIndex);
-                        }
-
-                        // Update the frontier priority queue
-                        UpdateActiveFrontier();
-
-                        // Update the forest params used for prediction since it has changed
-                        BufferCollection& bc = forestBcs[treeIndex];
-
-                        MatrixBufferTemplate<typename BufferTypes::ParamsContinuous>* featureFloatParams =
-                                bc.GetBufferPtr< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mPredictFeature.mFloatParamsBufferId);
-                        *featureFloatParams = tree.GetFloatFeatureParams();
-
-                        MatrixBufferTemplate<typename BufferTypes::ParamsInteger>* featureIntParams =
-                                bc.GetBufferPtr< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mPredictFeature.mIntParamsBufferId);
-                        *featureIntParams = tree.GetIntFeatureParams();
-                    }
-                }
-                stack.Pop(); //stack.Push(leaf.mNodeData);
+                const int leftNodeIndex = tree.NextNodeIndex();
+                const int rightNodeIndex = tree.NextNodeIndex();
+
+                selectorInfo.WriteToTree( nodeIndex, leftNodeIndex, rightNodeIndex,
+                                          tree.GetCounts(), tree.GetDepths(), tree.GetFloatFeatureParams(), tree.GetIntFeatureParams(), tree.GetYs());
+
+                tree.GetPath().Set(nodeIndex, LEFT_CHILD, leftNodeIndex);
+                tree.GetPath().Set(nodeIndex, RIGHT_CHILD, rightNodeIndex);
+
+                // Removed from the frontier after the batch
+                state.mSplitNodeIndices.push_back(nodeIndex);
+
+                // Update the forest params used for prediction since it has changed
+                BufferCollection& bc = state.mBc;
+
+                MatrixBufferTemplate<typename BufferTypes::ParamsContinuous>* featureFloatParams =
+                        bc.GetBufferPtr< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mPredictFeature.mFloatParamsBufferId);
+                *featureFloatParams = tree.GetFloatFeatureParams();
+
+                MatrixBufferTemplate<typename BufferTypes::ParamsInteger>* featureIntParams =
+                        bc.GetBufferPtr< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mPredictFeature.mIntParamsBufferId);
+                *featureIntParams = tree.GetIntFeatureParams();
             }
         }
+        stack.Pop(); //stack.Push(leaf.mNodeData);
     }
-    return mForest;
+}
+
+template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
+void OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
+::ProcessTreeSplits( int treeIndex, TreeLearnState& state )
+{
+    Tree& tree = mForest.mTrees[treeIndex];
+    for(size_t i=0; i<state.mSplitNodeIndices.size(); i++)
+    {
+        const int nodeIndex = state.mSplitNodeIndices[i];
+        const int depth = tree.GetDepths().Get(nodeIndex);
+
+        // Remove split node
+        ActiveOnlineLeaf& leaf = *FindActiveLeaf(treeIndex, nodeIndex);
+        delete leaf.mNodeData;
+        leaf = ActiveOnlineLeaf();
+        mNumberOfActiveFrontierLeaves--;
+
+        // Add children to the queue
+        if( mTrySplitCriteria->TrySplit(depth, std::numeric_limits<int>::max(), tree.GetExtraInfo(), nodeIndex, true) )
+        {
+            mFrontierQueue.ProcessSplit(mForest, treeIndex, nodeIndex,
+                                        tree.GetPath().Get(nodeIndex, LEFT_CHILD), tree.GetPath().Get(nodeIndex, RIGHT_CHILD));
+        }
+    }
+    state.mSplitNodeIndices.clear();
 }
 
 template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
@@ -259,14 +405,48 @@ Forest OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, Buffer
     return mForest;
 }
 
+template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
+void OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
+::SetBatchSize(int batchSize)
+{
+    ASSERT(batchSize > 0)
+    mBatchSize = batchSize;
+}
+
+template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
+void OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
+::SetNumberOfJobs(int numberOfJobs)
+{
+    ASSERT(numberOfJobs > 0)
+    mNumberOfJobs = numberOfJobs;
+}
+
 template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
 void OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
 ::UpdateActiveFrontier()
 {
     // Add a new active split to the frontier when there is space and there is a candidate in the queue
-    while( mActiveFrontierLeaves.size() < static_cast<size_t>(mMaxFrontierSize) && !mFrontierQueue.IsEmpty() )
+    while( mNumberOfActiveFrontierLeaves < mMaxFrontierSize && !mFrontierQueue.IsEmpty() )
     {
         std::pair<int,int> treeNodeKey = mFrontierQueue.PopBest(mForest);
-        mActiveFrontierLeaves[treeNodeKey] = ActiveOnlineLeaf(new BufferCollection());
+        std::vector<ActiveOnlineLeaf>& treeLeafs = mActiveFrontierLeaves[treeNodeKey.first];
+        if( static_cast<int>(treeLeafs.size()) <= treeNodeKey.second )
+        {
+            treeLeafs.resize(treeNodeKey.second+1);
+        }
+        treeLeafs[treeNodeKey.second] = ActiveOnlineLeaf(new BufferCollection());
+        mNumberOfActiveFrontierLeaves++;
+    }
+}
+
+template <class Feature, class EstimatorUpdater, class ProbabilityOfError, class BufferTypes>
+ActiveOnlineLeaf* OnlineForestLearner<Feature, EstimatorUpdater, ProbabilityOfError, BufferTypes>
+::FindActiveLeaf( int treeIndex, int nodeIndex )
+{
+    std::vector<ActiveOnlineLeaf>& treeLeafs = mActiveFrontierLeaves[treeIndex];
+    if( nodeIndex >= static_cast<int>(treeLeafs.size()) || treeLeafs[nodeIndex].mNodeData == NULL )
+    {
+        return NULL;
     }
+    return &treeLeafs[nodeIndex];
 }
\ No newline at end of file
@@ -1,7 +1,8 @@
 #include <ctime>
+#include <algorithm>
 
-#include "bootstrap.h"
 #include "BufferCollectionStack.h"
+#include "asserts.h"
 #include "BufferCollectionUtils.h"
 #include "Forest.h"
 #include "TreeLearnerI.h"
@@ -13,19 +14,61 @@
 #include <boost/make_shared.hpp>
 #endif
 
+// ----------------------------------------------------------------------------
+//
+// Hands out the index of the next tree to learn.  Workers pull trees until
+// the queue is empty so a worker that finishes a cheap tree immediately
+// starts on the next one instead of waiting on a fixed share of the forest.
+//
+// ----------------------------------------------------------------------------
+class TreeQueue
+{
+public:
+    TreeQueue(int numberOfTrees)
+    : mNextTreeIndex(0)
+    , mNumberOfTrees(numberOfTrees)
+    {}
+
+    bool Pop(int& treeIndex)
+    {
+#if USE_BOOST_THREAD
+        boost::mutex::scoped_lock lock(mMutex);
+#endif
+        if( mNextTreeIndex >= mNumberOfTrees )
+        {
+            return false;
+        }
+        treeIndex = mNextTreeIndex++;
+        return true;
+    }
+
+private:
+    int mNextTreeIndex;
+    const int mNumberOfTrees;
+#if USE_BOOST_THREAD
+    boost::mutex mMutex;
+#endif
+};
+
 void TrainTrees(    const TreeLearnerI* treeLearner,
                     const BufferCollectionStack& data,
-                    int treeStartIndex,
-                    int treeStride,
-                    int numberOfTrees,
+                    TreeQueue* treeQueue,
+                    int job,
+                    unsigned int seed,
+                    const Timer* learnTimer,
                     Forest* forestOut )
 {
-    for(int i=treeStartIndex; i<numberOfTrees; i+=treeStride)
+    int i = 0;
+    while( treeQueue->Pop(i) )
     {
-        TimeLogger totalTree(forestOut->mTrees[i].GetExtraInfo(), "ParallelForestLearner");
-        unsigned long seedInt = i + static_cast<unsigned long>(std::time(NULL)) + reinterpret_cast<unsigned long>(treeLearner);
-        setSeed(seedInt); //set bootstrap seed
-        treeLearner->Learn(data, forestOut->mTrees[i], seedInt);
+        BufferCollection& extraInfo = forestOut->mTrees[i].GetExtraInfo();
+        WriteValue<int>(extraInfo, "ParallelForestLearner-Job", job);
+        WriteValue<double>(extraInfo, "ParallelForestLearner-StartTime", learnTimer->ElapsedMilliSeconds());
+        TimeLogger totalTree(extraInfo, "ParallelForestLearner");
+        // Each tree has its own generator so the trees do not depend on the
+        // order the threads run in
+        const unsigned int treeSeed = seed + static_cast<unsigned int>(i);
+        treeLearner->Learn(data, forestOut->mTrees[i], treeSeed);
     }
 }
 
@@ -36,6 +79,8 @@ ParallelForestLearner::ParallelForestLearner( const TreeLearnerI* treeLearner, i
 , mForestSteps(NULL)
 , mNumberOfTrees(numberOfTrees)
 , mNumberOfJobs(numberOfJobs)
+, mSeed(0)
+, mUseSeed(false)
 {}
 
 ParallelForestLearner::ParallelForestLearner( const TreeLearnerI* treeLearner, const PipelineStepI* forestSteps, int numberOfTrees, int estimatorParamsDim, int numberOfJobs )
@@ -44,9 +89,17 @@ ParallelForestLearner::ParallelForestLearner( const TreeLearnerI* treeLearner, c
 , mForestSteps( forestSteps->Clone() )
 , mNumberOfTrees(numberOfTrees)
 , mNumberOfJobs(numberOfJobs)
+, mSeed(0)
+, mUseSeed(false)
 {}
 
 
+void ParallelForestLearner::SetSeed( unsigned int seed )
+{
+    mSeed = seed;
+    mUseSeed = true;
+}
+
 ParallelForestLearner::~ParallelForestLearner()
 {
     delete mForest;
@@ -62,30 +115,34 @@ Forest ParallelForestLearner::Learn( const BufferCollection& data )
     BufferCollectionStack stack;
     stack.Push(&data);
 
+    const unsigned int seed = mUseSeed ? mSeed :
+        static_cast<unsigned int>(std::time(NULL)) + static_cast<unsigned int>(reinterpret_cast<unsigned long>(mTreeLearner));
+
     BufferCollection* forestData = NULL;
     if( mForestSteps != NULL)
     {
         boost::mt19937 gen;
-        setSeed(static_cast<unsigned int>(std::time(NULL))); //set bootstrap seed
-        gen.seed(static_cast<unsigned int>(std::time(NULL)));
+        gen.seed(seed);
 
-        BufferCollection* forestData = new BufferCollection();
+        forestData = new BufferCollection();
         stack.Push(forestData);
         mForestSteps->ProcessStep(stack, *forestData, gen, *forestData, 0);
     }
 
+    Timer learnTimer;
+    TreeQueue treeQueue(mNumberOfTrees);
 #if USE_BOOST_THREAD
     std::vector< boost::shared_ptr< boost::thread > > threadVec;
     for(int job=0; job<mNumberOfJobs; job++)
     {
-        threadVec.push_back( boost::make_shared<boost::thread>(TrainTrees, mTreeLearner, stack, job, mNumberOfJobs, mNumberOfTrees, mForest) );
+        threadVec.push_back( boost::make_shared<boost::thread>(TrainTrees, mTreeLearner, stack, &treeQueue, job, seed, &learnTimer, mForest) );
     }
     for(int job=0; job<mNumberOfJobs; job++)
     {
         threadVec[job]->join();
     }
 #else
-    TrainTrees(mTreeLearner, stack, 0, 1, mNumberOfTrees, mForest);
+    TrainTrees(mTreeLearner, stack, &treeQueue, 0, seed, &learnTimer, mForest);
 #endif
     if( forestData != NULL )
     {
@@ -96,3 +153,65 @@ Forest ParallelForestLearner::Learn( const BufferCollection& data )
 }
 
 
+
+
+void LearnForests(  const std::vector<ParallelForestLearner*>* forestLearners,
+                    const BufferCollection* data,
+                    TreeQueue* learnerQueue,
+                    std::vector<Forest>* forestsOut )
+{
+    int i = 0;
+    while( learnerQueue->Pop(i) )
+    {
+        (*forestsOut)[i] = (*forestLearners)[i]->Learn(*data);
+    }
+}
+
+// At least one job so Learn always learns every learner
+ParallelForestLearnerBatch::ParallelForestLearnerBatch( int numberOfJobs )
+: mForestLearners()
+, mNumberOfJobs(std::max(1, numberOfJobs))
+{}
+
+ParallelForestLearnerBatch::~ParallelForestLearnerBatch()
+{}
+
+void ParallelForestLearnerBatch::AddForestLearner( ParallelForestLearner* forestLearner )
+{
+    ASSERT(forestLearner != NULL)
+    // A learner in the batch twice would be learned by two threads at once
+    ASSERT(std::find(mForestLearners.begin(), mForestLearners.end(), forestLearner) == mForestLearners.end())
+    mForestLearners.push_back(forestLearner);
+}
+
+int ParallelForestLearnerBatch::GetNumberOfForestLearners() const
+{
+    return static_cast<int>(mForestLearners.size());
+}
+
+Forest ParallelForestLearnerBatch::Learn( const BufferCollection& data )
+{
+    const int numberOfForestLearners = GetNumberOfForestLearners();
+    std::vector<Forest> forests(numberOfForestLearners);
+    TreeQueue learnerQueue(numberOfForestLearners);
+#if USE_BOOST_THREAD
+    std::vector< boost::shared_ptr< boost::thread > > threadVec;
+    for(int job=0; job<mNumberOfJobs; job++)
+    {
+        threadVec.push_back( boost::make_shared<boost::thread>(LearnForests, &mForestLearners, &data, &learnerQueue, &forests) );
+    }
+    for(int job=0; job<mNumberOfJobs; job++)
+    {
+        threadVec[job]->join();
+    }
+#else
+    LearnForests(&mForestLearners, &data, &learnerQueue, &forests);
+#endif
+
+    Forest forest;
+    for(int i=0; i<numberOfForestLearners; i++)
+    {
+        forest.AddForest(forests[i]);
+    }
+    return forest;
+}
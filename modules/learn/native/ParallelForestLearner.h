@@ -5,6 +5,8 @@
 #include "TreeLearnerI.h"
 #include "Forest.h"
 
+#include <vector>
+
 class ParallelForestLearner
 {
 public:
@@ -21,6 +23,10 @@ public:
 
     ~ParallelForestLearner();
 
+    // Trees are learned from seed, seed+1, ... so a forest can be reproduced
+    // (by default the seed comes from the clock)
+    void SetSeed( unsigned int seed );
+
     Forest Learn( const BufferCollection& data );
 private:
     ParallelForestLearner( const ParallelForestLearner& other );
@@ -31,5 +37,37 @@ private:
     const PipelineStepI* mForestSteps;
     const int mNumberOfTrees;
     const int mNumberOfJobs;
+    unsigned int mSeed;
+    bool mUseSeed;
 };
 
+
+// ----------------------------------------------------------------------------
+//
+// Learns the forests of several ParallelForestLearners (ie learners with
+// different parameters) on the same data.  The learners are handed to
+// numberOfJobs workers as they become free and the returned forest has the
+// trees of each learner in the order the learners were added.
+//
+// The learners are not owned, must outlive Learn and can only be added
+// once because each one writes to its own forest.  Each learner still
+// uses its own numberOfJobs so they are usually created with one job.
+//
+// ----------------------------------------------------------------------------
+class ParallelForestLearnerBatch
+{
+public:
+    ParallelForestLearnerBatch( int numberOfJobs );
+    ~ParallelForestLearnerBatch();
+
+    void AddForestLearner( ParallelForestLearner* forestLearner );
+    int GetNumberOfForestLearners() const;
+
+    Forest Learn( const BufferCollection& data );
+private:
+    ParallelForestLearnerBatch( const ParallelForestLearnerBatch& other );
+    ParallelForestLearnerBatch& operator=( const ParallelForestLearnerBatch& rhs );
+
+    std::vector<ParallelForestLearner*> mForestLearners;
+    const int mNumberOfJobs;
+};
@@ -19,6 +19,13 @@
 // discovery and data mining. ACM, 2000.
 //
 // http://homes.cs.washington.edu/~pedrod/papers/kdd00.pdf
+//
+// The queued leafs are in a binary heap ordered by a cached probability of
+// error.  The probability of a leaf only goes down as its tree sees more
+// datapoints unless datapoints reach the leaf, so the cached score of a leaf
+// is an upper bound until it is marked as changed with NodeChanged.
+// PopBest refreshes the changed leafs and then the top of the heap until the
+// top is up to date, which makes it the best leaf.
 ///////////////////////////////////////////////////////////////////////////////
 template <class ProbabilityOfError>
 class ProbabilityOfErrorFrontierQueue
@@ -27,21 +34,43 @@ public:
     ProbabilityOfErrorFrontierQueue(const int numberOfTrees);
     bool IsEmpty() const;
     void IncrDatapoints(const int treeIndex, long long count);
+    // Datapoints reached the node so its cached score is stale.  Calls for
+    // different trees can be made concurrently.
+    void NodeChanged(const int treeIndex, const int nodeIndex);
     std::pair<int, int> PopBest(const Forest& forest);
     void ProcessSplit(const Forest& forest, const int treeIndex,
                         const int nodeIndex, const int leftIndex, const int rightIndex);
 
 private:
+    float Score(const Forest& forest, const std::pair<int, int>& treeNodeKey) const;
+    void Push(const std::pair<int, int>& treeNodeKey, float score);
+    void SetScore(size_t position, float score);
+    bool IsBetter(size_t position, size_t otherPosition) const;
+    void SwapPositions(size_t position, size_t otherPosition);
+    void SiftUp(size_t position);
+    void SiftDown(size_t position);
+
     std::vector<long long> mNumberDatapointsPerTree;
     std::map< std::pair<int, int>, long long> mNumberDatapointsOnNodeCreation;
-    std::set< std::pair<int, int> > mQueuedFrontierLeaves;
+
+    // Binary heap of the queued leafs, their cached scores and the position
+    // of each leaf in the heap
+    std::vector< std::pair<int, int> > mHeap;
+    std::vector<float> mHeapScores;
+    std::map< std::pair<int, int>, size_t > mHeapPositions;
+
+    // Queued leafs of each tree that were reached by datapoints
+    std::vector< std::set<int> > mChangedNodesPerTree;
 };
 
 template <class ProbabilityOfError>
 ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::ProbabilityOfErrorFrontierQueue(const int numberOfTrees)
 : mNumberDatapointsPerTree(numberOfTrees)
 , mNumberDatapointsOnNodeCreation()
-, mQueuedFrontierLeaves()
+, mHeap()
+, mHeapScores()
+, mHeapPositions()
+, mChangedNodesPerTree(numberOfTrees)
 {
     // Add the root node for all trees
     for(int treeIndex=0; treeIndex<numberOfTrees; treeIndex++)
@@ -49,14 +78,14 @@ ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::ProbabilityOfErrorFrontierQ
         mNumberDatapointsPerTree[treeIndex] = 0;
         std::pair<int,int> treeNodeKey = std::make_pair(treeIndex, 0);
         mNumberDatapointsOnNodeCreation[treeNodeKey] = 0;
-        mQueuedFrontierLeaves.insert(treeNodeKey);
+        Push(treeNodeKey, 0.0f);
     }
 }
 
 template <class ProbabilityOfError>
 bool ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::IsEmpty() const
 {
-    return (mQueuedFrontierLeaves.size() <= 0);
+    return (mHeap.size() <= 0);
 }
 
 template <class ProbabilityOfError>
@@ -65,39 +94,55 @@ void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::IncrDatapoints(const i
     mNumberDatapointsPerTree[treeIndex] += count;
 }
 
+template <class ProbabilityOfError>
+void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::NodeChanged(const int treeIndex, const int nodeIndex)
+{
+    if( mHeapPositions.find(std::make_pair(treeIndex, nodeIndex)) != mHeapPositions.end() )
+    {
+        mChangedNodesPerTree[treeIndex].insert(nodeIndex);
+    }
+}
+
 template <class ProbabilityOfError>
 std::pair<int, int> ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::PopBest(const Forest& forest)
 {
     ASSERT(!IsEmpty())
 
-    ProbabilityOfError probOfError;
-
-    // Find node in queue with highest probability of improvement
-    std::pair<int, int> maxProbabilityOfErrorTreeNodeKey = *mQueuedFrontierLeaves.begin();
-    float maxProbabilityOfError = 0.0;
-    typedef std::set< std::pair<int, int> >::iterator it_type;
-    for(it_type iter = mQueuedFrontierLeaves.begin(); iter != mQueuedFrontierLeaves.end(); ++iter)
+    // Refresh the leafs that datapoints reached since the last pop
+    for(size_t treeIndex=0; treeIndex<mChangedNodesPerTree.size(); treeIndex++)
     {
-        const int treeIndex = iter->first;
-        const int nodeIndex = iter->second;
-        const Tree& tree = forest.mTrees[treeIndex];
-        const float pointsToReachNode = tree.GetCounts().Get(nodeIndex);
-        const float pointsDuringNodeLifetime =
-            static_cast<float>(mNumberDatapointsPerTree[treeIndex] - mNumberDatapointsOnNodeCreation[*iter]);
-        const float probOfNode = pointsToReachNode / pointsDuringNodeLifetime;
-
-        const float probOfErrorForNode = probOfError.ProbabilityOfError(tree, nodeIndex);
-
-        const float probabilityOfError = probOfNode * probOfErrorForNode;
-        if( probabilityOfError > maxProbabilityOfError )
+        std::set<int>& changedNodes = mChangedNodesPerTree[treeIndex];
+        for(std::set<int>::const_iterator iter = changedNodes.begin(); iter != changedNodes.end(); ++iter)
         {
-            maxProbabilityOfError = probabilityOfError;
-            maxProbabilityOfErrorTreeNodeKey = *iter;
+            const std::pair<int, int> treeNodeKey = std::make_pair(static_cast<int>(treeIndex), *iter);
+            typename std::map< std::pair<int, int>, size_t >::const_iterator position = mHeapPositions.find(treeNodeKey);
+            if( position != mHeapPositions.end() )
+            {
+                SetScore(position->second, Score(forest, treeNodeKey));
+            }
         }
+        changedNodes.clear();
+    }
+
+    // Every other cached score is an upper bound so the top is the best leaf
+    // once its score is up to date and it is still on top
+    std::pair<int, int> bestTreeNodeKey = mHeap[0];
+    SetScore(0, Score(forest, bestTreeNodeKey));
+    while( mHeap[0] != bestTreeNodeKey )
+    {
+        bestTreeNodeKey = mHeap[0];
+        SetScore(0, Score(forest, bestTreeNodeKey));
     }
 
-    mQueuedFrontierLeaves.erase(maxProbabilityOfErrorTreeNodeKey);
-    return maxProbabilityOfErrorTreeNodeKey;
+    SwapPositions(0, mHeap.size()-1);
+    mHeapPositions.erase(bestTreeNodeKey);
+    mHeap.pop_back();
+    mHeapScores.pop_back();
+    if( !IsEmpty() )
+    {
+        SiftDown(0);
+    }
+    return bestTreeNodeKey;
 }
 
 template <class ProbabilityOfError>
@@ -141,11 +186,94 @@ void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::ProcessSplit(const For
     const float probabilityOfLeft = probabilityOfNode * probabilityOfLeftGivenNode;
     const float leftTotalDatapointsToMaintainProbEst = tree.GetCounts().Get(leftIndex) / probabilityOfLeft;
     mNumberDatapointsOnNodeCreation[std::make_pair(treeIndex, leftIndex) ] = mNumberDatapointsPerTree[treeIndex] - leftTotalDatapointsToMaintainProbEst;
-    mQueuedFrontierLeaves.insert( std::make_pair(treeIndex, leftIndex) );
+    Push( std::make_pair(treeIndex, leftIndex), Score(forest, std::make_pair(treeIndex, leftIndex)) );
 
     const float probabilityOfRightGivenNode = tree.GetCounts().Get(rightIndex) / (tree.GetCounts().Get(leftIndex) + tree.GetCounts().Get(rightIndex));
     const float probabilityOfRight = probabilityOfNode * probabilityOfRightGivenNode;
     const float rightTotalDatapointsToMaintainProbEst = tree.GetCounts().Get(rightIndex) / probabilityOfRight;
     mNumberDatapointsOnNodeCreation[std::make_pair(treeIndex, rightIndex) ] = mNumberDatapointsPerTree[treeIndex] - rightTotalDatapointsToMaintainProbEst;
-    mQueuedFrontierLeaves.insert( std::make_pair(treeIndex, rightIndex) );
-}
\ No newline at end of file
+    Push( std::make_pair(treeIndex, rightIndex), Score(forest, std::make_pair(treeIndex, rightIndex)) );
+}
+
+template <class ProbabilityOfError>
+float ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::Score(const Forest& forest, const std::pair<int, int>& treeNodeKey) const
+{
+    ProbabilityOfError probOfError;
+
+    const int treeIndex = treeNodeKey.first;
+    const int nodeIndex = treeNodeKey.second;
+    const Tree& tree = forest.mTrees[treeIndex];
+    const float pointsToReachNode = tree.GetCounts().Get(nodeIndex);
+    const float pointsDuringNodeLifetime =
+        static_cast<float>(mNumberDatapointsPerTree[treeIndex] - mNumberDatapointsOnNodeCreation.find(treeNodeKey)->second);
+    const float probOfNode = pointsToReachNode / pointsDuringNodeLifetime;
+
+    const float probOfErrorForNode = probOfError.ProbabilityOfError(tree, nodeIndex);
+
+    // A node without datapoints has a probability of 0 (not nan)
+    const float probabilityOfError = probOfNode * probOfErrorForNode;
+    return probabilityOfError > 0.0f ? probabilityOfError : 0.0f;
+}
+
+template <class ProbabilityOfError>
+void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::Push(const std::pair<int, int>& treeNodeKey, float score)
+{
+    mHeap.push_back(treeNodeKey);
+    mHeapScores.push_back(score);
+    mHeapPositions[treeNodeKey] = mHeap.size()-1;
+    SiftUp(mHeap.size()-1);
+}
+
+template <class ProbabilityOfError>
+void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::SetScore(size_t position, float score)
+{
+    mHeapScores[position] = score;
+    SiftUp(position);
+    SiftDown(position);
+}
+
+template <class ProbabilityOfError>
+bool ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::IsBetter(size_t position, size_t otherPosition) const
+{
+    // Ties go to the smallest tree and node index
+    return mHeapScores[position] > mHeapScores[otherPosition]
+          || (mHeapScores[position] == mHeapScores[otherPosition] && mHeap[position] < mHeap[otherPosition]);
+}
+
+template <class ProbabilityOfError>
+void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::SwapPositions(size_t position, size_t otherPosition)
+{
+    std::swap(mHeap[position], mHeap[otherPosition]);
+    std::swap(mHeapScores[position], mHeapScores[otherPosition]);
+    mHeapPositions[mHeap[position]] = position;
+    mHeapPositions[mHeap[otherPosition]] = otherPosition;
+}
+
+template <class ProbabilityOfError>
+void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::SiftUp(size_t position)
+{
+    while( position > 0 && IsBetter(position, (position-1)/2) )
+    {
+        SwapPositions(position, (position-1)/2);
+        position = (position-1)/2;
+    }
+}
+
+template <class ProbabilityOfError>
+void ProbabilityOfErrorFrontierQueue<ProbabilityOfError>::SiftDown(size_t position)
+{
+    while( 2*position+1 < mHeap.size() )
+    {
+        size_t best = 2*position+1;
+        if( best+1 < mHeap.size() && IsBetter(best+1, best) )
+        {
+            best = best+1;
+        }
+        if( !IsBetter(best, position) )
+        {
+            break;
+        }
+        SwapPositions(position, best);
+        position = best;
+    }
+}
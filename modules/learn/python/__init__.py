@@ -1,6 +1,7 @@
 from utils import *
 from learn import *
 from wrappers import *
+from shards import *
 from split_criteria import *
 from classification_matrix_learner import *
 from regression_matrix_learner import *
@@ -42,25 +42,29 @@ class GreedyAddSwapWrapper:
         if self.forest is None:
             self.forest = new_forest
         else:
+            # The predictor follows self.forest so its cached leafs only
+            # have to be extended with the leafs of each new tree
+            predictor_wrapper = self.create_predictor(self.forest, **kwargs)
+
             for new_tree_index in range(new_forest.GetNumberOfTrees()):
                 operation = "None"
                 tree_index_to_remove = -1
                 forest_size = self.forest.GetNumberOfTrees()
 
-                predictor_wrapper = self.create_predictor(self.forest, **kwargs)
+                leafs = predictor_wrapper.predict_leafs_cached(**kwargs)
                 best_forest_error = self.error_calculator.error(predictor_wrapper, 
                                                                 tree_weights=tree_weights_for_all_trees(forest_size), 
-                                                                leafs=None,
+                                                                leafs=leafs,
                                                                 **kwargs)
 
                 # Try just adding the tree
                 new_tree = new_forest.GetTree(new_tree_index)
                 predictor_wrapper.add_tree(new_tree)
-                # leafs = predictor_wrapper.predict_leafs(x=kwargs.get('x'))
+                leafs = predictor_wrapper.predict_leafs_cached(**kwargs)
 
                 new_error = self.error_calculator.error(predictor_wrapper, 
                                                         tree_weights=tree_weights_for_all_trees(forest_size+1), 
-                                                        leafs=None,
+                                                        leafs=leafs,
                                                         **kwargs)
 
                 if new_error <= best_forest_error:
@@ -71,7 +75,7 @@ class GreedyAddSwapWrapper:
                 for tree_to_swap_out in range(forest_size):
                     new_error = self.error_calculator.error(predictor_wrapper, 
                                                             tree_weights=tree_weights_for_swap(forest_size+1, tree_to_swap_out),
-                                                            leafs=None,
+                                                            leafs=leafs,
                                                              **kwargs)
 
                     if new_error < best_forest_error:
@@ -90,6 +94,10 @@ class GreedyAddSwapWrapper:
                     # print("error = %f" % best_forest_error)
                     self.forest.RemoveTree(tree_index_to_remove)
                     self.forest.AddTree(new_forest.GetTree(new_tree_index))
+                    predictor_wrapper.remove_tree(tree_index_to_remove)
+
+                if operation == "None":
+                    predictor_wrapper.remove_tree(forest_size)
 
         forest_predictor_wrapper = self.create_predictor(self.forest, **kwargs)
         return forest_predictor_wrapper
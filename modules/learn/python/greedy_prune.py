@@ -3,136 +3,92 @@ import rftk.forest_data as forest_data
 import rftk.buffers as buffers
 import learn
 
-class ZeroOneClassificationError:
-    def y_hat_sum(self, tree_weights, oob_weights, leaf_ys, **kwargs):
-        weights = oob_weights * tree_weights
-        weighted_ys = weights * leaf_ys
-        y_hat_sum = weighted_ys.sum(axis=2) 
-        return y_hat_sum, weights, weights.sum(axis=1)
-
-    def error(self, y_hat_sum, weights, weights_sum, leaf_ys, **kwargs):
-        y_hat_avg = y_hat_sum / weights_sum
-        y_hat = y_hat_avg.argmax(axis=0)
-        error = np.mean(kwargs.get('classes') != y_hat)
-        return error
-
-    def error_without_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_revove, **kwargs):
-        y_hat_sum_without_tree = y_hat_sum - (leaf_ys[:,:,tree_id_to_revove] * weights[:,tree_id_to_revove])
-        weights_without_tree = weights_sum - weights[:,tree_id_to_revove]
-        y_hat_avg = y_hat_sum_without_tree / weights_without_tree
-        y_hat = y_hat_avg.argmax(axis=0)
-        error = np.mean(kwargs.get('classes') != y_hat)
-        return error
-
-class ProbOfErrorClassificationError:
-    def y_hat_sum(self, tree_weights, oob_weights, leaf_ys, **kwargs):
-        weights = oob_weights * tree_weights
-        weighted_ys = weights * leaf_ys
-        y_hat_sum = weighted_ys.sum(axis=2) 
-        return y_hat_sum, weights, weights.sum(axis=1)
-
-    def error(self, y_hat_sum, weights, weights_sum, leaf_ys, **kwargs):
-        y_hat_avg = y_hat_sum / weights_sum
-        y_hat_avg[np.isnan(y_hat_avg)] = 0
-        error = 1.0 - np.mean(y_hat_avg[kwargs.get('classes')].diagonal())
-        return error
-
-    def error_without_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_revove, **kwargs):
-        y_hat_sum_without_tree = y_hat_sum - (leaf_ys[:,:,tree_id_to_revove] * weights[:,tree_id_to_revove])
-        weights_without_tree = weights_sum - weights[:,tree_id_to_revove]
-        y_hat_avg = y_hat_sum_without_tree / weights_without_tree
-        y_hat_avg[np.isnan(y_hat_avg)] = 0
-        error = 1.0 - np.mean( y_hat_avg[kwargs.get('classes')].diagonal() )
-        return error
+class IncrementalError:
+    '''
+    Base of the error calculators of greedy_prune and greedy_add.  The forest
+    prediction is kept as y_hat_sum (classes x datapoints) and weights_sum
+    (datapoints) so adding or removing a tree only adds or subtracts its
+    column of leaf_ys.  Subclasses implement errors, which scores k
+    predictions at once from y_hat_sums (k x classes x datapoints) and
+    weights_sums (k x datapoints).
+    '''
+    # Number of elements of the k x classes x datapoints temporaries
+    max_chunk_elements = 2**22
 
-class ProbOfErrorOnErrorClassificationError:
     def y_hat_sum(self, tree_weights, oob_weights, leaf_ys, **kwargs):
-        weights = oob_weights * tree_weights
+        weights = oob_weights * np.asarray(tree_weights, dtype=np.float64)
         weighted_ys = weights * leaf_ys
         y_hat_sum = weighted_ys.sum(axis=2) 
         return y_hat_sum, weights, weights.sum(axis=1)
 
     def error(self, y_hat_sum, weights, weights_sum, leaf_ys, **kwargs):
-        y_hat_avg = y_hat_sum / weights_sum
-        y_hat_avg[np.isnan(y_hat_avg)] = 0
-        probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
-        probabilities[kwargs.get('classes') == y_hat_avg.argmax(axis=0)] = 1.0
-        error = np.mean(1.0 - y_hat_avg[kwargs.get('classes')].diagonal())
-        return error
+        return self.errors(y_hat_sum[np.newaxis], weights_sum[np.newaxis], **kwargs)[0]
 
     def error_without_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_revove, **kwargs):
-        y_hat_sum_without_tree = y_hat_sum - (leaf_ys[:,:,tree_id_to_revove] * weights[:,tree_id_to_revove])
-        weights_without_tree = weights_sum - weights[:,tree_id_to_revove]
-        y_hat_avg = y_hat_sum_without_tree / weights_without_tree
-        y_hat_avg[np.isnan(y_hat_avg)] = 0
-        probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
-        probabilities[kwargs.get('classes') == y_hat_avg.argmax(axis=0)] = 1.0
-        error = np.mean(1.0 - y_hat_avg[kwargs.get('classes')].diagonal())
-        return error
+        return self.errors_without_trees(y_hat_sum, weights, weights_sum, leaf_ys, [tree_id_to_revove], **kwargs)[0]
 
     def error_with_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_add, **kwargs):
-        y_hat_sum_with_tree = y_hat_sum + (leaf_ys[:,:,tree_id_to_add] * weights[:,tree_id_to_add])
-        weights_with_tree = weights_sum + weights[:,tree_id_to_add]
-        y_hat_avg = y_hat_sum_with_tree / weights_with_tree
+        return self.errors_with_trees(y_hat_sum, weights, weights_sum, leaf_ys, [tree_id_to_add], **kwargs)[0]
+
+    def errors_without_trees(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_ids, **kwargs):
+        return self.errors_with_tree_changes(y_hat_sum, weights, weights_sum, leaf_ys, tree_ids, -1.0, **kwargs)
+
+    def errors_with_trees(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_ids, **kwargs):
+        return self.errors_with_tree_changes(y_hat_sum, weights, weights_sum, leaf_ys, tree_ids, 1.0, **kwargs)
+
+    # Error of adding (sign=1) or removing (sign=-1) each of tree_ids on its
+    # own.  The trees are scored a chunk at a time so the temporaries stay
+    # below max_chunk_elements (or one classes x datapoints prediction).
+    def errors_with_tree_changes(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_ids, sign, **kwargs):
+        tree_ids = np.asarray(tree_ids, dtype=np.int64)
+        errors = np.zeros(len(tree_ids))
+        chunk_size = max(1, self.max_chunk_elements // y_hat_sum.size)
+        for start in range(0, len(tree_ids), chunk_size):
+            chunk_tree_ids = tree_ids[start:start+chunk_size]
+            tree_weights = weights[:,chunk_tree_ids].T
+            y_hat_sums = y_hat_sum[np.newaxis] + sign * leaf_ys[:,:,chunk_tree_ids].transpose(2,0,1) * tree_weights[:,np.newaxis,:]
+            weights_sums = weights_sum[np.newaxis] + sign * tree_weights
+            errors[start:start+len(chunk_tree_ids)] = self.errors(y_hat_sums, weights_sums, **kwargs)
+        return errors
+
+    # Probability of the true class of each datapoint (k x datapoints)
+    def true_class_probabilities(self, y_hat_avg, classes):
+        return y_hat_avg[:, classes, np.arange(len(classes))]
+
+class ZeroOneClassificationError(IncrementalError):
+    def errors(self, y_hat_sums, weights_sums, **kwargs):
+        y_hat_avg = y_hat_sums / weights_sums[:,np.newaxis,:]
+        y_hat = y_hat_avg.argmax(axis=1)
+        return np.mean(kwargs.get('classes') != y_hat, axis=1)
+
+class ProbOfErrorClassificationError(IncrementalError):
+    def errors(self, y_hat_sums, weights_sums, **kwargs):
+        y_hat_avg = y_hat_sums / weights_sums[:,np.newaxis,:]
         y_hat_avg[np.isnan(y_hat_avg)] = 0
-        probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
-        probabilities[kwargs.get('classes') == y_hat_avg.argmax(axis=0)] = 1.0
-        error = np.mean(1.0 - y_hat_avg[kwargs.get('classes')].diagonal())
-        return error
+        return 1.0 - np.mean(self.true_class_probabilities(y_hat_avg, kwargs.get('classes')), axis=1)
 
-class CrossEntropyError:
-    def y_hat_sum(self, tree_weights, oob_weights, leaf_ys, **kwargs):
-        weights = oob_weights * tree_weights
-        weighted_ys = weights * leaf_ys
-        y_hat_sum = weighted_ys.sum(axis=2) 
-        return y_hat_sum, weights, weights.sum(axis=1)
+# Probability of error that only counts misclassified datapoints
+class ProbOfErrorOnErrorClassificationError(IncrementalError):
+    def errors(self, y_hat_sums, weights_sums, **kwargs):
+        y_hat_avg = y_hat_sums / weights_sums[:,np.newaxis,:]
+        y_hat_avg[np.isnan(y_hat_avg)] = 0
+        probabilities = self.true_class_probabilities(y_hat_avg, kwargs.get('classes'))
+        probabilities[kwargs.get('classes') == y_hat_avg.argmax(axis=1)] = 1.0
+        return np.mean(1.0 - probabilities, axis=1)
 
-    def error(self, y_hat_sum, weights, weights_sum, leaf_ys, **kwargs):
-        y_hat_avg = y_hat_sum / weights_sum
+class CrossEntropyError(IncrementalError):
+    def errors(self, y_hat_sums, weights_sums, **kwargs):
+        y_hat_avg = y_hat_sums / weights_sums[:,np.newaxis,:]
         y_hat_avg[np.isnan(y_hat_avg)] = 0.001
-        y_hat_avg[y_hat_avg < 0.001] = 0.001
-        probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
-        error = np.mean(-np.log(probabilities))
-        return error
+        probabilities = self.true_class_probabilities(y_hat_avg, kwargs.get('classes'))
+        probabilities[probabilities < 0.001] = 0.001
+        return np.mean(-np.log(probabilities), axis=1)
 
-    def error_without_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_revove, **kwargs):
-        y_hat_sum_without_tree = y_hat_sum - (leaf_ys[:,:,tree_id_to_revove] * weights[:,tree_id_to_revove])
-        weights_without_tree = weights_sum - weights[:,tree_id_to_revove]
-        y_hat_avg = y_hat_sum_without_tree / weights_without_tree
-        y_hat_avg[np.isnan(y_hat_avg)] = 0.001
-        y_hat_avg[y_hat_avg < 0.001] = 0.001
-        probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
-        error = np.mean(-np.log(probabilities))
-        return error
-
-    def error_with_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_add, **kwargs):
-        y_hat_sum_with_tree = y_hat_sum + (leaf_ys[:,:,tree_id_to_add] * weights[:,tree_id_to_add])
-        weights_with_tree = weights_sum + weights[:,tree_id_to_add]
-        y_hat_avg = y_hat_sum_with_tree / weights_with_tree
-        y_hat_avg[np.isnan(y_hat_avg)] = 0.001
-        y_hat_avg[y_hat_avg < 0.001] = 0.001
-        probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
-        error = np.mean(-np.log(probabilities))
-        return error
-
-class MseRegressionError:
-    def y_hat_sum(self, tree_weights, oob_weights, leaf_ys, **kwargs):
-        weights = oob_weights * tree_weights
-        weighted_ys = weights * leaf_ys
-        y_hat_sum = weighted_ys.sum(axis=2) 
-        return y_hat_sum, weights, weights.sum(axis=1)
-
-    def error(self, y_hat_sum, weights, weights_sum, leaf_ys, **kwargs):
-        y_hat = y_hat_sum / weights_sum
-        error = np.mean((kwargs.get('y') - y_hat.T)**2)
-        return error
-
-    def error_without_tree(self, y_hat_sum, weights, weights_sum, leaf_ys, tree_id_to_revove, **kwargs):
-        y_hat_sum_without_tree = y_hat_sum - (leaf_ys[:,:,tree_id_to_revove] * weights[:,tree_id_to_revove])
-        weights_without_tree = weights_sum - weights[:,tree_id_to_revove]
-        y_hat = y_hat_sum_without_tree / weights_without_tree
-        error = np.mean((kwargs.get('y') - y_hat.T)**2)
-        return error
+class MseRegressionError(IncrementalError):
+    def errors(self, y_hat_sums, weights_sums, **kwargs):
+        y_hat = y_hat_sums / weights_sums[:,np.newaxis,:]
+        squared_errors = (kwargs.get('y').T[np.newaxis] - y_hat)**2
+        return squared_errors.reshape(len(squared_errors), -1).mean(axis=1)
 
 
 def greedy_prune(forest_predictor, error_calculator, backtrack_ratio=1.0, **kwargs):
@@ -145,38 +101,41 @@ def greedy_prune(forest_predictor, error_calculator, backtrack_ratio=1.0, **kwar
     tree_weights = np.ones(forest_size, dtype=np.float32)
     trees_pruned_in_order = []
 
-    # prune until removing a tree makes the oob error worse
-    continue_purning = True
-    while continue_purning:
-        y_hat_sum, weights, weights_sum = error_calculator.y_hat_sum(tree_weights=tree_weights, 
-                                                            oob_weights=oob_weights,
-                                                            leaf_ys=leaf_ys,
-                                                            **kwargs)
-
-        # Measure without new tree
-        best_forest_error = error_calculator.error(y_hat_sum=y_hat_sum, 
-                                                        weights=weights,
-                                                        weights_sum=weights_sum,
+    y_hat_sum, weights, weights_sum = error_calculator.y_hat_sum(tree_weights=tree_weights, 
+                                                        oob_weights=oob_weights,
                                                         leaf_ys=leaf_ys,
                                                         **kwargs)
+    best_forest_error = error_calculator.error(y_hat_sum=y_hat_sum, 
+                                                    weights=weights,
+                                                    weights_sum=weights_sum,
+                                                    leaf_ys=leaf_ys,
+                                                    **kwargs)
 
+    # prune until removing a tree makes the oob error worse
+    continue_purning = True
+    while continue_purning:
         # find the tree which being removed produces the least error
         tree_index_to_remove = -1
-        for tree_index in range(forest_size):
-            if tree_weights[tree_index] > 0:
-                error_without_tree_index = error_calculator.error_without_tree(y_hat_sum=y_hat_sum, 
-                                                                            weights=weights,
-                                                                            weights_sum=weights_sum,
-                                                                            leaf_ys=leaf_ys,
-                                                                            tree_id_to_revove=tree_index,
-                                                                            **kwargs)
-                if(error_without_tree_index < best_forest_error):
-                    tree_index_to_remove = tree_index
-                    best_forest_error = error_without_tree_index
+        candidate_tree_indices = np.flatnonzero(tree_weights > 0)
+        if len(candidate_tree_indices) > 0:
+            errors = error_calculator.errors_without_trees(y_hat_sum=y_hat_sum, 
+                                                            weights=weights,
+                                                            weights_sum=weights_sum,
+                                                            leaf_ys=leaf_ys,
+                                                            tree_ids=candidate_tree_indices,
+                                                            **kwargs)
+            errors[np.isnan(errors)] = np.inf
+            best_candidate = errors.argmin()
+            if(errors[best_candidate] < best_forest_error):
+                tree_index_to_remove = candidate_tree_indices[best_candidate]
+                best_forest_error = errors[best_candidate]
         if tree_index_to_remove != -1:
             # print('pruning %d - %f' % (tree_index_to_remove, best_forest_error))
             tree_weights[tree_index_to_remove] = 0
             trees_pruned_in_order.append(tree_index_to_remove)
+            y_hat_sum -= leaf_ys[:,:,tree_index_to_remove] * weights[:,tree_index_to_remove]
+            weights_sum -= weights[:,tree_index_to_remove]
+            weights[:,tree_index_to_remove] = 0
         else:
             continue_purning = False
 
@@ -211,39 +170,40 @@ def greedy_add(forest_predictor, error_calculator, backtrack_ratio=1.0, **kwargs
     tree_weights = np.zeros(forest_size, dtype=np.float32)
     trees_add_order = []
 
-    # prune until removing a tree makes the oob error worse
+    y_hat_sum, weights, weights_sum = error_calculator.y_hat_sum(tree_weights=tree_weights, 
+                                                        oob_weights=oob_weights,
+                                                        leaf_ys=leaf_ys,
+                                                        **kwargs)
+    best_forest_error = error_calculator.error(y_hat_sum=y_hat_sum, 
+                                                    weights=weights,
+                                                    weights_sum=weights_sum,
+                                                    leaf_ys=leaf_ys,
+                                                    **kwargs)
+
+    # add until adding a tree makes the oob error worse
     continue_adding = True
     while continue_adding:
-        y_hat_sum, weights, weights_sum = error_calculator.y_hat_sum(tree_weights=tree_weights, 
-                                                            oob_weights=oob_weights,
-                                                            leaf_ys=leaf_ys,
-                                                            **kwargs)
-
-        # Measure without new tree
-        best_forest_error = error_calculator.error(y_hat_sum=y_hat_sum, 
-                                                        weights=weights,
+        # find the tree which being added produces the least error
+        tree_index_to_add = -1
+        candidate_tree_indices = np.flatnonzero(tree_weights < 0.1)
+        if len(candidate_tree_indices) > 0:
+            errors = error_calculator.errors_with_trees(y_hat_sum=y_hat_sum, 
+                                                        weights=oob_weights,
                                                         weights_sum=weights_sum,
                                                         leaf_ys=leaf_ys,
+                                                        tree_ids=candidate_tree_indices,
                                                         **kwargs)
-
-        # find the tree which being removed produces the least error
-        tree_index_to_add = -1
-        for tree_index in range(forest_size):
-            if tree_weights[tree_index] < 0.1:
-                error_with_tree_index = error_calculator.error_with_tree(y_hat_sum=y_hat_sum, 
-                                                                            weights=oob_weights,
-                                                                            weights_sum=weights_sum,
-                                                                            leaf_ys=leaf_ys,
-                                                                            tree_id_to_add=tree_index,
-                                                                            **kwargs)
-                # print('tree error %d - %f - %f' % (tree_index, error_with_tree_index, best_forest_error))
-                if(error_with_tree_index < best_forest_error):
-                    tree_index_to_add = tree_index
-                    best_forest_error = error_with_tree_index
+            errors[np.isnan(errors)] = np.inf
+            best_candidate = errors.argmin()
+            if(errors[best_candidate] < best_forest_error):
+                tree_index_to_add = candidate_tree_indices[best_candidate]
+                best_forest_error = errors[best_candidate]
         if tree_index_to_add != -1:
             # print('adding %d - %f' % (tree_index_to_add, best_forest_error))
             tree_weights[tree_index_to_add] = 1
             trees_add_order.append(tree_index_to_add)
+            y_hat_sum += leaf_ys[:,:,tree_index_to_add] * oob_weights[:,tree_index_to_add]
+            weights_sum += oob_weights[:,tree_index_to_add]
         else:
             continue_adding = False
 
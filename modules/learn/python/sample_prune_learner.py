@@ -41,11 +41,21 @@ class SamplePruneWrapper:
             max_number_of_trees = all_kwargs['max_number_of_trees']
             del all_kwargs['max_number_of_trees']
 
-        batch_size = 1
+        number_of_jobs = 1
+        if 'number_of_jobs' in all_kwargs:
+            number_of_jobs = all_kwargs['number_of_jobs']
+            del all_kwargs['number_of_jobs']
+
+        # Number of learners (each with its own sampled parameters) that are
+        # learned concurrently over number_of_jobs
+        batch_size = number_of_jobs
         if 'batch_size' in all_kwargs:
-            batch_size = all_kwargs.get(batch_size)
+            batch_size = all_kwargs['batch_size']
             del all_kwargs['batch_size']
 
+        if number_of_jobs < 1 or batch_size < 1:
+            raise Exception("SamplePruneWrapper number_of_jobs=%s and batch_size=%s must be at least 1" % (str(number_of_jobs), str(batch_size)))
+
         use_all_trees = False
         if 'use_all_trees' in all_kwargs:
             use_all_trees = all_kwargs['use_all_trees']
@@ -65,43 +75,56 @@ class SamplePruneWrapper:
 
         while self.full_forest.GetNumberOfTrees() < max_number_of_trees:
 
-            for i in range(prune_period):
-                # if self.full_forest.GetNumberOfTrees() > burnined_in_period:
-                #     explore = not explore or included_params is None
-
-                # print self.full_forest.GetNumberOfTrees()
-                if explore:
-                    for (name, range_min, range_max, use_log_space) in parameter_ranges:
-                        all_kwargs[name] = int(np.random.uniform(range_min, range_max))
-                        parameter_ranges_values[name].append(all_kwargs[name])
-                        # print('explore %s - %d' % (name, all_kwargs[name]))
-                else: #exploit
-                    #sample from
-                    included_density = stats.gaussian_kde(included_params)
-                    if np.sum(excluded_trees_mask) > burnined_in_period:
-                        excluded_density = stats.gaussian_kde(excluded_params)
-                    reject = True
-                    while reject:
-                        sample = included_density.resample()[:,0].T
+            number_of_trees_to_learn = prune_period
+            while number_of_trees_to_learn > 0:
+                forest_learners = []
+                for i in range(min(batch_size, number_of_trees_to_learn)):
+                    # if self.full_forest.GetNumberOfTrees() > burnined_in_period:
+                    #     explore = not explore or included_params is None
+
+                    # print self.full_forest.GetNumberOfTrees()
+                    if explore:
+                        for (name, range_min, range_max, use_log_space) in parameter_ranges:
+                            all_kwargs[name] = int(np.random.uniform(range_min, range_max))
+                            parameter_ranges_values[name].append(all_kwargs[name])
+                            # print('explore %s - %d' % (name, all_kwargs[name]))
+                    else: #exploit
+                        #sample from
+                        included_density = stats.gaussian_kde(included_params)
                         if np.sum(excluded_trees_mask) > burnined_in_period:
-                            include_prob = included_density.evaluate(sample)
-                            exclude_prob = excluded_density.evaluate(sample)
-                            reject_rate = exclude_prob / (include_prob + exclude_prob)
-                        else:
-                            reject_rate = 0
-                        reject = np.random.uniform(0.0,1.0) < reject_rate
-                    for i in range(len(sample)):
-                        name = parameter_ranges[i][0]
-                        all_kwargs[name] = int(np.clip(sample[i], parameter_ranges[i][1], parameter_ranges[i][2]))
-                        parameter_ranges_values[name].append(all_kwargs[name])
-                        # print('exploit %s - %d' % (name, all_kwargs[name]))
-
-                # todo: support learning batches of trees
-                all_kwargs['number_of_trees'] = 1
-
-                learner = self.create_learner(**all_kwargs)
-                new_forest = learner.Learn(bufferCollection)
-                self.full_forest.AddForest(new_forest)
+                            excluded_density = stats.gaussian_kde(excluded_params)
+                        reject = True
+                        while reject:
+                            sample = included_density.resample()[:,0].T
+                            if np.sum(excluded_trees_mask) > burnined_in_period:
+                                include_prob = included_density.evaluate(sample)
+                                exclude_prob = excluded_density.evaluate(sample)
+                                reject_rate = exclude_prob / (include_prob + exclude_prob)
+                            else:
+                                reject_rate = 0
+                            reject = np.random.uniform(0.0,1.0) < reject_rate
+                        for j in range(len(sample)):
+                            name = parameter_ranges[j][0]
+                            all_kwargs[name] = int(np.clip(sample[j], parameter_ranges[j][1], parameter_ranges[j][2]))
+                            parameter_ranges_values[name].append(all_kwargs[name])
+                            # print('exploit %s - %d' % (name, all_kwargs[name]))
+
+                    all_kwargs['number_of_trees'] = 1
+                    all_kwargs['number_of_jobs'] = 1
+                    forest_learners.append(self.create_learner(**all_kwargs))
+
+                # Learn the whole batch on the same prepared data, one learner per job.
+                # Only ParallelForestLearners can be batched, others (ie tree_type
+                # online) are learned one after the other.
+                if all(isinstance(forest_learner, ParallelForestLearner) for forest_learner in forest_learners):
+                    batch_learner = ParallelForestLearnerBatch(number_of_jobs)
+                    for forest_learner in forest_learners:
+                        batch_learner.AddForestLearner(forest_learner)
+                    self.full_forest.AddForest(batch_learner.Learn(bufferCollection))
+                else:
+                    for forest_learner in forest_learners:
+                        self.full_forest.AddForest(forest_learner.Learn(bufferCollection))
+                number_of_trees_to_learn -= len(forest_learners)
 
             # prune forest
             predictor_wrapper = self.create_predictor(self.full_forest, **kwargs)
@@ -0,0 +1,80 @@
+import os
+import re
+
+import numpy as np
+
+
+class ShardedArray:
+    '''
+    The rows of an array split over .npy files.  Only the headers are read
+    up front, each shard is memory mapped when it is asked for.  It has the
+    shape of the concatenated array and a max that streams over the shards so
+    uber_create_learner can size the forest without loading the data.
+    '''
+    def __init__(self, filenames):
+        if not filenames:
+            raise Exception('ShardedArray needs at least one shard')
+        self.filenames = list(filenames)
+        shapes = [self.shard(i).shape for i in range(len(self.filenames))]
+        for shape in shapes:
+            if shape[1:] != shapes[0][1:]:
+                raise Exception('ShardedArray shards have different shapes %s and %s' % (str(shapes[0]), str(shape)))
+        self.shard_lengths = [shape[0] for shape in shapes]
+        self.shape = (sum(self.shard_lengths),) + shapes[0][1:]
+
+    def number_of_shards(self):
+        return len(self.filenames)
+
+    def shard(self, i):
+        return np.load(self.filenames[i], mmap_mode='r')
+
+    def max(self, axis=None, out=None):
+        if axis is not None or out is not None:
+            raise Exception('ShardedArray.max only reduces over all the elements')
+        return max(np.max(self.shard(i)) for i in range(self.number_of_shards()) if self.shard_lengths[i] > 0)
+
+    def min(self, axis=None, out=None):
+        if axis is not None or out is not None:
+            raise Exception('ShardedArray.min only reduces over all the elements')
+        return min(np.min(self.shard(i)) for i in range(self.number_of_shards()) if self.shard_lengths[i] > 0)
+
+
+class NpyShards:
+    '''
+    A directory of .npy shards, shard k of the array called name is
+    name_k.npy (ie x_0.npy, classes_0.npy, x_1.npy, classes_1.npy).  Every
+    array must have the same shards and shard k of each array must have the
+    same number of rows.
+
+    Iterating gives one dict of memory mapped arrays per shard, in order of k,
+    which can be passed as the data kwargs of a learner.  LearnerWrapper.fit_shards
+    feeds them to an online learner one at a time.
+    '''
+    shard_filename_pattern = re.compile(r'^(.+)_(\d+)\.npy$')
+
+    def __init__(self, directory):
+        filenames = {}
+        for filename in sorted(os.listdir(directory)):
+            match = self.shard_filename_pattern.match(filename)
+            if match is not None:
+                name, k = match.group(1), int(match.group(2))
+                filenames.setdefault(name, {})[k] = os.path.join(directory, filename)
+        if not filenames:
+            raise Exception('NpyShards found no name_k.npy files in %s' % directory)
+
+        shard_keys = sorted(filenames.values()[0].keys())
+        for name, shards in filenames.items():
+            if sorted(shards.keys()) != shard_keys:
+                raise Exception('NpyShards %s does not have the same shards as the other arrays' % name)
+
+        self.arrays = dict((name, ShardedArray([shards[k] for k in shard_keys])) for name, shards in filenames.items())
+        for name, array in self.arrays.items():
+            if array.shard_lengths != self.arrays.values()[0].shard_lengths:
+                raise Exception('NpyShards %s does not have the same number of rows per shard as the other arrays' % name)
+
+    def number_of_shards(self):
+        return self.arrays.values()[0].number_of_shards()
+
+    def __iter__(self):
+        for i in range(self.number_of_shards()):
+            yield dict((name, array.shard(i)) for name, array in self.arrays.items())
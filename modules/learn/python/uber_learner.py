@@ -11,6 +11,7 @@ import rftk.predict as predict
 import learn
 from utils import *
 from wrappers import *
+from shards import *
 from greedy_add_swap_learner import *
 from split_criteria import *
 
@@ -21,8 +22,21 @@ def make_uber_data_prepare(learner_kwargs):
 
         # add input data buffers
         data_type = learner_kwargs.get('data_type')
-        if data_type == 'matrix' or data_type == 'sparse_matrix':
-            bufferCollection.AddBuffer(buffers.X_FLOAT_DATA, kwargs['x'])
+        if data_type == 'matrix':
+            # Wrap memory mapped shards (see NpyShards) instead of copying them
+            x = kwargs['x']
+            if isinstance(x, np.memmap):
+                x = buffers.as_buffer(x, copy=False)
+            bufferCollection.AddBuffer(buffers.X_FLOAT_DATA, x)
+        elif data_type == 'sparse_matrix':
+            # The column index lets axis aligned features read a column in
+            # time proportional to its non zeros
+            x = kwargs['x']
+            if not buffers.is_buffer(x):
+                x = buffers.as_buffer(x)
+            if not x.HasColumnIndex():
+                x.BuildColumnIndex()
+            bufferCollection.AddBuffer(buffers.X_FLOAT_DATA, x)
         elif data_type == 'depth_image':
             bufferCollection.AddBuffer(buffers.DEPTH_IMAGES, kwargs['depth_images'])
             bufferCollection.AddBuffer(buffers.PIXEL_INDICES, kwargs['pixel_indices'])
@@ -134,6 +148,10 @@ def uber_create_learner(**kwargs):
     streams_type = pop_kwargs(kwargs, 'streams_type', unused_kwargs_keys, 'one_stream')
     feature_range = int(pop_kwargs(kwargs, 'feature_range', unused_kwargs_keys, 1)) #popping so feature range can be given to all configs
 
+    # Only the online learner keeps learning from one shard to the next
+    if isinstance(kwargs.get('x'), ShardedArray) and tree_type != 'online':
+        raise Exception("sharded data needs tree_type online, %s learns from all the data at once" % tree_type)
+
     selector_type_default = 'best_valid'
     if tree_type == 'online':
         selector_type_default = 'only_best'
@@ -280,6 +298,22 @@ def uber_create_learner(**kwargs):
     node_steps_init.append(feature_params_step)
     node_steps_update.append(feature_extractor_step)
 
+    # Sort each column once per tree and partition the sorted indices down the tree
+    presort = bool( pop_kwargs(kwargs, 'presort', unused_kwargs_keys, False) )
+    if presort:
+        if data_type != 'matrix' or extractor_type != 'axis_aligned' or tree_type == 'online':
+            raise Exception("presort requires data_type matrix, extractor_type axis_aligned and an offline tree_type")
+        if split_type not in ['all_midpoints', 'all_datapoints', 'all_uniform_at_gap'] or streams_type != 'one_stream':
+            raise Exception("presort requires an all_* split_type and one_stream")
+        assert('in_bounds_number_of_points' not in kwargs)
+        assert('number_of_splitpoint_samples' not in kwargs)
+        presort_step = matrix_features.PresortColumnsStep_f32i32(buffers.X_FLOAT_DATA, sample_data_step.IndicesBufferId)
+        tree_steps.append(presort_step)
+        slice_sorted_indices_step = matrix_features.SliceInt32MatrixFromAxisAlignedFeaturesStep_Default(presort_step.SortedIndicesBufferId,
+                                                                                                        feature_params_step.IntParamsBufferId)
+        node_steps_update.append(slice_sorted_indices_step)
+        split_steps_list.append(splitpoints.SplitSortedIndices_f32i32(presort_step.SortedIndicesBufferId))
+
     # Slice weights for datapoints in the node
     slice_weights_step = pipeline.SliceFloat32VectorBufferStep_i32(sample_data_step.WeightsBufferId, sample_data_step.IndicesBufferId)
     node_steps_update.append(slice_weights_step)
@@ -332,30 +366,45 @@ def uber_create_learner(**kwargs):
 
         if prediction_type == 'classification':
             if streams_type == 'one_stream':
-                impurity_walker = classification.ClassInfoGainWalker_f32i32(slice_weights_step.SlicedBufferId,
-                                                                                  slice_ys_step.SlicedBufferId,
-                                                                                  number_of_classes)
+                # The incremental walker updates the entropy in constant time per sample (for many classes)
+                if bool( pop_kwargs(kwargs, 'incremental_info_gain', unused_kwargs_keys, False) ):
+                    impurity_walker = classification.ClassInfoGainIncrementalWalker_f32i32(slice_weights_step.SlicedBufferId,
+                                                                                      slice_ys_step.SlicedBufferId,
+                                                                                      number_of_classes)
+                    best_splitpoints_step_type = classification.ClassInfoGainIncrementalBestSplitpointsWalkingSortedStep_f32i32
+                    down_sample_best_splitpoints_step_type = classification.ClassInfoGainIncrementalDownSampleBestSplitpointsWalkingSortedStep_f32i32
+                else:
+                    impurity_walker = classification.ClassInfoGainWalker_f32i32(slice_weights_step.SlicedBufferId,
+                                                                                      slice_ys_step.SlicedBufferId,
+                                                                                      number_of_classes)
+                    best_splitpoints_step_type = classification.ClassInfoGainBestSplitpointsWalkingSortedStep_f32i32
+                    down_sample_best_splitpoints_step_type = classification.ClassInfoGainDownSampleBestSplitpointsWalkingSortedStep_f32i32
                 if 'in_bounds_number_of_points' in kwargs:
                     assert('number_of_splitpoint_samples' not in kwargs)
                     in_bounds_number_of_points = int(pop_kwargs(kwargs, 
                                                 'in_bounds_number_of_points', 
                                                 unused_kwargs_keys, 
                                                 number_of_datapoints / 2))
-                    best_splitpoint_step = classification.ClassInfoGainBestSplitpointsWalkingSortedStep_f32i32(impurity_walker,
+                    best_splitpoint_step = best_splitpoints_step_type(impurity_walker,
                                                                                         feature_extractor_step.FeatureValuesBufferId,
                                                                                         feature_ordering,
                                                                                         splitpoint_location,
                                                                                         in_bounds_number_of_points)
                 elif 'number_of_splitpoint_samples' in kwargs:
                     number_of_splitpoint_samples = int(pop_kwargs(kwargs, 'number_of_splitpoint_samples', unused_kwargs_keys))
-                    best_splitpoint_step = classification.ClassInfoGainDownSampleBestSplitpointsWalkingSortedStep_f32i32(impurity_walker,
+                    best_splitpoint_step = down_sample_best_splitpoints_step_type(impurity_walker,
                                                                     feature_extractor_step.FeatureValuesBufferId,
                                                                     feature_ordering,
                                                                     splitpoint_location,
                                                                     number_of_splitpoint_samples)
-
+                elif presort:
+                    best_splitpoint_step = best_splitpoints_step_type(impurity_walker,
+                                                                                        feature_extractor_step.FeatureValuesBufferId,
+                                                                                        feature_ordering,
+                                                                                        splitpoint_location,
+                                                                                        slice_sorted_indices_step.SlicedBufferId)
                 else:
-                    best_splitpoint_step = classification.ClassInfoGainBestSplitpointsWalkingSortedStep_f32i32(impurity_walker,
+                    best_splitpoint_step = best_splitpoints_step_type(impurity_walker,
                                                                                         feature_extractor_step.FeatureValuesBufferId,
                                                                                         feature_ordering,
                                                                                         splitpoint_location)
@@ -407,7 +456,12 @@ def uber_create_learner(**kwargs):
                                                                     feature_ordering,
                                                                     splitpoint_location,
                                                                     number_of_splitpoint_samples)
-
+                elif presort:
+                    best_splitpoint_step = regression.SumOfVarianceBestSplitpointsWalkingSortedStep_f32i32(impurity_walker,
+                                                                                        feature_extractor_step.FeatureValuesBufferId,
+                                                                                        feature_ordering,
+                                                                                        splitpoint_location,
+                                                                                        slice_sorted_indices_step.SlicedBufferId)
                 else:
                     best_splitpoint_step = regression.SumOfVarianceBestSplitpointsWalkingSortedStep_f32i32(impurity_walker,
                                                                                         feature_extractor_step.FeatureValuesBufferId,
@@ -634,6 +688,67 @@ def uber_create_learner(**kwargs):
         else:
             raise Exception("unknown constant_splitpoints_type %s" % streams_type)
 
+    elif split_type == 'histogram':
+        if data_type != 'matrix' or extractor_type != 'axis_aligned' or tree_type == 'online':
+            raise Exception("histogram split_type requires data_type matrix, extractor_type axis_aligned and an offline tree_type")
+        if streams_type != 'one_stream':
+            raise Exception("histogram split_type requires one_stream")
+        number_of_bins = int(pop_kwargs(kwargs, 'number_of_bins', unused_kwargs_keys, 255))
+        if number_of_bins > 256:
+            raise Exception("histogram split_type supports at most 256 bins")
+
+        # Quantize each column once per tree and use the bin edges of the node features as splitpoints,
+        # the nodes read the bins of their datapoints from the codes of the tree
+        histogram_bins_step = matrix_features.HistogramBinsStep_f32i32(buffers.X_FLOAT_DATA, sample_data_step.IndicesBufferId, number_of_bins)
+        tree_steps.append(histogram_bins_step)
+        slice_bin_edges_step = matrix_features.SliceFloatMatrixFromAxisAlignedFeaturesStep_Default(histogram_bins_step.BinEdgesBufferId,
+                                                                                                  feature_params_step.IntParamsBufferId)
+        slice_bin_edges_counts_step = matrix_features.SliceInt32VectorFromAxisAlignedFeaturesStep_Default(histogram_bins_step.BinEdgesCountsBufferId,
+                                                                                                          feature_params_step.IntParamsBufferId)
+        node_steps_update.append(slice_bin_edges_step)
+        node_steps_update.append(slice_bin_edges_counts_step)
+
+        # Accumulate stats per bin and reuse the splitpoint impurities
+        if prediction_type == 'classification':
+            class_stats_updater = classification.ClassStatsUpdater_f32i32(slice_weights_step.SlicedBufferId,
+                                                                          slice_ys_step.SlicedBufferId,
+                                                                          number_of_classes)
+            histogram_split_stats_step = classification.ClassStatsUpdaterHistogramStep_f32i32(slice_bin_edges_step.SlicedBufferId,
+                                                                                  slice_bin_edges_counts_step.SlicedBufferId,
+                                                                                  histogram_bins_step.BinCodesBufferId,
+                                                                                  sample_data_step.IndicesBufferId,
+                                                                                  feature_params_step.IntParamsBufferId,
+                                                                                  class_stats_updater)
+            impurity_step = classification.ClassInfoGainSplitpointsImpurity_f32i32(slice_bin_edges_counts_step.SlicedBufferId,
+                                                                                  histogram_split_stats_step.ChildCountsBufferId,
+                                                                                  histogram_split_stats_step.LeftStatsBufferId,
+                                                                                  histogram_split_stats_step.RightStatsBufferId)
+        elif prediction_type == 'regression':
+            mean_variance_stats_updater = regression.MeanVarianceStatsUpdater_f32i32(slice_weights_step.SlicedBufferId,
+                                                                                      slice_ys_step.SlicedBufferId,
+                                                                                      dimension_of_y)
+            histogram_split_stats_step = regression.SumOfVarianceHistogramStep_f32i32(slice_bin_edges_step.SlicedBufferId,
+                                                                                  slice_bin_edges_counts_step.SlicedBufferId,
+                                                                                  histogram_bins_step.BinCodesBufferId,
+                                                                                  sample_data_step.IndicesBufferId,
+                                                                                  feature_params_step.IntParamsBufferId,
+                                                                                  mean_variance_stats_updater)
+            impurity_step = regression.SumOfVarianceSplitpointsImpurity_f32i32(slice_bin_edges_counts_step.SlicedBufferId,
+                                                                                  histogram_split_stats_step.ChildCountsBufferId,
+                                                                                  histogram_split_stats_step.LeftStatsBufferId,
+                                                                                  histogram_split_stats_step.RightStatsBufferId)
+        else:
+            raise Exception("unknown prediction_type %s" % prediction_type)
+
+        impurity_buffer = impurity_step.ImpurityBufferId
+        splitpoint_buffer = slice_bin_edges_step.SlicedBufferId
+        splitpoint_counts_buffer = slice_bin_edges_counts_step.SlicedBufferId
+        child_count_buffer = histogram_split_stats_step.ChildCountsBufferId
+        left_estimator_buffer = histogram_split_stats_step.LeftStatsBufferId
+        right_estimator_buffer = histogram_split_stats_step.RightStatsBufferId
+        node_steps_update.append(histogram_split_stats_step)
+        node_steps_impurity.append(impurity_step)
+
     else:
         raise Exception("unknown split_type %s" % split_type)
 
@@ -658,7 +773,10 @@ def uber_create_learner(**kwargs):
     try_split_criteria = create_try_split_criteria(unused_kwargs_keys=unused_kwargs_keys, **kwargs)
     should_split_criteria = create_should_split_criteria(unused_kwargs_keys=unused_kwargs_keys, **kwargs)
 
-    split_indices = splitpoints.SplitIndices_f32i32(sample_data_step.IndicesBufferId)
+    if tree_type == 'depth_first':
+        split_indices = splitpoints.SplitPartitionIndices_f32i32(sample_data_step.IndicesBufferId)
+    else:
+        split_indices = splitpoints.SplitIndices_f32i32(sample_data_step.IndicesBufferId)
     split_steps_list.append(split_indices)
     split_steps = splitpoints.SplitBuffersList(split_steps_list)
 
@@ -669,8 +787,11 @@ def uber_create_learner(**kwargs):
 
     number_of_trees = int( pop_kwargs(kwargs, 'number_of_trees', unused_kwargs_keys) )
     number_of_jobs = int( pop_kwargs(kwargs, 'number_of_jobs', unused_kwargs_keys, 1) )
+    if number_of_jobs < 1:
+        raise Exception("number_of_jobs %d must be at least 1" % number_of_jobs)
     if tree_type == 'depth_first':
         tree_learner = learn.DepthFirstTreeLearner_f32i32(try_split_criteria, tree_steps_pipeline, node_steps_pipeline, split_selector)
+        tree_learner.SetNumberOfJobs( int( pop_kwargs(kwargs, 'number_of_jobs_per_tree', unused_kwargs_keys, 1) ) )
         forest_learner = learn.ParallelForestLearner(tree_learner, forest_steps_pipeline, number_of_trees, y_estimator_dimension, number_of_jobs)
     elif tree_type == 'breadth_first':
         number_of_leaves, is_default = get_number_of_leaves(kwargs, unused_kwargs_keys, number_of_datapoints)
@@ -678,6 +799,9 @@ def uber_create_learner(**kwargs):
             tree_learner = learn.BreadthFirstTreeLearner_f32i32(try_split_criteria, tree_steps_pipeline, node_steps_pipeline, split_selector)
         else:
             tree_learner = learn.BreadthFirstTreeLearner_f32i32(try_split_criteria, tree_steps_pipeline, node_steps_pipeline, split_selector, number_of_leaves)
+        # number_of_jobs_per_tree is only used when learning a level at a time
+        tree_learner.SetLearnLevels( bool( pop_kwargs(kwargs, 'learn_levels', unused_kwargs_keys, False) ) )
+        tree_learner.SetNumberOfJobs( int( pop_kwargs(kwargs, 'number_of_jobs_per_tree', unused_kwargs_keys, 1) ) )
         forest_learner = learn.ParallelForestLearner(tree_learner, forest_steps_pipeline, number_of_trees, y_estimator_dimension, number_of_jobs)
     elif tree_type == 'biau2008':
         number_of_leaves, is_default = get_number_of_leaves(kwargs, unused_kwargs_keys, number_of_datapoints)
@@ -687,6 +811,9 @@ def uber_create_learner(**kwargs):
     elif tree_type == 'online':
         max_frontier_size = int(pop_kwargs(kwargs, 'max_frontier_size', unused_kwargs_keys, 10000000))
         impurity_update_period = int(pop_kwargs(kwargs, 'impurity_update_period', unused_kwargs_keys, 1))
+        batch_size = int(pop_kwargs(kwargs, 'batch_size', unused_kwargs_keys, 1))
+        if batch_size < 1:
+            raise Exception("online batch_size %d must be at least 1" % batch_size)
 
         node_steps_init_pipeline = pipeline.Pipeline(node_steps_init)
         node_steps_update_pipeline = pipeline.Pipeline(node_steps_update)
@@ -779,6 +906,13 @@ def uber_create_learner(**kwargs):
     else:
         raise Exception("unknown tree_type")
 
+    if tree_type == 'online':
+        forest_learner.SetBatchSize(batch_size)
+        forest_learner.SetNumberOfJobs(number_of_jobs)
+
+    if tree_type != 'online' and 'seed' in kwargs:
+        forest_learner.SetSeed(int(pop_kwargs(kwargs, 'seed', unused_kwargs_keys)))
+
     if unused_kwargs_keys:
         raise Exception("The following arguments were not used. You have a typo or an invalid config %s" % (str(unused_kwargs_keys)))
 
@@ -1,3 +1,4 @@
+import numpy as np
 import rftk.buffers as buffers
 
 class LearnerWrapper:
@@ -17,15 +18,34 @@ class LearnerWrapper:
         forest_predictor_wrapper = self.create_predictor(forest, **kwargs)
         return forest_predictor_wrapper
 
+    # Learns from one shard of NpyShards at a time so the data never has to
+    # fit in memory.  Only online learners keep learning across calls to Learn.
+    def fit_shards(self, shards, **kwargs):
+        if self.learner is None:
+            all_kwargs = dict(self.init_kwargs.items() + shards.arrays.items() + kwargs.items())
+            self.learner = self.create_learner(**all_kwargs)
+        for shard in shards:
+            bufferCollection = self.prepare_data(**dict(kwargs.items() + shard.items()))
+            forest = self.learner.Learn(bufferCollection)
+        forest_predictor_wrapper = self.create_predictor(forest, **kwargs)
+        return forest_predictor_wrapper
+
 
 class PredictorWrapper_32f:
     def __init__(self, forest_predictor, prepare_data):
         self.forest_predictor = forest_predictor
         self.prepare_data = prepare_data
+        # id(x) -> (x, leafs of every tree for x)
+        self.leafs_cache = {}
+
+    def set_number_of_jobs(self, **kwargs):
+        if 'number_of_jobs' in kwargs:
+            self.forest_predictor.SetNumberOfJobs(int(kwargs.get('number_of_jobs')))
 
     def predict(self, **kwargs):
         result = buffers.Float32MatrixBuffer()
         bufferCollection = self.prepare_data(**kwargs)
+        self.set_number_of_jobs(**kwargs)
         if 'tree_weights' in kwargs:
             tree_weights = kwargs.get('tree_weights')
             self.forest_predictor.PredictYs(bufferCollection, tree_weights, result)
@@ -36,6 +56,7 @@ class PredictorWrapper_32f:
     def predict_oob(self, **kwargs):
         result = buffers.Float32MatrixBuffer()
         bufferCollection = self.prepare_data(**kwargs)
+        self.set_number_of_jobs(**kwargs)
         if 'leafs' in kwargs:
             leafs = kwargs.get('leafs')
             tree_weights = kwargs.get('tree_weights')
@@ -50,9 +71,30 @@ class PredictorWrapper_32f:
     def predict_leafs(self, **kwargs):
         leafs = buffers.Int32MatrixBuffer()
         bufferCollection = self.prepare_data(**kwargs)
+        self.set_number_of_jobs(**kwargs)
         self.forest_predictor.PredictLeafs(bufferCollection, leafs)
         return leafs
 
+    # Leafs of every tree for the datapoints in x like predict_leafs, but the
+    # leafs are cached per x so only the trees added since the last call are
+    # walked.  Pass the result as the leafs of predict or predict_oob to
+    # rescore with different tree weights without walking the trees.
+    def predict_leafs_cached(self, **kwargs):
+        x = kwargs.get('x')
+        cached_x, leafs = self.leafs_cache.get(id(x), (None, None))
+        if cached_x is not x:
+            leafs = None
+        number_of_cached_trees = leafs.shape[1] if leafs is not None else 0
+        if number_of_cached_trees < self.forest_predictor.GetNumberOfTrees():
+            new_leafs = buffers.Int32MatrixBuffer()
+            bufferCollection = self.prepare_data(**kwargs)
+            self.set_number_of_jobs(**kwargs)
+            self.forest_predictor.PredictLeafs(bufferCollection, number_of_cached_trees, new_leafs)
+            new_leafs = buffers.as_numpy_array(new_leafs)
+            leafs = np.hstack([leafs, new_leafs]) if leafs is not None else new_leafs
+            self.leafs_cache[id(x)] = (x, leafs)
+        return buffers.as_matrix_buffer(np.array(leafs, dtype=np.int32))
+
     def predict_leafs_ys(self, **kwargs):
         oob_weights = buffers.Float32MatrixBuffer()
         leaf_ys = buffers.Float32Tensor3Buffer()
@@ -70,4 +112,12 @@ class PredictorWrapper_32f:
         return self.forest_predictor.GetForest()
 
     def set_forest(self, forest):
+        self.leafs_cache = {}
         return self.forest_predictor.SetForest(forest)
+
+    # Keeps the cached leafs of the other trees
+    def remove_tree(self, tree_index):
+        self.forest_predictor.RemoveTree(tree_index)
+        for key, (x, leafs) in self.leafs_cache.items():
+            if tree_index < leafs.shape[1]:
+                self.leafs_cache[key] = (x, np.delete(leafs, tree_index, axis=1))
@@ -1,12 +1,18 @@
 #include "BufferTypes.h"
 #include "CreateDepthFirstLearner.h"
 #include "SplitBuffersIndices.h"
+#include "SplitBuffersPartitionIndices.h"
+#include "SplitBuffersSortedIndices.h"
+#include "SplitBuffersList.h"
 
-DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollectionKey_t xs_key, 
-                                                          BufferCollectionKey_t classes_key, 
-                                                          int numberOfClasses, 
-                                                          FeatureValueOrdering featureOrdering, 
-                                                          double minNodeSize)
+template<class TreeLearner>
+TreeLearner CreateTreeLearner( BufferCollectionKey_t xs_key,
+                               BufferCollectionKey_t classes_key,
+                               int numberOfClasses,
+                               FeatureValueOrdering featureOrdering,
+                               double minNodeSize,
+                               bool presort,
+                               bool partitionIndices)
 {
     // Don't try split if size is above a minimum
     MinNodeSizeCriteria trySplitCriteria(minNodeSize);
@@ -18,6 +24,11 @@ DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollecti
     VectorBufferTemplate<int> numberOfFeaturesBuffer = CreateVector1<int>(2);
     SetBufferStep< VectorBufferTemplate<int> > numberOfFeatures( numberOfFeaturesBuffer, WHEN_NEW );
     treeSteps.push_back(&numberOfFeatures);
+    PresortColumnsStep<CdflBufferTypes_t, MatrixBufferTemplate<CdflBufferTypes_t::SourceContinuous > > presortColumns(xs_key, allSamplesStep.IndicesBufferId);
+    if(presort)
+    {
+        treeSteps.push_back(&presortColumns);
+    }
     Pipeline treeStepsPipeline(treeSteps);
 
     // Node steps
@@ -31,6 +42,12 @@ DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollecti
     FeatureExtractorStep< LinearMatrixFeature<CdflBufferTypes_t, MatrixBufferTemplate<CdflBufferTypes_t::SourceContinuous > > > featureExtractor(feature, 
                                                                                                                                 featureOrdering);
     nodeSteps.push_back(&featureExtractor);
+    SliceAxisAlignedFeaturesStep<CdflBufferTypes_t, MatrixBufferTemplate<CdflBufferTypes_t::Index> > sliceSortedIndices(presortColumns.SortedIndicesBufferId,
+                                                                                                            featureParams.IntParamsBufferId);
+    if(presort)
+    {
+        nodeSteps.push_back(&sliceSortedIndices);
+    }
     SliceBufferStep< CdflBufferTypes_t, VectorBufferTemplate<int> > sliceClasses(classes_key, allSamplesStep.IndicesBufferId);
     nodeSteps.push_back(&sliceClasses);
     SliceBufferStep< CdflBufferTypes_t, VectorBufferTemplate<float> > sliceWeights(allSamplesStep.WeightsBufferId, allSamplesStep.IndicesBufferId);  
@@ -39,7 +56,8 @@ DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollecti
     BestSplitpointsWalkingSortedStep< ClassInfoGainWalker<CdflBufferTypes_t> > bestSplitpointStep(classInfoGainWalker, 
                                                                                             featureExtractor.FeatureValuesBufferId,
                                                                                             featureOrdering,
-                                                                                            AT_MIDPOINT);
+                                                                                            AT_MIDPOINT,
+                                                                                            presort ? sliceSortedIndices.SlicedBufferId : BufferId(NullKey));
     nodeSteps.push_back(&bestSplitpointStep); 
     Pipeline nodeStepsPipeline(nodeSteps);
 
@@ -59,7 +77,45 @@ DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollecti
     const MinImpurityCriteria minImpurityCriteria(0.0);
     ClassEstimatorFinalizer<CdflBufferTypes_t> classFinalizer;
     SplitBuffersIndices<CdflBufferTypes_t> splitIndices(allSamplesStep.IndicesBufferId);
-    SplitSelector<CdflBufferTypes_t> splitSelector(splitBuffers, &minImpurityCriteria, &classFinalizer, &splitIndices);
+    SplitBuffersPartitionIndices<CdflBufferTypes_t> splitPartitionIndices(allSamplesStep.IndicesBufferId);
+    SplitBuffersSortedIndices<CdflBufferTypes_t> splitSortedIndices(presortColumns.SortedIndicesBufferId);
+    std::vector<SplitBuffersI*> splitters;
+    if(presort)
+    {
+        splitters.push_back(&splitSortedIndices);
+    }
+    if(partitionIndices)
+    {
+        splitters.push_back(&splitPartitionIndices);
+    }
+    else
+    {
+        splitters.push_back(&splitIndices);
+    }
+    SplitBuffersList splitList(splitters);
+    SplitSelector<CdflBufferTypes_t> splitSelector(splitBuffers, &minImpurityCriteria, &classFinalizer, &splitList);
     
-    return DepthFirstTreeLearner<CdflBufferTypes_t>(&trySplitCriteria, &treeStepsPipeline, &nodeStepsPipeline, &splitSelector);
+    return TreeLearner(&trySplitCriteria, &treeStepsPipeline, &nodeStepsPipeline, &splitSelector);
+}
+
+DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollectionKey_t xs_key, 
+                                                          BufferCollectionKey_t classes_key, 
+                                                          int numberOfClasses, 
+                                                          FeatureValueOrdering featureOrdering, 
+                                                          double minNodeSize,
+                                                          bool presort,
+                                                          bool partitionIndices)
+{
+    return CreateTreeLearner< DepthFirstTreeLearner<CdflBufferTypes_t> >(xs_key, classes_key, numberOfClasses, featureOrdering,
+                                                                         minNodeSize, presort, partitionIndices);
+}
+
+BreadthFirstTreeLearner<CdflBufferTypes_t> CreateBreadthFirstLearner( BufferCollectionKey_t xs_key,
+                                                          BufferCollectionKey_t classes_key,
+                                                          int numberOfClasses,
+                                                          FeatureValueOrdering featureOrdering,
+                                                          double minNodeSize)
+{
+    return CreateTreeLearner< BreadthFirstTreeLearner<CdflBufferTypes_t> >(xs_key, classes_key, numberOfClasses, featureOrdering,
+                                                                           minNodeSize, false, false);
 }
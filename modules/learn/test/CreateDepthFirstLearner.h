@@ -19,6 +19,8 @@
 #include "FeatureExtractorStep.h"
 #include "ClassInfoGainWalker.h"
 #include "BestSplitpointsWalkingSortedStep.h"
+#include "PresortColumnsStep.h"
+#include "SliceAxisAlignedFeaturesStep.h"
 #include "Pipeline.h"
 
 #include "MinImpurityCriteria.h"
@@ -26,6 +28,7 @@
 #include "SplitSelector.h"
 
 #include "DepthFirstTreeLearner.h"
+#include "BreadthFirstTreeLearner.h"
 #include "Tree.h"
 
 typedef SinglePrecisionBufferTypes CdflBufferTypes_t;
@@ -92,4 +95,12 @@ DepthFirstTreeLearner<CdflBufferTypes_t> CreateDepthFirstLearner( BufferCollecti
                                                           BufferCollectionKey_t classes_key, 
                                                           int numberOfClasses, 
                                                           FeatureValueOrdering featureOrdering, 
-                                                          double minNodeSize);
\ No newline at end of file
+                                                          double minNodeSize,
+                                                          bool presort=false,
+                                                          bool partitionIndices=false);
+
+BreadthFirstTreeLearner<CdflBufferTypes_t> CreateBreadthFirstLearner( BufferCollectionKey_t xs_key,
+                                                          BufferCollectionKey_t classes_key,
+                                                          int numberOfClasses,
+                                                          FeatureValueOrdering featureOrdering,
+                                                          double minNodeSize);
@@ -0,0 +1,116 @@
+#include "CreateOnlineForestLearner.h"
+
+#include <vector>
+
+#include "PipelineStepI.h"
+#include "Pipeline.h"
+#include "AllSamplesStep.h"
+#include "SetBufferStep.h"
+#include "SliceBufferStep.h"
+#include "AxisAlignedParamsStep.h"
+#include "FeatureExtractorStep.h"
+#include "RandomSplitpointsStep.h"
+#include "SplitpointStatsStep.h"
+#include "SplitpointsImpurity.h"
+#include "ClassStatsUpdater.h"
+#include "ClassInfoGainImpurity.h"
+#include "ClassEstimatorFinalizer.h"
+#include "MaxDepthCriteria.h"
+#include "MinImpurityCriteria.h"
+#include "MinChildSizeCriteria.h"
+#include "ShouldSplitCombinedCriteria.h"
+#include "SplitBuffersIndices.h"
+#include "WaitForBestSplitSelector.h"
+
+OnlineForestLearner_t* CreateOnlineForestLearner( BufferCollectionKey_t xs_key,
+                                                  BufferCollectionKey_t classes_key,
+                                                  int numberOfClasses,
+                                                  int numberOfTrees,
+                                                  int maxDepth,
+                                                  int minChildSize,
+                                                  int maxFrontierSize )
+{
+    typedef MatrixBufferTemplate<OflBufferTypes_t::SourceContinuous> Matrix_t;
+    typedef LinearMatrixFeature<OflBufferTypes_t, Matrix_t> Feature_t;
+    const FeatureValueOrdering featureOrdering = FEATURES_BY_DATAPOINTS;
+
+    MaxDepthCriteria trySplitCriteria(maxDepth);
+
+    // Tree steps
+    std::vector<PipelineStepI*> treeSteps;
+    AllSamplesStep<OflBufferTypes_t, Matrix_t> allSamplesStep(xs_key);
+    treeSteps.push_back(&allSamplesStep);
+    int numberOfFeaturesData[] = {2};
+    SetBufferStep< VectorBufferTemplate<int> > numberOfFeatures( VectorBufferTemplate<int>(&numberOfFeaturesData[0], 1), WHEN_NEW );
+    treeSteps.push_back(&numberOfFeatures);
+    Pipeline treeStepsPipeline(treeSteps);
+
+    // Node steps
+    std::vector<PipelineStepI*> initSteps;
+    AxisAlignedParamsStep<OflBufferTypes_t, Matrix_t> featureParams(numberOfFeatures.OutputBufferId, xs_key);
+    initSteps.push_back(&featureParams);
+    Pipeline initStepsPipeline(initSteps);
+
+    std::vector<PipelineStepI*> updateSteps;
+    Feature_t feature(featureParams.FloatParamsBufferId, featureParams.IntParamsBufferId, allSamplesStep.IndicesBufferId, xs_key);
+    FeatureExtractorStep<Feature_t> featureExtractor(feature, featureOrdering);
+    updateSteps.push_back(&featureExtractor);
+    SliceBufferStep< OflBufferTypes_t, VectorBufferTemplate<int> > sliceClasses(classes_key, allSamplesStep.IndicesBufferId);
+    updateSteps.push_back(&sliceClasses);
+    SliceBufferStep< OflBufferTypes_t, VectorBufferTemplate<float> > sliceWeights(allSamplesStep.WeightsBufferId, allSamplesStep.IndicesBufferId);
+    updateSteps.push_back(&sliceWeights);
+    RandomSplitpointsStep<OflBufferTypes_t> splitpointsStep(featureExtractor.FeatureValuesBufferId, 5, featureOrdering);
+    updateSteps.push_back(&splitpointsStep);
+    ClassStatsUpdater<OflBufferTypes_t> classStatsUpdater(sliceWeights.SlicedBufferId, sliceClasses.SlicedBufferId, numberOfClasses);
+    SplitpointStatsStep< ClassStatsUpdater<OflBufferTypes_t> > splitpointStats(splitpointsStep.SplitpointsBufferId,
+                                                                             splitpointsStep.SplitpointsCountsBufferId,
+                                                                             featureExtractor.FeatureValuesBufferId,
+                                                                             featureOrdering,
+                                                                             classStatsUpdater);
+    updateSteps.push_back(&splitpointStats);
+    Pipeline updateStepsPipeline(updateSteps);
+
+    std::vector<PipelineStepI*> impuritySteps;
+    SplitpointsImpurity< ClassInfoGainImpurity<OflBufferTypes_t> > impurity(splitpointsStep.SplitpointsCountsBufferId,
+                                                                          splitpointStats.ChildCountsBufferId,
+                                                                          splitpointStats.LeftStatsBufferId,
+                                                                          splitpointStats.RightStatsBufferId);
+    impuritySteps.push_back(&impurity);
+    Pipeline impurityStepsPipeline(impuritySteps);
+
+    // Split selector
+    std::vector<SplitSelectorBuffers> splitBuffers;
+    splitBuffers.push_back(SplitSelectorBuffers(impurity.ImpurityBufferId,
+                                                splitpointsStep.SplitpointsBufferId,
+                                                splitpointsStep.SplitpointsCountsBufferId,
+                                                splitpointStats.ChildCountsBufferId,
+                                                splitpointStats.LeftStatsBufferId,
+                                                splitpointStats.RightStatsBufferId,
+                                                featureParams.FloatParamsBufferId,
+                                                featureParams.IntParamsBufferId,
+                                                featureExtractor.FeatureValuesBufferId,
+                                                featureOrdering,
+                                                &featureExtractor));
+    MinImpurityCriteria minImpurityCriteria(0.0);
+    MinChildSizeCriteria minChildSizeCriteria(minChildSize);
+    std::vector<ShouldSplitCriteriaI*> shouldSplitCriterias;
+    shouldSplitCriterias.push_back(&minImpurityCriteria);
+    shouldSplitCriterias.push_back(&minChildSizeCriteria);
+    ShouldSplitCombinedCriteria shouldSplitCriteria(shouldSplitCriterias);
+    ClassEstimatorFinalizer<OflBufferTypes_t> classFinalizer;
+    SplitBuffersIndices<OflBufferTypes_t> splitIndices(allSamplesStep.IndicesBufferId);
+    WaitForBestSplitSelector<OflBufferTypes_t> splitSelector(splitBuffers, &shouldSplitCriteria, &classFinalizer, &splitIndices);
+
+    Feature_t predictFeature(allSamplesStep.IndicesBufferId, xs_key);
+    ClassEstimatorUpdater<OflBufferTypes_t> estimatorUpdater(allSamplesStep.WeightsBufferId, classes_key, numberOfClasses);
+
+    return new OnlineForestLearner_t(&trySplitCriteria,
+                                     &treeStepsPipeline,
+                                     &initStepsPipeline,
+                                     &updateStepsPipeline,
+                                     &impurityStepsPipeline,
+                                     1, &splitSelector,
+                                     maxFrontierSize, numberOfTrees, 3, 3, numberOfClasses,
+                                     allSamplesStep.IndicesBufferId, allSamplesStep.WeightsBufferId,
+                                     predictFeature, estimatorUpdater);
+}
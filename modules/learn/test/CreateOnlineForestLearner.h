@@ -0,0 +1,59 @@
+#pragma once
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "BufferTypes.h"
+#include "LinearMatrixFeature.h"
+#include "ClassEstimatorUpdater.h"
+#include "ClassProbabilityOfError.h"
+
+#include "OnlineForestLearner.h"
+
+typedef SinglePrecisionBufferTypes OflBufferTypes_t;
+typedef OnlineForestLearner< LinearMatrixFeature< OflBufferTypes_t, MatrixBufferTemplate<OflBufferTypes_t::SourceContinuous> >,
+                             ClassEstimatorUpdater< OflBufferTypes_t >,
+                             ClassProbabilityOfError< OflBufferTypes_t >,
+                             OflBufferTypes_t > OnlineForestLearner_t;
+
+// Two classes split by the sign of the first column, the second column is
+// noise.  The first column only has two values so whatever splitpoints are
+// sampled from it include one that separates the classes.
+struct OnlineForestLearnerFixture {
+    OnlineForestLearnerFixture()
+    : xs_key("xs")
+    , classes_key("classes")
+    , collection()
+    {
+        const int numberOfSamples = 200;
+        MatrixBufferTemplate<float> xs(numberOfSamples, 2);
+        VectorBufferTemplate<int> classes(numberOfSamples);
+        for(int i=0; i<numberOfSamples; i++)
+        {
+            const int classId = i % 2;
+            xs.Set(i, 0, classId == 0 ? -1.0f : 1.0f);
+            xs.Set(i, 1, static_cast<float>((i*37) % 11) - 5.0f);
+            classes.Set(i, classId);
+        }
+        collection.AddBuffer(xs_key, xs);
+        collection.AddBuffer(classes_key, classes);
+    }
+
+    ~OnlineForestLearnerFixture()
+    {
+    }
+
+    const BufferCollectionKey_t xs_key;
+    const BufferCollectionKey_t classes_key;
+    BufferCollection collection;
+};
+
+// Axis aligned online classification forest like uber_create_learner builds
+// with tree_type online, the caller owns the learner
+OnlineForestLearner_t* CreateOnlineForestLearner( BufferCollectionKey_t xs_key,
+                                                  BufferCollectionKey_t classes_key,
+                                                  int numberOfClasses,
+                                                  int numberOfTrees,
+                                                  int maxDepth,
+                                                  int minChildSize,
+                                                  int maxFrontierSize );
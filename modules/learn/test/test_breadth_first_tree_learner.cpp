@@ -0,0 +1,90 @@
+#include <boost/test/unit_test.hpp>
+
+#include "CreateDepthFirstLearner.h"
+
+void CheckTreeShape(const Tree& tree)
+{
+    BOOST_CHECK_EQUAL( tree.GetPath().GetM(), 7 );
+    float leafCounts = 0.0f;
+    int numberOfLeaves = 0;
+    for(int nodeIndex=0; nodeIndex<tree.GetPath().GetM(); nodeIndex++)
+    {
+        const int leftNodeIndex = tree.GetPath().Get(nodeIndex, 0);
+        const int rightNodeIndex = tree.GetPath().Get(nodeIndex, 1);
+        if( leftNodeIndex == NULL_CHILD )
+        {
+            leafCounts += tree.GetCounts().Get(nodeIndex);
+            numberOfLeaves++;
+        }
+        else
+        {
+            BOOST_CHECK( leftNodeIndex > nodeIndex && rightNodeIndex == leftNodeIndex+1 );
+            BOOST_CHECK_EQUAL( tree.GetDepths().Get(leftNodeIndex), tree.GetDepths().Get(nodeIndex)+1 );
+            BOOST_CHECK_EQUAL( tree.GetDepths().Get(rightNodeIndex), tree.GetDepths().Get(nodeIndex)+1 );
+        }
+    }
+    BOOST_CHECK_EQUAL( numberOfLeaves, 4 );
+    BOOST_CHECK_CLOSE( leafCounts, 10.0f, 0.1 );
+}
+
+BOOST_FIXTURE_TEST_SUITE( BreadthFirstTreeLearnerTests,  DepthFirstTreeLearnerFixture )
+
+BOOST_AUTO_TEST_CASE(test_Learn)
+{
+    BreadthFirstTreeLearner<CdflBufferTypes_t> breadthFirstTreeLearner = CreateBreadthFirstLearner(xs_key, classes_key, 4, FEATURES_BY_DATAPOINTS, 1.0);
+    Tree tree(1, 3, 3, 4 );
+    breadthFirstTreeLearner.Learn(stack, tree, 0);
+    tree.Compact();
+    CheckTreeShape(tree);
+}
+
+void CheckSameTree(const Tree& tree, const Tree& expectedTree)
+{
+    BOOST_CHECK( tree.GetPath() == expectedTree.GetPath() );
+    BOOST_CHECK( tree.GetIntFeatureParams() == expectedTree.GetIntFeatureParams() );
+    BOOST_CHECK( tree.GetFloatFeatureParams() == expectedTree.GetFloatFeatureParams() );
+    BOOST_CHECK( tree.GetCounts() == expectedTree.GetCounts() );
+    BOOST_CHECK( tree.GetYs() == expectedTree.GetYs() );
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_levels)
+{
+    BreadthFirstTreeLearner<CdflBufferTypes_t> breadthFirstTreeLearner = CreateBreadthFirstLearner(xs_key, classes_key, 4, FEATURES_BY_DATAPOINTS, 1.0);
+    breadthFirstTreeLearner.SetLearnLevels(true);
+    BOOST_CHECK( breadthFirstTreeLearner.GetLearnLevels() );
+    Tree oneJobTree(1, 3, 3, 4 );
+    breadthFirstTreeLearner.Learn(stack, oneJobTree, 0);
+    oneJobTree.Compact();
+    CheckTreeShape(oneJobTree);
+
+    // The tree does not depend on the number of threads
+    breadthFirstTreeLearner.SetNumberOfJobs(2);
+    Tree twoJobsTree(1, 3, 3, 4 );
+    breadthFirstTreeLearner.Learn(stack, twoJobsTree, 0);
+    twoJobsTree.Compact();
+    CheckSameTree(twoJobsTree, oneJobTree);
+
+    breadthFirstTreeLearner.SetNumberOfJobs(4);
+    Tree fourJobsTree(1, 3, 3, 4 );
+    breadthFirstTreeLearner.Learn(stack, fourJobsTree, 0);
+    fourJobsTree.Compact();
+    CheckSameTree(fourJobsTree, oneJobTree);
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_jobs_without_levels)
+{
+    BreadthFirstTreeLearner<CdflBufferTypes_t> breadthFirstTreeLearner = CreateBreadthFirstLearner(xs_key, classes_key, 4, FEATURES_BY_DATAPOINTS, 1.0);
+    Tree oneJobTree(1, 3, 3, 4 );
+    breadthFirstTreeLearner.Learn(stack, oneJobTree, 0);
+    oneJobTree.Compact();
+
+    // The number of jobs does not switch to learning levels
+    breadthFirstTreeLearner.SetNumberOfJobs(4);
+    BOOST_CHECK( !breadthFirstTreeLearner.GetLearnLevels() );
+    Tree fourJobsTree(1, 3, 3, 4 );
+    breadthFirstTreeLearner.Learn(stack, fourJobsTree, 0);
+    fourJobsTree.Compact();
+    CheckSameTree(fourJobsTree, oneJobTree);
+}
+
+BOOST_AUTO_TEST_SUITE_END()
@@ -179,4 +179,89 @@ BOOST_AUTO_TEST_CASE(test_Learn_minsize)
     BOOST_CHECK_CLOSE( tree.GetYs().Get(2,3), 0.2, 0.1 );
 }
 
+BOOST_AUTO_TEST_CASE(test_Learn_multiple_jobs)
+{
+    const int numberOfClasses = 4;
+    const double minNodeSize = 1.0;
+    FeatureValueOrdering featureOrdering = FEATURES_BY_DATAPOINTS;
+
+    DepthFirstTreeLearner<CdflBufferTypes_t> depthFirstTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize);
+    depthFirstTreeLearner.SetNumberOfJobs(4);
+    Tree tree(1, 3, 3, numberOfClasses );
+    depthFirstTreeLearner.Learn(stack, tree, 0);
+    tree.Compact();
+
+    // Node ids depend on which subtree grows first so only check the shape
+    BOOST_CHECK_EQUAL( tree.GetPath().GetM(), 7 );
+    float leafCounts = 0.0f;
+    int numberOfLeaves = 0;
+    for(int nodeIndex=0; nodeIndex<tree.GetPath().GetM(); nodeIndex++)
+    {
+        const int leftNodeIndex = tree.GetPath().Get(nodeIndex, 0);
+        const int rightNodeIndex = tree.GetPath().Get(nodeIndex, 1);
+        if( leftNodeIndex == NULL_CHILD )
+        {
+            leafCounts += tree.GetCounts().Get(nodeIndex);
+            numberOfLeaves++;
+        }
+        else
+        {
+            BOOST_CHECK_EQUAL( tree.GetDepths().Get(leftNodeIndex), tree.GetDepths().Get(nodeIndex)+1 );
+            BOOST_CHECK_EQUAL( tree.GetDepths().Get(rightNodeIndex), tree.GetDepths().Get(nodeIndex)+1 );
+        }
+    }
+    BOOST_CHECK_EQUAL( numberOfLeaves, 4 );
+    BOOST_CHECK_CLOSE( leafCounts, 10.0f, 0.1 );
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_presort)
+{
+    const int numberOfClasses = 4;
+    const double minNodeSize = 1.0;
+
+    for(int ordering=FEATURES_BY_DATAPOINTS; ordering<=DATAPOINTS_BY_FEATURES; ordering++)
+    {
+        FeatureValueOrdering featureOrdering = static_cast<FeatureValueOrdering>(ordering);
+        DepthFirstTreeLearner<CdflBufferTypes_t> sortedTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize);
+        DepthFirstTreeLearner<CdflBufferTypes_t> presortedTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize, true);
+
+        Tree sortedTree(1, 3, 3, numberOfClasses );
+        sortedTreeLearner.Learn(stack, sortedTree, 0);
+        Tree presortedTree(1, 3, 3, numberOfClasses );
+        presortedTreeLearner.Learn(stack, presortedTree, 0);
+
+        BOOST_CHECK( presortedTree.GetPath() == sortedTree.GetPath() );
+        BOOST_CHECK( presortedTree.GetIntFeatureParams() == sortedTree.GetIntFeatureParams() );
+        BOOST_CHECK( presortedTree.GetFloatFeatureParams() == sortedTree.GetFloatFeatureParams() );
+        BOOST_CHECK( presortedTree.GetCounts() == sortedTree.GetCounts() );
+        BOOST_CHECK( presortedTree.GetDepths() == sortedTree.GetDepths() );
+        BOOST_CHECK( presortedTree.GetYs() == sortedTree.GetYs() );
+    }
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_partition_indices)
+{
+    const int numberOfClasses = 4;
+    const double minNodeSize = 1.0;
+
+    for(int presort=0; presort<=1; presort++)
+    {
+        FeatureValueOrdering featureOrdering = FEATURES_BY_DATAPOINTS;
+        DepthFirstTreeLearner<CdflBufferTypes_t> treeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize, presort);
+        DepthFirstTreeLearner<CdflBufferTypes_t> partitionTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize, presort, true);
+
+        Tree tree(1, 3, 3, numberOfClasses );
+        treeLearner.Learn(stack, tree, 0);
+        Tree partitionTree(1, 3, 3, numberOfClasses );
+        partitionTreeLearner.Learn(stack, partitionTree, 0);
+
+        BOOST_CHECK( partitionTree.GetPath() == tree.GetPath() );
+        BOOST_CHECK( partitionTree.GetIntFeatureParams() == tree.GetIntFeatureParams() );
+        BOOST_CHECK( partitionTree.GetFloatFeatureParams() == tree.GetFloatFeatureParams() );
+        BOOST_CHECK( partitionTree.GetCounts() == tree.GetCounts() );
+        BOOST_CHECK( partitionTree.GetDepths() == tree.GetDepths() );
+        BOOST_CHECK( partitionTree.GetYs() == tree.GetYs() );
+    }
+}
+
 BOOST_AUTO_TEST_SUITE_END()
\ No newline at end of file
@@ -0,0 +1,139 @@
+#include <boost/test/unit_test.hpp>
+
+#include <boost/scoped_ptr.hpp>
+#include <set>
+
+#include "CreateOnlineForestLearner.h"
+
+void CheckLearnedSignOfFirstColumn(const Forest& forest)
+{
+    for(int t=0; t<forest.GetNumberOfTrees(); t++)
+    {
+        const Tree& tree = forest.mTrees[t];
+
+        // The root splits on the first column and the left child has the
+        // greater values
+        const int leftNodeIndex = tree.GetPath().Get(0, LEFT_CHILD);
+        const int rightNodeIndex = tree.GetPath().Get(0, RIGHT_CHILD);
+        BOOST_REQUIRE( leftNodeIndex > 0 && rightNodeIndex > 0 );
+        BOOST_CHECK_EQUAL( tree.GetIntFeatureParams().Get(0, PARAM_START_INDEX), 0 );
+        BOOST_CHECK_CLOSE( tree.GetYs().Get(leftNodeIndex, 1), 1.0f, 0.1 );
+        BOOST_CHECK_CLOSE( tree.GetYs().Get(rightNodeIndex, 0), 1.0f, 0.1 );
+    }
+}
+
+// Four classes, one per quadrant of the first two columns
+void AddQuadrantData(BufferCollection& collection, const BufferCollectionKey_t& xs_key,
+                     const BufferCollectionKey_t& classes_key, int numberOfSamples)
+{
+    MatrixBufferTemplate<float> xs(numberOfSamples, 2);
+    VectorBufferTemplate<int> classes(numberOfSamples);
+    for(int i=0; i<numberOfSamples; i++)
+    {
+        const int column0Class = i % 2;
+        const int column1Class = (i / 2) % 2;
+        xs.Set(i, 0, column0Class == 0 ? -1.0f : 1.0f);
+        xs.Set(i, 1, column1Class == 0 ? -1.0f : 1.0f);
+        classes.Set(i, 2*column0Class + column1Class);
+    }
+    collection.AddBuffer(xs_key, xs);
+    collection.AddBuffer(classes_key, classes);
+}
+
+// The root splits on one column, both children split on the other column and
+// each of the four grandchildren is a pure leaf of a different class.  This is
+// the forest the std::map of active leafs learned from the quadrant data.
+void CheckLearnedQuadrants(const Forest& forest)
+{
+    for(int t=0; t<forest.GetNumberOfTrees(); t++)
+    {
+        const Tree& tree = forest.mTrees[t];
+        const int rootColumn = tree.GetIntFeatureParams().Get(0, PARAM_START_INDEX);
+        std::set<int> leafClasses;
+        for(int c=LEFT_CHILD; c<=RIGHT_CHILD; c++)
+        {
+            const int childNodeIndex = tree.GetPath().Get(0, c);
+            BOOST_REQUIRE( childNodeIndex > 0 );
+            BOOST_CHECK_EQUAL( tree.GetDepths().Get(childNodeIndex), 1 );
+            BOOST_CHECK_EQUAL( tree.GetIntFeatureParams().Get(childNodeIndex, PARAM_START_INDEX), 1 - rootColumn );
+            for(int g=LEFT_CHILD; g<=RIGHT_CHILD; g++)
+            {
+                const int leafNodeIndex = tree.GetPath().Get(childNodeIndex, g);
+                BOOST_REQUIRE( leafNodeIndex > 0 );
+                BOOST_CHECK_EQUAL( tree.GetDepths().Get(leafNodeIndex), 2 );
+                BOOST_CHECK_EQUAL( tree.GetPath().Get(leafNodeIndex, LEFT_CHILD), -1 );
+                int leafClass = 0;
+                for(int k=1; k<tree.GetYs().GetN(); k++)
+                {
+                    if( tree.GetYs().Get(leafNodeIndex, k) > tree.GetYs().Get(leafNodeIndex, leafClass) )
+                    {
+                        leafClass = k;
+                    }
+                }
+                BOOST_CHECK_CLOSE( tree.GetYs().Get(leafNodeIndex, leafClass), 1.0f, 0.1 );
+                leafClasses.insert(leafClass);
+            }
+        }
+        BOOST_CHECK_EQUAL( leafClasses.size(), 4 );
+    }
+}
+
+BOOST_FIXTURE_TEST_SUITE( OnlineForestLearnerTests, OnlineForestLearnerFixture )
+
+BOOST_AUTO_TEST_CASE(test_Learn)
+{
+    boost::scoped_ptr<OnlineForestLearner_t> learner( CreateOnlineForestLearner(xs_key, classes_key, 2, 3, 1, 10, 10000000) );
+    const Forest forest = learner->Learn(collection);
+    BOOST_CHECK_EQUAL( forest.GetNumberOfTrees(), 3 );
+    CheckLearnedSignOfFirstColumn(forest);
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_batches)
+{
+    boost::scoped_ptr<OnlineForestLearner_t> learner( CreateOnlineForestLearner(xs_key, classes_key, 2, 3, 1, 10, 10000000) );
+    learner->SetBatchSize(16);
+    const Forest forest = learner->Learn(collection);
+    BOOST_CHECK_EQUAL( forest.GetNumberOfTrees(), 3 );
+    CheckLearnedSignOfFirstColumn(forest);
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_jobs)
+{
+    boost::scoped_ptr<OnlineForestLearner_t> learner( CreateOnlineForestLearner(xs_key, classes_key, 2, 3, 1, 10, 10000000) );
+    learner->SetBatchSize(16);
+    learner->SetNumberOfJobs(2);
+    const Forest forest = learner->Learn(collection);
+    BOOST_CHECK_EQUAL( forest.GetNumberOfTrees(), 3 );
+    CheckLearnedSignOfFirstColumn(forest);
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_splits_grow_frontier)
+{
+    BufferCollection quadrantCollection;
+    AddQuadrantData(quadrantCollection, xs_key, classes_key, 2000);
+
+    // Every leaf becomes active and splits, the children of the root are
+    // only added to the frontier once the root is split
+    boost::scoped_ptr<OnlineForestLearner_t> learner( CreateOnlineForestLearner(xs_key, classes_key, 4, 3, 2, 10, 10000000) );
+    const Forest forest = learner->Learn(quadrantCollection);
+    BOOST_CHECK_EQUAL( forest.GetNumberOfTrees(), 3 );
+    CheckLearnedQuadrants(forest);
+
+    // A frontier of one leaf at a time activates the leafs of the trees in
+    // turn, so the same nodes are added and removed many times
+    boost::scoped_ptr<OnlineForestLearner_t> oneLeafLearner( CreateOnlineForestLearner(xs_key, classes_key, 4, 3, 2, 10, 1) );
+    const Forest oneLeafForest = oneLeafLearner->Learn(quadrantCollection);
+    CheckLearnedQuadrants(oneLeafForest);
+
+    // The leafs are split over several calls to Learn
+    boost::scoped_ptr<OnlineForestLearner_t> batchLearner( CreateOnlineForestLearner(xs_key, classes_key, 4, 3, 2, 10, 2) );
+    batchLearner->SetBatchSize(8);
+    batchLearner->SetNumberOfJobs(2);
+    for(int i=0; i<3; i++)
+    {
+        batchLearner->Learn(quadrantCollection);
+    }
+    CheckLearnedQuadrants(batchLearner->GetForest());
+}
+
+BOOST_AUTO_TEST_SUITE_END()
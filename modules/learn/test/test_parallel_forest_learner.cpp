@@ -71,4 +71,104 @@ BOOST_AUTO_TEST_CASE(test_Learn)
     BOOST_CHECK_CLOSE( tree.GetYs().Get(6,3), 1.0, 0.1 );
 }
 
+BOOST_AUTO_TEST_CASE(test_Learn_same_seed_same_forest)
+{
+    const int numberOfClasses = 4;
+    FeatureValueOrdering featureOrdering = FEATURES_BY_DATAPOINTS;
+    const double minNodeSize = 1.0;
+
+    DepthFirstTreeLearner<CdflBufferTypes_t> depthFirstTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize);
+
+    ParallelForestLearner singleJobLearner(&depthFirstTreeLearner, 10, numberOfClasses, 1);
+    singleJobLearner.SetSeed(11);
+    Forest singleJobForest = singleJobLearner.Learn(collection);
+
+    ParallelForestLearner multipleJobLearner(&depthFirstTreeLearner, 10, numberOfClasses, 4);
+    multipleJobLearner.SetSeed(11);
+    Forest multipleJobForest = multipleJobLearner.Learn(collection);
+
+    for(int i=0; i<10; i++)
+    {
+        BOOST_CHECK( singleJobForest.mTrees[i].GetPath() == multipleJobForest.mTrees[i].GetPath() );
+        BOOST_CHECK( singleJobForest.mTrees[i].GetIntFeatureParams() == multipleJobForest.mTrees[i].GetIntFeatureParams() );
+        BOOST_CHECK( singleJobForest.mTrees[i].GetFloatFeatureParams() == multipleJobForest.mTrees[i].GetFloatFeatureParams() );
+    }
+}
+
+BOOST_AUTO_TEST_CASE(test_Learn_records_per_tree_jobs_and_timing)
+{
+    const int numberOfClasses = 4;
+    const int numberOfTrees = 13;
+    const int numberOfJobs = 4;
+    FeatureValueOrdering featureOrdering = FEATURES_BY_DATAPOINTS;
+    const double minNodeSize = 1.0;
+
+    DepthFirstTreeLearner<CdflBufferTypes_t> depthFirstTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, minNodeSize);
+
+    ParallelForestLearner parallelForestLearner(&depthFirstTreeLearner, numberOfTrees, numberOfClasses, numberOfJobs);
+    Forest forest = parallelForestLearner.Learn(collection);
+
+    for(int i=0; i<numberOfTrees; i++)
+    {
+        const BufferCollection& extraInfo = forest.mTrees[i].GetExtraInfo();
+        BOOST_CHECK( extraInfo.HasBuffer< VectorBufferTemplate<double> >("Time-ParallelForestLearner") );
+        BOOST_CHECK( extraInfo.HasBuffer< VectorBufferTemplate<double> >("ParallelForestLearner-StartTime") );
+        const int job = extraInfo.GetBuffer< VectorBufferTemplate<int> >("ParallelForestLearner-Job").Get(0);
+        BOOST_CHECK( job >= 0 && job < numberOfJobs );
+        BOOST_CHECK_EQUAL( extraInfo.GetBuffer< VectorBufferTemplate<int> >("Time-ParallelForestLearner-Count").Get(0), 1 );
+    }
+}
+
+BOOST_AUTO_TEST_CASE(test_ParallelForestLearnerBatch_Learn_matches_each_learner)
+{
+    const int numberOfClasses = 4;
+    FeatureValueOrdering featureOrdering = FEATURES_BY_DATAPOINTS;
+
+    DepthFirstTreeLearner<CdflBufferTypes_t> smallNodesTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, 1.0);
+    DepthFirstTreeLearner<CdflBufferTypes_t> largeNodesTreeLearner = CreateDepthFirstLearner(xs_key, classes_key, numberOfClasses, featureOrdering, 5.0);
+
+    ParallelForestLearner smallNodesLearner(&smallNodesTreeLearner, 3, numberOfClasses, 1);
+    smallNodesLearner.SetSeed(5);
+    ParallelForestLearner largeNodesLearner(&largeNodesTreeLearner, 2, numberOfClasses, 1);
+    largeNodesLearner.SetSeed(7);
+    Forest expectedForest = smallNodesLearner.Learn(collection);
+    expectedForest.AddForest(largeNodesLearner.Learn(collection));
+
+    ParallelForestLearnerBatch batchLearner(4);
+    batchLearner.AddForestLearner(&smallNodesLearner);
+    batchLearner.AddForestLearner(&largeNodesLearner);
+    BOOST_CHECK_EQUAL( batchLearner.GetNumberOfForestLearners(), 2 );
+    Forest forest = batchLearner.Learn(collection);
+
+    BOOST_CHECK_EQUAL( forest.GetNumberOfTrees(), 5 );
+    for(int i=0; i<5; i++)
+    {
+        BOOST_CHECK( forest.mTrees[i].GetPath() == expectedForest.mTrees[i].GetPath() );
+        BOOST_CHECK( forest.mTrees[i].GetIntFeatureParams() == expectedForest.mTrees[i].GetIntFeatureParams() );
+        BOOST_CHECK( forest.mTrees[i].GetFloatFeatureParams() == expectedForest.mTrees[i].GetFloatFeatureParams() );
+        BOOST_CHECK( forest.mTrees[i].GetCounts() == expectedForest.mTrees[i].GetCounts() );
+    }
+}
+
+BOOST_AUTO_TEST_CASE(test_ParallelForestLearnerBatch_AddForestLearner_twice)
+{
+    DepthFirstTreeLearner<CdflBufferTypes_t> treeLearner = CreateDepthFirstLearner(xs_key, classes_key, 4, FEATURES_BY_DATAPOINTS, 1.0);
+    ParallelForestLearner forestLearner(&treeLearner, 2, 4, 1);
+
+    ParallelForestLearnerBatch batchLearner(2);
+    batchLearner.AddForestLearner(&forestLearner);
+    BOOST_CHECK_THROW( batchLearner.AddForestLearner(&forestLearner), std::out_of_range );
+    BOOST_CHECK_EQUAL( batchLearner.GetNumberOfForestLearners(), 1 );
+}
+
+BOOST_AUTO_TEST_CASE(test_ParallelForestLearnerBatch_no_jobs_learns_every_learner)
+{
+    DepthFirstTreeLearner<CdflBufferTypes_t> treeLearner = CreateDepthFirstLearner(xs_key, classes_key, 4, FEATURES_BY_DATAPOINTS, 1.0);
+    ParallelForestLearner forestLearner(&treeLearner, 2, 4, 1);
+
+    ParallelForestLearnerBatch batchLearner(0);
+    batchLearner.AddForestLearner(&forestLearner);
+    BOOST_CHECK_EQUAL( batchLearner.Learn(collection).GetNumberOfTrees(), 2 );
+}
+
 BOOST_AUTO_TEST_SUITE_END()
\ No newline at end of file
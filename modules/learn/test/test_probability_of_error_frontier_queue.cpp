@@ -0,0 +1,72 @@
+#include <boost/test/unit_test.hpp>
+
+#include "BufferTypes.h"
+#include "Forest.h"
+#include "ClassProbabilityOfError.h"
+#include "ProbabilityOfErrorFrontierQueue.h"
+
+typedef ProbabilityOfErrorFrontierQueue< ClassProbabilityOfError<SinglePrecisionBufferTypes> > FrontierQueue_t;
+
+void SetNode(Tree& tree, int nodeIndex, float count, float y0)
+{
+    tree.GetCounts().Set(nodeIndex, count);
+    tree.GetYs().Set(nodeIndex, 0, y0);
+    tree.GetYs().Set(nodeIndex, 1, 1.0f - y0);
+}
+
+BOOST_AUTO_TEST_SUITE( ProbabilityOfErrorFrontierQueueTests )
+
+BOOST_AUTO_TEST_CASE(test_PopBest)
+{
+    Forest forest(2, 3, 1, 1, 2);
+    FrontierQueue_t queue(2);
+
+    queue.IncrDatapoints(0, 10);
+    queue.IncrDatapoints(1, 10);
+    SetNode(forest.mTrees[0], 0, 10.0f, 0.5f);
+    SetNode(forest.mTrees[1], 0, 10.0f, 0.9f);
+    queue.NodeChanged(0, 0);
+    queue.NodeChanged(1, 0);
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(0, 0) );
+
+    // Probability of error of (0,1) is 0, (0,2) is 0.4*0.5 and (1,0) is 0.1
+    Tree& tree = forest.mTrees[0];
+    const int leftNodeIndex = tree.NextNodeIndex();
+    const int rightNodeIndex = tree.NextNodeIndex();
+    SetNode(tree, leftNodeIndex, 6.0f, 1.0f);
+    SetNode(tree, rightNodeIndex, 4.0f, 0.5f);
+    queue.ProcessSplit(forest, 0, 0, leftNodeIndex, rightNodeIndex);
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(0, rightNodeIndex) );
+
+    queue.IncrDatapoints(1, 10);
+    SetNode(forest.mTrees[1], 0, 20.0f, 0.5f);
+    queue.NodeChanged(1, 0);
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(1, 0) );
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(0, leftNodeIndex) );
+    BOOST_CHECK( queue.IsEmpty() );
+}
+
+BOOST_AUTO_TEST_CASE(test_PopBest_stale_score)
+{
+    Forest forest(3, 1, 1, 1, 2);
+    FrontierQueue_t queue(3);
+
+    for(int treeIndex=0; treeIndex<3; treeIndex++)
+    {
+        queue.IncrDatapoints(treeIndex, 10);
+        queue.NodeChanged(treeIndex, 0);
+    }
+    SetNode(forest.mTrees[0], 0, 10.0f, 0.7f);
+    SetNode(forest.mTrees[1], 0, 10.0f, 0.8f);
+    SetNode(forest.mTrees[2], 0, 10.0f, 0.5f);
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(2, 0) );
+
+    // The root of tree 0 was not reached by the datapoints so its
+    // probability of error drops from 0.3 to 0.03
+    queue.IncrDatapoints(0, 90);
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(1, 0) );
+    BOOST_CHECK( queue.PopBest(forest) == std::make_pair(0, 0) );
+    BOOST_CHECK( queue.IsEmpty() );
+}
+
+BOOST_AUTO_TEST_SUITE_END()
@@ -40,10 +40,11 @@ private:
     void SampleParams(typename BufferTypes::Index numberOfFeatures,
                       typename BufferTypes::Index numberOfDimensions,
                         MatrixBufferTemplate<typename BufferTypes::ParamsContinuous>& floatParams,
-                        MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams) const;
+                        MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams,
+                        boost::mt19937& gen) const;
 
-    const BufferId mNumberOfFeaturesBufferId;
-    const BufferId mMatrixDataBufferId;
+    const BufferKey mNumberOfFeaturesBufferId;
+    const BufferKey mMatrixDataBufferId;
 };
 
 
@@ -74,7 +75,6 @@ void AxisAlignedParamsStep<BufferTypes, DataMatrixType>::ProcessStep(const Buffe
                                                           boost::mt19937& gen,
                                                           BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(gen);
     UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
     
@@ -96,7 +96,7 @@ void AxisAlignedParamsStep<BufferTypes, DataMatrixType>::ProcessStep(const Buffe
         MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams =
                 writeCollection.GetOrAddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(IntParamsBufferId);
 
-        SampleParams(numberOfFeatures, numberOfDimensions, floatParams, intParams);
+        SampleParams(numberOfFeatures, numberOfDimensions, floatParams, intParams, gen);
     }
 }
 
@@ -104,14 +104,15 @@ template <class BufferTypes, class DataMatrixType>
 void AxisAlignedParamsStep<BufferTypes, DataMatrixType>::SampleParams(typename BufferTypes::Index numberOfFeatures,
                                                         typename BufferTypes::Index numberOfDimensions,
                                                         MatrixBufferTemplate<typename BufferTypes::ParamsContinuous>& floatParams,
-                                                        MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams ) const
+                                                        MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams,
+                                                        boost::mt19937& gen ) const
 {
     floatParams.Resize(numberOfFeatures, DIMENSION_OF_PARAMETERS);
     intParams.Resize(numberOfFeatures, DIMENSION_OF_PARAMETERS);
 
     // Sample without replacement so a dimension is not choosen multiple times
     std::vector<typename BufferTypes::Index> candidateDimensions(numberOfFeatures);
-    sampleIndicesWithOutReplacement(&candidateDimensions[0], numberOfFeatures, numberOfDimensions);
+    sampleIndicesWithOutReplacement(&candidateDimensions[0], numberOfFeatures, numberOfDimensions, gen);
 
     for(int i=0; i<numberOfFeatures; i++)
     {
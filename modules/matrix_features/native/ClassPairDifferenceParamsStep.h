@@ -53,10 +53,10 @@ private:
                     MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams,
                     boost::mt19937& gen ) const;
 
-    const BufferId mNumberOfFeaturesBufferId;
-    const BufferId mMatrixDataBufferId;
-    const BufferId mClassesBufferId;
-    const BufferId mIndicesBufferId;
+    const BufferKey mNumberOfFeaturesBufferId;
+    const BufferKey mMatrixDataBufferId;
+    const BufferKey mClassesBufferId;
+    const BufferKey mIndicesBufferId;
     const int mSubspaceDimension;
 };
 
@@ -174,7 +174,7 @@ void ClassPairDifferenceParamsStep<BufferTypes, DataMatrixType>::SampleParams(ty
         intParams.Set(f, FEATURE_TYPE_INDEX, MATRIX_FEATURES); // feature type
         intParams.Set(f, NUMBER_OF_DIMENSIONS_INDEX, subspaceDimension); // how many dimensions in projection
 
-        std::random_shuffle ( dimensionsSubspace.begin(), dimensionsSubspace.end() );
+        shuffle(dimensionsSubspace, gen);
         std::sort( dimensionsSubspace.begin(), dimensionsSubspace.begin() + subspaceDimension );
 
         for(int i=0; i<subspaceDimension; i++)
@@ -43,8 +43,8 @@ private:
                         MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams,
                         boost::mt19937& gen) const;
 
-    const BufferId mNumberOfFeaturesBufferId;
-    const BufferId mMatrixDataBufferId;
+    const BufferKey mNumberOfFeaturesBufferId;
+    const BufferKey mMatrixDataBufferId;
 };
 
 
@@ -0,0 +1,164 @@
+#pragma once
+
+#include <vector>
+#include <algorithm>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "BufferCollectionStack.h"
+#include "PipelineStepI.h"
+#include "UniqueBufferId.h"
+#include "Constants.h"
+
+// ----------------------------------------------------------------------------
+//
+// HistogramBinsStep quantizes every column of a matrix into at most
+// maxNumberOfBins bins for the datapoints in indices.  The bins have roughly
+// the same number of datapoints and the edges are at the midpoint between
+// consecutive distinct values so equal values always share a bin.
+//
+// Row d of BinEdgesBufferId has the sorted edges of column d and
+// BinEdgesCountsBufferId has the number of edges.  BinCodesBufferId has the
+// bin of every row of the matrix, row d of the codes is column d of the
+// matrix (ie codes(d, i) is the number of edges of column d below the value
+// of row i) so a node can look up the bins of its datapoints without
+// searching the edges.
+//
+// This is meant to be a tree step; SliceAxisAlignedFeaturesStep selects the
+// edges of the axis aligned features of a node and
+// HistogramSplitpointStatsStep uses them as splitpoints and reads the codes.
+//
+// ----------------------------------------------------------------------------
+template <class BufferTypes, class DataMatrixType>
+class HistogramBinsStep: public PipelineStepI
+{
+public:
+    HistogramBinsStep( const BufferId& matrixDataBufferId,
+                       const BufferId& indicesBufferId,
+                       int maxNumberOfBins );
+    virtual ~HistogramBinsStep();
+
+    virtual PipelineStepI* Clone() const;
+
+    virtual void ProcessStep(   const BufferCollectionStack& readCollection,
+                                BufferCollection& writeCollection,
+                                boost::mt19937& gen,
+                                BufferCollection& extraInfo, int nodeIndex) const;
+
+    // Read only output buffers
+    const BufferId BinEdgesBufferId;
+    const BufferId BinEdgesCountsBufferId;
+    const BufferId BinCodesBufferId;
+private:
+    const BufferKey mMatrixDataBufferId;
+    const BufferKey mIndicesBufferId;
+    const int mMaxNumberOfBins;
+};
+
+
+template <class BufferTypes, class DataMatrixType>
+HistogramBinsStep<BufferTypes, DataMatrixType>::HistogramBinsStep( const BufferId& matrixDataBufferId,
+                                                                  const BufferId& indicesBufferId,
+                                                                  int maxNumberOfBins )
+: PipelineStepI("HistogramBinsStep")
+, BinEdgesBufferId(GetBufferId("BinEdges"))
+, BinEdgesCountsBufferId(GetBufferId("BinEdgesCounts"))
+, BinCodesBufferId(GetBufferId("BinCodes"))
+, mMatrixDataBufferId(matrixDataBufferId)
+, mIndicesBufferId(indicesBufferId)
+, mMaxNumberOfBins(maxNumberOfBins)
+{}
+
+template <class BufferTypes, class DataMatrixType>
+HistogramBinsStep<BufferTypes, DataMatrixType>::~HistogramBinsStep()
+{}
+
+template <class BufferTypes, class DataMatrixType>
+PipelineStepI* HistogramBinsStep<BufferTypes, DataMatrixType>::Clone() const
+{
+    HistogramBinsStep* clone = new HistogramBinsStep<BufferTypes, DataMatrixType>(*this);
+    return clone;
+}
+
+template <class BufferTypes, class DataMatrixType>
+void HistogramBinsStep<BufferTypes, DataMatrixType>::ProcessStep(const BufferCollectionStack& readCollection,
+                                                          BufferCollection& writeCollection,
+                                                          boost::mt19937& gen,
+                                                          BufferCollection& extraInfo, int nodeIndex) const
+{
+    UNUSED_PARAM(gen);
+    UNUSED_PARAM(extraInfo);
+    UNUSED_PARAM(nodeIndex);
+    ASSERT(mMaxNumberOfBins >= 2);
+    ASSERT(mMaxNumberOfBins <= HISTOGRAM_MAX_NUMBER_OF_BINS);
+
+    const DataMatrixType& matrixBuffer =
+            readCollection.GetBuffer< DataMatrixType >(mMatrixDataBufferId);
+    const VectorBufferTemplate<typename BufferTypes::Index>& indices =
+            readCollection.GetBuffer< VectorBufferTemplate<typename BufferTypes::Index> >(mIndicesBufferId);
+
+    const typename BufferTypes::Index numberOfSamples = indices.GetN();
+    const typename BufferTypes::Index numberOfDimensions = matrixBuffer.GetN();
+    const typename BufferTypes::Index numberOfRows = matrixBuffer.GetM();
+
+    MatrixBufferTemplate<typename BufferTypes::FeatureValue>& binEdges =
+            writeCollection.GetOrAddBuffer< MatrixBufferTemplate<typename BufferTypes::FeatureValue> >(BinEdgesBufferId);
+    binEdges.Resize(numberOfDimensions, mMaxNumberOfBins-1);
+    binEdges.Zero();
+
+    VectorBufferTemplate<typename BufferTypes::Index>& binEdgesCounts =
+            writeCollection.GetOrAddBuffer< VectorBufferTemplate<typename BufferTypes::Index> >(BinEdgesCountsBufferId);
+    binEdgesCounts.Resize(numberOfDimensions);
+    binEdgesCounts.Zero();
+
+    MatrixBufferTemplate<HistogramBinCode>& binCodes =
+            writeCollection.GetOrAddBuffer< MatrixBufferTemplate<HistogramBinCode> >(BinCodesBufferId);
+    binCodes.Resize(numberOfDimensions, numberOfRows);
+
+    std::vector<typename BufferTypes::FeatureValue> values(numberOfSamples);
+    for(int d=0; d<numberOfDimensions; d++)
+    {
+        for(int s=0; s<numberOfSamples; s++)
+        {
+            values[s] = static_cast<typename BufferTypes::FeatureValue>(matrixBuffer.Get(indices.Get(s), d));
+        }
+        std::sort( values.begin(), values.end() );
+
+        int numberOfEdges = 0;
+        for(int b=1; b<mMaxNumberOfBins && numberOfSamples > 0; b++)
+        {
+            // Move the quantile to the next distinct value so equal values share a bin
+            const int quantile = static_cast<int>((static_cast<long long>(b) * numberOfSamples) / mMaxNumberOfBins);
+            if(quantile < 1)
+            {
+                continue;
+            }
+            const typename std::vector<typename BufferTypes::FeatureValue>::const_iterator next =
+                    std::upper_bound(values.begin() + quantile, values.end(), values[quantile-1]);
+            if(next == values.end())
+            {
+                break;
+            }
+            const typename BufferTypes::FeatureValue lower = *(next-1);
+            const typename BufferTypes::FeatureValue edge = lower + 0.5*(*next - lower);
+            if(numberOfEdges == 0 || edge > binEdges.Get(d, numberOfEdges-1))
+            {
+                binEdges.Set(d, numberOfEdges, edge);
+                numberOfEdges++;
+            }
+        }
+        binEdgesCounts.Set(d, numberOfEdges);
+
+        // Every row is coded, not only the ones in indices, so the codes can
+        // be read through any node's indices
+        const typename BufferTypes::FeatureValue* firstEdge = binEdges.GetRowPtrUnsafe(d);
+        const typename BufferTypes::FeatureValue* lastEdge = firstEdge + numberOfEdges;
+        HistogramBinCode* codes = binCodes.GetMutableRowPtrUnsafe(d);
+        for(int r=0; r<numberOfRows; r++)
+        {
+            const typename BufferTypes::FeatureValue value = static_cast<typename BufferTypes::FeatureValue>(matrixBuffer.Get(r, d));
+            codes[r] = static_cast<HistogramBinCode>(std::lower_bound(firstEdge, lastEdge, value) - firstEdge);
+        }
+    }
+}
@@ -49,10 +49,10 @@ public:
     typedef typename BufferTypes::Index Int;
     typedef LinearMatrixFeatureBinding<BufferTypes, DataMatrixType> FeatureBinding;
 
-    const BufferId mFloatParamsBufferId;
-    const BufferId mIntParamsBufferId;
-    const BufferId mIndicesBufferId;
-    const BufferId mDataMatrixBufferId;
+    const BufferKey mFloatParamsBufferId;
+    const BufferKey mIntParamsBufferId;
+    const BufferKey mIndicesBufferId;
+    const BufferKey mDataMatrixBufferId;
 };
 
 template <class BufferTypes, class DataMatrixType>
@@ -1,8 +1,14 @@
 #pragma once
 
+#include <vector>
+#include <utility>
+#include <algorithm>
+
 #include "asserts.h"
+#include "unused.h"
 #include "VectorBuffer.h"
 #include "MatrixBuffer.h"
+#include "SparseMatrixBuffer.h"
 #include "Constants.h"
 
 const int NUMBER_OF_DIMENSIONS_INDEX = FEATURE_TYPE_INDEX + 1;
@@ -29,6 +35,7 @@ public:
     LinearMatrixFeatureBinding & operator=(const LinearMatrixFeatureBinding & other);
 
     typename BufferTypes::FeatureValue FeatureValue( const typename BufferTypes::Index featureIndex, const typename BufferTypes::Index relativeSampleIndex) const;
+    void FeatureValues( const typename BufferTypes::Index featureIndex, typename BufferTypes::FeatureValue* featureValues) const;
 
     typename BufferTypes::Index GetNumberOfFeatures() const;
     typename BufferTypes::Index GetNumberOfDatapoints() const;
@@ -39,8 +46,80 @@ private:
     VectorBufferTemplate<typename BufferTypes::Index> const* mIndices;
     DataMatrixType const* mDataMatrix;
 
+    // (matrix row, datapoint) pairs of mIndices sorted by row, built the first
+    // time FeatureValues walks a sparse column index
+    mutable std::vector< std::pair<typename BufferTypes::Index, typename BufferTypes::Index> > mSortedRows;
 };
 
+// Adds weight times column dimension of the rows in indices to featureValues
+template <class Index, class FeatureValue, class Weight, class T>
+void AddWeightedColumn( const MatrixBufferTemplate<T>& dataMatrix, const Index dimension, const Weight weight,
+                        const Index* indices, const Index numberOfDatapoints,
+                        std::vector< std::pair<Index, Index> >& sortedRows,
+                        FeatureValue* featureValues )
+{
+    UNUSED_PARAM(sortedRows);
+    for(int s=0; s<numberOfDatapoints; s++)
+    {
+        featureValues[s] += weight * dataMatrix.Get(indices[s], dimension);
+    }
+}
+
+// Searching each row of a sparse matrix costs O(#non zeros of the row) per
+// datapoint.  When the matrix has a column index (see BuildColumnIndex) and
+// the column has fewer non zeros than there are datapoints, the non zeros of
+// the column are looked up in the datapoints sorted by row instead.  Rows can
+// appear more than once in indices (ie bagging) so each non zero goes to
+// every datapoint of its row.
+template <class Index, class FeatureValue, class Weight, class T>
+void AddWeightedColumn( const SparseMatrixBufferTemplate<T>& dataMatrix, const Index dimension, const Weight weight,
+                        const Index* indices, const Index numberOfDatapoints,
+                        std::vector< std::pair<Index, Index> >& sortedRows,
+                        FeatureValue* featureValues )
+{
+    if( !dataMatrix.HasColumnIndex() || dataMatrix.GetColumnNumberOfNonZeros(dimension) > numberOfDatapoints )
+    {
+        for(int s=0; s<numberOfDatapoints; s++)
+        {
+            featureValues[s] += weight * dataMatrix.Get(indices[s], dimension);
+        }
+        return;
+    }
+
+    // The indices can change under the binding (ie the online learner reuses
+    // one buffer for every sample) so the sorted rows are checked before use
+    bool isSortedRowsValid = static_cast<Index>(sortedRows.size()) == numberOfDatapoints;
+    for(int s=0; s<numberOfDatapoints && isSortedRowsValid; s++)
+    {
+        isSortedRowsValid = indices[sortedRows[s].second] == sortedRows[s].first;
+    }
+    if( !isSortedRowsValid )
+    {
+        sortedRows.resize(numberOfDatapoints);
+        for(int s=0; s<numberOfDatapoints; s++)
+        {
+            sortedRows[s] = std::make_pair(indices[s], static_cast<Index>(s));
+        }
+        std::sort(sortedRows.begin(), sortedRows.end());
+    }
+
+    const int numberOfNonZeros = dataMatrix.GetColumnNumberOfNonZeros(dimension);
+    const int* rows = dataMatrix.GetColumnRowsPtrUnsafe(dimension);
+    const T* values = dataMatrix.GetColumnValuesPtrUnsafe(dimension);
+    typename std::vector< std::pair<Index, Index> >::iterator first = sortedRows.begin();
+    for(int i=0; i<numberOfNonZeros; i++)
+    {
+        // The rows of a column are sorted so the search starts where the last one ended
+        first = std::lower_bound(first, sortedRows.end(), std::make_pair(static_cast<Index>(rows[i]), static_cast<Index>(0)));
+        typename std::vector< std::pair<Index, Index> >::iterator it = first;
+        for(; it != sortedRows.end() && it->first == rows[i]; ++it)
+        {
+            featureValues[it->second] += weight * values[i];
+        }
+        first = it;
+    }
+}
+
 template <class BufferTypes, class DataMatrixType>
 LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>::LinearMatrixFeatureBinding( MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> const* floatParams,
                                                                                          MatrixBufferTemplate<typename BufferTypes::ParamsInteger> const* intParams,
@@ -50,6 +129,7 @@ LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>::LinearMatrixFeatureBind
 , mIntParams(intParams)
 , mIndices(indices)
 , mDataMatrix(dataMatrix)
+, mSortedRows()
 {}
 
 template <class BufferTypes, class DataMatrixType>
@@ -58,6 +138,7 @@ LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>::LinearMatrixFeatureBind
 , mIntParams(NULL)
 , mIndices(NULL)
 , mDataMatrix(NULL)
+, mSortedRows()
 {}
 
 template <class BufferTypes, class DataMatrixType>
@@ -66,6 +147,7 @@ LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>::LinearMatrixFeatureBind
 , mIntParams(other.mIntParams)
 , mIndices(other.mIndices)
 , mDataMatrix(other.mDataMatrix)
+, mSortedRows(other.mSortedRows)
 {}
 
 template <class BufferTypes, class DataMatrixType>
@@ -75,6 +157,7 @@ LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>& LinearMatrixFeatureBind
     mIntParams = other.mIntParams;
     mIndices = other.mIndices;
     mDataMatrix = other.mDataMatrix;
+    mSortedRows = other.mSortedRows;
     return *this;
 }
 
@@ -97,6 +180,24 @@ typename BufferTypes::FeatureValue LinearMatrixFeatureBinding<BufferTypes, DataM
     return featureValue;
 }
 
+// Writes the feature for every datapoint, one dimension at a time so the
+// params are only read once
+template <class BufferTypes, class DataMatrixType>
+void LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>::FeatureValues( const typename BufferTypes::Index featureIndex, typename BufferTypes::FeatureValue* featureValues) const
+{
+    const typename BufferTypes::Index numberOfDatapoints = mIndices->GetN();
+    const typename BufferTypes::Index* indices = mIndices->GetDataPtrUnsafe();
+    std::fill(featureValues, featureValues + numberOfDatapoints, static_cast<typename BufferTypes::FeatureValue>(0.0));
+
+    const typename BufferTypes::Index numberOfDimensions = mIntParams->Get(featureIndex, NUMBER_OF_DIMENSIONS_INDEX);
+    for(int i=PARAM_START_INDEX; i<numberOfDimensions + PARAM_START_INDEX; i++)
+    {
+        const typename BufferTypes::Index dimension = mIntParams->Get(featureIndex, i);
+        const typename BufferTypes::ParamsContinuous weight = mFloatParams->Get(featureIndex, i);
+        AddWeightedColumn(*mDataMatrix, dimension, weight, indices, numberOfDatapoints, mSortedRows, featureValues);
+    }
+}
+
 template <class BufferTypes, class DataMatrixType>
 typename BufferTypes::Index LinearMatrixFeatureBinding<BufferTypes, DataMatrixType>::GetNumberOfFeatures() const
 {
@@ -0,0 +1,105 @@
+#pragma once
+
+#include <vector>
+#include <utility>
+#include <algorithm>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "BufferCollectionStack.h"
+#include "PipelineStepI.h"
+#include "UniqueBufferId.h"
+
+// ----------------------------------------------------------------------------
+//
+// PresortColumnsStep sorts every column of a matrix once for the datapoints
+// in indices.  Row d of the output lists the positions in indices ordered
+// by the value of column d (ties are ordered by position).
+//
+// The sort order of a column does not change down the tree, so this is meant
+// to be a tree step.  SliceAxisAlignedFeaturesStep selects the rows of the
+// axis aligned features of a node, BestSplitpointsWalkingSortedStep walks
+// them without sorting and SplitBuffersSortedIndices partitions them for the
+// children.
+//
+// ----------------------------------------------------------------------------
+template <class BufferTypes, class DataMatrixType>
+class PresortColumnsStep: public PipelineStepI
+{
+public:
+    PresortColumnsStep( const BufferId& matrixDataBufferId,
+                        const BufferId& indicesBufferId );
+    virtual ~PresortColumnsStep();
+
+    virtual PipelineStepI* Clone() const;
+
+    virtual void ProcessStep(   const BufferCollectionStack& readCollection,
+                                BufferCollection& writeCollection,
+                                boost::mt19937& gen,
+                                BufferCollection& extraInfo, int nodeIndex) const;
+
+    // Read only output buffer
+    const BufferId SortedIndicesBufferId;
+private:
+    const BufferKey mMatrixDataBufferId;
+    const BufferKey mIndicesBufferId;
+};
+
+
+template <class BufferTypes, class DataMatrixType>
+PresortColumnsStep<BufferTypes, DataMatrixType>::PresortColumnsStep( const BufferId& matrixDataBufferId,
+                                                                    const BufferId& indicesBufferId )
+: PipelineStepI("PresortColumnsStep")
+, SortedIndicesBufferId(GetBufferId("SortedIndices"))
+, mMatrixDataBufferId(matrixDataBufferId)
+, mIndicesBufferId(indicesBufferId)
+{}
+
+template <class BufferTypes, class DataMatrixType>
+PresortColumnsStep<BufferTypes, DataMatrixType>::~PresortColumnsStep()
+{}
+
+template <class BufferTypes, class DataMatrixType>
+PipelineStepI* PresortColumnsStep<BufferTypes, DataMatrixType>::Clone() const
+{
+    PresortColumnsStep* clone = new PresortColumnsStep<BufferTypes, DataMatrixType>(*this);
+    return clone;
+}
+
+template <class BufferTypes, class DataMatrixType>
+void PresortColumnsStep<BufferTypes, DataMatrixType>::ProcessStep(const BufferCollectionStack& readCollection,
+                                                          BufferCollection& writeCollection,
+                                                          boost::mt19937& gen,
+                                                          BufferCollection& extraInfo, int nodeIndex) const
+{
+    UNUSED_PARAM(gen);
+    UNUSED_PARAM(extraInfo);
+    UNUSED_PARAM(nodeIndex);
+
+    const DataMatrixType& matrixBuffer =
+            readCollection.GetBuffer< DataMatrixType >(mMatrixDataBufferId);
+    const VectorBufferTemplate<typename BufferTypes::Index>& indices =
+            readCollection.GetBuffer< VectorBufferTemplate<typename BufferTypes::Index> >(mIndicesBufferId);
+
+    const typename BufferTypes::Index numberOfSamples = indices.GetN();
+    const typename BufferTypes::Index numberOfDimensions = matrixBuffer.GetN();
+
+    MatrixBufferTemplate<typename BufferTypes::Index>& sortedIndices =
+            writeCollection.GetOrAddBuffer< MatrixBufferTemplate<typename BufferTypes::Index> >(SortedIndicesBufferId);
+    sortedIndices.Resize(numberOfDimensions, numberOfSamples);
+
+    std::vector< std::pair<typename BufferTypes::SourceContinuous, typename BufferTypes::Index> > valueIndices(numberOfSamples);
+    for(int d=0; d<numberOfDimensions; d++)
+    {
+        for(int s=0; s<numberOfSamples; s++)
+        {
+            valueIndices[s] = std::make_pair(matrixBuffer.Get(indices.Get(s), d), s);
+        }
+        std::sort( valueIndices.begin(), valueIndices.end() );
+        for(int s=0; s<numberOfSamples; s++)
+        {
+            sortedIndices.Set(d, s, valueIndices[s].second);
+        }
+    }
+}
@@ -49,8 +49,8 @@ private:
                     MatrixBufferTemplate<typename BufferTypes::ParamsInteger>& intParams,
                     boost::mt19937& gen ) const;
 
-    const BufferId mNumberOfFeaturesBufferId;
-    const BufferId mMatrixDataBufferId;
+    const BufferKey mNumberOfFeaturesBufferId;
+    const BufferKey mMatrixDataBufferId;
     const int mSubspaceDimension;
 };
 
@@ -137,7 +137,7 @@ void RandomProjectionParamsStep<BufferTypes, DataMatrixType>::SampleParams(typen
         intParams.Set(f, FEATURE_TYPE_INDEX, MATRIX_FEATURES); // feature type
         intParams.Set(f, NUMBER_OF_DIMENSIONS_INDEX, subspaceDimension); // how many dimensions in projection
 
-        std::random_shuffle ( dimensionsSubspace.begin(), dimensionsSubspace.end() );
+        shuffle(dimensionsSubspace, gen);
         std::sort( dimensionsSubspace.begin(), dimensionsSubspace.begin() + subspaceDimension );
 
         for(int i=0; i<subspaceDimension; i++)
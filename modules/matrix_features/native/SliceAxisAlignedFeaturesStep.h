@@ -28,8 +28,8 @@ public:
     // Read only output buffer
     const BufferId SlicedBufferId;
 private:
-    const BufferId mBufferBufferId;
-    const BufferId mAxisAlignedIntParamsBufferId;
+    const BufferKey mBufferBufferId;
+    const BufferKey mAxisAlignedIntParamsBufferId;
 };
 
 
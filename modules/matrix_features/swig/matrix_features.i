@@ -4,6 +4,8 @@
     #include "BufferTypes.h"
     #include "FeatureExtractorStep.h"
     #include "SliceAxisAlignedFeaturesStep.h"
+    #include "PresortColumnsStep.h"
+    #include "HistogramBinsStep.h"
 %}
 
 %include <exception.i>
@@ -14,6 +16,8 @@
 
 %include "FeatureExtractorStep.h"
 %include "SliceAxisAlignedFeaturesStep.h"
+%include "PresortColumnsStep.h"
+%include "HistogramBinsStep.h"
 
 %template(AxisAlignedParamsStep_f32i32) AxisAlignedParamsStep< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
 %template(RandomProjectionParamsStep_f32i32) RandomProjectionParamsStep< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
@@ -28,6 +32,10 @@
 %template(LinearFloat32MatrixFeature_f32i32) LinearMatrixFeature< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
 %template(LinearFloat32MatrixFeatureExtractorStep_f32i32) FeatureExtractorStep< LinearMatrixFeature<DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> > >;
 %template(SliceFloatMatrixFromAxisAlignedFeaturesStep_Default) SliceAxisAlignedFeaturesStep< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
+%template(SliceInt32MatrixFromAxisAlignedFeaturesStep_Default) SliceAxisAlignedFeaturesStep< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::Index> >;
+%template(PresortColumnsStep_f32i32) PresortColumnsStep< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
+%template(SliceInt32VectorFromAxisAlignedFeaturesStep_Default) SliceAxisAlignedFeaturesStep< DefaultBufferTypes, VectorBufferTemplate<DefaultBufferTypes::Index> >;
+%template(HistogramBinsStep_f32i32) HistogramBinsStep< DefaultBufferTypes, MatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
 
 %template(LinearFloat32MatrixFeature_Sparse_f32i32) LinearMatrixFeature< DefaultBufferTypes, SparseMatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> >;
 %template(LinearFloat32MatrixFeatureExtractorStep_Sparse_f32i32) FeatureExtractorStep< LinearMatrixFeature<DefaultBufferTypes, SparseMatrixBufferTemplate<DefaultBufferTypes::SourceContinuous> > >;
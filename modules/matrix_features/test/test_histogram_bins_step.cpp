@@ -0,0 +1,120 @@
+#include <boost/test/unit_test.hpp>
+
+#include "BufferTypes.h"
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "BufferCollectionStack.h"
+#include "HistogramBinsStep.h"
+
+typedef BufferTypes<double, int, int, double, int, double, double, int, double> HistogramBufferTypes_t;
+
+struct HistogramBinsStepFixture {
+    HistogramBinsStepFixture()
+    : xs_key("xs")
+    , indices_key("indices")
+    , collection()
+    , stack()
+    {
+        double xsData[] = {3, 1, 7,
+                           6, 2, 7,
+                           1, 1, 7,
+                           5, 2, 7,
+                           2, 1, 7,
+                           4, 1, 7};
+        int indicesData[] = {0, 1, 2, 3, 4, 5};
+        collection.AddBuffer(xs_key, MatrixBufferTemplate<double>(&xsData[0], 6, 3));
+        collection.AddBuffer(indices_key, VectorBufferTemplate<int>(&indicesData[0], 6));
+        stack.Push(&collection);
+    }
+
+    ~HistogramBinsStepFixture()
+    {
+    }
+
+    const BufferCollectionKey_t xs_key;
+    const BufferCollectionKey_t indices_key;
+    BufferCollection collection;
+    BufferCollectionStack stack;
+};
+
+BOOST_FIXTURE_TEST_SUITE( HistogramBinsStepTests,  HistogramBinsStepFixture)
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep)
+{
+    const HistogramBinsStep< HistogramBufferTypes_t, MatrixBufferTemplate<double> > histogramBinsStep(xs_key, indices_key, 3);
+
+    boost::mt19937 gen(0);
+    histogramBinsStep.ProcessStep(stack, collection, gen, collection, 0);
+
+    const MatrixBufferTemplate<double>& binEdges =
+            collection.GetBuffer< MatrixBufferTemplate<double> >(histogramBinsStep.BinEdgesBufferId);
+    const VectorBufferTemplate<int>& binEdgesCounts =
+            collection.GetBuffer< VectorBufferTemplate<int> >(histogramBinsStep.BinEdgesCountsBufferId);
+
+    // Equal values share a bin and a constant column has no edges
+    double expectedEdgesData[] = {2.5, 4.5,
+                                  1.5, 0,
+                                  0,   0};
+    int expectedEdgesCountsData[] = {2, 1, 0};
+    BOOST_CHECK(binEdges == MatrixBufferTemplate<double>(&expectedEdgesData[0], 3, 2));
+    BOOST_CHECK(binEdgesCounts == VectorBufferTemplate<int>(&expectedEdgesCountsData[0], 3));
+
+    // Row d of the codes is the bin of every row of column d
+    const MatrixBufferTemplate<HistogramBinCode>& binCodes =
+            collection.GetBuffer< MatrixBufferTemplate<HistogramBinCode> >(histogramBinsStep.BinCodesBufferId);
+    int expectedCodesData[] = {1, 2, 0, 2, 0, 1,
+                                            0, 1, 0, 1, 0, 0,
+                                            0, 0, 0, 0, 0, 0};
+    BOOST_CHECK(binCodes == MatrixBufferTemplate<HistogramBinCode>(&expectedCodesData[0], 3, 6));
+}
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep_codes_every_row)
+{
+    // The edges only come from the indices but every row is coded
+    int indicesData[] = {0, 1, 2};
+    collection.AddBuffer(indices_key, VectorBufferTemplate<int>(&indicesData[0], 3));
+    const HistogramBinsStep< HistogramBufferTypes_t, MatrixBufferTemplate<double> > histogramBinsStep(xs_key, indices_key, 3);
+
+    boost::mt19937 gen(0);
+    histogramBinsStep.ProcessStep(stack, collection, gen, collection, 0);
+
+    const MatrixBufferTemplate<double>& binEdges =
+            collection.GetBuffer< MatrixBufferTemplate<double> >(histogramBinsStep.BinEdgesBufferId);
+    BOOST_CHECK_CLOSE(binEdges.Get(0, 0), 2.0, 0.001);
+    BOOST_CHECK_CLOSE(binEdges.Get(0, 1), 4.5, 0.001);
+
+    const MatrixBufferTemplate<HistogramBinCode>& binCodes =
+            collection.GetBuffer< MatrixBufferTemplate<HistogramBinCode> >(histogramBinsStep.BinCodesBufferId);
+    BOOST_CHECK_EQUAL(binCodes.GetN(), 6);
+    HistogramBinCode expectedColumn0Codes[] = {1, 2, 0, 2, 0, 1};
+    for(int r=0; r<6; r++)
+    {
+        BOOST_CHECK_EQUAL(binCodes.Get(0, r), expectedColumn0Codes[r]);
+    }
+}
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep_more_bins_than_values)
+{
+    const HistogramBinsStep< HistogramBufferTypes_t, MatrixBufferTemplate<double> > histogramBinsStep(xs_key, indices_key, 255);
+
+    boost::mt19937 gen(0);
+    histogramBinsStep.ProcessStep(stack, collection, gen, collection, 0);
+
+    const MatrixBufferTemplate<double>& binEdges =
+            collection.GetBuffer< MatrixBufferTemplate<double> >(histogramBinsStep.BinEdgesBufferId);
+    const VectorBufferTemplate<int>& binEdgesCounts =
+            collection.GetBuffer< VectorBufferTemplate<int> >(histogramBinsStep.BinEdgesCountsBufferId);
+
+    BOOST_CHECK_EQUAL(binEdges.GetN(), 254);
+    BOOST_CHECK_EQUAL(binEdgesCounts.Get(0), 5);
+    BOOST_CHECK_EQUAL(binEdgesCounts.Get(1), 1);
+    BOOST_CHECK_EQUAL(binEdgesCounts.Get(2), 0);
+    for(int i=0; i<5; i++)
+    {
+        BOOST_CHECK_CLOSE(binEdges.Get(0, i), 1.5 + i, 0.001);
+    }
+    BOOST_CHECK_CLOSE(binEdges.Get(1, 0), 1.5, 0.001);
+}
+
+BOOST_AUTO_TEST_SUITE_END()
@@ -1,7 +1,10 @@
 #include <boost/test/unit_test.hpp>
 
+#include <vector>
+
 #include "VectorBuffer.h"
 #include "MatrixBuffer.h"
+#include "SparseMatrixBuffer.h"
 #include "BufferCollection.h"
 #include "BufferCollectionStack.h"
 #include "LinearMatrixFeature.h"
@@ -103,6 +106,90 @@ BOOST_AUTO_TEST_CASE(test_FeatureValue_linear_combination)
     BOOST_CHECK_EQUAL(featureBinding.FeatureValue(1, 1), 14.5);
 }
 
+BOOST_AUTO_TEST_CASE(test_FeatureValues_linear_combination)
+{
+    double float_params_data[] = {0, 0, -1.0, 0.0, 1.0, 2.0, -3.0,
+                                  0, 0, -0.5, 0.5, 1.5, 1, 1};
+    MatrixBufferTemplate<double> float_params(&float_params_data[0], 2, 7);
+    collection.AddBuffer< MatrixBufferTemplate<double> >(float_params_key, float_params);
+
+    int int_params_data[] = {MATRIX_FEATURES, 5, 0, 1, 2, 3, 4,
+                             MATRIX_FEATURES, 3, 0, 2, 4, 1, 1};
+    MatrixBufferTemplate<int> int_params(&int_params_data[0], 2, 7);
+    collection.AddBuffer< MatrixBufferTemplate<int> >(int_params_key, int_params);
+
+    LinearMatrixFeature_t matrix_feature(  float_params_key, int_params_key,
+                                           indices_key, xs_key);
+    LinearMatrixFeatureBinding_t featureBinding =  matrix_feature.Bind(stack);
+    const int numberOfDatapoints = featureBinding.GetNumberOfDatapoints();
+    std::vector<float> featureValues(numberOfDatapoints);
+    for(int f=0; f<2; f++)
+    {
+        featureBinding.FeatureValues(f, &featureValues[0]);
+        for(int s=0; s<numberOfDatapoints; s++)
+        {
+            BOOST_CHECK_EQUAL(featureValues[s], featureBinding.FeatureValue(f, s));
+        }
+    }
+}
+
+BOOST_AUTO_TEST_CASE(test_FeatureValues_sparse_column_index)
+{
+    typedef LinearMatrixFeature<TestBufferTypes_t, SparseMatrixBufferTemplate<TestBufferTypes_t::SourceContinuous > > SparseLinearMatrixFeature_t;
+    typedef LinearMatrixFeatureBinding<TestBufferTypes_t, SparseMatrixBufferTemplate<TestBufferTypes_t::SourceContinuous > > SparseLinearMatrixFeatureBinding_t;
+
+    double xs_data[] = {0, 1, 0, 0, 4,
+                        0, 0, 0, 8, 0,
+                        3, 0, 0, 0, 2,
+                        0, 7, 0, 5, 0};
+    SparseMatrixBufferTemplate<double> sparse_xs(&xs_data[0], 4, 5);
+    sparse_xs.BuildColumnIndex();
+    collection.AddBuffer< SparseMatrixBufferTemplate<double> >(xs_key, sparse_xs);
+
+    // Repeated and unsorted rows like a bootstrap sample
+    int indices_data[] = {3, 0, 3, 2, 1, 0};
+    collection.AddBuffer< VectorBufferTemplate<int> >(indices_key, VectorBufferTemplate<int>(&indices_data[0], 6));
+
+    double float_params_data[] = {0, 0, 1.0, 0.0,
+                                  0, 0, -0.5, 2.0,
+                                  0, 0, 1.5, 0.0};
+    MatrixBufferTemplate<double> float_params(&float_params_data[0], 3, 4);
+    collection.AddBuffer< MatrixBufferTemplate<double> >(float_params_key, float_params);
+
+    int int_params_data[] = {MATRIX_FEATURES, 1, 1, 0,
+                             MATRIX_FEATURES, 2, 4, 3,
+                             MATRIX_FEATURES, 1, 2, 0};
+    MatrixBufferTemplate<int> int_params(&int_params_data[0], 3, 4);
+    collection.AddBuffer< MatrixBufferTemplate<int> >(int_params_key, int_params);
+
+    SparseLinearMatrixFeature_t matrix_feature(  float_params_key, int_params_key,
+                                                 indices_key, xs_key);
+    SparseLinearMatrixFeatureBinding_t featureBinding =  matrix_feature.Bind(stack);
+    const int numberOfDatapoints = featureBinding.GetNumberOfDatapoints();
+    std::vector<float> featureValues(numberOfDatapoints);
+    for(int f=0; f<3; f++)
+    {
+        featureBinding.FeatureValues(f, &featureValues[0]);
+        for(int s=0; s<numberOfDatapoints; s++)
+        {
+            BOOST_CHECK_EQUAL(featureValues[s], featureBinding.FeatureValue(f, s));
+        }
+    }
+
+    // The binding sees changes to the indices
+    VectorBufferTemplate<int>* bindedIndices = collection.GetBufferPtr< VectorBufferTemplate<int> >(indices_key);
+    bindedIndices->Set(0, 2);
+    bindedIndices->Set(3, 3);
+    for(int f=0; f<3; f++)
+    {
+        featureBinding.FeatureValues(f, &featureValues[0]);
+        for(int s=0; s<numberOfDatapoints; s++)
+        {
+            BOOST_CHECK_EQUAL(featureValues[s], featureBinding.FeatureValue(f, s));
+        }
+    }
+}
+
 BOOST_AUTO_TEST_CASE(test_FeatureExtractor_linear_combination)
 {
     double float_params_data[] = {0, 0, -1.0, 0.0, 1.0, 2.0, -3.0,
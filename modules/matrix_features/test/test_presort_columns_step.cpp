@@ -0,0 +1,59 @@
+#include <boost/test/unit_test.hpp>
+
+#include "BufferTypes.h"
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "BufferCollectionStack.h"
+#include "PresortColumnsStep.h"
+
+typedef BufferTypes<double, int, int, double, int, double, double, int, double> PresortBufferTypes_t;
+
+struct PresortColumnsStepFixture {
+    PresortColumnsStepFixture()
+    : xs_key("xs")
+    , indices_key("indices")
+    , collection()
+    , stack()
+    {
+        double xsData[] = {6, 0.5, 2,
+                           3, 0.5, 1,
+                           7, 0.1, 9,
+                           0, 0.7, 4};
+        int indicesData[] = {3, 0, 2, 0};
+        collection.AddBuffer(xs_key, MatrixBufferTemplate<double>(&xsData[0], 4, 3));
+        collection.AddBuffer(indices_key, VectorBufferTemplate<int>(&indicesData[0], 4));
+        stack.Push(&collection);
+    }
+
+    ~PresortColumnsStepFixture()
+    {
+    }
+
+    const BufferCollectionKey_t xs_key;
+    const BufferCollectionKey_t indices_key;
+    BufferCollection collection;
+    BufferCollectionStack stack;
+};
+
+BOOST_FIXTURE_TEST_SUITE( PresortColumnsStepTests,  PresortColumnsStepFixture)
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep)
+{
+    const PresortColumnsStep< PresortBufferTypes_t, MatrixBufferTemplate<double> > presortStep(xs_key, indices_key);
+
+    boost::mt19937 gen(0);
+    presortStep.ProcessStep(stack, collection, gen, collection, 0);
+
+    BOOST_CHECK(collection.HasBuffer< MatrixBufferTemplate<int> >(presortStep.SortedIndicesBufferId));
+    const MatrixBufferTemplate<int>& sortedIndices =
+            collection.GetBuffer< MatrixBufferTemplate<int> >(presortStep.SortedIndicesBufferId);
+
+    // Positions in indices ordered by each column, ties are ordered by position
+    int expectedData[] = {0, 1, 3, 2,
+                          2, 1, 3, 0,
+                          1, 3, 0, 2};
+    BOOST_CHECK(sortedIndices == MatrixBufferTemplate<int>(&expectedData[0], 3, 4));
+}
+
+BOOST_AUTO_TEST_SUITE_END()
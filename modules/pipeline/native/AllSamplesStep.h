@@ -29,7 +29,7 @@ public:
     const BufferId IndicesBufferId;
     const BufferId WeightsBufferId;
 private:
-    const BufferId mDataBufferId;
+    const BufferKey mDataBufferId;
 
 };
 
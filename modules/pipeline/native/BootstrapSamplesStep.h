@@ -31,7 +31,7 @@ public:
     const BufferId IndicesBufferId;
     const BufferId WeightsBufferId;
 private:
-    const BufferId mDataBufferId;
+    const BufferKey mDataBufferId;
 
 };
 
@@ -61,7 +61,6 @@ void BootstrapSamplesStep<BufferTypes, DataMatrixType>::ProcessStep(const Buffer
                                                                 boost::mt19937& gen,
                                                                 BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(gen);
     UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
@@ -80,7 +79,8 @@ void BootstrapSamplesStep<BufferTypes, DataMatrixType>::ProcessStep(const Buffer
     std::vector<int> counts(numberOfSamples);
     sampleWithReplacement( &counts[0],
                           numberOfSamples,
-                          numberOfSamples);
+                          numberOfSamples,
+                          gen);
 
     std::vector<typename BufferTypes::Index> sampledIndices;
     std::vector<typename BufferTypes::Index> oobIndices;
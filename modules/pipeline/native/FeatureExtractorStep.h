@@ -1,5 +1,7 @@
 #pragma once
 
+#include <vector>
+
 #include "VectorBuffer.h"
 #include "MatrixBuffer.h"
 #include "BufferCollection.h"
@@ -14,6 +16,9 @@
 // FeatureExtractorStep extracts features for all float/int params for all
 // datapoints
 //
+// The feature binding must implement FeatureValues(featureIndex, out) which
+// writes the feature for every datapoint to out.
+//
 // ----------------------------------------------------------------------------
 template <class FeatureType>
 class FeatureExtractorStep: public PipelineStepI, public FeatureInfoLoggerI
@@ -82,14 +87,31 @@ void FeatureExtractorStep<FeatureType>::ProcessStep(const BufferCollectionStack&
             writeCollection.GetOrAddBuffer< MatrixBufferTemplate<typename FeatureType::Float> >(FeatureValuesBufferId);
     featureValues.Resize(m,n);
 
-    for(int s=0; s<numberOfDatapoints; s++)
+    if( numberOfDatapoints == 0 )
+    {
+        return;
+    }
+
+    // The binding computes a feature for all datapoints at once.  With
+    // DATAPOINTS_BY_FEATURES the feature is a column so it goes through a
+    // temporary row.
+    if( mOrdering == FEATURES_BY_DATAPOINTS )
+    {
+        for(int f=0; f<numberOfFeatures; f++)
+        {
+            featureBinding.FeatureValues(f, featureValues.GetMutableRowPtrUnsafe(f));
+        }
+    }
+    else
     {
+        std::vector<typename FeatureType::Float> values(numberOfDatapoints);
         for(int f=0; f<numberOfFeatures; f++)
         {
-            typename FeatureType::Float value = featureBinding.FeatureValue(f, s);
-            typename FeatureType::Int r = (mOrdering == FEATURES_BY_DATAPOINTS) ? f : s;
-            typename FeatureType::Int c = (mOrdering == FEATURES_BY_DATAPOINTS) ? s : f;
-            featureValues.Set(r,c, value);
+            featureBinding.FeatureValues(f, &values[0]);
+            for(int s=0; s<numberOfDatapoints; s++)
+            {
+                featureValues.Set(s, f, values[s]);
+            }
         }
     }
 }
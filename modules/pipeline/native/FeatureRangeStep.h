@@ -27,7 +27,7 @@ public:
     const BufferId FeatureRangeMinMaxBufferId;
 private:
 
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mFeatureValuesBufferId;
     FeatureValueOrdering mOrdering;
 };
 
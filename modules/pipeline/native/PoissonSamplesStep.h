@@ -30,7 +30,7 @@ public:
     const BufferId IndicesBufferId;
     const BufferId WeightsBufferId;
 private:
-    const BufferId mDataBufferId;
+    const BufferKey mDataBufferId;
     const typename BufferTypes::SourceContinuous mMean;
 
 };
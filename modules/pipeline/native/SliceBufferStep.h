@@ -27,8 +27,8 @@ public:
     // Read only output buffer
     const BufferId SlicedBufferId;
 private:
-    const BufferId mBufferBufferId;
-    const BufferId mIndicesBufferId;
+    const BufferKey mBufferBufferId;
+    const BufferKey mIndicesBufferId;
 };
 
 
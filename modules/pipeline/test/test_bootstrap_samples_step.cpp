@@ -49,4 +49,28 @@ BOOST_AUTO_TEST_CASE(test_ProcessStep)
     BOOST_CHECK_CLOSE(totalWeight, static_cast<float>(numberOfDatapoints), 0.1);
 }
 
+BOOST_AUTO_TEST_CASE(test_ProcessStep_same_seed_same_samples)
+{
+    const int numberOfDatapoints = 50;
+    MatrixBufferTemplate<float> xs(numberOfDatapoints, 2);
+    BufferId xs_key("xs");
+    BufferCollection collection;
+    collection.AddBuffer< MatrixBufferTemplate<float> > (xs_key, xs);
+    BufferCollectionStack stack;
+    stack.Push(&collection);
+
+    BootstrapSamplesStep<SinglePrecisionBufferTypes, MatrixBufferTemplate<float> > bootstrap_step(xs_key);
+    BufferCollection first;
+    BufferCollection second;
+    boost::mt19937 gen(7);
+    bootstrap_step.ProcessStep(stack, first, gen, first, 0);
+    gen.seed(7);
+    bootstrap_step.ProcessStep(stack, second, gen, second, 0);
+
+    BOOST_CHECK(first.GetBuffer< VectorBufferTemplate<float> >(bootstrap_step.WeightsBufferId)
+                == second.GetBuffer< VectorBufferTemplate<float> >(bootstrap_step.WeightsBufferId));
+    BOOST_CHECK(first.GetBuffer< VectorBufferTemplate<int> >(bootstrap_step.IndicesBufferId)
+                == second.GetBuffer< VectorBufferTemplate<int> >(bootstrap_step.IndicesBufferId));
+}
+
 BOOST_AUTO_TEST_SUITE_END()
\ No newline at end of file
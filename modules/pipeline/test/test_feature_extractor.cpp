@@ -19,6 +19,14 @@ public:
         return static_cast<FloatType>(featureIndex * GetNumberOfDatapoints() + relativeSampleIndex);
     }
 
+    void FeatureValues( const int featureIndex, FloatType* featureValues) const
+    {
+        for(int s=0; s<GetNumberOfDatapoints(); s++)
+        {
+            featureValues[s] = FeatureValue(featureIndex, s);
+        }
+    }
+
     IntType GetNumberOfFeatures() const
     {
         return 3;
@@ -3,9 +3,17 @@
 #include <BufferCollection.h>
 #include <BufferCollectionStack.h>
 #include <Forest.h>
+#include <CompiledForest.h>
 #include <Constants.h>
 #include <PipelineStepI.h>
 
+#if USE_BOOST_THREAD
+#include <boost/thread.hpp>
+#include <boost/shared_ptr.hpp>
+#include <boost/make_shared.hpp>
+#include <boost/bind.hpp>
+#endif
+
 template <class FeatureBinding, class BufferTypes>
 typename BufferTypes::Index nextChild(  const FeatureBinding& feature,
                     const Tree& tree,
@@ -41,15 +49,36 @@ typename BufferTypes::Index walkTree( const FeatureBinding& feature,
     return walkTree<FeatureBinding,BufferTypes>(feature, tree, childNodeId, index);
 }
 
+// Iterative version of walkTree over a CompiledTree.  The feature must be bound
+// to the compiled tree's params because they are indexed by compiled node id.
+template <class FeatureBinding, class BufferTypes>
+typename BufferTypes::Index walkCompiledTree( const FeatureBinding& feature,
+                  const CompiledTree& tree,
+                  const typename BufferTypes::Index index )
+{
+    const CompiledNode* nodes = tree.GetNodes();
+    typename BufferTypes::Index compiledNodeId = 0;
+    while(nodes[compiledNodeId].mLeftChild != NULL_CHILD)
+    {
+        const CompiledNode& node = nodes[compiledNodeId];
+        const typename BufferTypes::FeatureValue featureValue = feature.FeatureValue(compiledNodeId, index);
+        const bool goLeft = (featureValue > node.mSplitpoint);
+        compiledNodeId = goLeft ? node.mLeftChild : node.mRightChild;
+    }
+    return nodes[compiledNodeId].mNodeId;
+}
 
 template <class Feature, class Combiner, class BufferTypes>
 class TemplateForestPredictor
 {
 public:
     TemplateForestPredictor( const Forest& forest, const Feature& feature, const Combiner& combiner, const PipelineStepI* preSteps );
+    TemplateForestPredictor( const Forest& forest, const Feature& feature, const Combiner& combiner, const PipelineStepI* preSteps, int numberOfJobs );
     ~TemplateForestPredictor();
 
     void PredictLeafs(const BufferCollection& data, MatrixBufferTemplate<int>& leafsOut) const;
+    // Only walks the trees from firstTreeId on, column t of leafsOut is tree firstTreeId+t
+    void PredictLeafs(const BufferCollection& data, int firstTreeId, MatrixBufferTemplate<int>& leafsOut) const;
     void PredictYs(const BufferCollection& data, MatrixBufferTemplate<float>& ysOut);
     void PredictOobYs(const BufferCollection& data, MatrixBufferTemplate<float>& ysOut);
     void PredictYs(const BufferCollection& data, const VectorBufferTemplate<double>& treeWeights, MatrixBufferTemplate<float>& ysOut);
@@ -61,10 +90,33 @@ public:
 
     void SetForest(const Forest& forest);
     Forest GetForest() const;
+    const CompiledForest& GetCompiledForest() const;
+    int GetNumberOfTrees() const;
     void AddTree(const Tree& tree);
+    void RemoveTree(const int index);
     void AddForest(const Forest& forest);
 
+    void SetNumberOfJobs(int numberOfJobs);
+    int GetNumberOfJobs() const;
+
 private:
+    void PredictLeafsRange(const std::vector<typename Feature::FeatureBinding>& featureBindings,
+                            int firstTreeId,
+                            typename BufferTypes::Index startIndex,
+                            typename BufferTypes::Index endIndex,
+                            MatrixBufferTemplate<int>& leafsOut) const;
+
+    void PredictYsRange(const std::vector<typename Feature::FeatureBinding>& featureBindings,
+                        const std::vector< const VectorBufferTemplate<typename BufferTypes::Index>* >& oobIndices,
+                        const VectorBufferTemplate<double>& treeWeights,
+                        bool useOobIndices,
+                        const MatrixBufferTemplate<int>* leafs,
+                        typename BufferTypes::Index startIndex,
+                        typename BufferTypes::Index endIndex,
+                        MatrixBufferTemplate<float>& ysOut) const;
+
+    int GetNumberOfJobs(int numberOfIndices) const;
+
     void PredictYsInternal(const BufferCollection& data, 
                             MatrixBufferTemplate<float>& ysOut, 
                             const VectorBufferTemplate<double>& treeWeights,
@@ -72,17 +124,31 @@ private:
                             const MatrixBufferTemplate<int>* leafs);
 
     Forest mForest;
+    CompiledForest mCompiledForest;
     Feature mFeature;
     Combiner mCombiner;
     const PipelineStepI* mPreSteps;
+    int mNumberOfJobs;
 };
 
 template <class Feature, class Combiner, class BufferTypes>
 TemplateForestPredictor<Feature, Combiner, BufferTypes>::TemplateForestPredictor( const Forest& forest, const Feature& feature, const Combiner& combiner, const PipelineStepI* preSteps )
 : mForest(forest)
+, mCompiledForest(forest)
 , mFeature(feature)
 , mCombiner(combiner)
 , mPreSteps(preSteps->Clone())
+, mNumberOfJobs(1)
+{}
+
+template <class Feature, class Combiner, class BufferTypes>
+TemplateForestPredictor<Feature, Combiner, BufferTypes>::TemplateForestPredictor( const Forest& forest, const Feature& feature, const Combiner& combiner, const PipelineStepI* preSteps, int numberOfJobs )
+: mForest(forest)
+, mCompiledForest(forest)
+, mFeature(feature)
+, mCombiner(combiner)
+, mPreSteps(preSteps->Clone())
+, mNumberOfJobs(numberOfJobs)
 {}
 
 template <class Feature, class Combiner, class BufferTypes>
@@ -94,21 +160,30 @@ TemplateForestPredictor<Feature, Combiner, BufferTypes>::~TemplateForestPredicto
 template <class Feature, class Combiner, class BufferTypes>
 void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafs( const BufferCollection& data,
                                                                                   MatrixBufferTemplate<int>& leafsOut) const
+{
+    PredictLeafs(data, 0, leafsOut);
+}
+
+template <class Feature, class Combiner, class BufferTypes>
+void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafs( const BufferCollection& data,
+                                                                                  int firstTreeId,
+                                                                                  MatrixBufferTemplate<int>& leafsOut) const
 {
     boost::mt19937 gen;
     gen.seed(0);
 
     const int numberOfTreesInForest = mForest.mTrees.size();
+    ASSERT_VALID_RANGE(firstTreeId, 0, numberOfTreesInForest)
     BufferCollectionStack stack;
     stack.Push(&data);
 
     BufferCollection* perTreeBufferCollection = new BufferCollection[numberOfTreesInForest];
     std::vector<typename Feature::FeatureBinding> featureBindings(numberOfTreesInForest);
-    for(int treeId=0; treeId<numberOfTreesInForest; treeId++)
+    for(int treeId=firstTreeId; treeId<numberOfTreesInForest; treeId++)
     {
         BufferCollection& bc = perTreeBufferCollection[treeId];
-        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mFeature.mFloatParamsBufferId, mForest.mTrees[treeId].GetFloatFeatureParams());
-        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mFeature.mIntParamsBufferId, mForest.mTrees[treeId].GetIntFeatureParams());
+        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mFeature.mFloatParamsBufferId, mCompiledForest.GetTree(treeId).GetFloatFeatureParams());
+        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mFeature.mIntParamsBufferId, mCompiledForest.GetTree(treeId).GetIntFeatureParams());
         mPreSteps->ProcessStep(stack, bc, gen, bc, 0);
 
         stack.Push(&bc);
@@ -116,22 +191,51 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafs( cons
         stack.Pop();
     }
 
-    const int numberOfIndices = featureBindings[0].GetNumberOfDatapoints();
-    leafsOut.Resize(numberOfIndices, numberOfTreesInForest);
+    const int numberOfIndices = featureBindings[firstTreeId].GetNumberOfDatapoints();
+    leafsOut.Resize(numberOfIndices, numberOfTreesInForest-firstTreeId);
 
-    for(typename BufferTypes::Index i=0; i<numberOfIndices; i++)
+    // Each job walks a contiguous block of datapoints and only writes its own rows of leafsOut
+    const int numberOfJobs = GetNumberOfJobs(numberOfIndices);
+#if USE_BOOST_THREAD
+    std::vector< boost::shared_ptr< boost::thread > > threadVec;
+    for(int job=0; job<numberOfJobs; job++)
     {
-        for(typename BufferTypes::Index treeId=0; treeId<numberOfTreesInForest; treeId++)
-        {
-            typename BufferTypes::Index leafNodeId = walkTree<typename Feature::FeatureBinding, BufferTypes>(
-                                                                            featureBindings[treeId], mForest.mTrees[treeId], 0, i);
-            leafsOut.Set(i, treeId, leafNodeId);
-        }
+        const int startIndex = (job * numberOfIndices) / numberOfJobs;
+        const int endIndex = ((job+1) * numberOfIndices) / numberOfJobs;
+        threadVec.push_back( boost::make_shared<boost::thread>(&TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafsRange,
+                                                                this, boost::cref(featureBindings), firstTreeId, startIndex, endIndex, boost::ref(leafsOut)) );
     }
+    for(int job=0; job<numberOfJobs; job++)
+    {
+        threadVec[job]->join();
+    }
+#else
+    UNUSED_PARAM(numberOfJobs)
+    PredictLeafsRange(featureBindings, firstTreeId, 0, numberOfIndices, leafsOut);
+#endif
 
     delete[] perTreeBufferCollection;
 }
 
+template <class Feature, class Combiner, class BufferTypes>
+void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafsRange(const std::vector<typename Feature::FeatureBinding>& featureBindings,
+                                                                                int firstTreeId,
+                                                                                typename BufferTypes::Index startIndex,
+                                                                                typename BufferTypes::Index endIndex,
+                                                                                MatrixBufferTemplate<int>& leafsOut) const
+{
+    const int numberOfTreesInForest = mForest.mTrees.size();
+    for(typename BufferTypes::Index i=startIndex; i<endIndex; i++)
+    {
+        for(typename BufferTypes::Index treeId=firstTreeId; treeId<numberOfTreesInForest; treeId++)
+        {
+            typename BufferTypes::Index leafNodeId = walkCompiledTree<typename Feature::FeatureBinding, BufferTypes>(
+                                                                            featureBindings[treeId], mCompiledForest.GetTree(treeId), i);
+            leafsOut.Set(i, treeId-firstTreeId, leafNodeId);
+        }
+    }
+}
+
 template <class Feature, class Combiner, class BufferTypes>
 void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYs( const BufferCollection& data,
                                                                               MatrixBufferTemplate<float>& ysOut)
@@ -203,15 +307,14 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYsInternal(
     std::vector<typename Feature::FeatureBinding> featureBindings(numberOfTreesInForest);
 
     std::vector< const VectorBufferTemplate<typename BufferTypes::Index>* > oobIndices(numberOfTreesInForest);
-    std::vector<typename BufferTypes::Index> currentOobOffset(numberOfTreesInForest);
 
     for(int treeId=0; treeId<numberOfTreesInForest; treeId++)
     {
         const Tree& tree = mForest.mTrees[treeId];
         BufferCollection& bc = perTreeBufferCollection[treeId];
 
-        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mFeature.mFloatParamsBufferId, tree.GetFloatFeatureParams());
-        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mFeature.mIntParamsBufferId, tree.GetIntFeatureParams());
+        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mFeature.mFloatParamsBufferId, mCompiledForest.GetTree(treeId).GetFloatFeatureParams());
+        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mFeature.mIntParamsBufferId, mCompiledForest.GetTree(treeId).GetIntFeatureParams());
         mPreSteps->ProcessStep(stack, bc, gen, bc, 0);
 
         stack.Push(&bc);
@@ -222,16 +325,79 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYsInternal(
         {
             oobIndices[treeId] = tree.GetExtraInfo().GetBufferPtr< VectorBufferTemplate<typename BufferTypes::Index> >(OOB_INDICES);
             ASSERT(oobIndices[treeId]->IsSorted()) //Assuming OOB_INDICES have already been sorted
-            currentOobOffset[treeId] = 0;
         }
     }
 
     const int numberOfIndices = featureBindings[0].GetNumberOfDatapoints();
     ysOut.Resize(numberOfIndices, mCombiner.GetResultDim());
 
-    for(typename BufferTypes::Index i=0; i<numberOfIndices; i++)
+    // Each job walks a contiguous block of datapoints and only writes its own rows of ysOut
+    const int numberOfJobs = GetNumberOfJobs(numberOfIndices);
+#if USE_BOOST_THREAD
+    std::vector< boost::shared_ptr< boost::thread > > threadVec;
+    for(int job=0; job<numberOfJobs; job++)
+    {
+        const int startIndex = (job * numberOfIndices) / numberOfJobs;
+        const int endIndex = ((job+1) * numberOfIndices) / numberOfJobs;
+        // Bound first because make_shared takes at most nine arguments
+        threadVec.push_back( boost::make_shared<boost::thread>(boost::bind(&TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYsRange,
+                                                                this, boost::cref(featureBindings), boost::cref(oobIndices), boost::cref(treeWeights),
+                                                                useOobIndices, leafs, startIndex, endIndex, boost::ref(ysOut))) );
+    }
+    for(int job=0; job<numberOfJobs; job++)
+    {
+        threadVec[job]->join();
+    }
+#else
+    UNUSED_PARAM(numberOfJobs)
+    PredictYsRange(featureBindings, oobIndices, treeWeights, useOobIndices, leafs, 0, numberOfIndices, ysOut);
+#endif
+}
+
+template <class Feature, class Combiner, class BufferTypes>
+void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYsRange(const std::vector<typename Feature::FeatureBinding>& featureBindings,
+                                                                             const std::vector< const VectorBufferTemplate<typename BufferTypes::Index>* >& oobIndices,
+                                                                             const VectorBufferTemplate<double>& treeWeights,
+                                                                             bool useOobIndices,
+                                                                             const MatrixBufferTemplate<int>* leafs,
+                                                                             typename BufferTypes::Index startIndex,
+                                                                             typename BufferTypes::Index endIndex,
+                                                                             MatrixBufferTemplate<float>& ysOut) const
+{
+    const int numberOfTreesInForest = mForest.mTrees.size();
+    const int numberOfIndices = featureBindings[0].GetNumberOfDatapoints();
+
+    // Each job combines into its own copy because the combiner keeps per datapoint state
+    Combiner combiner(mCombiner);
+
+    // Start each tree's oob offset at the first oob index in this job's block
+    std::vector<typename BufferTypes::Index> currentOobOffset(numberOfTreesInForest, 0);
+    if(useOobIndices)
     {
-        mCombiner.Reset();
+        for(int treeId=0; treeId<numberOfTreesInForest; treeId++)
+        {
+            const VectorBufferTemplate<typename BufferTypes::Index>& treeOobIndices = *oobIndices[treeId];
+            typename BufferTypes::Index low = 0;
+            typename BufferTypes::Index high = treeOobIndices.GetN();
+            while(low < high)
+            {
+                const typename BufferTypes::Index mid = low + (high - low) / 2;
+                if(treeOobIndices.Get(mid) < startIndex)
+                {
+                    low = mid + 1;
+                }
+                else
+                {
+                    high = mid;
+                }
+            }
+            currentOobOffset[treeId] = std::min(treeOobIndices.GetN()-1, low);
+        }
+    }
+
+    for(typename BufferTypes::Index i=startIndex; i<endIndex; i++)
+    {
+        combiner.Reset();
         for(typename BufferTypes::Index treeId=0; treeId<numberOfTreesInForest; treeId++)
         {
             // Only include an datapoint if it is OOB or if we're not using OOB samples 
@@ -241,9 +407,9 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYsInternal(
             {
                 const Tree& tree = mForest.mTrees[treeId];
                 typename BufferTypes::Index leafNodeId = (leafs != NULL) ? leafs->Get(i, treeId) :
-                                                walkTree<typename Feature::FeatureBinding, BufferTypes>(
-                                                                    featureBindings[treeId], tree, 0, i);
-                mCombiner.Combine(leafNodeId, tree.GetCounts().Get(leafNodeId), tree.GetYs(), treeWeights.Get(treeId));
+                                                walkCompiledTree<typename Feature::FeatureBinding, BufferTypes>(
+                                                                    featureBindings[treeId], mCompiledForest.GetTree(treeId), i);
+                combiner.Combine(leafNodeId, tree.GetCounts().Get(leafNodeId), tree.GetYs(), treeWeights.Get(treeId));
             }
 
             if(isOobIndex)
@@ -252,7 +418,7 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictYsInternal(
             }
 
         }
-        mCombiner.WriteResult(i, ysOut);
+        combiner.WriteResult(i, ysOut);
     }
 }
 
@@ -281,8 +447,8 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafYs(cons
         const Tree& tree = mForest.mTrees[treeId];
         BufferCollection& bc = perTreeBufferCollection[treeId];
 
-        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mFeature.mFloatParamsBufferId, tree.GetFloatFeatureParams());
-        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mFeature.mIntParamsBufferId, tree.GetIntFeatureParams());
+        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsContinuous> >(mFeature.mFloatParamsBufferId, mCompiledForest.GetTree(treeId).GetFloatFeatureParams());
+        bc.AddBuffer< MatrixBufferTemplate<typename BufferTypes::ParamsInteger> >(mFeature.mIntParamsBufferId, mCompiledForest.GetTree(treeId).GetIntFeatureParams());
         mPreSteps->ProcessStep(stack, bc, gen, bc, 0);
 
         stack.Push(&bc);
@@ -309,8 +475,8 @@ void TemplateForestPredictor<Feature, Combiner, BufferTypes>::PredictLeafYs(cons
         for(typename BufferTypes::Index treeId=0; treeId<numberOfTreesInForest; treeId++)
         {
             const Tree& tree = mForest.mTrees[treeId];
-            typename BufferTypes::Index leafNodeId = walkTree<typename Feature::FeatureBinding, BufferTypes>(
-                                                                featureBindings[treeId], tree, 0, i);
+            typename BufferTypes::Index leafNodeId = walkCompiledTree<typename Feature::FeatureBinding, BufferTypes>(
+                                                                featureBindings[treeId], mCompiledForest.GetTree(treeId), i);
 
             for(int c=0; c<yDim; c++)
             {
@@ -339,6 +505,7 @@ template <class Feature, class Combiner, class BufferTypes>
 void TemplateForestPredictor<Feature, Combiner, BufferTypes>::SetForest(const Forest& forest) 
 {
     mForest = forest;
+    mCompiledForest = CompiledForest(forest);
 }
 
 template <class Feature, class Combiner, class BufferTypes>
@@ -347,16 +514,57 @@ Forest TemplateForestPredictor<Feature, Combiner, BufferTypes>::GetForest() cons
     return mForest;
 }
 
+template <class Feature, class Combiner, class BufferTypes>
+const CompiledForest& TemplateForestPredictor<Feature, Combiner, BufferTypes>::GetCompiledForest() const
+{
+    return mCompiledForest;
+}
+
+template <class Feature, class Combiner, class BufferTypes>
+int TemplateForestPredictor<Feature, Combiner, BufferTypes>::GetNumberOfTrees() const
+{
+    return mForest.mTrees.size();
+}
+
 template <class Feature, class Combiner, class BufferTypes>
 void TemplateForestPredictor<Feature, Combiner, BufferTypes>::AddTree(const Tree& tree)
 {
+    mCompiledForest.AddTree(tree);
     return mForest.AddTree(tree);
 }
 
+// Only erases the tree from the forest and the compiled forest so the other
+// trees are neither copied nor recompiled
+template <class Feature, class Combiner, class BufferTypes>
+void TemplateForestPredictor<Feature, Combiner, BufferTypes>::RemoveTree(const int index)
+{
+    mCompiledForest.RemoveTree(index);
+    mForest.RemoveTree(index);
+}
+
 template <class Feature, class Combiner, class BufferTypes>
 void TemplateForestPredictor<Feature, Combiner, BufferTypes>::AddForest(const Forest& forest)
 {
+    mCompiledForest.AddForest(forest);
     return mForest.AddForest(forest);
 }
 
+template <class Feature, class Combiner, class BufferTypes>
+void TemplateForestPredictor<Feature, Combiner, BufferTypes>::SetNumberOfJobs(int numberOfJobs)
+{
+    mNumberOfJobs = numberOfJobs;
+}
+
+template <class Feature, class Combiner, class BufferTypes>
+int TemplateForestPredictor<Feature, Combiner, BufferTypes>::GetNumberOfJobs() const
+{
+    return mNumberOfJobs;
+}
+
+template <class Feature, class Combiner, class BufferTypes>
+int TemplateForestPredictor<Feature, Combiner, BufferTypes>::GetNumberOfJobs(int numberOfIndices) const
+{
+    return std::max(1, std::min(mNumberOfJobs, numberOfIndices));
+}
+
 
@@ -1,6 +1,7 @@
 #include <boost/test/unit_test.hpp>
 
 #include <vector>
+#include <stdio.h>
 
 #include "VectorBuffer.h"
 #include "MatrixBuffer.h"
@@ -11,6 +12,7 @@
 #include "LinearMatrixFeature.h"
 #include "ClassProbabilityCombiner.h"
 #include "AllSamplesStep.h"
+#include "ForestFile.h"
 
 
 struct ForestPredictorFixture {
@@ -136,6 +138,34 @@ BOOST_AUTO_TEST_CASE(test_PredictLeafs)
     BOOST_CHECK_EQUAL(leafs.Get(0,1), 2);
 }
 
+BOOST_AUTO_TEST_CASE(test_PredictLeafs_firstTreeId)
+{
+    MatrixBufferTemplate<int> leafs;
+    forestPredictor->PredictLeafs(collection, 1, leafs);
+
+    BOOST_CHECK_EQUAL(forestPredictor->GetNumberOfTrees(), 2);
+    BOOST_CHECK_EQUAL(leafs.GetN(), 1);
+    BOOST_CHECK_EQUAL(leafs.Get(0,0), 2);
+}
+
+BOOST_AUTO_TEST_CASE(test_RemoveTree)
+{
+    forestPredictor->RemoveTree(0);
+    BOOST_CHECK_EQUAL(forestPredictor->GetNumberOfTrees(), 1);
+    BOOST_CHECK_EQUAL(forestPredictor->GetCompiledForest().GetNumberOfTrees(), 1);
+
+    MatrixBufferTemplate<int> leafs;
+    forestPredictor->PredictLeafs(collection, leafs);
+    BOOST_CHECK_EQUAL(leafs.GetN(), 1);
+    BOOST_CHECK_EQUAL(leafs.Get(0,0), 2);
+
+    MatrixBufferTemplate<float> ys;
+    forestPredictor->PredictYs(collection, ys);
+    BOOST_CHECK_CLOSE(ys.Get(0,0), 0.8, 0.1);
+    BOOST_CHECK_CLOSE(ys.Get(0,1), 0.1, 0.1);
+    BOOST_CHECK_CLOSE(ys.Get(0,2), 0.1, 0.1);
+}
+
 BOOST_AUTO_TEST_CASE(test_PredictYs)
 {
     MatrixBufferTemplate<float> ys;
@@ -146,4 +176,65 @@ BOOST_AUTO_TEST_CASE(test_PredictYs)
     BOOST_CHECK_CLOSE(ys.Get(0,2), 0.25, 0.1);
 }
 
+BOOST_AUTO_TEST_CASE(test_PredictYs_multiple_jobs)
+{
+    float many_xs_data[] = {4.0, 0.0,
+                            1.0, 3.0,
+                            6.0, -1.0,
+                            -2.0, 3.0,
+                            4.0, 0.0};
+    BufferCollection manyCollection;
+    manyCollection.AddBuffer(xs_key, MatrixBufferTemplate<float>(&many_xs_data[0], 5, 2));
+
+    MatrixBufferTemplate<int> expectedLeafs;
+    MatrixBufferTemplate<float> expectedYs;
+    forestPredictor->PredictLeafs(manyCollection, expectedLeafs);
+    forestPredictor->PredictYs(manyCollection, expectedYs);
+
+    forestPredictor->SetNumberOfJobs(3);
+    BOOST_CHECK_EQUAL(forestPredictor->GetNumberOfJobs(), 3);
+    MatrixBufferTemplate<int> leafs;
+    MatrixBufferTemplate<float> ys;
+    forestPredictor->PredictLeafs(manyCollection, leafs);
+    forestPredictor->PredictYs(manyCollection, ys);
+
+    BOOST_CHECK(leafs == expectedLeafs);
+    BOOST_CHECK(ys == expectedYs);
+    BOOST_CHECK_CLOSE(ys.Get(4,0), 0.55, 0.1);
+    BOOST_CHECK_CLOSE(ys.Get(4,1), 0.2, 0.1);
+    BOOST_CHECK_CLOSE(ys.Get(4,2), 0.25, 0.1);
+}
+
+BOOST_AUTO_TEST_CASE(test_ForestPredictor_wraps_mapped_forest)
+{
+    const std::string filename = "test_forest_predictor.rftk";
+    WriteForestFile(forest, filename);
+    {
+        Forest mappedForest = ReadForestFile(filename);
+        TemplateForestPredictor< LinearMatrixFeature_t, ClassProbabilityCombiner<BufferTypes_t>, BufferTypes_t> mappedPredictor(
+                                mappedForest, feature, combiner, &indicesStep);
+
+        MatrixBufferTemplate<int> expectedLeafs;
+        MatrixBufferTemplate<float> expectedYs;
+        forestPredictor->PredictLeafs(collection, expectedLeafs);
+        forestPredictor->PredictYs(collection, expectedYs);
+        MatrixBufferTemplate<int> leafs;
+        MatrixBufferTemplate<float> ys;
+        mappedPredictor.PredictLeafs(collection, leafs);
+        mappedPredictor.PredictYs(collection, ys);
+        BOOST_CHECK(leafs == expectedLeafs);
+        BOOST_CHECK(ys == expectedYs);
+
+        // Neither building the predictor nor predicting copies the mapped trees
+        const Forest predictorForest = mappedPredictor.GetForest();
+        for(int i=0; i<mappedPredictor.GetNumberOfTrees(); i++)
+        {
+            BOOST_CHECK(mappedPredictor.GetCompiledForest().GetTree(i).IsView());
+            BOOST_CHECK(predictorForest.mTrees[i].GetPath().IsView());
+            BOOST_CHECK(predictorForest.mTrees[i].GetYs().IsView());
+        }
+    }
+    remove(filename.c_str());
+}
+
 BOOST_AUTO_TEST_SUITE_END()
@@ -90,8 +90,8 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mYsBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mYsBufferId;
 };
 
 template <class BT>
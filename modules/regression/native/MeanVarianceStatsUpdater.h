@@ -21,6 +21,13 @@ public:
     void UpdateStats(typename BT::DatapointCounts& counts, Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& stats,
                 int feature, int threshold, int sampleIndex) const;
 
+    // Combine the mean and variance of otherFeature, otherThreshold in otherStats
+    // with feature, threshold in stats (parallel variant of Welford's update)
+    void MergeStats(typename BT::DatapointCounts& counts, Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& stats,
+                int feature, int threshold,
+                typename BT::DatapointCounts otherCounts, const Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& otherStats,
+                int otherFeature, int otherThreshold) const;
+
 private:
     VectorBufferTemplate<typename BT::DatapointCounts> const* mSampleWeights;
     MatrixBufferTemplate<typename BT::SourceContinuous> const* mYs;
@@ -58,6 +65,31 @@ void BindedMeanVarianceStatsUpdater<BT>::UpdateStats(typename BT::DatapointCount
     counts = newCounts;
 }
 
+template <class BT>
+void BindedMeanVarianceStatsUpdater<BT>::MergeStats(typename BT::DatapointCounts& counts, Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& stats,
+                                                          int feature, int threshold,
+                                                          typename BT::DatapointCounts otherCounts, const Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& otherStats,
+                                                          int otherFeature, int otherThreshold) const
+{
+    const typename BT::DatapointCounts newCounts = counts + otherCounts;
+    if( otherCounts <= typename BT::DatapointCounts(0) || newCounts <= typename BT::DatapointCounts(0) )
+    {
+        return;
+    }
+
+    const typename BT::Index yDim = mYs->GetN();
+    ASSERT_ARG_DIM_1D(yDim, stats.GetN()/2);
+
+    for(typename BT::Index d=0; d<yDim; d++)
+    {
+        const typename BT::SufficientStatsContinuous mean = stats.Get(feature, threshold, d);
+        const typename BT::SufficientStatsContinuous delta = otherStats.Get(otherFeature, otherThreshold, d) - mean;
+        stats.Incr(feature, threshold, d, delta * otherCounts / newCounts);
+        stats.Incr(feature, threshold, d+yDim, otherStats.Get(otherFeature, otherThreshold, d+yDim) + delta * delta * counts * otherCounts / newCounts);
+    }
+    counts = newCounts;
+}
+
 
 // ----------------------------------------------------------------------------
 //
@@ -79,8 +111,8 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mYsBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mYsBufferId;
     const int mYDimension;
 };
 
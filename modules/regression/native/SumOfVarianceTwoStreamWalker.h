@@ -49,9 +49,9 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mStreamTypeBufferId;
-    const BufferId mYsBufferId;
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mStreamTypeBufferId;
+    const BufferKey mYsBufferId;
     const int mYdim;
 
     VectorBufferTemplate<typename BT::DatapointCounts> const* mSampleWeights;
@@ -1,6 +1,7 @@
 #pragma once
 
 #include <vector>
+#include <algorithm>
 #include <cmath>
 
 #include "VectorBuffer.h"
@@ -16,6 +17,11 @@
 // This class is called from BestSplitpointsWalkingSortedStep where
 // MoveLeftToRight is called for the sorted feature values
 //
+// The mean and the sum of squared differences (M2) of each component are
+// updated with Welford's method and the walker keeps the sum of M2 over the
+// components of each side, so Impurity does not loop over the components.
+// The means and M2s of a side are in one contiguous array [means, M2s].
+//
 // ----------------------------------------------------------------------------
 template <class BT>
 class SumOfVarianceWalker
@@ -44,19 +50,26 @@ public:
     typedef BT BufferTypes;
 
 private:
-    const BufferId mSampleWeightsBufferId;
-    const BufferId mYsBufferId;
+    void AddStartSample(typename BT::Index sampleIndex);
+    void BindStartVariance();
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> GetYs(const std::vector<typename BT::SufficientStatsContinuous>& meanVariance) const;
+
+    const BufferKey mSampleWeightsBufferId;
+    const BufferKey mYsBufferId;
     const int mYdim;
 
     VectorBufferTemplate<typename BT::ParamsContinuous> const* mSampleWeights;
     MatrixBufferTemplate<typename BT::SourceContinuous> const* mYs;
 
     typename BT::SufficientStatsContinuous mStartCounts;
-    VectorBufferTemplate<typename BT::SufficientStatsContinuous> mStartMeanVariance;
+    std::vector<typename BT::SufficientStatsContinuous> mStartMeanVariance;
+    typename BT::SufficientStatsContinuous mStartSumOfM2;
     typename BT::SufficientStatsContinuous mLeftCounts;
-    VectorBufferTemplate<typename BT::SufficientStatsContinuous> mLeftMeanVariance;
+    std::vector<typename BT::SufficientStatsContinuous> mLeftMeanVariance;
+    typename BT::SufficientStatsContinuous mLeftSumOfM2;
     typename BT::SufficientStatsContinuous mRightCounts;
-    VectorBufferTemplate<typename BT::SufficientStatsContinuous> mRightMeanVariance;
+    std::vector<typename BT::SufficientStatsContinuous> mRightMeanVariance;
+    typename BT::SufficientStatsContinuous mRightSumOfM2;
 
     typename BT::SufficientStatsContinuous mStartVariance;
 };
@@ -73,10 +86,13 @@ SumOfVarianceWalker<BT>::SumOfVarianceWalker(const BufferId& sampleWeights,
 , mYs(NULL)
 , mStartCounts(0)
 , mStartMeanVariance(ydim*2)
+, mStartSumOfM2(0)
 , mLeftCounts(0)
 , mLeftMeanVariance(ydim*2)
+, mLeftSumOfM2(0)
 , mRightCounts(0)
 , mRightMeanVariance(ydim*2)
+, mRightSumOfM2(0)
 , mStartVariance(0)
 {}
 
@@ -91,39 +107,14 @@ void SumOfVarianceWalker<BT>::Bind(const BufferCollectionStack& readCollection)
 
     mYs = readCollection.GetBufferPtr< MatrixBufferTemplate<typename BT::SourceContinuous> >(mYsBufferId);
     ASSERT_ARG_DIM_1D(mSampleWeights->GetN(), mYs->GetM())
+    ASSERT(mYs->GetN() >= mYdim)
 
     for(int i=0; i<mSampleWeights->GetN(); i++)
     {
-        const typename BT::SufficientStatsContinuous weight = mSampleWeights->Get(i);
-        typename BT::SufficientStatsContinuous newCounts = mStartCounts + weight;
-        for(int d=0; d<mYdim; d++)
-        {
-            const typename BT::SufficientStatsContinuous epsilon = typename BT::SufficientStatsContinuous(0.1);
-            const typename BT::SufficientStatsContinuous zero = typename BT::SufficientStatsContinuous(0);
-            const typename BT::SufficientStatsContinuous y_i = mYs->Get(i,d);
-            // old unstable sufficient stats 
-            // mStartMeanVariance.Incr(d, weight*y_d);
-            // mStartMeanVariance.Incr(d+mYdim, weight*y_d*y_d);
-            const typename BT::SufficientStatsContinuous mean = mStartMeanVariance.Get(d);
-            const typename BT::SufficientStatsContinuous delta = y_i - mean;
-            const typename BT::SufficientStatsContinuous r = newCounts > epsilon ? delta * weight / newCounts : zero;
-            mStartMeanVariance.Incr(d,r);
-            mStartMeanVariance.Incr(d+mYdim, mStartCounts*delta*r);
-        }
-        mStartCounts = newCounts;
-    }
-
-    mStartVariance = typename BT::SufficientStatsContinuous(0);
-    for(int d=0; d<mYdim; d++)
-    {
-        // old unstable sufficient stats 
-        // const typename BT::SufficientStatsContinuous y = mStartMeanVariance.Get(d);
-        // const typename BT::SufficientStatsContinuous ySquared = mStartMeanVariance.Get(d+mYdim);
-        // mStartVariance += ySquared / mStartCounts - pow(y/mStartCounts, 2);
-        mStartVariance += mStartMeanVariance.Get(d+mYdim) / mStartCounts;
+        AddStartSample(i);
     }
 
-    Reset();
+    BindStartVariance();
 }
 
 template <class BT>
@@ -133,38 +124,55 @@ void SumOfVarianceWalker<BT>::Bind(const BufferCollectionStack& readCollection,
 
     mYs = readCollection.GetBufferPtr< MatrixBufferTemplate<typename BT::SourceContinuous> >(mYsBufferId);
     ASSERT_ARG_DIM_1D(mSampleWeights->GetN(), mYs->GetM())
+    ASSERT(mYs->GetN() >= mYdim)
 
     for(typename BT::Index s=0; s<includedSamples.GetN(); s++)
     {
-        typename BT::Index i = includedSamples.Get(s);
-        const typename BT::SufficientStatsContinuous weight = mSampleWeights->Get(i);
-        typename BT::SufficientStatsContinuous newCounts = mStartCounts + weight;
-        for(int d=0; d<mYdim; d++)
-        {
-            const typename BT::SufficientStatsContinuous epsilon = typename BT::SufficientStatsContinuous(0.1);
-            const typename BT::SufficientStatsContinuous zero = typename BT::SufficientStatsContinuous(0);
-            const typename BT::SufficientStatsContinuous y_i = mYs->Get(i,d);
-            // old unstable sufficient stats 
-            // mStartMeanVariance.Incr(d, weight*y_d);
-            // mStartMeanVariance.Incr(d+mYdim, weight*y_d*y_d);
-            const typename BT::SufficientStatsContinuous mean = mStartMeanVariance.Get(d);
-            const typename BT::SufficientStatsContinuous delta = y_i - mean;
-            const typename BT::SufficientStatsContinuous r = newCounts > epsilon ? delta * weight / newCounts : zero;
-            mStartMeanVariance.Incr(d,r);
-            mStartMeanVariance.Incr(d+mYdim, mStartCounts*delta*r);
-        }
-        mStartCounts = newCounts;
+        AddStartSample(includedSamples.Get(s));
     }
 
-    mStartVariance = typename BT::SufficientStatsContinuous(0);
+    BindStartVariance();
+}
+
+template <class BT>
+void SumOfVarianceWalker<BT>::AddStartSample(typename BT::Index sampleIndex)
+{
+    const typename BT::SufficientStatsContinuous epsilon = typename BT::SufficientStatsContinuous(0.1);
+    const typename BT::SufficientStatsContinuous zero = typename BT::SufficientStatsContinuous(0);
+
+    const typename BT::SufficientStatsContinuous weight = mSampleWeights->Get(sampleIndex);
+    const typename BT::SufficientStatsContinuous newCounts = mStartCounts + weight;
+    const typename BT::SufficientStatsContinuous scale = newCounts > epsilon ? weight / newCounts : zero;
+
+    const typename BT::SourceContinuous* y = mYs->GetRowPtrUnsafe(sampleIndex);
+    typename BT::SufficientStatsContinuous* mean = &mStartMeanVariance[0];
+    typename BT::SufficientStatsContinuous* m2 = &mStartMeanVariance[mYdim];
     for(int d=0; d<mYdim; d++)
     {
-        // old unstable sufficient stats 
+        // old unstable sufficient stats
+        // mStartMeanVariance.Incr(d, weight*y_d);
+        // mStartMeanVariance.Incr(d+mYdim, weight*y_d*y_d);
+        const typename BT::SufficientStatsContinuous delta = y[d] - mean[d];
+        const typename BT::SufficientStatsContinuous r = delta * scale;
+        mean[d] += r;
+        m2[d] += mStartCounts*delta*r;
+    }
+    mStartCounts = newCounts;
+}
+
+template <class BT>
+void SumOfVarianceWalker<BT>::BindStartVariance()
+{
+    mStartSumOfM2 = typename BT::SufficientStatsContinuous(0);
+    for(int d=0; d<mYdim; d++)
+    {
+        // old unstable sufficient stats
         // const typename BT::SufficientStatsContinuous y = mStartMeanVariance.Get(d);
         // const typename BT::SufficientStatsContinuous ySquared = mStartMeanVariance.Get(d+mYdim);
         // mStartVariance += ySquared / mStartCounts - pow(y/mStartCounts, 2);
-        mStartVariance += mStartMeanVariance.Get(d+mYdim) / mStartCounts;
+        mStartSumOfM2 += mStartMeanVariance[d+mYdim];
     }
+    mStartVariance = mStartSumOfM2 / mStartCounts;
 
     Reset();
 }
@@ -174,43 +182,56 @@ void SumOfVarianceWalker<BT>::Reset()
 {
     mLeftCounts = mStartCounts;
     mLeftMeanVariance = mStartMeanVariance;
+    mLeftSumOfM2 = mStartSumOfM2;
     mRightCounts = typename BT::SufficientStatsContinuous(0);
-    mRightMeanVariance.Zero();
+    std::fill(mRightMeanVariance.begin(), mRightMeanVariance.end(), typename BT::SufficientStatsContinuous(0));
+    mRightSumOfM2 = typename BT::SufficientStatsContinuous(0);
 }
 
 template <class BT>
 void SumOfVarianceWalker<BT>::MoveLeftToRight(typename BT::Index sampleIndex)
 {
+    const typename BT::SufficientStatsContinuous epsilon = typename BT::SufficientStatsContinuous(0.1);
+    const typename BT::SufficientStatsContinuous zero = typename BT::SufficientStatsContinuous(0);
+
     const typename BT::SufficientStatsContinuous weight = mSampleWeights->Get(sampleIndex);
 
     const typename BT::SufficientStatsContinuous newLeftCounts = mLeftCounts - weight;
     const typename BT::SufficientStatsContinuous newRightCounts = mRightCounts + weight;
+    const typename BT::SufficientStatsContinuous leftScale = newLeftCounts > epsilon ? -weight / newLeftCounts : zero;
+    const typename BT::SufficientStatsContinuous rightScale = newRightCounts > epsilon ? weight / newRightCounts : zero;
+
+    // old unstable sufficient stats
+    // mLeftMeanVariance.Incr(d, -weight*y_d);
+    // mLeftMeanVariance.Incr(d+mYdim, -weight*y_d*y_d);
+    // mRightMeanVariance.Incr(d, weight*y_d);
+    // mRightMeanVariance.Incr(d+mYdim, weight*y_d*y_d);
+    const typename BT::SourceContinuous* y = mYs->GetRowPtrUnsafe(sampleIndex);
+    typename BT::SufficientStatsContinuous* leftMean = &mLeftMeanVariance[0];
+    typename BT::SufficientStatsContinuous* leftM2 = &mLeftMeanVariance[mYdim];
+    typename BT::SufficientStatsContinuous* rightMean = &mRightMeanVariance[0];
+    typename BT::SufficientStatsContinuous* rightM2 = &mRightMeanVariance[mYdim];
+    typename BT::SufficientStatsContinuous leftSumOfM2Delta = zero;
+    typename BT::SufficientStatsContinuous rightSumOfM2Delta = zero;
 
     for(int d=0; d<mYdim; d++)
     {
-        const typename BT::SufficientStatsContinuous epsilon = typename BT::SufficientStatsContinuous(0.1);
-        const typename BT::SufficientStatsContinuous zero = typename BT::SufficientStatsContinuous(0);
-
-        const typename BT::SufficientStatsContinuous y_d = mYs->Get(sampleIndex,d);
-
-        // old unstable sufficient stats 
-        // mLeftMeanVariance.Incr(d, -weight*y_d);
-        // mLeftMeanVariance.Incr(d+mYdim, -weight*y_d*y_d);
-        // mRightMeanVariance.Incr(d, weight*y_d);
-        // mRightMeanVariance.Incr(d+mYdim, weight*y_d*y_d);
-
-        const typename BT::SufficientStatsContinuous leftMean = mLeftMeanVariance.Get(d);
-        const typename BT::SufficientStatsContinuous leftDelta = y_d - leftMean;
-        const typename BT::SufficientStatsContinuous leftr = newLeftCounts > epsilon ? leftDelta * -1.0 * weight / newLeftCounts : zero;
-        mLeftMeanVariance.Incr(d, leftr);
-        mLeftMeanVariance.Incr(d+mYdim, mLeftCounts*leftDelta*leftr);
-
-        const typename BT::SufficientStatsContinuous rightMean = mRightMeanVariance.Get(d);
-        const typename BT::SufficientStatsContinuous rightDelta = y_d - rightMean;
-        const typename BT::SufficientStatsContinuous rightr = newRightCounts > epsilon ? rightDelta * weight / newRightCounts : zero;
-        mRightMeanVariance.Incr(d, rightr);
-        mRightMeanVariance.Incr(d+mYdim, mRightCounts*rightDelta*rightr);
+        const typename BT::SufficientStatsContinuous leftDelta = y[d] - leftMean[d];
+        const typename BT::SufficientStatsContinuous leftr = leftDelta * leftScale;
+        const typename BT::SufficientStatsContinuous leftM2Delta = mLeftCounts*leftDelta*leftr;
+        leftMean[d] += leftr;
+        leftM2[d] += leftM2Delta;
+        leftSumOfM2Delta += leftM2Delta;
+
+        const typename BT::SufficientStatsContinuous rightDelta = y[d] - rightMean[d];
+        const typename BT::SufficientStatsContinuous rightr = rightDelta * rightScale;
+        const typename BT::SufficientStatsContinuous rightM2Delta = mRightCounts*rightDelta*rightr;
+        rightMean[d] += rightr;
+        rightM2[d] += rightM2Delta;
+        rightSumOfM2Delta += rightM2Delta;
     }
+    mLeftSumOfM2 += leftSumOfM2Delta;
+    mRightSumOfM2 += rightSumOfM2Delta;
     mLeftCounts = newLeftCounts;
     mRightCounts = newRightCounts;
 }
@@ -218,30 +239,12 @@ void SumOfVarianceWalker<BT>::MoveLeftToRight(typename BT::Index sampleIndex)
 template <class BT>
 typename BT::ImpurityValue SumOfVarianceWalker<BT>::Impurity()
 {
+    // (counts / countsTotal) * (sumOfM2 / counts) for each side
     const typename BT::SufficientStatsContinuous countsTotal = mLeftCounts+mRightCounts;
-    typename BT::SufficientStatsContinuous leftSumOfVariance = typename BT::SufficientStatsContinuous(0);
-    typename BT::SufficientStatsContinuous rightSumOfVariance = typename BT::SufficientStatsContinuous(0);
+    const typename BT::SufficientStatsContinuous leftSumOfVariance = (mLeftCounts>0.0) ? mLeftSumOfM2/countsTotal : typename BT::SufficientStatsContinuous(0);
+    const typename BT::SufficientStatsContinuous rightSumOfVariance = (mRightCounts>0.0) ? mRightSumOfM2/countsTotal : typename BT::SufficientStatsContinuous(0);
 
-    for(int d=0; d<mYdim; d++)
-    {
-        // old unstable sufficient stats
-        // const FloatType leftY = mLeftMeanVariance.Get(d);
-        // const FloatType leftYSquared = mLeftMeanVariance.Get(d+mYdim);
-        // const FloatType rightY = mRightMeanVariance.Get(d);
-        // const FloatType rightYSquared = mRightMeanVariance.Get(d+mYdim);
-        // leftSumOfVariance += (mLeftCounts>0.0) ? leftYSquared/mLeftCounts -  pow(leftY/mLeftCounts, 2) : 0.0;
-        // rightSumOfVariance += (mRightCounts>0.0) ? rightYSquared/mRightCounts -  pow(rightY/mRightCounts, 2) : 0.0;
-
-        const typename BT::SufficientStatsContinuous leftY2 = mLeftMeanVariance.Get(d+mYdim);
-        const typename BT::SufficientStatsContinuous rightY2 = mRightMeanVariance.Get(d+mYdim);
-
-        leftSumOfVariance += (mLeftCounts>0.0) ? leftY2/mLeftCounts : typename BT::SufficientStatsContinuous(0);
-        rightSumOfVariance += (mRightCounts>0.0) ? rightY2/mRightCounts : typename BT::SufficientStatsContinuous(0);
-    }
-
-    const typename BT::ImpurityValue varianceGain = mStartVariance
-                                  - ((mLeftCounts / countsTotal) * leftSumOfVariance)
-                                  - ((mRightCounts / countsTotal) * rightSumOfVariance);
+    const typename BT::ImpurityValue varianceGain = mStartVariance - leftSumOfVariance - rightSumOfVariance;
 
     return varianceGain;
 }
@@ -252,16 +255,27 @@ typename BT::Index SumOfVarianceWalker<BT>::GetYDim() const
     return mYdim*2;
 }
 
+template <class BT>
+VectorBufferTemplate<typename BT::SufficientStatsContinuous> SumOfVarianceWalker<BT>::GetYs(const std::vector<typename BT::SufficientStatsContinuous>& meanVariance) const
+{
+    VectorBufferTemplate<typename BT::SufficientStatsContinuous> ys(mYdim*2);
+    for(int i=0; i<mYdim*2; i++)
+    {
+        ys.Set(i, meanVariance[i]);
+    }
+    return ys;
+}
+
 template <class BT>
 VectorBufferTemplate<typename BT::SufficientStatsContinuous> SumOfVarianceWalker<BT>::GetLeftYs() const
 {
-    return mLeftMeanVariance;
+    return GetYs(mLeftMeanVariance);
 }
 
 template <class BT>
 VectorBufferTemplate<typename BT::SufficientStatsContinuous> SumOfVarianceWalker<BT>::GetRightYs() const
 {
-    return mRightMeanVariance;
+    return GetYs(mRightMeanVariance);
 }
 
 template <class BT>
@@ -274,4 +288,4 @@ template <class BT>
 typename BT::SufficientStatsContinuous SumOfVarianceWalker<BT>::GetRightChildCounts() const
 {
     return mRightCounts;
-}
\ No newline at end of file
+}
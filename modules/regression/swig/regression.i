@@ -4,6 +4,7 @@
     #include "BufferTypes.h"
     #include "SplitpointsImpurity.h"
     #include "SplitpointStatsStep.h"
+    #include "HistogramSplitpointStatsStep.h"
     #include "TwoStreamSplitpointStatsStep.h"
 %}
 
@@ -16,6 +17,7 @@
 
 %include "SplitpointsImpurity.h"
 %include "SplitpointStatsStep.h"
+%include "HistogramSplitpointStatsStep.h"
 %include "TwoStreamSplitpointStatsStep.h"
 
 
@@ -34,4 +36,5 @@
 %template(MeanVarianceStatsUpdater_f32i32) MeanVarianceStatsUpdater<DefaultBufferTypes>;
 %template(SumOfVarianceOneStreamStep_f32i32) SplitpointStatsStep< MeanVarianceStatsUpdater<DefaultBufferTypes> >;
 %template(SumOfVarianceTwoStreamStep_f32i32) TwoStreamSplitpointStatsStep< MeanVarianceStatsUpdater<DefaultBufferTypes> >;
+%template(SumOfVarianceHistogramStep_f32i32) HistogramSplitpointStatsStep< MeanVarianceStatsUpdater<DefaultBufferTypes> >;
 %template(SumOfVarianceSplitpointsImpurity_f32i32) SplitpointsImpurity< SumOfVarianceImpurity<DefaultBufferTypes> >;
\ No newline at end of file
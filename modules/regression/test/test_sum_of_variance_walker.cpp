@@ -103,5 +103,56 @@ BOOST_AUTO_TEST_CASE(test_SumOfVarianceWalker_Reset)
     BOOST_CHECK_CLOSE(sumOfVarianceWalker.Impurity(), 0.6622475, 1);
 }
 
+BOOST_AUTO_TEST_CASE(test_SumOfVarianceWalker_Impurity_matches_two_pass_variance)
+{
+    const int n = 6;
+    const int d = 5;
+    float ys_data[] = {0, 1, 5, -2, 0.5,
+                       3, 2, 4, -1, 0.25,
+                       1, 9, 3, 0, 1.5,
+                       7, 4, 2, 6, 0.75,
+                       2, 2, 1, 3, 2.5,
+                       5, 6, 0, 1, 0.125};
+    float weights_data[] = {1, 2, 1, 3, 1, 2};
+    BufferCollection wideCollection;
+    wideCollection.AddBuffer(ys_key, MatrixBufferTemplate<float>(&ys_data[0], n, d));
+    wideCollection.AddBuffer(weights_key, VectorBufferTemplate<float>(&weights_data[0], n));
+    BufferCollectionStack wideStack;
+    wideStack.Push(&wideCollection);
+
+    SumOfVarianceWalker< BufferTypes_t > sumOfVarianceWalker(weights_key, ys_key, d);
+    sumOfVarianceWalker.Bind(wideStack);
+
+    // Weighted sum of the variance of each component of samples [start, end)
+    struct SumOfVariance
+    {
+        static double Compute(const float* ys, const float* weights, int start, int end, int d)
+        {
+            double counts = 0.0;
+            for(int i=start; i<end; i++) { counts += weights[i]; }
+            double sumOfVariance = 0.0;
+            for(int c=0; c<d && counts > 0.0; c++)
+            {
+                double mean = 0.0;
+                for(int i=start; i<end; i++) { mean += weights[i]*ys[i*d+c]; }
+                mean /= counts;
+                for(int i=start; i<end; i++) { sumOfVariance += weights[i]*(ys[i*d+c]-mean)*(ys[i*d+c]-mean); }
+            }
+            return sumOfVariance;
+        }
+    };
+
+    double total = 0.0;
+    for(int i=0; i<n; i++) { total += weights_data[i]; }
+    const double startVariance = SumOfVariance::Compute(ys_data, weights_data, 0, n, d) / total;
+    for(int split=n-1; split>0; split--)
+    {
+        sumOfVarianceWalker.MoveLeftToRight(split);
+        const double expected = startVariance
+                                - SumOfVariance::Compute(ys_data, weights_data, 0, split, d) / total
+                                - SumOfVariance::Compute(ys_data, weights_data, split, n, d) / total;
+        BOOST_CHECK_CLOSE(sumOfVarianceWalker.Impurity(), expected, 0.01);
+    }
+}
 
 BOOST_AUTO_TEST_SUITE_END()
\ No newline at end of file
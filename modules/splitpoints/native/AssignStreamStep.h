@@ -43,7 +43,7 @@ public:
 
     const BufferId StreamTypeBufferId;
 private:
-    const BufferId mWeightsBufferId;
+    const BufferKey mWeightsBufferId;
     const typename BufferTypes::ParamsContinuous mProbabilityOfImpurityStream;
     const bool mIid;
 };
@@ -110,7 +110,7 @@ void AssignStreamStep<BufferTypes>::ProcessStep(const BufferCollectionStack& rea
         std::vector<typename BufferTypes::Index> streamTypeVec(numberOfDatapoints);
         sampleWithOutReplacement(&streamTypeVec[0], streamTypeVec.size(),
                                       static_cast<typename BufferTypes::Index>(
-                                            static_cast<typename BufferTypes::ParamsContinuous>(numberOfDatapoints)*mProbabilityOfImpurityStream));
+                                            static_cast<typename BufferTypes::ParamsContinuous>(numberOfDatapoints)*mProbabilityOfImpurityStream), gen);
 
         for(typename BufferTypes::Index i=0; i<numberOfDatapoints; i++)
         {
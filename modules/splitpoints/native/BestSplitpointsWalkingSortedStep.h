@@ -2,11 +2,20 @@
 
 #include <limits>
 #include <cmath>
+#include <vector>
+#include <utility>
 
 #include <boost/random.hpp>
 #include <boost/random/mersenne_twister.hpp>
 #include <boost/random/uniform_int.hpp>
 #include <boost/random/uniform_real.hpp>
+#include <boost/shared_ptr.hpp>
+
+#if USE_BOOST_THREAD
+#include <boost/thread/tss.hpp>
+#else
+#include <boost/scoped_ptr.hpp>
+#endif
 
 #include "bootstrap.h"
 #include "VectorBuffer.h"
@@ -23,6 +32,15 @@
 // this by sorting the feature values and walking the sorted values to find
 // the split point with the highest impurity.
 //
+// When a sorted indices buffer is given (row f lists the datapoints in the
+// order of feature f, see PresortColumnsStep) the feature values are walked
+// in that order and are not sorted again.
+//
+// The sorted values, the in bounds samples and the best ys of a feature are
+// kept in scratch space that belongs to the thread calling ProcessStep (and
+// is shared by the clones of the step).  It grows to the largest node the
+// thread has seen and is reused for every feature and node after that.
+//
 // ----------------------------------------------------------------------------
 enum WalkingSortedSplitpointLocation
 {
@@ -47,6 +65,11 @@ public:
                               FeatureValueOrdering featureValueOrdering,
                               WalkingSortedSplitpointLocation splitpointLocation,
                               const int numberOfInBoundsDatapoints );
+    BestSplitpointsWalkingSortedStep (const ImpurityWalker& impurityWalker,
+                              const BufferId& featureValues,
+                              FeatureValueOrdering featureValueOrdering,
+                              WalkingSortedSplitpointLocation splitpointLocation,
+                              const BufferId& sortedIndices );
     virtual ~BestSplitpointsWalkingSortedStep();
 
     virtual PipelineStepI* Clone() const;
@@ -65,11 +88,27 @@ public:
     const BufferId RightYsBufferId;
 private:
     const ImpurityWalker mImpurityWalker;
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const FeatureValueOrdering mFeatureValueOrdering;
     const WalkingSortedSplitpointLocation mSplitpointLocation;
     const int mNumberOfInBoundsDatapoints;
+    const BufferKey mSortedIndicesBufferId;
 
+    struct Scratch
+    {
+        std::vector< std::pair<typename ImpurityWalker::BufferTypes::FeatureValue, int> > mSortedValueIndices;
+        std::vector<int> mInBoundsSamples;
+        VectorBufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous> mBestLeftYs;
+        VectorBufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous> mBestRightYs;
+    };
+#if USE_BOOST_THREAD
+    typedef boost::thread_specific_ptr<Scratch> ScratchPtr;
+#else
+    typedef boost::scoped_ptr<Scratch> ScratchPtr;
+#endif
+    Scratch& GetScratch() const;
+
+    boost::shared_ptr<ScratchPtr> mScratch;
 };
 
 
@@ -90,6 +129,8 @@ BestSplitpointsWalkingSortedStep<ImpurityWalker>::BestSplitpointsWalkingSortedSt
 , mFeatureValueOrdering(featureValueOrdering)
 , mSplitpointLocation(splitpointLocation)
 , mNumberOfInBoundsDatapoints(0)
+, mSortedIndicesBufferId(NullKey)
+, mScratch(new ScratchPtr())
 {}
 
 template <class ImpurityWalker>
@@ -108,6 +149,8 @@ BestSplitpointsWalkingSortedStep<ImpurityWalker>::BestSplitpointsWalkingSortedSt
 , mFeatureValueOrdering(featureValueOrdering)
 , mSplitpointLocation(AT_MIDPOINT)
 , mNumberOfInBoundsDatapoints(0)
+, mSortedIndicesBufferId(NullKey)
+, mScratch(new ScratchPtr())
 {}
 
 
@@ -129,6 +172,30 @@ BestSplitpointsWalkingSortedStep<ImpurityWalker>::BestSplitpointsWalkingSortedSt
 , mFeatureValueOrdering(featureValueOrdering)
 , mSplitpointLocation(splitpointLocation)
 , mNumberOfInBoundsDatapoints(numberOfInBoundsDatapoints)
+, mSortedIndicesBufferId(NullKey)
+, mScratch(new ScratchPtr())
+{}
+
+template <class ImpurityWalker>
+BestSplitpointsWalkingSortedStep<ImpurityWalker>::BestSplitpointsWalkingSortedStep(const ImpurityWalker& impurityWalker,
+                                                                      const BufferId& featureValues,
+                                                                      FeatureValueOrdering featureValueOrdering,
+                                                                      WalkingSortedSplitpointLocation splitpointLocation,
+                                                                      const BufferId& sortedIndices)
+: PipelineStepI("BestSplitpointsWalkingSortedStep")
+, ImpurityBufferId( GetBufferId("Impurity") )
+, SplitpointBufferId( GetBufferId("Splitpoints") )
+, SplitpointCountsBufferId( GetBufferId("SplitpointsCounts") )
+, ChildCountsBufferId( GetBufferId("ChildCounts") )
+, LeftYsBufferId( GetBufferId("LeftYs") )
+, RightYsBufferId( GetBufferId("RightYs") )
+, mImpurityWalker(impurityWalker)
+, mFeatureValuesBufferId(featureValues)
+, mFeatureValueOrdering(featureValueOrdering)
+, mSplitpointLocation(splitpointLocation)
+, mNumberOfInBoundsDatapoints(0)
+, mSortedIndicesBufferId(sortedIndices)
+, mScratch(new ScratchPtr())
 {}
 
 template <class ImpurityWalker>
@@ -142,13 +209,22 @@ PipelineStepI* BestSplitpointsWalkingSortedStep<ImpurityWalker>::Clone() const
     return clone;
 }
 
+template <class ImpurityWalker>
+typename BestSplitpointsWalkingSortedStep<ImpurityWalker>::Scratch& BestSplitpointsWalkingSortedStep<ImpurityWalker>::GetScratch() const
+{
+    if( mScratch->get() == NULL )
+    {
+        mScratch->reset(new Scratch());
+    }
+    return *mScratch->get();
+}
+
 template <class ImpurityWalker>
 void BestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(const BufferCollectionStack& readCollection,
                                                               BufferCollection& writeCollection,
                                                               boost::mt19937& gen,
                                                               BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(gen);
     UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
@@ -162,6 +238,13 @@ void BestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(const BufferC
     impurityWalker.Bind(readCollection);
     const typename ImpurityWalker::BufferTypes::Index numberOfFeatures =  mFeatureValueOrdering == FEATURES_BY_DATAPOINTS ? featureValues.GetM() : featureValues.GetN();
 
+    MatrixBufferTemplate<typename ImpurityWalker::BufferTypes::Index> const* sortedIndices = NULL;
+    if( mSortedIndicesBufferId.GetName() != NullKey )
+    {
+        sortedIndices = readCollection.GetBufferPtr< MatrixBufferTemplate<typename ImpurityWalker::BufferTypes::Index> >(mSortedIndicesBufferId);
+        ASSERT_ARG_DIM_1D(sortedIndices->GetM(), numberOfFeatures)
+    }
+
     // Bind output buffers
     MatrixBufferTemplate<typename ImpurityWalker::BufferTypes::ImpurityValue>& impurities
            = writeCollection.GetOrAddBuffer< MatrixBufferTemplate<typename ImpurityWalker::BufferTypes::ImpurityValue> >(ImpurityBufferId);
@@ -187,6 +270,10 @@ void BestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(const BufferC
            = writeCollection.GetOrAddBuffer< Tensor3BufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous> >(RightYsBufferId);
     rightYs.Resize(numberOfFeatures, 1, impurityWalker.GetYDim());
 
+    Scratch& scratch = GetScratch();
+    VectorBufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous>& bestLeftYs = scratch.mBestLeftYs;
+    VectorBufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous>& bestRightYs = scratch.mBestRightYs;
+
     for(int f=0; f<numberOfFeatures; f++)
     {
         impurityWalker.Reset();
@@ -196,28 +283,42 @@ void BestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(const BufferC
         typename ImpurityWalker::BufferTypes::FeatureValue bestSplitpoint = std::numeric_limits<typename ImpurityWalker::BufferTypes::FeatureValue>::min();
         typename ImpurityWalker::BufferTypes::SufficientStatsContinuous bestLeftChildCounts = typename ImpurityWalker::BufferTypes::SufficientStatsContinuous(0);
         typename ImpurityWalker::BufferTypes::SufficientStatsContinuous bestRightChildCounts = typename ImpurityWalker::BufferTypes::SufficientStatsContinuous(0);
-        VectorBufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous> bestLeftYs(impurityWalker.GetYDim());
-        VectorBufferTemplate<typename ImpurityWalker::BufferTypes::SufficientStatsContinuous> bestRightYs(impurityWalker.GetYDim());
+        bestLeftYs.Resize(impurityWalker.GetYDim());
+        bestLeftYs.Zero();
+        bestRightYs.Resize(impurityWalker.GetYDim());
+        bestRightYs.Zero();
 
-        FeatureSorter<typename ImpurityWalker::BufferTypes::FeatureValue> sorter(featureValues, mFeatureValueOrdering, f);
-        sorter.Sort();
+        FeatureSorter<typename ImpurityWalker::BufferTypes::FeatureValue> sorter(featureValues, mFeatureValueOrdering, f, scratch.mSortedValueIndices);
+        if( sortedIndices != NULL )
+        {
+            sorter.SetSortedOrder(*sortedIndices, f);
+        }
+        else
+        {
+            sorter.Sort();
+        }
 
         typename ImpurityWalker::BufferTypes::FeatureValue boundsMin = std::numeric_limits<typename ImpurityWalker::BufferTypes::FeatureValue>::max();
         typename ImpurityWalker::BufferTypes::FeatureValue boundsMax = -std::numeric_limits<typename ImpurityWalker::BufferTypes::FeatureValue>::max();
         if( mNumberOfInBoundsDatapoints > 0)
         {
             const int numberOfSamples = sorter.GetNumberOfSamples();
-            std::vector<int> inboundSamples(numberOfSamples);
             const int numberOfInBoundsSamples = std::min(numberOfSamples, mNumberOfInBoundsDatapoints);
-            sampleWithOutReplacement(&inboundSamples[0], numberOfSamples, numberOfInBoundsSamples);
-
+            std::vector<int>& inBoundsSamples = scratch.mInBoundsSamples;
+            inBoundsSamples.resize(numberOfSamples);
             for(int sortedIndex=0; sortedIndex<numberOfSamples; sortedIndex++)
             {
-                if(inboundSamples[sortedIndex] )
-                {
-                    boundsMin = std::min(boundsMin, sorter.GetFeatureValue(sortedIndex));
-                    boundsMax = std::max(boundsMax, sorter.GetFeatureValue(sortedIndex));
-                }
+                inBoundsSamples[sortedIndex] = sortedIndex;
+            }
+            if(numberOfSamples > 0)
+            {
+                shuffleFirst(&inBoundsSamples[0], numberOfInBoundsSamples, numberOfSamples, gen);
+            }
+
+            for(int i=0; i<numberOfInBoundsSamples; i++)
+            {
+                boundsMin = std::min(boundsMin, sorter.GetFeatureValue(inBoundsSamples[i]));
+                boundsMax = std::max(boundsMax, sorter.GetFeatureValue(inBoundsSamples[i]));
             }
         }
         else
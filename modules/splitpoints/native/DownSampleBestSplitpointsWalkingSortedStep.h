@@ -53,7 +53,7 @@ public:
     const BufferId RightYsBufferId;
 private:
     const ImpurityWalker mImpurityWalker;
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const FeatureValueOrdering mFeatureValueOrdering;
     const WalkingSortedSplitpointLocation mSplitpointLocation;
     const int mNumberOfSamples;
@@ -97,7 +97,6 @@ void DownSampleBestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(con
                                                               boost::mt19937& gen,
                                                               BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(gen);
     UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
@@ -127,7 +126,7 @@ void DownSampleBestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(con
     {
         // Sample without replacement so a dimension is not choosen multiple times
         std::vector<typename ImpurityWalker::BufferTypes::Index> samples(mNumberOfSamples);
-        sampleIndicesWithOutReplacement(&samples[0], mNumberOfSamples, numberOfDatapoints);
+        sampleIndicesWithOutReplacement(&samples[0], mNumberOfSamples, numberOfDatapoints, gen);
         includedSamples = VectorBufferTemplate<typename ImpurityWalker::BufferTypes::Index>(&samples[0], mNumberOfSamples);
         sliceFeatureValues = mFeatureValueOrdering == FEATURES_BY_DATAPOINTS ?
                                  allFeatureValues.SliceColumns( includedSamples )
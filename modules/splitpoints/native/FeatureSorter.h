@@ -10,7 +10,12 @@
 // ----------------------------------------------------------------------------
 //
 // Sort feature values to get a mapping from unsorted indices to sorted 
-// indices.  Either by row or column.
+// indices.  Either by row or column.  SetSortedOrder uses an order that was
+// computed ahead of time (ie by PresortColumnsStep) instead of sorting.
+//
+// The sorted values are kept in a vector owned by the sorter or in a vector
+// passed in by the caller, which lets a caller reuse the same memory for
+// every feature.
 //
 // ----------------------------------------------------------------------------
 template <class FeatureValueType>
@@ -20,37 +25,93 @@ public:
     FeatureSorter(  const MatrixBufferTemplate<FeatureValueType>& featureValues,
                     const FeatureValueOrdering ordering,
                     const int featureIndex );
+    FeatureSorter(  const MatrixBufferTemplate<FeatureValueType>& featureValues,
+                    const FeatureValueOrdering ordering,
+                    const int featureIndex,
+                    std::vector< std::pair<FeatureValueType, int> >& valueIndices );
     void Sort();
+    void SetSortedOrder(const MatrixBufferTemplate<int>& sortedIndices, int sortedRow);
     int GetUnSortedIndex(int sortedIndex) const;
     FeatureValueType GetFeatureValue(int sortedIndex) const;
     int GetNumberOfSamples() const;
 
 private:
+    FeatureSorter(const FeatureSorter<FeatureValueType>& other);
+    void Init();
+    FeatureValueType GetUnSortedFeatureValue(int unSortedIndex) const;
+
+    const MatrixBufferTemplate<FeatureValueType>& mFeatureValues;
+    const FeatureValueOrdering mOrdering;
+    const int mFeatureIndex;
     const int mNumberOfSamples;
-    std::vector< std::pair<FeatureValueType, int> > mValueIndices;
+    std::vector< std::pair<FeatureValueType, int> > mOwnedValueIndices;
+    std::vector< std::pair<FeatureValueType, int> >& mValueIndices;
 };
 
 template <class FeatureValueType>
 FeatureSorter<FeatureValueType>::FeatureSorter(   const MatrixBufferTemplate<FeatureValueType>& featureValues,
                                             const FeatureValueOrdering ordering,
                                             const int featureIndex)
-: mNumberOfSamples( ordering == FEATURES_BY_DATAPOINTS ? featureValues.GetN() : featureValues.GetM())
-, mValueIndices(mNumberOfSamples)
+: mFeatureValues(featureValues)
+, mOrdering(ordering)
+, mFeatureIndex(featureIndex)
+, mNumberOfSamples( ordering == FEATURES_BY_DATAPOINTS ? featureValues.GetN() : featureValues.GetM())
+, mOwnedValueIndices()
+, mValueIndices(mOwnedValueIndices)
 {
+    Init();
+}
+
+template <class FeatureValueType>
+FeatureSorter<FeatureValueType>::FeatureSorter(   const MatrixBufferTemplate<FeatureValueType>& featureValues,
+                                            const FeatureValueOrdering ordering,
+                                            const int featureIndex,
+                                            std::vector< std::pair<FeatureValueType, int> >& valueIndices)
+: mFeatureValues(featureValues)
+, mOrdering(ordering)
+, mFeatureIndex(featureIndex)
+, mNumberOfSamples( ordering == FEATURES_BY_DATAPOINTS ? featureValues.GetN() : featureValues.GetM())
+, mOwnedValueIndices()
+, mValueIndices(valueIndices)
+{
+    Init();
+}
+
+template <class FeatureValueType>
+void FeatureSorter<FeatureValueType>::Init()
+{
+    mValueIndices.resize(mNumberOfSamples);
     for(int s=0; s<mNumberOfSamples; s++)
     {
-        int r = (ordering == FEATURES_BY_DATAPOINTS) ? featureIndex : s;
-        int c = (ordering == FEATURES_BY_DATAPOINTS) ? s : featureIndex;
-        mValueIndices[s] = std::pair<FeatureValueType,int>(featureValues.Get(r,c), s);
+        mValueIndices[s] = std::pair<FeatureValueType,int>(GetUnSortedFeatureValue(s), s);
     }
 }
 
+template <class FeatureValueType>
+FeatureValueType FeatureSorter<FeatureValueType>::GetUnSortedFeatureValue(int unSortedIndex) const
+{
+    const int r = (mOrdering == FEATURES_BY_DATAPOINTS) ? mFeatureIndex : unSortedIndex;
+    const int c = (mOrdering == FEATURES_BY_DATAPOINTS) ? unSortedIndex : mFeatureIndex;
+    return mFeatureValues.Get(r,c);
+}
+
 template <class FeatureValueType>
 void FeatureSorter<FeatureValueType>::Sort()
 {
     std::sort( mValueIndices.begin(), mValueIndices.end() );
 }
 
+template <class FeatureValueType>
+void FeatureSorter<FeatureValueType>::SetSortedOrder(const MatrixBufferTemplate<int>& sortedIndices, int sortedRow)
+{
+    ASSERT_ARG_DIM_1D(sortedIndices.GetN(), mNumberOfSamples)
+    for(int s=0; s<mNumberOfSamples; s++)
+    {
+        const int unSortedIndex = sortedIndices.Get(sortedRow, s);
+        mValueIndices[s] = std::pair<FeatureValueType,int>(GetUnSortedFeatureValue(unSortedIndex), unSortedIndex);
+    }
+}
+
 template <class FeatureValueType>
 int FeatureSorter<FeatureValueType>::GetUnSortedIndex(int sortedIndex) const
 {
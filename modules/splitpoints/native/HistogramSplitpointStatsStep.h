@@ -0,0 +1,183 @@
+#pragma once
+
+#include <vector>
+#include <algorithm>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "Tensor3Buffer.h"
+#include "BufferCollection.h"
+#include "PipelineStepI.h"
+#include "FeatureExtractorStep.h"
+#include "UniqueBufferId.h"
+#include "Constants.h"
+
+// ----------------------------------------------------------------------------
+//
+// Updates the split statistics #features X #splitpoints like
+// SplitpointStatsStep for axis aligned features whose splitpoints are the
+// bin edges from HistogramBinsStep.
+//
+// The bin of each datapoint is read from the bin codes of the tree (column
+// intParams(feature, 2) of the codes, through the node's indices) so nothing
+// is searched or extracted per node.  Each datapoint is added to the stats
+// of its bin and the stats of the children of each splitpoint are the sums
+// of the bins on each side.  This is O(#datapoints + #splitpoints) per
+// feature.  The stats updater must support MergeStats.
+//
+// ----------------------------------------------------------------------------
+template <class StatsUpdater>
+class HistogramSplitpointStatsStep : public PipelineStepI
+{
+public:
+    HistogramSplitpointStatsStep(const BufferId& splitpointsBufferId,
+                            const BufferId& splitpointCountsBufferId,
+                            const BufferId& binCodesBufferId,
+                            const BufferId& indicesBufferId,
+                            const BufferId& axisAlignedIntParamsBufferId,
+                            const StatsUpdater& statsUpdater);
+
+    virtual PipelineStepI* Clone() const;
+
+    virtual void ProcessStep(   const BufferCollectionStack& readCollection,
+                                BufferCollection& writeCollection,
+                                boost::mt19937& gen,
+                                BufferCollection& extraInfo, int nodeIndex) const;
+
+    const BufferId ChildCountsBufferId;
+    const BufferId LeftStatsBufferId;
+    const BufferId RightStatsBufferId;
+
+private:
+    const BufferKey mSplitpointsBufferId;
+    const BufferKey mSplitpointCountsBufferId;
+    const BufferKey mBinCodesBufferId;
+    const BufferKey mIndicesBufferId;
+    const BufferKey mAxisAlignedIntParamsBufferId;
+    StatsUpdater mStatsUpdater;
+};
+
+template <class StatsUpdater>
+HistogramSplitpointStatsStep<StatsUpdater>::HistogramSplitpointStatsStep(const BufferId& splitpointsBufferId,
+                                                              const BufferId& splitpointCountsBufferId,
+                                                              const BufferId& binCodesBufferId,
+                                                              const BufferId& indicesBufferId,
+                                                              const BufferId& axisAlignedIntParamsBufferId,
+                                                              const StatsUpdater& statsUpdater)
+: PipelineStepI("HistogramSplitpointStatsStep")
+, ChildCountsBufferId(GetBufferId("ChildCounts"))
+, LeftStatsBufferId(GetBufferId("LeftStats"))
+, RightStatsBufferId(GetBufferId("RightStats"))
+, mSplitpointsBufferId(splitpointsBufferId)
+, mSplitpointCountsBufferId(splitpointCountsBufferId)
+, mBinCodesBufferId(binCodesBufferId)
+, mIndicesBufferId(indicesBufferId)
+, mAxisAlignedIntParamsBufferId(axisAlignedIntParamsBufferId)
+, mStatsUpdater(statsUpdater)
+{
+}
+
+template <class StatsUpdater>
+PipelineStepI* HistogramSplitpointStatsStep<StatsUpdater>::Clone() const
+{
+    HistogramSplitpointStatsStep<StatsUpdater>* clone = new HistogramSplitpointStatsStep<StatsUpdater>(*this);
+    return clone;
+}
+
+template <class StatsUpdater>
+void HistogramSplitpointStatsStep<StatsUpdater>::ProcessStep(const BufferCollectionStack& readCollection,
+                                                        BufferCollection& writeCollection,
+                                                        boost::mt19937& gen,
+                                                        BufferCollection& extraInfo, int nodeIndex) const
+{
+    UNUSED_PARAM(gen);
+    UNUSED_PARAM(extraInfo);
+    UNUSED_PARAM(nodeIndex);
+
+    typedef typename StatsUpdater::BufferTypes BT;
+
+    typename StatsUpdater::BindedStatUpdater bindedStatUpdater = mStatsUpdater.Bind(readCollection);
+
+    const MatrixBufferTemplate<typename BT::FeatureValue>& splitpoints =
+          readCollection.GetBuffer< MatrixBufferTemplate<typename BT::FeatureValue> >(mSplitpointsBufferId);
+
+    const VectorBufferTemplate<typename BT::Index>& splitpointsCounts =
+          readCollection.GetBuffer< VectorBufferTemplate<typename BT::Index> >(mSplitpointCountsBufferId);
+
+    const MatrixBufferTemplate<HistogramBinCode>& binCodes =
+          readCollection.GetBuffer< MatrixBufferTemplate<HistogramBinCode> >(mBinCodesBufferId);
+
+    const VectorBufferTemplate<typename BT::Index>& indices =
+          readCollection.GetBuffer< VectorBufferTemplate<typename BT::Index> >(mIndicesBufferId);
+
+    const MatrixBufferTemplate<typename BT::ParamsInteger>& axisAlignedIntParams =
+          readCollection.GetBuffer< MatrixBufferTemplate<typename BT::ParamsInteger> >(mAxisAlignedIntParamsBufferId);
+
+    const typename BT::Index numberOfFeatures = splitpoints.GetM();
+    const typename BT::Index maxNumberOfSplitpoints = splitpoints.GetN();
+    const typename BT::Index numberOfSamples = indices.GetN();
+    const int statsDimension = mStatsUpdater.GetDimension();
+    ASSERT_ARG_DIM_1D(axisAlignedIntParams.GetM(), numberOfFeatures)
+
+    Tensor3BufferTemplate<typename BT::DatapointCounts>& childCounts =
+          writeCollection.GetOrAddBuffer< Tensor3BufferTemplate<typename BT::DatapointCounts> >(ChildCountsBufferId);
+    childCounts = Tensor3BufferTemplate<typename BT::DatapointCounts>(numberOfFeatures, maxNumberOfSplitpoints, 2);
+
+    Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& leftStats =
+          writeCollection.GetOrAddBuffer< Tensor3BufferTemplate<typename BT::SufficientStatsContinuous> >(LeftStatsBufferId);
+    leftStats = Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>(numberOfFeatures, maxNumberOfSplitpoints, statsDimension);
+
+    Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>& rightStats =
+          writeCollection.GetOrAddBuffer< Tensor3BufferTemplate<typename BT::SufficientStatsContinuous> >(RightStatsBufferId);
+    rightStats = Tensor3BufferTemplate<typename BT::SufficientStatsContinuous>(numberOfFeatures, maxNumberOfSplitpoints, statsDimension);
+
+    // Bin b holds the datapoints that are greater than b splitpoints, shared by all features
+    std::vector<typename BT::DatapointCounts> binCounts(maxNumberOfSplitpoints+1);
+    Tensor3BufferTemplate<typename BT::SufficientStatsContinuous> binStats(1, maxNumberOfSplitpoints+1, statsDimension);
+
+    for(typename BT::Index feature=0; feature<numberOfFeatures; feature++)
+    {
+        // Axis aligned features have one dimension (see SliceAxisAlignedFeaturesStep)
+        ASSERT(axisAlignedIntParams.Get(feature,1) == 1)
+        const HistogramBinCode* codes = binCodes.GetRowPtrUnsafe(axisAlignedIntParams.Get(feature,2));
+        const typename BT::Index numberOfSplitpoints = splitpointsCounts.Get(feature);
+
+        std::fill(binCounts.begin(), binCounts.begin() + numberOfSplitpoints+1, typename BT::DatapointCounts(0));
+        for(typename BT::Index bin=0; bin<=numberOfSplitpoints; bin++)
+        {
+            for(int d=0; d<statsDimension; d++)
+            {
+                binStats.Set(0, bin, d, typename BT::SufficientStatsContinuous(0));
+            }
+        }
+
+        for(typename BT::Index sample=0; sample<numberOfSamples; sample++)
+        {
+            const int bin = codes[indices.Get(sample)];
+            ASSERT(bin <= numberOfSplitpoints)
+            bindedStatUpdater.UpdateStats(binCounts[bin], binStats, 0, bin, sample);
+        }
+
+        // The right child of splitpoint s has bins 0..s and the left child has the rest
+        for(typename BT::Index splitpoint=0; splitpoint<numberOfSplitpoints; splitpoint++)
+        {
+            typename BT::DatapointCounts counts = typename BT::DatapointCounts(0);
+            if(splitpoint > 0)
+            {
+                bindedStatUpdater.MergeStats(counts, rightStats, feature, splitpoint, childCounts.Get(feature, splitpoint-1, RIGHT_CHILD), rightStats, feature, splitpoint-1);
+            }
+            bindedStatUpdater.MergeStats(counts, rightStats, feature, splitpoint, binCounts[splitpoint], binStats, 0, splitpoint);
+            childCounts.Set(feature, splitpoint, RIGHT_CHILD, counts);
+        }
+        for(typename BT::Index splitpoint=numberOfSplitpoints-1; splitpoint>=0; splitpoint--)
+        {
+            typename BT::DatapointCounts counts = typename BT::DatapointCounts(0);
+            if(splitpoint < numberOfSplitpoints-1)
+            {
+                bindedStatUpdater.MergeStats(counts, leftStats, feature, splitpoint, childCounts.Get(feature, splitpoint+1, LEFT_CHILD), leftStats, feature, splitpoint+1);
+            }
+            bindedStatUpdater.MergeStats(counts, leftStats, feature, splitpoint, binCounts[splitpoint+1], binStats, 0, splitpoint+1);
+            childCounts.Set(feature, splitpoint, LEFT_CHILD, counts);
+        }
+    }
+}
@@ -47,7 +47,7 @@ public:
     const BufferId RightYsBufferId;
 private:
     const ImpurityWalker mImpurityWalker;
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const FeatureValueOrdering mFeatureValueOrdering;
 
 };
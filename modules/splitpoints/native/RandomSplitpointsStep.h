@@ -46,10 +46,10 @@ private:
                         const int featureIndex,
                         const typename BufferTypes::FeatureValue featureValue) const;
 
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const int mMaxSplitpointPerFeature;
     const FeatureValueOrdering mFeatureValueOrdering;
-    const BufferId mStreamTypeBufferId;
+    const BufferKey mStreamTypeBufferId;
 };
 
 template <class BufferTypes>
@@ -93,8 +93,7 @@ void RandomSplitpointsStep<BufferTypes>::ProcessStep(const BufferCollectionStack
                                         boost::mt19937& gen,
                                         BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(gen);
-    UNUSED_PARAM(extraInfo); //sampleIndicesWithOutReplacement does NOT currently use boost::mt19937
+    UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
     const MatrixBufferTemplate<typename BufferTypes::FeatureValue>& featureValues =
@@ -121,7 +120,7 @@ void RandomSplitpointsStep<BufferTypes>::ProcessStep(const BufferCollectionStack
     if(IsFull(splitPointsCounts)) return;
 
     std::vector<int> randomOrder(numberOfSamples);
-    sampleIndicesWithOutReplacement(&randomOrder[0], randomOrder.size(), randomOrder.size());
+    sampleIndicesWithOutReplacement(&randomOrder[0], randomOrder.size(), randomOrder.size(), gen);
 
     for(int j=0; j<numberOfSamples && !IsFull(splitPointsCounts); j++)
     {
@@ -38,7 +38,7 @@ public:
     const BufferId SplitpointsBufferId;
     const BufferId SplitpointsCountsBufferId;
 private:
-    const BufferId mFeatureValuesRangeMinMax;
+    const BufferKey mFeatureValuesRangeMinMax;
     const int mNumberOfSplitpoints;
 
 };
@@ -67,7 +67,7 @@ void RandomUniformSplitpointsInRangeStep<BufferTypes>::ProcessStep(const BufferC
                                         boost::mt19937& gen,
                                         BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(extraInfo); //sampleIndicesWithOutReplacement does NOT currently use boost::mt19937
+    UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
     const MatrixBufferTemplate<typename BufferTypes::FeatureValue>& featureValuesRangesMinMax =
@@ -41,9 +41,9 @@ public:
     const BufferId PastIntParamsBufferId;
     const BufferId PastRangesBufferId;
 private:
-    const BufferId mFloatParamsBufferId;
-    const BufferId mIntParamsBufferId;
-    const BufferId mInitialRangeBufferId;
+    const BufferKey mFloatParamsBufferId;
+    const BufferKey mIntParamsBufferId;
+    const BufferKey mInitialRangeBufferId;
     const FeatureEqualI<BufferTypes>* mFeatureEqual;
 };
 
@@ -98,7 +98,7 @@ void RangeMidpointStep<BufferTypes>::ProcessStep(const BufferCollectionStack& re
                                         BufferCollection& extraInfo, int nodeIndex) const
 {
     UNUSED_PARAM(gen);
-    UNUSED_PARAM(extraInfo); //sampleIndicesWithOutReplacement does NOT currently use boost::mt19937
+    UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
     const MatrixBufferTemplate<typename BufferTypes::ParamsContinuous>& floatParams =
@@ -30,10 +30,10 @@ public:
     virtual SplitBuffersI* Clone() const;
 
 private:
-    const BufferId mPastFloatParamsBufferId;
-    const BufferId mPastIntParamsBufferId;
-    const BufferId mPastRangesBufferId;
-    const BufferId mInitialRangeBufferId;
+    const BufferKey mPastFloatParamsBufferId;
+    const BufferKey mPastIntParamsBufferId;
+    const BufferKey mPastRangesBufferId;
+    const BufferKey mInitialRangeBufferId;
     const FeatureEqualI<BufferTypes>* mFeatureEqual;
 };
 
@@ -24,7 +24,7 @@ public:
     virtual SplitBuffersI* Clone() const;
 
 private:
-    BufferId mIndicesBufferId;
+    BufferKey mIndicesBufferId;
 };
 
 template <class BufferTypes>
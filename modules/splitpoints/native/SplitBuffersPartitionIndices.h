@@ -0,0 +1,146 @@
+#pragma once
+
+#include <vector>
+#include <boost/shared_ptr.hpp>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "PipelineStepI.h"
+#include "UniqueBufferId.h"
+#include "SplitBuffersI.h"
+
+// ----------------------------------------------------------------------------
+//
+// Splits indices like SplitBuffersIndices but without allocating for every
+// node.  The first split of a tree copies the indices into a tree wide array
+// and the indices of each child are a view (see BufferStorage) of a range of
+// that array.  Splitting a node partitions its range in place so the left
+// child gets the front of the range and the right child the back.  The
+// partition is stable so the children have the same indices in the same order
+// as with SplitBuffersIndices.
+//
+// The tree wide array has a second half of the same size that the partition
+// uses as scratch space for the right child.  The ranges of siblings never
+// overlap so subtrees can be learned concurrently.
+//
+// Splitting reorders the indices of the node, it has to be the last splitter
+// that reads them.
+//
+// ----------------------------------------------------------------------------
+template <class BufferTypes>
+class SplitBuffersPartitionIndices : public SplitBuffersI
+{
+public:
+    SplitBuffersPartitionIndices(const BufferId& indicesBufferId);
+    virtual ~SplitBuffersPartitionIndices();
+
+    virtual void SplitBuffers(const SplitSelectorBuffers& splitSelectorBuffers,
+                              int bestFeature,
+                              int bestSplitpoint,
+                              const BufferCollectionStack& readBuffers,
+                              BufferCollection& leftBuffers,
+                              BufferCollection& rightBuffers) const;
+
+    virtual SplitBuffersI* Clone() const;
+
+private:
+    BufferKey mIndicesBufferId;
+    BufferKey mScratchBufferId;
+};
+
+template <class BufferTypes>
+SplitBuffersPartitionIndices<BufferTypes>::SplitBuffersPartitionIndices(const BufferId& indicesBufferId)
+: mIndicesBufferId(indicesBufferId)
+, mScratchBufferId(indicesBufferId + "-PartitionScratch")
+{}
+
+template <class BufferTypes>
+SplitBuffersPartitionIndices<BufferTypes>::~SplitBuffersPartitionIndices()
+{}
+
+template <class BufferTypes>
+void SplitBuffersPartitionIndices<BufferTypes>::SplitBuffers(const SplitSelectorBuffers& splitSelectorBuffers,
+                                                        int bestFeature,
+                                                        int bestSplitpoint,
+                                                        const BufferCollectionStack& readBuffers,
+                                                        BufferCollection& leftBuffers,
+                                                        BufferCollection& rightBuffers) const
+{
+    typedef typename BufferTypes::Index Index;
+
+    const VectorBufferTemplate<Index>& nodeIndices
+          = readBuffers.GetBuffer< VectorBufferTemplate<Index> >(mIndicesBufferId);
+
+    const MatrixBufferTemplate<typename BufferTypes::FeatureValue>& featureValues
+          = readBuffers.GetBuffer< MatrixBufferTemplate<typename BufferTypes::FeatureValue> >(splitSelectorBuffers.mFeatureValuesBufferId);
+
+    const MatrixBufferTemplate<typename BufferTypes::FeatureValue>& splitpoints
+          = readBuffers.GetBuffer< MatrixBufferTemplate<typename BufferTypes::FeatureValue> >(splitSelectorBuffers.mSplitpointsBufferId);
+
+    const typename BufferTypes::FeatureValue bestSplitpointValue = splitpoints.Get(bestFeature, bestSplitpoint);
+    const int numberOfSamples = nodeIndices.GetN();
+    if( splitSelectorBuffers.mOrdering == FEATURES_BY_DATAPOINTS )
+    {
+        ASSERT_ARG_DIM_1D(featureValues.GetN(), numberOfSamples)
+    }
+    else if ( splitSelectorBuffers.mOrdering == DATAPOINTS_BY_FEATURES )
+    {
+        ASSERT_ARG_DIM_1D(featureValues.GetM(), numberOfSamples)
+    }
+
+    // The root of the tree copies its indices into the tree wide array, every
+    // other node already has views of it
+    VectorBufferTemplate<Index> indices;
+    VectorBufferTemplate<Index> scratch;
+    if( readBuffers.HasBuffer< VectorBufferTemplate<Index> >(mScratchBufferId) )
+    {
+        indices = nodeIndices;
+        scratch = readBuffers.GetBuffer< VectorBufferTemplate<Index> >(mScratchBufferId);
+    }
+    else
+    {
+        ASSERT(numberOfSamples > 0)
+        boost::shared_ptr< std::vector<Index> > storage( new std::vector<Index>(2*numberOfSamples) );
+        std::copy(nodeIndices.GetDataPtrUnsafe(), nodeIndices.GetDataPtrUnsafe() + numberOfSamples, storage->begin());
+        const VectorBufferTemplate<Index> treeIndices(BufferStorage<Index>(&(*storage)[0], storage->size(), storage), storage->size());
+        indices = treeIndices.View(0, numberOfSamples);
+        scratch = treeIndices.View(numberOfSamples, numberOfSamples);
+    }
+    ASSERT(indices.IsView() && scratch.IsView())
+    ASSERT_ARG_DIM_1D(scratch.GetN(), numberOfSamples)
+
+    // The views are read only so the partition writes through the raw pointers
+    // of the tree wide array, which is only shared with the other views.
+    Index* indicesPtr = const_cast<Index*>(indices.GetDataPtrUnsafe());
+    Index* scratchPtr = const_cast<Index*>(scratch.GetDataPtrUnsafe());
+    int numberOfLeft = 0;
+    int numberOfRight = 0;
+    for(int i=0; i<numberOfSamples; i++)
+    {
+        const typename BufferTypes::FeatureValue featureValue = splitSelectorBuffers.mOrdering == FEATURES_BY_DATAPOINTS ?
+                                                                featureValues.Get(bestFeature, i) : featureValues.Get(i, bestFeature);
+        const Index index = indicesPtr[i];
+        if( featureValue > bestSplitpointValue )
+        {
+            indicesPtr[numberOfLeft++] = index;
+        }
+        else
+        {
+            scratchPtr[numberOfRight++] = index;
+        }
+    }
+    std::copy(scratchPtr, scratchPtr + numberOfRight, indicesPtr + numberOfLeft);
+
+    leftBuffers.AddBuffer< VectorBufferTemplate<Index> >(mIndicesBufferId, indices.View(0, numberOfLeft) );
+    leftBuffers.AddBuffer< VectorBufferTemplate<Index> >(mScratchBufferId, scratch.View(0, numberOfLeft) );
+    rightBuffers.AddBuffer< VectorBufferTemplate<Index> >(mIndicesBufferId, indices.View(numberOfLeft, numberOfRight) );
+    rightBuffers.AddBuffer< VectorBufferTemplate<Index> >(mScratchBufferId, scratch.View(numberOfLeft, numberOfRight) );
+}
+
+template <class BufferTypes>
+SplitBuffersI* SplitBuffersPartitionIndices<BufferTypes>::Clone() const
+{
+    SplitBuffersPartitionIndices<BufferTypes>* clone = new SplitBuffersPartitionIndices<BufferTypes>(*this);
+    return clone;
+}
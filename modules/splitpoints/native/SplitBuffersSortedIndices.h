@@ -0,0 +1,119 @@
+#pragma once
+
+#include <vector>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "BufferCollection.h"
+#include "PipelineStepI.h"
+#include "UniqueBufferId.h"
+#include "SplitBuffersI.h"
+
+// ----------------------------------------------------------------------------
+//
+// Partition presorted indices (see PresortColumnsStep) for the children.
+// Each row keeps its order and the positions are renumbered to the position
+// of the datapoint in the child, which matches the order SplitBuffersIndices
+// gives the indices of the child.  This is linear in the size of the node so
+// the children do not have to sort again.
+//
+// ----------------------------------------------------------------------------
+template <class BufferTypes>
+class SplitBuffersSortedIndices : public SplitBuffersI
+{
+public:
+    SplitBuffersSortedIndices(const BufferId& sortedIndicesBufferId);
+    virtual ~SplitBuffersSortedIndices();
+
+    virtual void SplitBuffers(const SplitSelectorBuffers& splitSelectorBuffers,
+                              int bestFeature,
+                              int bestSplitpoint,
+                              const BufferCollectionStack& readBuffers,
+                              BufferCollection& leftBuffers,
+                              BufferCollection& rightBuffers) const;
+
+    virtual SplitBuffersI* Clone() const;
+
+private:
+    BufferKey mSortedIndicesBufferId;
+};
+
+template <class BufferTypes>
+SplitBuffersSortedIndices<BufferTypes>::SplitBuffersSortedIndices(const BufferId& sortedIndicesBufferId)
+: mSortedIndicesBufferId(sortedIndicesBufferId)
+{}
+
+template <class BufferTypes>
+SplitBuffersSortedIndices<BufferTypes>::~SplitBuffersSortedIndices()
+{}
+
+template <class BufferTypes>
+void SplitBuffersSortedIndices<BufferTypes>::SplitBuffers(const SplitSelectorBuffers& splitSelectorBuffers,
+                                                        int bestFeature,
+                                                        int bestSplitpoint,
+                                                        const BufferCollectionStack& readBuffers,
+                                                        BufferCollection& leftBuffers,
+                                                        BufferCollection& rightBuffers) const
+{
+    const MatrixBufferTemplate<typename BufferTypes::Index>& sortedIndices
+          = readBuffers.GetBuffer< MatrixBufferTemplate<typename BufferTypes::Index> >(mSortedIndicesBufferId);
+
+    const MatrixBufferTemplate<typename BufferTypes::FeatureValue>& featureValuesMatrix
+          = readBuffers.GetBuffer< MatrixBufferTemplate<typename BufferTypes::FeatureValue> >(splitSelectorBuffers.mFeatureValuesBufferId);
+
+    const MatrixBufferTemplate<typename BufferTypes::FeatureValue>& splitpoints
+          = readBuffers.GetBuffer< MatrixBufferTemplate<typename BufferTypes::FeatureValue> >(splitSelectorBuffers.mSplitpointsBufferId);
+
+    const typename BufferTypes::FeatureValue bestSplitpointValue = splitpoints.Get(bestFeature, bestSplitpoint);
+    VectorBufferTemplate<typename BufferTypes::FeatureValue> featureValues;
+    if( splitSelectorBuffers.mOrdering == FEATURES_BY_DATAPOINTS )
+    {
+        featureValues = featureValuesMatrix.SliceRowAsVector(bestFeature);
+    }
+    else if ( splitSelectorBuffers.mOrdering == DATAPOINTS_BY_FEATURES )
+    {
+        featureValues = featureValuesMatrix.SliceColumnAsVector(bestFeature);
+    }
+    ASSERT_ARG_DIM_1D(featureValues.GetN(), sortedIndices.GetN())
+
+    // Position of each datapoint in the child it goes to
+    const int numberOfSamples = featureValues.GetN();
+    std::vector<bool> goesLeft(numberOfSamples);
+    std::vector<typename BufferTypes::Index> childPositions(numberOfSamples);
+    typename BufferTypes::Index numberOfLeft = 0;
+    typename BufferTypes::Index numberOfRight = 0;
+    for(int i=0; i<numberOfSamples; i++)
+    {
+        goesLeft[i] = featureValues.Get(i) > bestSplitpointValue;
+        childPositions[i] = goesLeft[i] ? numberOfLeft++ : numberOfRight++;
+    }
+
+    MatrixBufferTemplate<typename BufferTypes::Index> leftSortedIndices(sortedIndices.GetM(), numberOfLeft);
+    MatrixBufferTemplate<typename BufferTypes::Index> rightSortedIndices(sortedIndices.GetM(), numberOfRight);
+    for(int r=0; r<sortedIndices.GetM(); r++)
+    {
+        int leftColumn = 0;
+        int rightColumn = 0;
+        for(int s=0; s<numberOfSamples; s++)
+        {
+            const typename BufferTypes::Index i = sortedIndices.Get(r, s);
+            if( goesLeft[i] )
+            {
+                leftSortedIndices.Set(r, leftColumn++, childPositions[i]);
+            }
+            else
+            {
+                rightSortedIndices.Set(r, rightColumn++, childPositions[i]);
+            }
+        }
+    }
+    leftBuffers.AddBuffer< MatrixBufferTemplate<typename BufferTypes::Index> >(mSortedIndicesBufferId, leftSortedIndices );
+    rightBuffers.AddBuffer< MatrixBufferTemplate<typename BufferTypes::Index> >(mSortedIndicesBufferId, rightSortedIndices );
+}
+
+template <class BufferTypes>
+SplitBuffersI* SplitBuffersSortedIndices<BufferTypes>::Clone() const
+{
+    SplitBuffersSortedIndices<BufferTypes>* clone = new SplitBuffersSortedIndices<BufferTypes>(*this);
+    return clone;
+}
@@ -29,15 +29,15 @@ public:
     SplitSelectorBuffers& operator=( const SplitSelectorBuffers& rhs );
 
     // BufferIds are non-const for vector assignment operator
-    BufferId mImpurityBufferId;
-    BufferId mSplitpointsBufferId;
-    BufferId mSplitpointsCountsBufferId;
-    BufferId mChildCountsBufferId;
-    BufferId mLeftEstimatorParamsBufferId;
-    BufferId mRightEstimatorParamsBufferId;
-    BufferId mFloatParamsBufferId;
-    BufferId mIntParamsBufferId;
-    BufferId mFeatureValuesBufferId;
+    BufferKey mImpurityBufferId;
+    BufferKey mSplitpointsBufferId;
+    BufferKey mSplitpointsCountsBufferId;
+    BufferKey mChildCountsBufferId;
+    BufferKey mLeftEstimatorParamsBufferId;
+    BufferKey mRightEstimatorParamsBufferId;
+    BufferKey mFloatParamsBufferId;
+    BufferKey mIntParamsBufferId;
+    BufferKey mFeatureValuesBufferId;
     FeatureValueOrdering mOrdering;
     FeatureInfoLoggerI* mFeatureIndexer;
 };
@@ -36,9 +36,9 @@ public:
     const BufferId RightStatsBufferId;
 
 private:
-    const BufferId mSplitpointsBufferId;
-    const BufferId mSplitpointCountsBufferId;
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mSplitpointsBufferId;
+    const BufferKey mSplitpointCountsBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const FeatureValueOrdering mFeatureValueOrdering;
     StatsUpdater mStatsUpdater;
 };
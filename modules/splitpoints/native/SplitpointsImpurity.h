@@ -31,10 +31,10 @@ public:
 
     const BufferId ImpurityBufferId;
 private:
-    const BufferId mSplitpointCountsBufferId;
-    const BufferId mChildCountsBufferId;
-    const BufferId mLeftStatsBufferId;
-    const BufferId mRightStatsBufferId;
+    const BufferKey mSplitpointCountsBufferId;
+    const BufferKey mChildCountsBufferId;
+    const BufferKey mLeftStatsBufferId;
+    const BufferKey mRightStatsBufferId;
 };
 
 
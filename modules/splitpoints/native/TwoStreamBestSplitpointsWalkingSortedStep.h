@@ -53,8 +53,8 @@ public:
     const BufferId RightEstimationYsBufferId;
 private:
     const ImpurityWalker mImpurityWalker;
-    const BufferId mStreamTypeBufferId;
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mStreamTypeBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const FeatureValueOrdering mFeatureValueOrdering;
     const WalkingSortedSplitpointLocation mSplitpointLocation;
     const int mNumberOfInBoundsDatapoints;
@@ -100,7 +100,6 @@ void TwoStreamBestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(cons
                                                               boost::mt19937& gen,
                                                               BufferCollection& extraInfo, int nodeIndex) const
 {
-    UNUSED_PARAM(gen);
     UNUSED_PARAM(extraInfo);
     UNUSED_PARAM(nodeIndex);
 
@@ -150,7 +149,7 @@ void TwoStreamBestSplitpointsWalkingSortedStep<ImpurityWalker>::ProcessStep(cons
         const int numberOfSamples = sorter.GetNumberOfSamples();
         std::vector<int> inboundSamples(numberOfSamples);
         const int numberOfInBoundsSamples = std::min(numberOfSamples, mNumberOfInBoundsDatapoints);
-        sampleWithOutReplacement(&inboundSamples[0], numberOfSamples, numberOfInBoundsSamples);
+        sampleWithOutReplacement(&inboundSamples[0], numberOfSamples, numberOfInBoundsSamples, gen);
 
         typename ImpurityWalker::BufferTypes::FeatureValue boundsMin = std::numeric_limits<typename ImpurityWalker::BufferTypes::FeatureValue>::max();
         typename ImpurityWalker::BufferTypes::FeatureValue boundsMax = -std::numeric_limits<typename ImpurityWalker::BufferTypes::FeatureValue>::max();
@@ -43,10 +43,10 @@ public:
     const BufferId RightEstimatorStatsBufferId;
 
 private:
-    const BufferId mSplitpointsBufferId;
-    const BufferId mSplitpointCountsBufferId;
-    const BufferId mStreamTypeBufferId;
-    const BufferId mFeatureValuesBufferId;
+    const BufferKey mSplitpointsBufferId;
+    const BufferKey mSplitpointCountsBufferId;
+    const BufferKey mStreamTypeBufferId;
+    const BufferKey mFeatureValuesBufferId;
     const FeatureValueOrdering mFeatureValueOrdering;
     StatsUpdater mStatsUpdater;
 };
@@ -6,6 +6,7 @@
 #include "WaitForBestSplitSelector.h"
 #include "SplitSelectorInfo.h"
 #include "SplitBuffersIndices.h"
+#include "SplitBuffersPartitionIndices.h"
 #include "SplitpointsImpurity.h"
 #include "AssignStreamStep.h"
 #include "RandomSplitpointsStep.h"
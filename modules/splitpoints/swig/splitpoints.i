@@ -9,6 +9,8 @@
 
     #include "SplitBuffersI.h"
     #include "SplitBuffersIndices.h"
+    #include "SplitBuffersPartitionIndices.h"
+    #include "SplitBuffersSortedIndices.h"
     #include "SplitBuffersFeatureRange.h"
     #include "SplitBuffersList.h"
     #include "BestSplitpointsWalkingSortedStep.h"
@@ -42,6 +44,8 @@ namespace std {
 
 %include "SplitBuffersI.h"
 %include "SplitBuffersIndices.h"
+%include "SplitBuffersPartitionIndices.h"
+%include "SplitBuffersSortedIndices.h"
 %include "SplitBuffersFeatureRange.h"
 %include "SplitBuffersList.h"
 %include "RandomUniformSplitpointsInRangeStep.h"
@@ -57,5 +61,7 @@ namespace std {
 %template(RangeMidpointStep_f32i32) RangeMidpointStep<DefaultBufferTypes>;
 
 %template(SplitIndices_f32i32) SplitBuffersIndices<DefaultBufferTypes>;
+%template(SplitPartitionIndices_f32i32) SplitBuffersPartitionIndices<DefaultBufferTypes>;
+%template(SplitSortedIndices_f32i32) SplitBuffersSortedIndices<DefaultBufferTypes>;
 %template(SplitBuffersFeatureRange_f32i32) SplitBuffersFeatureRange<DefaultBufferTypes>;
 %template(RandomUniformSplitpointsInRangeStep_Default) RandomUniformSplitpointsInRangeStep< DefaultBufferTypes >;
\ No newline at end of file
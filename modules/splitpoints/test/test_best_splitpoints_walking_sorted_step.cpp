@@ -214,4 +214,72 @@ BOOST_AUTO_TEST_CASE(test_BestSplitpointsWalkingSortedStep_ProcessStep_DATAPOINT
     BOOST_CHECK(right_ys == expected_right_ys);
 }
 
+BOOST_AUTO_TEST_CASE(test_BestSplitpointsWalkingSortedStep_ProcessStep_presorted_matches_sorted)
+{
+    // Rows of fm in sorted order
+    int sorted_indices_data[] = {3, 4, 1, 0, 2,
+                                 4, 1, 2, 0, 3,
+                                 1, 2, 3, 4, 0};
+    const BufferCollectionKey_t sorted_indices_key("sorted_indices");
+    collection.AddBuffer(sorted_indices_key, CreateMatrix<int>(sorted_indices_data, 3, 5));
+
+    TestBufferWalker<double, int> walker(im, left, right);
+    BestSplitpointsWalkingSortedStep< TestBufferWalker<double, int> > bestsplits(walker, fm_key, FEATURES_BY_DATAPOINTS, AT_MIDPOINT);
+    BestSplitpointsWalkingSortedStep< TestBufferWalker<double, int> > presortedBestsplits(walker, fm_key, FEATURES_BY_DATAPOINTS, AT_MIDPOINT, sorted_indices_key);
+
+    boost::mt19937 gen;
+    BufferCollection sortedCollection;
+    bestsplits.ProcessStep(stack, sortedCollection, gen, sortedCollection, 0);
+    BufferCollection presortedCollection;
+    presortedBestsplits.ProcessStep(stack, presortedCollection, gen, presortedCollection, 0);
+
+    BOOST_CHECK( sortedCollection.GetBuffer< MatrixBufferTemplate<double> >( bestsplits.ImpurityBufferId )
+                  == presortedCollection.GetBuffer< MatrixBufferTemplate<double> >( presortedBestsplits.ImpurityBufferId ) );
+    BOOST_CHECK( sortedCollection.GetBuffer< MatrixBufferTemplate<double> >( bestsplits.SplitpointBufferId )
+                  == presortedCollection.GetBuffer< MatrixBufferTemplate<double> >( presortedBestsplits.SplitpointBufferId ) );
+    BOOST_CHECK( sortedCollection.GetBuffer< VectorBufferTemplate<int> >( bestsplits.SplitpointCountsBufferId )
+                  == presortedCollection.GetBuffer< VectorBufferTemplate<int> >( presortedBestsplits.SplitpointCountsBufferId ) );
+    BOOST_CHECK( sortedCollection.GetBuffer< Tensor3BufferTemplate<double> >( bestsplits.ChildCountsBufferId )
+                  == presortedCollection.GetBuffer< Tensor3BufferTemplate<double> >( presortedBestsplits.ChildCountsBufferId ) );
+    BOOST_CHECK( sortedCollection.GetBuffer< Tensor3BufferTemplate<double> >( bestsplits.LeftYsBufferId )
+                  == presortedCollection.GetBuffer< Tensor3BufferTemplate<double> >( presortedBestsplits.LeftYsBufferId ) );
+    BOOST_CHECK( sortedCollection.GetBuffer< Tensor3BufferTemplate<double> >( bestsplits.RightYsBufferId )
+                  == presortedCollection.GetBuffer< Tensor3BufferTemplate<double> >( presortedBestsplits.RightYsBufferId ) );
+}
+
+BOOST_AUTO_TEST_CASE(test_BestSplitpointsWalkingSortedStep_ProcessStep_reuses_scratch)
+{
+    // Process a smaller node after a larger one with the same step
+    double small_data[] = {0.06, 0.03, 0.07,
+                           6.1,  3,    5.5,
+                           9,    3,    6.25};
+    BufferCollection smallCollection;
+    smallCollection.AddBuffer(fm_key, CreateMatrix<double>(small_data, 3, 3));
+    BufferCollectionStack smallStack;
+    smallStack.Push(&smallCollection);
+
+    TestBufferWalker<double, int> walker(im, left, right);
+    BestSplitpointsWalkingSortedStep< TestBufferWalker<double, int> > bestsplits(walker, fm_key, FEATURES_BY_DATAPOINTS, AT_MIDPOINT);
+    BestSplitpointsWalkingSortedStep< TestBufferWalker<double, int> > newBestsplits(walker, fm_key, FEATURES_BY_DATAPOINTS, AT_MIDPOINT);
+
+    boost::mt19937 gen;
+    BufferCollection largeCollection;
+    bestsplits.ProcessStep(stack, largeCollection, gen, largeCollection, 0);
+    BufferCollection reusedCollection;
+    bestsplits.ProcessStep(smallStack, reusedCollection, gen, reusedCollection, 1);
+    BufferCollection newCollection;
+    newBestsplits.ProcessStep(smallStack, newCollection, gen, newCollection, 1);
+
+    BOOST_CHECK( reusedCollection.GetBuffer< MatrixBufferTemplate<double> >( bestsplits.ImpurityBufferId )
+                  == newCollection.GetBuffer< MatrixBufferTemplate<double> >( newBestsplits.ImpurityBufferId ) );
+    BOOST_CHECK( reusedCollection.GetBuffer< MatrixBufferTemplate<double> >( bestsplits.SplitpointBufferId )
+                  == newCollection.GetBuffer< MatrixBufferTemplate<double> >( newBestsplits.SplitpointBufferId ) );
+    BOOST_CHECK( reusedCollection.GetBuffer< VectorBufferTemplate<int> >( bestsplits.SplitpointCountsBufferId )
+                  == newCollection.GetBuffer< VectorBufferTemplate<int> >( newBestsplits.SplitpointCountsBufferId ) );
+    BOOST_CHECK( reusedCollection.GetBuffer< Tensor3BufferTemplate<double> >( bestsplits.LeftYsBufferId )
+                  == newCollection.GetBuffer< Tensor3BufferTemplate<double> >( newBestsplits.LeftYsBufferId ) );
+    BOOST_CHECK( reusedCollection.GetBuffer< Tensor3BufferTemplate<double> >( bestsplits.RightYsBufferId )
+                  == newCollection.GetBuffer< Tensor3BufferTemplate<double> >( newBestsplits.RightYsBufferId ) );
+}
+
 BOOST_AUTO_TEST_SUITE_END()
\ No newline at end of file
@@ -0,0 +1,171 @@
+#include <boost/test/unit_test.hpp>
+
+#include "VectorBuffer.h"
+#include "MatrixBuffer.h"
+#include "Tensor3Buffer.h"
+#include "BufferTypes.h"
+#include "BufferCollection.h"
+#include "BufferCollectionStack.h"
+#include "UniqueBufferId.h"
+#include "SplitpointStatsStep.h"
+#include "HistogramSplitpointStatsStep.h"
+#include "ClassStatsUpdater.h"
+#include "MeanVarianceStatsUpdater.h"
+#include "Constants.h"
+
+#include <algorithm>
+
+struct HistogramSplitpointStatsStepFixture {
+    HistogramSplitpointStatsStepFixture()
+    : weights_key("weights")
+    , classes_key("classes")
+    , ys_key("ys")
+    , split_points_key("split_points")
+    , split_points_counts_key("split_points_counts")
+    , feature_values_key("feature_values")
+    , bin_codes_key("bin_codes")
+    , indices_key("indices")
+    , int_params_key("int_params")
+    , bc()
+    , stack()
+    {
+        float weight_data[] = {1.0, 0.5, 2.0, 1.5, 3.0, 1.0, 1.0, 1.0, 1.0, 1.0};
+        bc.AddBuffer(weights_key, VectorBufferTemplate<float>(&weight_data[0], 10));
+
+        int classes_data[] = {0, 2, 1, 2, 1, 0, 0, 1, 1, 2};
+        bc.AddBuffer(classes_key, VectorBufferTemplate<int>(&classes_data[0], 10));
+
+        float ys_data[] = {0, 2,
+                           2, 1,
+                           4, 5,
+                           22, 24,
+                           1, 2,
+                           -3, 0.5,
+                           8, 8,
+                           2.5, 1,
+                           0, 0,
+                           7, -2};
+        bc.AddBuffer(ys_key, MatrixBufferTemplate<float>(&ys_data[0], 10, 2));
+
+        // Sorted splitpoints, the histogram step requires it
+        float split_points_data[] = {2.0, 5.5, 7.0,
+                                     0.5, 1.5, 0,
+                                     1.003, 0, 0 };
+        bc.AddBuffer(split_points_key, MatrixBufferTemplate<float>(&split_points_data[0], 3, 3));
+
+        int split_points_counts_data[] = {3,2,1};
+        bc.AddBuffer(split_points_counts_key, VectorBufferTemplate<int>(&split_points_counts_data[0], 3));
+
+        float feature_values_data[] = {1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0,
+                                       1.0, 1.0, 1.0, 1.0, 1.0, 2.0, 2.0, 2.0, 2.0, 2.0,
+                                       1.001, 1.002, 1.003, 1.004, 1.005, 1.006, 0, 0, 0, 0 };
+        MatrixBufferTemplate<float> featureValues(&feature_values_data[0], 3, 10);
+        bc.AddBuffer(feature_values_key, featureValues);
+
+        // The tree has 12 rows and 4 columns, datapoint s of the node is row
+        // indices[s] and feature f is column int_params(f, 2)
+        int indices_data[] = {11, 3, 0, 7, 5, 9, 1, 10, 4, 6};
+        bc.AddBuffer(indices_key, VectorBufferTemplate<int>(&indices_data[0], 10));
+        int int_params_data[] = {10, 1, 2,
+                                 10, 1, 0,
+                                 10, 1, 3};
+        bc.AddBuffer(int_params_key, MatrixBufferTemplate<int>(&int_params_data[0], 3, 3));
+
+        MatrixBufferTemplate<HistogramBinCode> binCodes(4, 12);
+        for(int f=0; f<3; f++)
+        {
+            const float* firstSplitpoint = &split_points_data[f*3];
+            const float* lastSplitpoint = firstSplitpoint + split_points_counts_data[f];
+            for(int sample=0; sample<10; sample++)
+            {
+                const int bin = std::lower_bound(firstSplitpoint, lastSplitpoint, featureValues.Get(f, sample)) - firstSplitpoint;
+                binCodes.Set(int_params_data[f*3+2], indices_data[sample], static_cast<HistogramBinCode>(bin));
+            }
+        }
+        bc.AddBuffer(bin_codes_key, binCodes);
+        stack.Push(&bc);
+    }
+
+    template <class StatsUpdater>
+    void CheckSameAsSplitpointStatsStep(const StatsUpdater& statsUpdater)
+    {
+        SplitpointStatsStep<StatsUpdater> splitpointStatsStep(split_points_key, split_points_counts_key,
+                                                              feature_values_key, FEATURES_BY_DATAPOINTS, statsUpdater);
+        HistogramSplitpointStatsStep<StatsUpdater> histogramStatsStep(split_points_key, split_points_counts_key,
+                                                                      bin_codes_key, indices_key, int_params_key, statsUpdater);
+        boost::mt19937 gen;
+        BufferCollection expected;
+        splitpointStatsStep.ProcessStep(stack, expected, gen, expected, 0);
+        BufferCollection histogram;
+        histogramStatsStep.ProcessStep(stack, histogram, gen, histogram, 0);
+
+        CheckClose(expected.GetBuffer< Tensor3BufferTemplate<float> >(splitpointStatsStep.ChildCountsBufferId),
+                   histogram.GetBuffer< Tensor3BufferTemplate<float> >(histogramStatsStep.ChildCountsBufferId));
+        CheckClose(expected.GetBuffer< Tensor3BufferTemplate<float> >(splitpointStatsStep.LeftStatsBufferId),
+                   histogram.GetBuffer< Tensor3BufferTemplate<float> >(histogramStatsStep.LeftStatsBufferId));
+        CheckClose(expected.GetBuffer< Tensor3BufferTemplate<float> >(splitpointStatsStep.RightStatsBufferId),
+                   histogram.GetBuffer< Tensor3BufferTemplate<float> >(histogramStatsStep.RightStatsBufferId));
+    }
+
+    void CheckClose(const Tensor3BufferTemplate<float>& expected, const Tensor3BufferTemplate<float>& actual)
+    {
+        BOOST_CHECK_EQUAL(expected.GetL(), actual.GetL());
+        BOOST_CHECK_EQUAL(expected.GetM(), actual.GetM());
+        BOOST_CHECK_EQUAL(expected.GetN(), actual.GetN());
+        const int numberOfSplitpoints[] = {3,2,1};
+        for(int l=0; l<expected.GetL(); l++)
+        {
+            for(int m=0; m<numberOfSplitpoints[l]; m++)
+            {
+                for(int n=0; n<expected.GetN(); n++)
+                {
+                    BOOST_CHECK_SMALL(expected.Get(l,m,n) - actual.Get(l,m,n), 0.001f);
+                }
+            }
+        }
+    }
+
+    const BufferId weights_key;
+    const BufferId classes_key;
+    const BufferId ys_key;
+    const BufferId split_points_key;
+    const BufferId split_points_counts_key;
+    const BufferId feature_values_key;
+    const BufferId bin_codes_key;
+    const BufferId indices_key;
+    const BufferId int_params_key;
+    BufferCollection bc;
+    BufferCollectionStack stack;
+};
+
+BOOST_FIXTURE_TEST_SUITE( HistogramSplitpointStatsStepTests, HistogramSplitpointStatsStepFixture )
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep_class_stats)
+{
+    ClassStatsUpdater<SinglePrecisionBufferTypes> classStatsUpdater(weights_key, classes_key, 3);
+    CheckSameAsSplitpointStatsStep(classStatsUpdater);
+}
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep_mean_variance_stats)
+{
+    MeanVarianceStatsUpdater<SinglePrecisionBufferTypes> meanVarianceStatsUpdater(weights_key, ys_key, 2);
+    CheckSameAsSplitpointStatsStep(meanVarianceStatsUpdater);
+}
+
+BOOST_AUTO_TEST_CASE(test_ProcessStep_subset_of_indices)
+{
+    // A child node only has some of the rows and reads the same codes
+    int child_indices_data[] = {0, 7, 5, 9};
+    bc.AddBuffer(indices_key, VectorBufferTemplate<int>(&child_indices_data[0], 4));
+    float child_feature_values_data[] = {3.0, 4.0, 5.0, 6.0,
+                                         1.0, 1.0, 1.0, 2.0,
+                                         1.003, 1.004, 1.005, 1.006 };
+    bc.AddBuffer(feature_values_key, MatrixBufferTemplate<float>(&child_feature_values_data[0], 3, 4));
+
+    ClassStatsUpdater<SinglePrecisionBufferTypes> classStatsUpdater(weights_key, classes_key, 3);
+    CheckSameAsSplitpointStatsStep(classStatsUpdater);
+    MeanVarianceStatsUpdater<SinglePrecisionBufferTypes> meanVarianceStatsUpdater(weights_key, ys_key, 2);
+    CheckSameAsSplitpointStatsStep(meanVarianceStatsUpdater);
+}
+
+BOOST_AUTO_TEST_SUITE_END()
@@ -11,6 +11,9 @@
 #include "ClassEstimatorFinalizer.h"
 #include "SplitSelectorBuffers.h"
 #include "SplitBuffersIndices.h"
+#include "SplitBuffersPartitionIndices.h"
+#include "SplitBuffersSortedIndices.h"
+#include "SplitBuffersList.h"
 #include "SplitSelectorInfo.h"
 #include "SplitSelector.h"
 
@@ -436,4 +439,89 @@ BOOST_AUTO_TEST_CASE(test_SplitBuffers_DATAPOINTS_BY_FEATURES)
 }
 
 
+BOOST_AUTO_TEST_CASE(test_SplitBuffers_sorted_indices)
+{
+    const BufferCollectionKey_t sorted_indices_key("sorted_indices");
+    int sortedIndicesData[] = {4, 2, 0, 3, 1,
+                               1, 0, 2, 3, 4};
+    collection.AddBuffer(sorted_indices_key, CreateMatrix<int>(sortedIndicesData, 2, 5));
+
+    SplitSelectorBuffers buffers(im_key, splitpoints_key, number_splitpoints_key, childcounts_key,
+                              left_key, right_key, feature_floatparams_key, feature_intparams_key,
+                              feature_values_key, FEATURES_BY_DATAPOINTS, NULL);
+    std::vector<SplitSelectorBuffers> split_select_buffers;
+    split_select_buffers.push_back(buffers);
+
+    MinChildSizeCriteria min_child_size_criteria(10);
+    ClassEstimatorFinalizer<BufferTypes_t> classEsimatorFinalizer;
+    SplitBuffersIndices<BufferTypes_t> splitIndices(indices_key);
+    SplitBuffersSortedIndices<BufferTypes_t> splitSortedIndices(sorted_indices_key);
+    std::vector<SplitBuffersI*> splitters;
+    splitters.push_back(&splitIndices);
+    splitters.push_back(&splitSortedIndices);
+    SplitBuffersList splitList(splitters);
+    SplitSelector<BufferTypes_t> splitselector(split_select_buffers, &min_child_size_criteria, &classEsimatorFinalizer, &splitList);
+
+    const int depth = 5;
+    BufferCollection bc;
+    SplitSelectorInfo<BufferTypes_t> selectorInfo = splitselector.ProcessSplits(stack, depth, bc, 0);
+    BOOST_CHECK( selectorInfo.ValidSplit() );
+
+    BufferCollection leftBufCol;
+    BufferCollection rightBufCol;
+    float leftSize, rightSize;
+    selectorInfo.SplitBuffers(leftBufCol, rightBufCol, leftSize, rightSize);
+
+    // Datapoints 0 and 4 go left and 1, 2 and 3 go right.  Each row keeps its
+    // order and is renumbered to the positions in the child.
+    int leftExpectedSortedIndexData[] = {1, 0,
+                                         0, 1};
+    int rightExpectedSortedIndexData[] = {1, 2, 0,
+                                          0, 1, 2};
+
+    BOOST_CHECK(leftBufCol.GetBuffer< MatrixBufferTemplate<int> >(sorted_indices_key) == CreateMatrix<int>(leftExpectedSortedIndexData, 2, 2));
+    BOOST_CHECK(rightBufCol.GetBuffer< MatrixBufferTemplate<int> >(sorted_indices_key) == CreateMatrix<int>(rightExpectedSortedIndexData, 2, 3));
+}
+
+BOOST_AUTO_TEST_CASE(test_SplitBuffers_partition_indices)
+{
+    SplitSelectorBuffers buffers(im_key, splitpoints_key, number_splitpoints_key, childcounts_key,
+                              left_key, right_key, feature_floatparams_key, feature_intparams_key,
+                              feature_values_key, FEATURES_BY_DATAPOINTS, NULL);
+    std::vector<SplitSelectorBuffers> split_select_buffers;
+    split_select_buffers.push_back(buffers);
+
+    MinChildSizeCriteria min_child_size_criteria(10);
+    ClassEstimatorFinalizer<BufferTypes_t> classEsimatorFinalizer;
+    SplitBuffersPartitionIndices<BufferTypes_t> splitIndices(indices_key);
+    SplitSelector<BufferTypes_t> splitselector(split_select_buffers, &min_child_size_criteria, &classEsimatorFinalizer, &splitIndices);
+
+    const int depth = 5;
+    BufferCollection bc;
+    SplitSelectorInfo<BufferTypes_t> selectorInfo = splitselector.ProcessSplits(stack, depth, bc, 0);
+    BOOST_CHECK( selectorInfo.ValidSplit() );
+
+    BufferCollection leftBufCol;
+    BufferCollection rightBufCol;
+    float leftSize, rightSize;
+    selectorInfo.SplitBuffers(leftBufCol, rightBufCol, leftSize, rightSize);
+
+    int leftExpectedIndexData[] = {0, 4};
+    int rightExpectedIndexData[] = {1, 2, 3};
+
+    const VectorBufferTemplate<int>& leftIndices = leftBufCol.GetBuffer< VectorBufferTemplate<int> >(indices_key);
+    const VectorBufferTemplate<int>& rightIndices = rightBufCol.GetBuffer< VectorBufferTemplate<int> >(indices_key);
+    BOOST_CHECK(leftIndices == CreateVector<int>(leftExpectedIndexData, 2));
+    BOOST_CHECK(rightIndices == CreateVector<int>(rightExpectedIndexData, 3));
+
+    // Both children are ranges of the same array
+    BOOST_CHECK(leftIndices.IsView());
+    BOOST_CHECK(rightIndices.IsView());
+    BOOST_CHECK_EQUAL(leftIndices.GetDataPtrUnsafe() + 2, rightIndices.GetDataPtrUnsafe());
+
+    // The indices of the node are not changed
+    int expectedIndexData[] = {0, 1, 2, 3, 4};
+    BOOST_CHECK(collection.GetBuffer< VectorBufferTemplate<int> >(indices_key) == CreateVector<int>(expectedIndexData, 5));
+}
+
 BOOST_AUTO_TEST_SUITE_END()
\ No newline at end of file
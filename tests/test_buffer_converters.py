@@ -78,6 +78,26 @@ class TestBufferConverters(unittest.TestCase):
         X_64 = np.array([22,1,5], dtype=np.float )
         self.matrix_buffer_flatten_helper(X=X_64, buffer_type=buffers.Float64MatrixBuffer)
 
+    def test_matrix_buffer_no_copy(self):
+        X = np.array([[3,21,1],[22,1,5]], dtype=np.float32 )
+        buf = buffers.as_matrix_buffer(X, copy=False)
+        self.assertTrue(isinstance(buf, buffers.Float32MatrixBuffer))
+        self.assertEqual(buf.DataAddress(), X.ctypes.data)
+        X_view = buffers.as_numpy_array(buf, copy=False)
+        self.assertEqual(X_view.ctypes.data, X.ctypes.data)
+        self.assertTrue((X == X_view).all())
+
+        buf.Set(0, 0, 7)
+        self.assertEqual(X[0,0], 3)
+        self.assertEqual(buffers.as_numpy_array(buf)[0,0], 7)
+
+    def test_tensor_buffer_no_copy_keeps_array_alive(self):
+        X = np.arange(24, dtype=np.int64).reshape(2,3,4)
+        buf = buffers.as_tensor_buffer(X[:,:,::2], copy=False)
+        del X
+        X_back = buffers.as_numpy_array(buf, copy=False)
+        self.assertTrue((X_back == np.arange(24).reshape(2,3,4)[:,:,::2]).all())
+
 
 
 
@@ -1,6 +1,9 @@
 import unittest as unittest
 import numpy as np
 import datetime
+import os
+import shutil
+import tempfile
 
 import load_data 
 
@@ -289,6 +292,104 @@ class TestNew(unittest.TestCase):
         self.assertEqual(result[5,1], -1)
 
 
+    def write_shards(self, directory, shard_lengths):
+        xs = []
+        classes = []
+        for k, shard_length in enumerate(shard_lengths):
+            x = np.random.rand(shard_length, 2).astype(np.float32)
+            x[:,0] += k
+            c = np.array(x[:,1] > 0.5, dtype=np.int32)
+            np.save(os.path.join(directory, 'x_%d.npy' % k), x)
+            np.save(os.path.join(directory, 'classes_%d.npy' % k), c)
+            xs.append(x)
+            classes.append(c)
+        return np.vstack(xs), np.hstack(classes)
+
+    def test_npy_shards(self):
+        directory = tempfile.mkdtemp()
+        try:
+            x, classes = self.write_shards(directory, [30, 20, 10])
+            shards = rftk.learn.NpyShards(directory)
+            self.assertEqual(shards.number_of_shards(), 3)
+            self.assertEqual(sorted(shards.arrays.keys()), ['classes', 'x'])
+            self.assertEqual(shards.arrays['x'].shape, (60, 2))
+            self.assertEqual(shards.arrays['classes'].shape, (60,))
+            self.assertEqual(shards.arrays['x'].max(), x.max())
+            self.assertEqual(shards.arrays['x'].min(), x.min())
+            self.assertEqual(shards.arrays['classes'].max(), classes.max())
+            shard_list = list(shards)
+            self.assertEqual(len(shard_list), 3)
+            self.assertTrue(isinstance(shard_list[1]['x'], np.memmap))
+            self.assertTrue((np.vstack([shard['x'] for shard in shard_list]) == x).all())
+            self.assertTrue((np.hstack([shard['classes'] for shard in shard_list]) == classes).all())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_npy_shards_mismatched(self):
+        directory = tempfile.mkdtemp()
+        try:
+            np.save(os.path.join(directory, 'x_0.npy'), np.zeros((5, 2), dtype=np.float32))
+            np.save(os.path.join(directory, 'x_1.npy'), np.zeros((5, 3), dtype=np.float32))
+            self.assertRaises(Exception, rftk.learn.ShardedArray,
+                              [os.path.join(directory, 'x_0.npy'), os.path.join(directory, 'x_1.npy')])
+            self.assertRaises(Exception, rftk.learn.ShardedArray, [])
+
+            # classes is missing shard 1
+            np.save(os.path.join(directory, 'x_1.npy'), np.zeros((5, 2), dtype=np.float32))
+            np.save(os.path.join(directory, 'classes_0.npy'), np.zeros(5, dtype=np.int32))
+            self.assertRaises(Exception, rftk.learn.NpyShards, directory)
+
+            # shard 1 of classes has a different number of rows than shard 1 of x
+            np.save(os.path.join(directory, 'classes_1.npy'), np.zeros(4, dtype=np.int32))
+            self.assertRaises(Exception, rftk.learn.NpyShards, directory)
+
+            np.save(os.path.join(directory, 'classes_1.npy'), np.zeros(5, dtype=np.int32))
+            self.assertEqual(rftk.learn.NpyShards(directory).number_of_shards(), 2)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_npy_shards_empty_directory(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertRaises(Exception, rftk.learn.NpyShards, directory)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_fit_shards_online(self):
+        directory = tempfile.mkdtemp()
+        try:
+            x, classes = self.write_shards(directory, [200, 200])
+            learner = rftk.learn.create_uber_learner(data_type='matrix',
+                                                     extractor_type='axis_aligned',
+                                                     prediction_type='classification',
+                                                     split_type='constant_splitpoints',
+                                                     constant_splitpoints_type='at_random_datapoints',
+                                                     number_of_splitpoints=10,
+                                                     streams_type='one_stream',
+                                                     tree_type='online')
+            predictor = learner.fit_shards(rftk.learn.NpyShards(directory), number_of_trees=10, number_of_features=2)
+            self.assertEqual(predictor.get_forest().GetNumberOfTrees(), 10)
+            y_probs = predictor.predict(x=x)
+            self.assertEqual(y_probs.shape, (400, 2))
+            self.assertTrue(np.allclose(y_probs.sum(axis=1), 1.0))
+            self.assertLess(np.mean(classes != y_probs.argmax(axis=1)), 0.5)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_fit_shards_depth_first_raises(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.write_shards(directory, [20, 20])
+            learner = rftk.learn.create_uber_learner(data_type='matrix',
+                                                     extractor_type='axis_aligned',
+                                                     prediction_type='classification',
+                                                     split_type='all_midpoints',
+                                                     tree_type='depth_first')
+            self.assertRaises(Exception, learner.fit_shards, rftk.learn.NpyShards(directory))
+        finally:
+            shutil.rmtree(directory)
+
+
     def test_ecoli_classifiers(self):
         x_train, y_train, x_test, y_test = load_data.load_ecoli_data()
 
@@ -1083,6 +1184,199 @@ class TestNew(unittest.TestCase):
 
 
 
+# The errors of a single prediction as the error calculators of greedy_prune
+# computed them one tree at a time
+def reference_zero_one_error(y_hat_sum, weights_sum, **kwargs):
+    y_hat_avg = y_hat_sum / weights_sum
+    return np.mean(kwargs.get('classes') != y_hat_avg.argmax(axis=0))
+
+def reference_prob_of_error(y_hat_sum, weights_sum, **kwargs):
+    y_hat_avg = y_hat_sum / weights_sum
+    y_hat_avg[np.isnan(y_hat_avg)] = 0
+    return 1.0 - np.mean(y_hat_avg[kwargs.get('classes')].diagonal())
+
+def reference_prob_of_error_on_error(y_hat_sum, weights_sum, **kwargs):
+    y_hat_avg = y_hat_sum / weights_sum
+    y_hat_avg[np.isnan(y_hat_avg)] = 0
+    probabilities = y_hat_avg[kwargs.get('classes')].diagonal().copy()
+    probabilities[kwargs.get('classes') == y_hat_avg.argmax(axis=0)] = 1.0
+    return np.mean(1.0 - probabilities)
+
+def reference_cross_entropy_error(y_hat_sum, weights_sum, **kwargs):
+    y_hat_avg = y_hat_sum / weights_sum
+    y_hat_avg[np.isnan(y_hat_avg)] = 0.001
+    y_hat_avg[y_hat_avg < 0.001] = 0.001
+    return np.mean(-np.log(y_hat_avg[kwargs.get('classes')].diagonal()))
+
+def reference_mse_error(y_hat_sum, weights_sum, **kwargs):
+    return np.mean((kwargs.get('y') - (y_hat_sum / weights_sum).T)**2)
+
+classification_error_calculators = [
+    (rftk.learn.ZeroOneClassificationError, reference_zero_one_error),
+    (rftk.learn.ProbOfErrorClassificationError, reference_prob_of_error),
+    (rftk.learn.ProbOfErrorOnErrorClassificationError, reference_prob_of_error_on_error),
+    (rftk.learn.CrossEntropyError, reference_cross_entropy_error)]
+
+# greedy_prune as it was before the candidates were scored in one pass, it
+# rebuilt the prediction and scored one tree at a time
+def reference_greedy_prune(reference_error, leaf_ys, oob_weights, backtrack_ratio, **kwargs):
+    forest_size = leaf_ys.shape[2]
+    tree_weights = np.ones(forest_size)
+    trees_pruned_in_order = []
+    while True:
+        weights = oob_weights * tree_weights
+        y_hat_sum = (weights * leaf_ys).sum(axis=2)
+        weights_sum = weights.sum(axis=1)
+        best_forest_error = reference_error(y_hat_sum, weights_sum, **kwargs)
+        tree_index_to_remove = -1
+        for tree_index in range(forest_size):
+            if tree_weights[tree_index] > 0:
+                error = reference_error(y_hat_sum - leaf_ys[:,:,tree_index] * weights[:,tree_index],
+                                        weights_sum - weights[:,tree_index], **kwargs)
+                if error < best_forest_error:
+                    tree_index_to_remove = tree_index
+                    best_forest_error = error
+        if tree_index_to_remove == -1:
+            break
+        tree_weights[tree_index_to_remove] = 0
+        trees_pruned_in_order.append(tree_index_to_remove)
+    number_of_trees_to_backtrack = int(np.sum(tree_weights > 0.1) * backtrack_ratio)
+    for tree_index in trees_pruned_in_order[-number_of_trees_to_backtrack:]:
+        tree_weights[tree_index] = 1.0
+    return tree_weights
+
+def reference_greedy_add(reference_error, leaf_ys, oob_weights, **kwargs):
+    forest_size = leaf_ys.shape[2]
+    tree_weights = np.zeros(forest_size)
+    while True:
+        weights = oob_weights * tree_weights
+        y_hat_sum = (weights * leaf_ys).sum(axis=2)
+        weights_sum = weights.sum(axis=1)
+        best_forest_error = reference_error(y_hat_sum, weights_sum, **kwargs)
+        tree_index_to_add = -1
+        for tree_index in range(forest_size):
+            if tree_weights[tree_index] < 0.1:
+                error = reference_error(y_hat_sum + leaf_ys[:,:,tree_index] * oob_weights[:,tree_index],
+                                        weights_sum + oob_weights[:,tree_index], **kwargs)
+                if error < best_forest_error:
+                    tree_index_to_add = tree_index
+                    best_forest_error = error
+        if tree_index_to_add == -1:
+            break
+        tree_weights[tree_index_to_add] = 1
+    return tree_weights
+
+
+class TestGreedyPrune(unittest.TestCase):
+
+    def random_leaf_ys(self, random_state, ys_dim, number_of_datapoints, number_of_trees):
+        leaf_ys = random_state.rand(ys_dim, number_of_datapoints, number_of_trees).astype(np.float32)
+        leaf_ys /= leaf_ys.sum(axis=0)
+        oob_weights = random_state.uniform(0.5, 1.5, size=(number_of_datapoints, number_of_trees)).astype(np.float32)
+        return leaf_ys, oob_weights
+
+    def check_errors_match_per_tree(self, error_calculator, reference_error, leaf_ys, oob_weights, **kwargs):
+        number_of_trees = leaf_ys.shape[2]
+        tree_weights = np.ones(number_of_trees, dtype=np.float32)
+        y_hat_sum, weights, weights_sum = error_calculator.y_hat_sum(tree_weights=tree_weights,
+                                                                     oob_weights=oob_weights,
+                                                                     leaf_ys=leaf_ys,
+                                                                     **kwargs)
+        tree_ids = np.arange(number_of_trees)
+
+        # A chunk smaller than the number of candidates
+        error_calculator.max_chunk_elements = 2 * y_hat_sum.size
+        errors_without_trees = error_calculator.errors_without_trees(y_hat_sum=y_hat_sum, weights=weights,
+                                                                     weights_sum=weights_sum, leaf_ys=leaf_ys,
+                                                                     tree_ids=tree_ids, **kwargs)
+        errors_with_trees = error_calculator.errors_with_trees(y_hat_sum=y_hat_sum, weights=weights,
+                                                               weights_sum=weights_sum, leaf_ys=leaf_ys,
+                                                               tree_ids=tree_ids, **kwargs)
+        self.assertEqual(errors_without_trees.shape, (number_of_trees,))
+        self.assertEqual(errors_with_trees.shape, (number_of_trees,))
+
+        for tree_id in tree_ids:
+            error_without_tree = error_calculator.error_without_tree(y_hat_sum=y_hat_sum, weights=weights,
+                                                                     weights_sum=weights_sum, leaf_ys=leaf_ys,
+                                                                     tree_id_to_revove=tree_id, **kwargs)
+            error_with_tree = error_calculator.error_with_tree(y_hat_sum=y_hat_sum, weights=weights,
+                                                               weights_sum=weights_sum, leaf_ys=leaf_ys,
+                                                               tree_id_to_add=tree_id, **kwargs)
+            self.assertAlmostEqual(errors_without_trees[tree_id], error_without_tree)
+            self.assertAlmostEqual(errors_with_trees[tree_id], error_with_tree)
+
+            y_hat_sum_without_tree = y_hat_sum - leaf_ys[:,:,tree_id] * weights[:,tree_id]
+            y_hat_sum_with_tree = y_hat_sum + leaf_ys[:,:,tree_id] * weights[:,tree_id]
+            self.assertAlmostEqual(errors_without_trees[tree_id],
+                                   reference_error(y_hat_sum_without_tree, weights_sum - weights[:,tree_id], **kwargs))
+            self.assertAlmostEqual(errors_with_trees[tree_id],
+                                   reference_error(y_hat_sum_with_tree, weights_sum + weights[:,tree_id], **kwargs))
+
+    def test_classification_errors_match_per_tree(self):
+        random_state = np.random.RandomState(0)
+        leaf_ys, oob_weights = self.random_leaf_ys(random_state, 3, 20, 7)
+        classes = random_state.randint(0, 3, size=20).astype(np.int32)
+        for error_calculator_type, reference_error in classification_error_calculators:
+            self.check_errors_match_per_tree(error_calculator_type(), reference_error, leaf_ys, oob_weights, classes=classes)
+
+    def test_regression_errors_match_per_tree(self):
+        random_state = np.random.RandomState(1)
+        leaf_ys, oob_weights = self.random_leaf_ys(random_state, 2, 20, 7)
+        y = random_state.rand(20, 2).astype(np.float32)
+        self.check_errors_match_per_tree(rftk.learn.MseRegressionError(), reference_mse_error, leaf_ys, oob_weights, y=y)
+
+    def test_prob_of_error_on_error_only_counts_errors(self):
+        # One tree, the first two datapoints are classified correctly and
+        # the last one is not
+        leaf_ys = np.array([[[0.6], [0.2], [0.7]],
+                            [[0.4], [0.8], [0.3]]], dtype=np.float32)
+        oob_weights = np.ones((3, 1), dtype=np.float32)
+        classes = np.array([0, 1, 1], dtype=np.int32)
+        tree_weights = np.ones(1, dtype=np.float32)
+
+        error_calculator = rftk.learn.ProbOfErrorOnErrorClassificationError()
+        y_hat_sum, weights, weights_sum = error_calculator.y_hat_sum(tree_weights=tree_weights,
+                                                                     oob_weights=oob_weights,
+                                                                     leaf_ys=leaf_ys,
+                                                                     classes=classes)
+        error = error_calculator.error(y_hat_sum=y_hat_sum, weights=weights, weights_sum=weights_sum,
+                                       leaf_ys=leaf_ys, classes=classes)
+        self.assertAlmostEqual(error, (1.0 - 0.3) / 3.0, places=5)
+
+        # Every datapoint counts towards the probability of error
+        prob_of_error_calculator = rftk.learn.ProbOfErrorClassificationError()
+        prob_of_error = prob_of_error_calculator.error(y_hat_sum=y_hat_sum, weights=weights, weights_sum=weights_sum,
+                                                       leaf_ys=leaf_ys, classes=classes)
+        self.assertAlmostEqual(prob_of_error, (0.4 + 0.2 + 0.7) / 3.0, places=5)
+
+    def learn_bootstrap_forest(self):
+        random_state = np.random.RandomState(2)
+        x = random_state.rand(60, 2).astype(np.float32)
+        classes = np.array(x[:,0] + 0.3*random_state.rand(60) > 0.65, dtype=np.int32)
+        learner = rftk.learn.create_vanilia_classifier()
+        predictor = learner.fit(x=x, classes=classes, bootstrap=True, number_of_trees=12, number_of_features=2)
+        return predictor, x, classes
+
+    def test_greedy_prune_picks_same_trees(self):
+        predictor, x, classes = self.learn_bootstrap_forest()
+        leaf_ys, oob_weights = predictor.predict_leafs_ys(x=x, classes=classes)
+        for error_calculator_type, reference_error in classification_error_calculators:
+            for backtrack_ratio in [1.0, 0.5]:
+                _, tree_weights, _ = rftk.learn.greedy_prune(predictor, error_calculator_type(), backtrack_ratio, x=x, classes=classes)
+                expected_tree_weights = reference_greedy_prune(reference_error, leaf_ys, oob_weights, backtrack_ratio, classes=classes)
+                self.assertTrue((tree_weights == expected_tree_weights).all())
+
+    def test_greedy_add_picks_same_trees(self):
+        predictor, x, classes = self.learn_bootstrap_forest()
+        leaf_ys, oob_weights = predictor.predict_leafs_ys(x=x, classes=classes)
+        for error_calculator_type, reference_error in classification_error_calculators:
+            _, tree_weights, _ = rftk.learn.greedy_add(predictor, error_calculator_type(), x=x, classes=classes)
+            expected_tree_weights = reference_greedy_add(reference_error, leaf_ys, oob_weights, classes=classes)
+            self.assertTrue((tree_weights == expected_tree_weights).all())
+
+
+
+
 
 
 